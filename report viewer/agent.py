@@ -6,23 +6,75 @@ click elements, and respond in both Arabic and English.
 """
 
 import os
+import asyncio
+import functools
 import logging
+import time
 from dotenv import load_dotenv
 
 from livekit import agents, rtc
-from livekit.agents import AgentServer, AgentSession, Agent, RunContext, function_tool
+from livekit.agents import (
+    AgentServer, AgentSession, Agent, JobExecutorType, JobProcess, RunContext, StopResponse, function_tool, inference,
+    room_io,
+)
+from livekit.agents.llm import ChatChunk, ChatContext, ChatMessage
 
-# Import custom tools from tools.py
-from tools import ALL_TOOLS, FRONTEND_BASE_URL
-
-# Load environment variables
+# Load environment variables (before importing modules that read them)
 load_dotenv(".env.local")
 load_dotenv(".env")
 
+# Import custom tools from tools.py
+from tools import ALL_TOOLS, FRONTEND_BASE_URL, send_navigation_url  # noqa: E402
+from client_capabilities import ClientCapabilities  # noqa: E402
+from conversation_log import get_transcript_writer, user_id_for  # noqa: E402
+from history import HistoryWindow  # noqa: E402
+from intent_router import IntentRouter, split_confirmation  # noqa: E402
+from interruptions import ToolRuns  # noqa: E402
+from kpi_aggregates import get_kpi_aggregates  # noqa: E402
+from outbound import outbound_for  # noqa: E402
+from page_context import PageContextBuilder  # noqa: E402
+from page_model import PageModel  # noqa: E402
+from pending_actions import PendingActionRegistry  # noqa: E402
+from report_index import get_report_index  # noqa: E402
+from resumption import (  # noqa: E402
+    RESUME_READY_TIMEOUT, SessionResumer, load_recent_conversation, resumed_chat_ctx,
+)
+from routes import ROUTES, route_list  # noqa: E402
+from speculation import SpeculativeNavigator  # noqa: E402
+from terminal_replies import TerminalReplies  # noqa: E402
+from tracing import TurnTracer, setup_tracing, tracer  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("voice-agent")
 
+# Deterministic fast path for plain navigation commands (set AGENT_FAST_PATH=0 to
+# always go through the LLM)
+FAST_PATH_ROUTER = IntentRouter(ROUTES) if os.getenv("AGENT_FAST_PATH", "1") != "0" else None
+
+# Prefetch hints to the frontend from interim transcripts (set AGENT_SPECULATION=0 to disable)
+SPECULATIVE_NAVIGATION = os.getenv("AGENT_SPECULATION", "1") != "0"
+
+# STT-LLM-TTS providers (LiveKit Inference model strings)
+STT_MODEL = os.getenv("AGENT_STT_MODEL", "assemblyai/universal-streaming:ar")  # Arabic + English support
+LLM_MODEL = os.getenv("AGENT_LLM_MODEL", "openai/gpt-4.1-mini")
+TTS_MODEL = os.getenv("AGENT_TTS_MODEL", "openai/tts-1:nova")  # Clear voice for bilingual support
+
+# Fixed bilingual greeting, so its audio can be served from the TTS cache
+GREETING = os.getenv(
+    "AGENT_GREETING",
+    "أهلاً بيك! Hello! I can help you navigate the dashboard. Just tell me where you'd like to go.",
+)
+
+# Phrases whose synthesized audio is cached: the greeting and every navigation
+# confirmation, both bilingual (tool result) and single-language (fast path)
+CACHED_PHRASES = [GREETING] + [
+    phrase
+    for route in ROUTES
+    for phrase in (route.confirmation, split_confirmation(route.confirmation, "ar"),
+                   split_confirmation(route.confirmation, "en"))
+]
+
 # Agent instructions - bilingual support for Arabic and English
 AGENT_INSTRUCTIONS = """You are a helpful voice AI assistant for the Professional Engineers Dashboard.
 
@@ -35,83 +87,422 @@ AGENT_INSTRUCTIONS = """You are a helpful voice AI assistant for the Professiona
 You can help users navigate the dashboard using voice commands:
 
 ### Navigation Commands
-- Dashboard: "افتح الداشبورد" / "Open dashboard"
-- WhatsApp Reports: "وريني تقارير الواتساب" / "Show WhatsApp reports"
-- Productivity Reports: "افتح تقارير الإنتاجية" / "Show productivity reports"
-- Ads Reports: "عايز تقارير الإعلانات" / "Show ads reports"
-- Email Reports: "افتح تقارير الإيميلات" / "Show mail reports"
-- Bots: "روح على البوتات" / "Open bots"
-- Social Posts: "وريني البوستات" / "Show social posts"
-- Content Ideas: "افتح الأفكار" / "Show content ideas"
-- Meeting Summary: "وريني الاجتماعات" / "Show meeting summary"
-- Courses: "افتح الكورسات" / "Show courses and prices"
-- Home: "روح الصفحة الرئيسية" / "Go home"
-- Admin Settings: "افتح الإعدادات" / "Open admin settings"
-- Awaiting Approval: "وريني الموافقات" / "Show awaiting approval"
+When the user asks to open, show or go to a page ("افتح الداشبورد", "Show WhatsApp reports"), call navigate with its route:
+{routes}
 
 ### Report by Date
 When a user asks for a specific report with a DATE mentioned (e.g., "Get me productivity report of 2 nov 2025" or "عايز تقرير الإنتاجية بتاع 2 نوفمبر"), use the view_report_by_date function.
 
+### Questions About Report Content
+When the user asks what a report, meeting or weekly analysis says (not to open it), call search_reports and answer briefly from its snippets, naming the report and date they come from.
+
+### Numbers
+When the user asks how many reports, posts or content ideas there were in a period, how a section is doing, or which bots are running ("How many WhatsApp reports this month?", "أداء الإعلانات الأسبوع ده"), call get_kpi and answer briefly from its numbers.
+
 ### DOM Interactions
 You can also click buttons and elements on the page when the user requests.
+When one request needs several steps (open a page, then search or click), send them all in a single run_dom_plan call.
 
 ## Response Style
 - Be concise and friendly
 - Confirm actions you're taking
 - If navigation fails, inform the user politely
 - Don't use complex formatting, emojis, or special characters in your responses
-"""
+""".format(routes=route_list())
+
+
+@functools.cache
+def response_fingerprint() -> str:
+    """What cached LLM answers depend on: a change to any of it invalidates them.
+
+    Computed on first use (in prewarm) rather than at import: it serializes
+    every tool's schema.
+    """
+    from response_cache import fingerprint
+
+    return fingerprint(AGENT_INSTRUCTIONS, ALL_TOOLS, LLM_MODEL)
 
 
 class VoiceAssistant(Agent):
     """Voice assistant agent for the Professional Engineers Dashboard."""
 
-    def __init__(self) -> None:
+    def __init__(self, chat_ctx: ChatContext | None = None) -> None:
         super().__init__(
             instructions=AGENT_INSTRUCTIONS,
             tools=ALL_TOOLS,
+            chat_ctx=chat_ctx,
         )
 
     async def on_enter(self) -> None:
         """Called when the agent enters the session."""
         logger.info("Voice assistant entered session")
 
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        """Navigate directly on confident navigation commands, skipping the LLM.
+
+        Tools still running for earlier turns are cancelled first, unless the
+        turn is only an acknowledgement ("ok", "تمام"). The history
+        is then trimmed to its sliding window (older turns folded into a
+        summary). Other turns get a bounded summary of the user's page added
+        to this turn's context (not to the history).
+        """
+        # The user has moved on (unless this is just "ok"): tools still running for earlier turns are stale
+        tool_runs = getattr(self, "_tool_runs", None)
+        if tool_runs is not None:
+            tool_runs.on_user_turn(new_message.text_content or "")
+
+        history = getattr(self, "_history", None)
+        if history is not None:
+            trimmed = history.trim(self.chat_ctx)
+            if trimmed is not None:
+                await self.update_chat_ctx(trimmed)
+                turn_ctx.items[:] = self.chat_ctx.items
+
+        await self._fast_path(new_message)
+
+        page_context = getattr(self, "_page_context", None)
+        if page_context is not None:
+            content = page_context.build(getattr(self, "_page_model", None), new_message.text_content or "")
+            if content:
+                turn_ctx.add_message(role="system", content=content)
+
+    async def _fast_path(self, new_message: ChatMessage) -> None:
+        """Publish a confidently matched navigation and end the turn with StopResponse."""
+        if FAST_PATH_ROUTER is None:
+            return
+
+        match = FAST_PATH_ROUTER.match(new_message.text_content or "")
+        if match is None:
+            return
+
+        logger.info(f"Fast-path navigation: {match.route} (confidence {match.confidence:.2f})")
+        with tracer.start_as_current_span("fast_path", attributes={"route": match.route}):
+            sent = await send_navigation_url(self, None, f"{FRONTEND_BASE_URL}{match.pathname}")
+        if not sent:
+            return  # let the LLM handle it
+
+        # Keep the command in the history, since StopResponse drops the user message
+        chat_ctx = self.chat_ctx.copy()
+        chat_ctx.items.append(new_message)
+        await self.update_chat_ctx(chat_ctx)
+
+        self.session.say(match.spoken_confirmation)
+        raise StopResponse()
+
+    async def llm_node(self, chat_ctx, tools, model_settings):
+        """Replay the answer to a question asked before; send anything else to the LLM and cache its answer."""
+        cache = getattr(self, "_response_cache", None)
+        utterance = None
+        if cache is not None:
+            from response_cache import CachedResponse, cacheable_utterance
+
+            utterance = cacheable_utterance(chat_ctx)
+        if utterance is None:
+            async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
+                yield chunk
+            return
+
+        page_model = getattr(self, "_page_model", None)
+        page = page_model.pathname if page_model is not None else None
+        content = page_model.digest if page_model is not None else ""
+        cached = cache.lookup(utterance, page, content)
+        if cached is not None:
+            logger.info(f"Cached answer for {utterance!r}")
+            for chunk in cached.chunks():
+                yield chunk
+            return
+
+        text, tool_calls = [], []
+        async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
+            if isinstance(chunk, str):
+                text.append(chunk)
+            elif isinstance(chunk, ChatChunk) and chunk.delta is not None:
+                text.append(chunk.delta.content or "")
+                tool_calls.extend((call.name, call.arguments) for call in chunk.delta.tool_calls)
+            yield chunk
+        # Only reached when the answer streamed to the end (not on interruption)
+        cache.store(utterance, page, CachedResponse("".join(text).strip(), tuple(tool_calls)), content)
+
+    async def tts_node(self, text, model_settings):
+        """Serve cached audio for fixed phrases; everything else goes to the TTS provider."""
+        cache = getattr(self, "_tts_cache", None)
+        if cache is None:
+            frames = Agent.default.tts_node(self, text, model_settings)
+        else:
+            frames = cache.synthesize(text, TTS_MODEL, lambda t: Agent.default.tts_node(self, t, model_settings))
+        async for frame in frames:
+            yield frame
+
+
+def build_providers() -> dict:
+    """Construct the STT, LLM and TTS plugins from their model strings."""
+    return {
+        "stt": inference.STT.from_model_string(STT_MODEL),
+        "llm": inference.LLM.from_model_string(LLM_MODEL),
+        "tts": inference.TTS.from_model_string(TTS_MODEL),
+    }
+
+
+# Plugins built in this process, by the (STT, LLM, TTS) model strings they were built for
+_providers: dict[tuple[str, str, str], dict] = {}
+
+
+def get_providers() -> dict:
+    """This process's plugins for the configured models, built on first use.
+
+    The LLM client alone takes ~50-150ms to construct (it loads the CA
+    bundle), so jobs without a prewarmed process (thread executor, or more
+    jobs than idle processes) reuse the first job's plugins instead of
+    building their own.
+    """
+    key = (STT_MODEL, LLM_MODEL, TTS_MODEL)
+    if key not in _providers:
+        _providers[key] = build_providers()
+    return _providers[key]
+
+
+def build_tts_cache():
+    """Open this host's TTS cache and register the phrases it may hold."""
+    from tts_cache import get_tts_cache
+
+    cache = get_tts_cache()
+    if cache is not None:
+        cache.register(CACHED_PHRASES)
+    return cache
+
+
+# prewarm() steps, in order, as reported in proc.userdata["prewarm_phases"]
+PREWARM_PHASES = ("tracing", "features", "providers", "tts_cache", "response_cache")
+
+
+def prewarm(proc: JobProcess):
+    """Runs once per worker process, before it is handed a job.
+
+    Plugin construction happens here instead of after the room is assigned,
+    so an idle process is ready to greet as soon as it gets a job. So do the
+    imports of the modules only sessions use (data indexes, caches): the
+    worker's main process, which never runs a session, doesn't load them.
+    """
+    start = time.perf_counter()
+    marks = [start]
+    setup_tracing()
+    marks.append(time.perf_counter())
+    import report_search  # noqa: F401
+    import response_cache
+    import tts_cache  # noqa: F401
+    marks.append(time.perf_counter())
+    proc.userdata.update(get_providers())
+    marks.append(time.perf_counter())
+    proc.userdata["tts_cache"] = build_tts_cache()
+    marks.append(time.perf_counter())
+    response_cache.get_response_cache(response_fingerprint())  # load the answers other jobs saved
+    marks.append(time.perf_counter())
+    proc.userdata["prewarm_seconds"] = marks[-1] - start
+    proc.userdata["prewarm_phases"] = {
+        phase: (end - begin) * 1000
+        for phase, begin, end in zip(PREWARM_PHASES, marks, marks[1:])
+    }
+    logger.info(f"Worker process prewarmed in {proc.userdata['prewarm_seconds'] * 1000:.0f}ms ("
+                + ", ".join(f"{phase} {ms:.0f}ms" for phase, ms in proc.userdata["prewarm_phases"].items()) + ")")
+
+
+def server_options() -> dict:
+    """AgentServer options, overridable from the environment.
+
+    AGENT_NUM_IDLE_PROCESSES: prewarmed processes kept waiting for jobs
+    AGENT_LOAD_THRESHOLD:     load (0-1) above which the worker stops taking jobs
+    AGENT_JOB_EXECUTOR:       "process" (one process per job) or "thread"
+    AGENT_PROMETHEUS_PORT:    serve /metrics (livekit and tracing.py histograms) on this port
+    AGENT_PROMETHEUS_MULTIPROC_DIR: collect job processes' metrics through this directory
+    Unset options keep the livekit dev/production defaults.
+    """
+    options = {"setup_fnc": prewarm}
+    if os.getenv("AGENT_NUM_IDLE_PROCESSES"):
+        options["num_idle_processes"] = int(os.environ["AGENT_NUM_IDLE_PROCESSES"])
+    if os.getenv("AGENT_LOAD_THRESHOLD"):
+        options["load_threshold"] = float(os.environ["AGENT_LOAD_THRESHOLD"])
+    if os.getenv("AGENT_JOB_EXECUTOR"):
+        options["job_executor_type"] = JobExecutorType(os.environ["AGENT_JOB_EXECUTOR"])
+    if os.getenv("AGENT_PROMETHEUS_PORT"):
+        options["prometheus_port"] = int(os.environ["AGENT_PROMETHEUS_PORT"])
+    if os.getenv("AGENT_PROMETHEUS_MULTIPROC_DIR"):
+        options["prometheus_multiproc_dir"] = os.environ["AGENT_PROMETHEUS_MULTIPROC_DIR"]
+    return options
+
 
 # Create the agent server
-server = AgentServer()
+server = AgentServer(**server_options())
 
 
 @server.rtc_session()
 async def voice_agent_session(ctx: agents.JobContext):
     """Main entry point for voice agent sessions."""
+    from report_search import get_report_search
+    from response_cache import get_response_cache
+
+    started_at = time.perf_counter()
     logger.info(f"Starting voice agent session in room: {ctx.room.name}")
 
-    # Store room reference for navigation tools
-    # This allows tools to access the room for data channel communication
+    # Use the plugins built by prewarm(), or else this process's shared ones (built on first use)
+    setup_tracing()
+    providers = ctx.proc.userdata if "llm" in ctx.proc.userdata else get_providers()
+
+    # Open provider connections and load the report indexes and KPI aggregates while the room connects
+    for plugin in (providers["stt"], providers["llm"], providers["tts"]):
+        plugin.prewarm()
+    index_warmup = asyncio.create_task(get_report_index())
+    search_warmup = asyncio.create_task(get_report_search())
+    kpi_warmup = asyncio.create_task(get_kpi_aggregates())
+    # The room is the user's stable room: pick up its conversation if this job replaces a recent one
+    previous_conversation = asyncio.create_task(load_recent_conversation(ctx.room.name))
 
     # Create the agent session with STT-LLM-TTS pipeline
     session = AgentSession(
-        stt="assemblyai/universal-streaming:ar",  # Arabic + English support
-        llm="openai/gpt-4.1-mini",
-        tts="openai/tts-1:nova",  # Clear voice for bilingual support
+        stt=providers["stt"],
+        llm=providers["llm"],
+        tts=providers["tts"],
     )
 
+    # Per-turn stage timings (end of speech -> transcript -> LLM -> TTS)
+    turn_tracer = TurnTracer()
+    turn_tracer.attach(session)
+
+    # Let the frontend warm a page's data while the user is still saying its name
+    speculation = SpeculativeNavigator() if SPECULATIVE_NAVIGATION else None
+    if speculation is not None:
+        speculation.attach(session, ctx.room)
+
+    # Seed the history from the room's previous conversation, if any
+    resumed = await previous_conversation
+    chat_ctx = None
+    if resumed is not None:
+        chat_ctx = resumed_chat_ctx(resumed)
+        logger.info(f"Resuming conversation {resumed['id']} of {ctx.room.name} ({len(chat_ctx.items)} turns)")
+
+    # Buffer the transcript for voice_conversations (written in batches across rooms)
+    transcript_writer = get_transcript_writer()
+    conversation = (transcript_writer.attach(session, ctx.room.name, resume=resumed)
+                    if transcript_writer is not None else None)
+    if conversation is not None and conversation.user_id is None:
+        # Not a livekit-token room (voice-<user id>): the row belongs to the user who joins
+        def on_participant_connected(participant: rtc.RemoteParticipant) -> None:
+            if conversation.user_id is None and participant.kind != rtc.ParticipantKind.PARTICIPANT_KIND_AGENT:
+                conversation.user_id = user_id_for(ctx.room.name, participant.identity)
+
+        ctx.room.on("participant_connected", on_participant_connected)
+
     # Create the assistant
-    assistant = VoiceAssistant()
+    assistant = VoiceAssistant(chat_ctx=chat_ctx)
 
     # Store room reference on assistant for tool access
     assistant._room = ctx.room
 
+    # Which channel the frontend takes navigation on (client-capabilities handshake)
+    assistant._client = ClientCapabilities()
+    assistant._client.attach(ctx.room)
+
+    # Coalesce, rate limit and batch what the agent publishes to the room
+    assistant._outbound = outbound_for(ctx.room)
+    assistant._outbound.capabilities = assistant._client
+
+    # Pre-rendered audio for the greeting and navigation confirmations
+    assistant._tts_cache = ctx.proc.userdata.get("tts_cache") or build_tts_cache()
+
+    # Answers to questions asked before, shared by the worker's sessions
+    assistant._response_cache = get_response_cache(response_fingerprint())
+
+    # Resolve DOM actions from the frontend's dom-action-result messages
+    assistant._pending_actions = PendingActionRegistry()
+    assistant._pending_actions.attach(ctx.room)
+
+    # Track the page-content the frontend publishes, for page-ready waits and
+    # resolving click targets
+    assistant._page_model = PageModel()
+    assistant._page_model.attach(ctx.room)
+    assistant._page_context = PageContextBuilder()
+
+    # Recent turns verbatim, older ones folded into a running summary
+    assistant._history = HistoryWindow()
+
+    # Cancel page-driving tools when the user barges in or moves on
+    assistant._tool_runs = ToolRuns()
+    assistant._tool_runs.attach(session)
+
+    # Speak navigation tools' results directly instead of a second LLM pass
+    assistant._terminal = TerminalReplies()
+    assistant._terminal.attach(session)
+
+    # Keep the session through reloads and network blips (the user's room is stable)
+    def on_leave():
+        assistant._tool_runs.cancel("disconnected")
+        session.interrupt()
+
+    async def on_rejoin() -> bool:
+        assistant._page_model.reset()
+        snapshot = assistant._page_model.expect_snapshot()
+        await assistant._client.request()
+        await assistant._page_model.request_snapshot()
+        return await assistant._page_model.wait(snapshot, RESUME_READY_TIMEOUT) is not None
+
+    async def on_expire():
+        await ctx.delete_room()
+        ctx.shutdown(reason="user did not come back")
+
+    assistant._resumer = SessionResumer()
+    assistant._resumer.attach(ctx.room, on_leave, on_rejoin, on_expire)
+    if resumed is not None:
+        assistant._resumer.stats.rehydrated_turns = len(chat_ctx.items)
+
+    async def log_session_stats():
+        logger.info(f"Page-ready waits vs fixed delay: {assistant._page_model.wait_stats.summary()}")
+        logger.info(f"Page content updates: {assistant._page_model.update_stats.summary()}")
+        logger.info(f"Navigation publishes: {assistant._client.publish_stats.summary()}")
+        logger.info(f"History trims: {assistant._history.stats.summary()}")
+        logger.info(f"Terminal tool replies: {assistant._terminal.stats.summary()}")
+        logger.info(f"Tool runs: {assistant._tool_runs.stats.summary()}, "
+                    f"DOM actions revoked: {assistant._pending_actions.revoked}")
+        if assistant._tts_cache is not None:
+            logger.info(f"TTS cache: {assistant._tts_cache.stats()}")
+        if assistant._response_cache is not None:
+            logger.info(f"Response cache: {assistant._response_cache.stats.summary()}")
+            try:
+                await asyncio.to_thread(assistant._response_cache.save)
+            except OSError as e:
+                logger.warning(f"Could not save the response cache: {e}")
+        if speculation is not None:
+            speculation.close()
+            logger.info(f"Speculative prefetch: {speculation.stats.summary()}")
+        logger.info(f"Outbound messages: {assistant._outbound.stats.summary()}")
+        assistant._resumer.close()
+        logger.info(f"Session resumption: {assistant._resumer.stats.summary()}")
+        turn_tracer.close()
+        index_warmup.cancel()
+        search_warmup.cancel()
+        kpi_warmup.cancel()
+        if conversation is not None:
+            await transcript_writer.close(conversation)
+            logger.info(f"Transcript writer: {transcript_writer.stats.summary()}")
+
+    ctx.add_shutdown_callback(log_session_stats)
+
     # Start the session
     await session.start(
         room=ctx.room,
         agent=assistant,
+        room_options=room_io.RoomOptions(close_on_disconnect=False),
     )
 
-    # Generate initial greeting
-    await session.generate_reply(
-        instructions="Greet the user briefly. If they seem Arabic-speaking, greet in Arabic. Otherwise greet in English. Offer to help them navigate the dashboard."
-    )
+    # In case the frontend announced its capabilities or sent its page content
+    # before we were listening
+    await assistant._client.request()
+    await assistant._page_model.request_snapshot()
+
+    # Generate initial greeting (not when carrying on an earlier conversation)
+    if resumed is not None:
+        logger.info(f"Resumed without greeting {(time.perf_counter() - started_at) * 1000:.0f}ms after job start")
+        return
+    await session.say(GREETING)
+    logger.info(f"First greeting done {(time.perf_counter() - started_at) * 1000:.0f}ms after job start")
 
 
 if __name__ == "__main__":
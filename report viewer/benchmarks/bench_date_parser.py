@@ -0,0 +1,88 @@
+"""
+Parse-time micro-benchmark for date_parser.parse_date.
+
+Generates a corpus of a few thousand bilingual date phrases (absolute,
+numeric, Arabic-Indic digits, relative, weekdays) and reports per-phrase
+parse time for cold (uncached) and warm (LRU hit) parses.
+
+Usage:
+    python benchmarks/bench_date_parser.py [--phrases 5000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import date_parser  # noqa: E402
+from date_parser import parse_date  # noqa: E402
+
+EN_MONTHS = ["jan", "january", "feb", "march", "apr", "may", "june", "jul", "august", "sep", "october", "nov", "december"]
+AR_MONTHS = ["يناير", "فبراير", "مارس", "أبريل", "مايو", "يونيو", "يوليو", "أغسطس", "سبتمبر", "أكتوبر", "نوفمبر", "ديسمبر"]
+RELATIVE = ["yesterday", "today", "امبارح", "النهارده", "اول امبارح", "last sunday", "الحد اللي فات",
+            "last thursday", "الخميس اللي فات", "3 days ago", "من 3 ايام", "من اسبوع"]
+ARABIC_DIGITS = str.maketrans("0123456789", "٠١٢٣٤٥٦٧٨٩")
+
+
+def corpus(size: int, rng: random.Random) -> list[str]:
+    start = date(2023, 1, 1)
+    phrases = []
+    while len(phrases) < size:
+        day = start + timedelta(days=rng.randrange(1000))
+        kind = rng.randrange(7)
+        if kind == 0:
+            phrases.append(f"{day.day} {rng.choice(EN_MONTHS)} {day.year}")
+        elif kind == 1:
+            phrases.append(f"{day:%B} {day.day}, {day.year}")
+        elif kind == 2:
+            phrases.append(f"{day.day}/{day.month}/{day.year}")
+        elif kind == 3:
+            phrases.append(day.isoformat())
+        elif kind == 4:
+            phrases.append(f"{day.day} {AR_MONTHS[day.month - 1]}")
+        elif kind == 5:
+            phrases.append(f"{day.day} {AR_MONTHS[day.month - 1]} {day.year}".translate(ARABIC_DIGITS))
+        else:
+            phrases.append(rng.choice(RELATIVE))
+    return phrases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phrases", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    phrases = corpus(args.phrases, random.Random(5))
+    today = date(2025, 11, 20)
+
+    cold = []
+    for phrase in phrases:
+        date_parser._parse.cache_clear()
+        start = time.perf_counter()
+        parse_date(phrase, today=today)
+        cold.append((time.perf_counter() - start) * 1e6)
+
+    date_parser._parse.cache_clear()
+    for phrase in phrases:
+        parse_date(phrase, today=today)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for phrase in phrases:
+            parse_date(phrase, today=today)
+    warm_us = (time.perf_counter() - start) / (args.repeat * len(phrases)) * 1e6
+
+    parsed = sum(1 for phrase in phrases if parse_date(phrase, today=today) is not None)
+    q = statistics.quantiles(cold, n=100)
+    print(f"phrases={len(phrases)} parsed={parsed / len(phrases):.0%}")
+    print(f"cold: p50={q[49]:.1f}us p95={q[94]:.1f}us p99={q[98]:.1f}us max={max(cold):.1f}us")
+    print(f"warm (cache hit): {warm_us:.2f}us/phrase, {date_parser.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
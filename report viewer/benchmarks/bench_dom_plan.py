@@ -0,0 +1,151 @@
+"""
+Compound page requests: one LLM turn and one `dom-action` per step vs a single
+`dom-plan`.
+
+An in-process fake frontend answers over a fake room. It acks plan steps as
+DOMInteractionExecutor does, taking --step-ms per step plus --rtt-ms of
+network per message. The per-step path also pays --llm-ms for each LLM turn
+that chooses the next action. The plan path pays it once. The harness prints
+end-to-end time, publishes and bytes sent for plans of 2 to --max-steps
+steps. It then checks that oversized plans are rejected before they are sent.
+
+Usage:
+    python benchmarks/bench_dom_plan.py [--llm-ms 700] [--rtt-ms 40] [--step-ms 150] [--max-steps 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dom_plan import MAX_PLAN_BYTES, PlanError, PlanStep, build_plan, encode_plan  # noqa: E402
+from pending_actions import RESULT_TOPIC, PendingActionRegistry  # noqa: E402
+from tools import send_dom_action, send_dom_plan  # noqa: E402
+
+
+@dataclass
+class _Packet:
+    data: bytes
+    topic: str
+    participant: object = None
+
+
+class _FakeFrontend:
+    """Runs dom-action and dom-plan messages, acking like DOMInteractionExecutor."""
+
+    def __init__(self, registry, rtt_ms, step_ms):
+        self.registry = registry
+        self.rtt = rtt_ms / 1000
+        self.step = step_ms / 1000
+        self.publishes = 0
+        self.bytes_sent = 0
+        self.tasks = set()
+
+    async def publish_data(self, payload, reliable=True, topic=""):
+        self.publishes += 1
+        self.bytes_sent += len(payload)
+        task = asyncio.create_task(self._run(json.loads(payload)))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def _send(self, body):
+        self.registry.on_data_received(_Packet(json.dumps(body).encode(), RESULT_TOPIC))
+
+    async def _run(self, message):
+        await asyncio.sleep(self.rtt / 2)
+        if message["type"] == "dom-plan":
+            for index, _ in enumerate(message["steps"]):
+                await asyncio.sleep(self.step)
+                self._send({"type": "dom-plan-step", "actionId": message["actionId"], "index": index,
+                            "status": "ok", "detail": "done"})
+        else:
+            await asyncio.sleep(self.step)
+        await asyncio.sleep(self.rtt / 2)
+        self._send({"type": RESULT_TOPIC, "actionId": message["actionId"], "success": True, "result": "done"})
+
+
+class _FakeRoom:
+    def __init__(self, participant):
+        self.local_participant = participant
+
+
+class _FakeAgent:
+    def __init__(self, room, registry):
+        self._room = room
+        self._pending_actions = registry
+
+
+def compound_steps(n: int) -> list[PlanStep]:
+    steps = [PlanStep(action="navigate", route="productivity_reports"),
+             PlanStep(action="fill", text="Search", value="November")]
+    steps += [PlanStep(action="click", text="View Report", index=i) for i in range(max(0, n - 2))]
+    return steps[:n]
+
+
+async def per_step(agent, steps: list[PlanStep], llm_ms: float) -> None:
+    # What the LLM does without plans: one turn per action, each waiting for the last
+    for wire in build_plan(steps):
+        await asyncio.sleep(llm_ms / 1000)
+        if wire["op"] == "navigate":  # the navigate tool's publish, as one more round trip
+            await send_dom_action(agent, None, "click", {"text": wire["pathname"]})
+        else:
+            await send_dom_action(agent, None, wire["op"], wire["target"], wire.get("value"))
+
+
+async def planned(agent, steps: list[PlanStep], llm_ms: float) -> None:
+    await asyncio.sleep(llm_ms / 1000)
+    result = await send_dom_plan(agent, build_plan(steps))
+    assert result and len(result.steps) == len(steps), result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-ms", type=float, default=700)
+    parser.add_argument("--rtt-ms", type=float, default=40)
+    parser.add_argument("--step-ms", type=float, default=150)
+    parser.add_argument("--max-steps", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'steps':>5} {'mode':>9} {'total ms':>9} {'publishes':>10} {'bytes':>7}")
+    for n in range(2, args.max_steps + 1):
+        for mode, run in (("per-step", per_step), ("plan", planned)):
+            registry = PendingActionRegistry()
+            frontend = _FakeFrontend(registry, args.rtt_ms, args.step_ms)
+            agent = _FakeAgent(_FakeRoom(frontend), registry)
+            start = time.perf_counter()
+            await run(agent, compound_steps(n), args.llm_ms)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{n:>5} {mode:>9} {elapsed:>9.0f} {frontend.publishes:>10} {frontend.bytes_sent:>7}")
+            assert len(registry) == 0, "registry leaked pending actions"
+
+    print()
+    oversized = {
+        "too many steps": [PlanStep(action="click", text="Next")] * 11,
+        "long fill value": [PlanStep(action="fill", text="Notes", value="x" * 1001)],
+        "unknown route": [PlanStep(action="navigate", route=None)],
+        "too much waiting": [PlanStep(action="navigate", route="dashboard")] * 6,
+    }
+    for label, steps in oversized.items():
+        try:
+            build_plan(steps)
+        except PlanError as e:
+            print(f"rejected ({label}): {e}")
+        else:
+            sys.exit(f"{label} was not rejected")
+    # Every field within its own limit, but too big as a whole
+    max_fields = build_plan([PlanStep(action="fill", text="t" * 200, value="v" * 1000, if_present="p" * 200)] * 9)
+    try:
+        encode_plan("x" * 36, max_fields)
+    except PlanError as e:
+        print(f"rejected (encoded size, limit {MAX_PLAN_BYTES}): {e}")
+    else:
+        sys.exit("oversized plan was not rejected")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
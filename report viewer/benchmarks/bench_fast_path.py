@@ -0,0 +1,161 @@
+"""
+Transcript-to-publish latency with and without the fast-path intent router.
+
+Replays a bilingual corpus of commands through two pipelines against an
+in-process fake room:
+
+- llm:       every transcript waits for a simulated LLM tool-call round-trip
+             before send_navigation_url runs (today's behaviour).
+- fast-path: IntentRouter.match() runs first; matched commands publish
+             directly, everything else falls back to the simulated LLM.
+
+The LLM round-trip is simulated (no network), so pass the TTFT you observe in
+production via --llm-ms / --llm-jitter-ms.
+
+Usage:
+    python benchmarks/bench_fast_path.py [--rounds 20] [--llm-ms 650] [--llm-jitter-ms 250]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from client_capabilities import ClientCapabilities, PublishStats  # noqa: E402
+from intent_router import IntentRouter  # noqa: E402
+from routes import ROUTES  # noqa: E402
+from tools import FRONTEND_BASE_URL, send_navigation_url  # noqa: E402
+
+CORPUS = [
+    "افتح الداشبورد",
+    "وريني تقارير الواتساب",
+    "افتح تقارير الإنتاجية",
+    "عايز تقارير الإعلانات",
+    "افتح تقارير الإيميلات",
+    "روح على البوتات",
+    "وريني البوستات",
+    "افتح الأفكار",
+    "وريني الاجتماعات",
+    "افتح الكورسات",
+    "روح الصفحة الرئيسية",
+    "افتح الإعدادات",
+    "وريني الموافقات",
+    "Open dashboard",
+    "Show WhatsApp reports",
+    "Show productivity reports",
+    "Show ads reports",
+    "Show mail reports",
+    "Open bots",
+    "Show social posts",
+    "Show content ideas",
+    "Show meeting summary",
+    "Show courses and prices",
+    "Go home",
+    "Open admin settings",
+    "Show awaiting approval",
+    # Not fast-path material: dates, questions, compound commands
+    "Get me productivity report of 2 nov 2025",
+    "عايز تقرير الإنتاجية بتاع 2 نوفمبر",
+    "what can you do",
+    "open whatsapp reports and then the dashboard",
+]
+
+
+class _FakeParticipant:
+    def __init__(self):
+        self.published_at = None
+
+    async def publish_data(self, payload, reliable=True, topic=""):
+        self.published_at = time.perf_counter()
+
+
+
+class _FakeRoom:
+    def __init__(self):
+        self.local_participant = _FakeParticipant()
+        self.remote_participants = {"user": object()}
+
+    def on(self, event, callback):
+        pass
+
+    def isconnected(self):
+        return True
+
+
+class _FakeAgent:
+    def __init__(self, stats: PublishStats):
+        self._room = _FakeRoom()
+        self._client = ClientCapabilities()
+        self._client.publish_stats = stats
+        self._client.attach(self._room)
+
+
+def _pathname_for(transcript: str, router: IntentRouter) -> str:
+    match = router.match(transcript)
+    return match.pathname if match else "/dashboard"
+
+
+async def _llm_round_trip(rng: random.Random, llm_ms: float, jitter_ms: float):
+    await asyncio.sleep(max(0.0, rng.gauss(llm_ms, jitter_ms)) / 1000)
+
+
+async def _run(transcript: str, router: IntentRouter, fast_path: bool, stats: PublishStats,
+               rng, args) -> tuple[float, bool]:
+    agent = _FakeAgent(stats)
+    start = time.perf_counter()
+
+    match = router.match(transcript) if fast_path else None
+    if match is None:
+        await _llm_round_trip(rng, args.llm_ms, args.llm_jitter_ms)
+        pathname = _pathname_for(transcript, router)
+    else:
+        pathname = match.pathname
+
+    await send_navigation_url(agent, None, f"{FRONTEND_BASE_URL}{pathname}")
+    return (agent._room.local_participant.published_at - start) * 1000, match is not None
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    return statistics.quantiles(values, n=100)[pct - 1] if len(values) > 1 else values[0]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--llm-ms", type=float, default=650.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=250.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    router = IntentRouter(ROUTES)
+
+    for label, fast_path in (("llm", False), ("fast-path", True)):
+        rng = random.Random(args.seed)
+        stats = PublishStats()
+        results = await asyncio.gather(*(
+            _run(transcript, router, fast_path, stats, rng, args)
+            for _ in range(args.rounds)
+            for transcript in CORPUS
+        ))
+        latencies = [ms for ms, _ in results]
+        hits = sum(1 for _, hit in results if hit)
+        print(
+            f"{label:>10}: n={len(latencies)} hit_rate={hits / len(results):.0%} "
+            f"p50={_percentile(latencies, 50):.1f}ms p95={_percentile(latencies, 95):.1f}ms"
+        )
+    print(f"publishes: {stats.summary()}")
+
+    start = time.perf_counter()
+    for transcript in CORPUS * 100:
+        router.match(transcript)
+    per_match_us = (time.perf_counter() - start) / (len(CORPUS) * 100) * 1e6
+    print(f"router.match: {per_match_us:.1f}us per transcript")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
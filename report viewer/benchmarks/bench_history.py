@@ -0,0 +1,185 @@
+"""
+Prompt tokens and modeled LLM latency per turn over a long session, with the
+full chat history vs the HistoryWindow.
+
+Builds a synthetic --turns-turn session the way AgentSession records it. The
+mix is mostly fast-path navigation (user message + spoken confirmation),
+plus view_report_by_date and navigate tool calls (call, result, reply) and
+free-form questions. Before each turn the windowed variant is trimmed exactly
+as VoiceAssistant.on_user_turn_completed does. The prompt of each turn is its
+instructions, tool schemas and history.
+
+TTFT is modeled as --base-ms plus --ms-per-1k per thousand prompt tokens.
+Prefill time grows with the prompt, so a flat token curve means flat latency.
+With --live and OPENAI_API_KEY set, the harness measures the real TTFT of
+both prompts at a few turns instead.
+
+Usage:
+    python benchmarks/bench_history.py [--turns 200] [--base-ms 350] [--ms-per-1k 60] [--live] [--model gpt-4.1-mini]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("LIVEKIT_API_KEY", "bench-api-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "bench-api-secret-0123456789abcdef0123")
+
+from livekit.agents.llm import ChatContext, FunctionCall, FunctionCallOutput  # noqa: E402
+from livekit.agents.llm.utils import build_legacy_openai_schema  # noqa: E402
+
+from agent import AGENT_INSTRUCTIONS  # noqa: E402
+from bench_fast_path import CORPUS  # noqa: E402
+from bench_prompt_tokens import count_tokens  # noqa: E402
+from history import HistoryWindow  # noqa: E402
+from intent_router import IntentRouter, split_confirmation  # noqa: E402
+from routes import ROUTES, ROUTES_BY_NAME  # noqa: E402
+from tools import ALL_TOOLS  # noqa: E402
+
+ROUTER = IntentRouter(ROUTES)
+NAVIGATION = [text for text in CORPUS if ROUTER.match(text)]
+REPORTS = [("productivity", "2 February 2025"), ("whatsapp", "5 يناير 2025"), ("ads", "yesterday"),
+           ("mail", "last Sunday")]
+QUESTIONS = ["what can you do on this page?", "ايه الفرق بين تقارير الإنتاجية والإعلانات؟",
+             "how many reports are there this week?", "summarize the last report for me"]
+SUMMARY_MARKS = ("Summary of the",)
+
+
+def add_turn(ctx: ChatContext, rng: random.Random, turn: int) -> None:
+    """Append one synthetic turn, shaped like AgentSession's records."""
+    roll = rng.random()
+    if roll < 0.6:
+        said = rng.choice(NAVIGATION)
+        match = ROUTER.match(said)
+        ctx.add_message(role="user", content=said)
+        ctx.add_message(role="assistant", content=split_confirmation(
+            ROUTES_BY_NAME[match.route].confirmation, match.language))
+        return
+    if roll < 0.8:
+        report_type, date = rng.choice(REPORTS)
+        said = f"Get me the {report_type} report of {date}"
+        call = ("view_report_by_date", {"report_type": report_type, "date": date},
+                f"Opening report for {date} on {report_type} reports page...")
+        reply = f"Here is the {report_type} report for {date}."
+    elif roll < 0.9:
+        route = rng.choice(ROUTES)
+        said = f"take me to where I can see the {route.label_en}"
+        call = ("navigate", {"route": route.name}, route.confirmation)
+        reply = split_confirmation(route.confirmation, "en")
+    else:
+        said = rng.choice(QUESTIONS)
+        ctx.add_message(role="user", content=said)
+        ctx.add_message(role="assistant", content=" ".join(["I can open any report page, find a report by date, "
+                                                            "click buttons and fill in search boxes for you."] * 2))
+        return
+    ctx.add_message(role="user", content=said)
+    name, arguments, output = call
+    call_id = f"call_{turn}"
+    ctx.items.append(FunctionCall(call_id=call_id, name=name, arguments=json.dumps(arguments, ensure_ascii=False)))
+    ctx.items.append(FunctionCallOutput(call_id=call_id, name=name, output=output, is_error=False))
+    ctx.add_message(role="assistant", content=reply)
+
+
+def history_text(ctx: ChatContext) -> str:
+    parts = []
+    for item in ctx.items:
+        if item.type == "message":
+            parts.append(item.text_content or "")
+        elif item.type == "function_call":
+            parts.append(f"{item.name}({item.arguments})")
+        elif item.type == "function_call_output":
+            parts.append(item.output)
+    return "\n".join(parts)
+
+
+async def time_to_first_token(client, model: str, tools: list[dict], ctx: ChatContext) -> float:
+    ctx = ctx.copy()
+    ctx.add_message(role="user", content="Show ads reports")
+    messages, _ = ctx.to_provider_format("openai")
+    start = time.perf_counter()
+    stream = await client.chat.completions.create(model=model, messages=messages, tools=tools, stream=True)
+    elapsed = None
+    async for chunk in stream:
+        delta = chunk.choices[0].delta if chunk.choices else None
+        if elapsed is None and delta is not None and (delta.content or delta.tool_calls):
+            elapsed = (time.perf_counter() - start) * 1000
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--base-ms", type=float, default=350, help="modeled TTFT of an empty prompt")
+    parser.add_argument("--ms-per-1k", type=float, default=60, help="modeled TTFT per 1000 prompt tokens")
+    parser.add_argument("--live", action="store_true", help="measure TTFT against the OpenAI API")
+    parser.add_argument("--model", default="gpt-4.1-mini")
+    args = parser.parse_args()
+
+    tools = [build_legacy_openai_schema(tool) for tool in ALL_TOOLS]
+    fixed = count_tokens(AGENT_INSTRUCTIONS) + count_tokens(json.dumps(tools, ensure_ascii=False))
+    rng = random.Random(11)
+    full = ChatContext()
+    full.add_message(role="system", content=AGENT_INSTRUCTIONS)
+    windowed = full.copy()
+    window = HistoryWindow()
+
+    def ttft(tokens: int) -> float:
+        return args.base_ms + tokens / 1000 * args.ms_per_1k
+
+    checkpoints = sorted({1, 10, 25, 50, 100, 150, args.turns} & set(range(1, args.turns + 1)))
+    print(f"instructions + tool schemas: {fixed} tokens; TTFT model {args.base_ms:g}ms + "
+          f"{args.ms_per_1k:g}ms/1k tokens")
+    print(f"{'turn':>5} {'full tok':>9} {'window tok':>11} {'full ms':>8} {'window ms':>10} {'items':>6}")
+    totals = {"full": 0, "window": 0}
+    trim_us = []
+    snapshots = {}
+    for turn in range(1, args.turns + 1):
+        start = time.perf_counter()
+        trimmed = window.trim(windowed)
+        trim_us.append((time.perf_counter() - start) * 1e6)
+        if trimmed is not None:
+            windowed = trimmed
+        tokens = {name: fixed + count_tokens(history_text(ctx)) for name, ctx in (("full", full), ("window", windowed))}
+        for name, value in tokens.items():
+            totals[name] += value
+        if turn in checkpoints:
+            snapshots[turn] = (full.copy(), windowed.copy())
+            print(f"{turn:>5} {tokens['full']:>9} {tokens['window']:>11} {ttft(tokens['full']):>8.0f} "
+                  f"{ttft(tokens['window']):>10.0f} {len(windowed.items):>6}")
+        state = rng.getstate()
+        add_turn(full, rng, turn)
+        rng.setstate(state)
+        add_turn(windowed, rng, turn)
+
+    print()
+    print(f"prompt tokens over {args.turns} turns: full {totals['full']}, window {totals['window']} "
+          f"({totals['window'] / totals['full']:.0%})")
+    print(f"trim: p50={statistics.median(trim_us):.1f}us max={max(trim_us):.0f}us, {window.stats.summary()}")
+    summary = next(item.text_content for item in windowed.items
+                   if item.type == "message" and item.text_content.startswith(SUMMARY_MARKS))
+    print(f"\nsummary message ({count_tokens(summary)} tokens):\n{summary}")
+
+    if args.live:
+        if not os.getenv("OPENAI_API_KEY"):
+            sys.exit("--live needs OPENAI_API_KEY")
+        from openai import AsyncOpenAI
+
+        async def live():
+            client = AsyncOpenAI()
+            print(f"\nlive TTFT ({args.model}):")
+            for turn, (full_ctx, window_ctx) in snapshots.items():
+                full_ms = await time_to_first_token(client, args.model, tools, full_ctx)
+                window_ms = await time_to_first_token(client, args.model, tools, window_ctx)
+                print(f"{turn:>5} full {full_ms:>6.0f}ms  window {window_ms:>6.0f}ms")
+
+        asyncio.run(live())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Rapid back-to-back commands: stale page actions with and without ToolRuns
+cancellation.
+
+Scripts of voice commands are replayed against the real tools, over a fake
+room with an in-process frontend. Each command is a final transcript, then
+the turn. It goes either to the fast path (navigation published at once) or,
+after --llm-ms, to a tool call from a new reply. The frontend navigates on
+receipt, publishes page-content once the page has rendered (--render-ms), and
+runs DOM actions and plan steps (--step-ms each). Like
+DOMInteractionExecutor, it drops actions revoked by `dom-action-cancel`.
+
+For each script, with cancellation off and on, the harness prints:
+- stale: frontend effects (navigations, clicks, plan steps) caused by a
+  command after the user had already issued the next one
+- final page: whether the user ends up where the last command sent them
+- busy ms: how long tools kept running after the user moved on
+- replies: superseded tools that still returned a result for the LLM to speak
+- revoked: DOM actions cancelled on the frontend
+
+Each script is also checked: with cancellation on it must leave nothing
+stale, pending or running.
+
+Usage:
+    python benchmarks/bench_interruptions.py [--llm-ms 600] [--render-ms 1500] [--step-ms 400] [--rtt-ms 40]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("LIVEKIT_API_KEY", "bench-api-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "bench-api-secret-0123456789abcdef0123")
+
+from livekit import rtc  # noqa: E402
+from livekit.agents import RunContext, StopResponse  # noqa: E402
+from livekit.agents.llm import FunctionCall  # noqa: E402
+from livekit.agents.voice import SpeechHandle  # noqa: E402
+from livekit.agents.voice.events import UserInputTranscribedEvent  # noqa: E402
+
+import tools  # noqa: E402
+from dom_plan import PlanStep  # noqa: E402
+from interruptions import ToolRuns  # noqa: E402
+from page_model import PAGE_CONTENT_TOPIC, PageModel  # noqa: E402
+from pending_actions import CANCEL_TYPE, RESULT_TOPIC, PendingActionRegistry  # noqa: E402
+from routes import ROUTES_BY_NAME, SECTION_PATHS  # noqa: E402
+
+REPORT_PATHS = set(SECTION_PATHS.values())
+
+# The command a publish belongs to (tasks inherit it)
+_COMMAND: contextvars.ContextVar[int] = contextvars.ContextVar("command", default=-1)
+
+
+@dataclass
+class _Packet:
+    data: bytes
+    topic: str
+    participant: object = None
+
+
+class _FakeFrontend:
+    """Navigates, renders and runs DOM actions; records each effect with the command that caused it."""
+
+    def __init__(self, room: "_FakeRoom", args):
+        self.room = room
+        self.rtt = args.rtt_ms / 1000
+        self.render = args.render_ms / 1000
+        self.step = args.step_ms / 1000
+        self.pathname = "/dashboard"
+        self.seq = 0
+        self.cancelled: set[str] = set()
+        self.effects: list[tuple[int, int, str]] = []  # (command, latest command at the time, what)
+        self.tasks: set[asyncio.Task] = set()
+        self.latest = -1
+
+    def receive(self, payload: bytes, topic: str) -> None:
+        task = asyncio.get_running_loop().create_task(self._handle(json.loads(payload), _COMMAND.get()))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def _send(self, body: dict, topic: str) -> None:
+        self.room.emit("data_received", _Packet(json.dumps(body).encode("utf-8"), topic))
+
+    def _effect(self, command: int, what: str) -> None:
+        self.effects.append((command, self.latest, what))
+
+    async def _handle(self, message: dict, command: int) -> None:
+        await asyncio.sleep(self.rtt / 2)
+        kind = message.get("type")
+        if kind == CANCEL_TYPE:
+            self.cancelled.add(message["actionId"])
+        elif kind == "agent-navigation-url":
+            self.pathname = message["pathname"]
+            self._effect(command, f"navigate {self.pathname}")
+            pathname = self.pathname
+            await asyncio.sleep(self.render)
+            if self.pathname == pathname:
+                self.seq += 1
+                cards = [{"key": "card:1", "text": "2 November 2025 View Report"}] if pathname in REPORT_PATHS else []
+                self._send({"type": "page-content", "seq": self.seq,
+                            "content": {"pathname": pathname, "title": "", "elements": {"cards": cards}}},
+                           PAGE_CONTENT_TOPIC)
+        elif kind == "dom-action":
+            if message["actionId"] in self.cancelled:
+                return
+            await asyncio.sleep(self.step)
+            if message["actionId"] in self.cancelled:
+                return
+            self._effect(command, f"{message['action']['type']} on {self.pathname}")
+            self._send({"type": RESULT_TOPIC, "actionId": message["actionId"], "success": True,
+                        "result": "done"}, RESULT_TOPIC)
+        elif kind == "dom-plan":
+            for index, step in enumerate(message["steps"]):
+                if message["actionId"] in self.cancelled:
+                    return
+                await asyncio.sleep(self.step)
+                if message["actionId"] in self.cancelled:  # waitFor checks it while polling
+                    return
+                if step["op"] == "navigate":
+                    self.pathname = step["pathname"]
+                self._effect(command, f"plan {step['op']} on {self.pathname}")
+                self._send({"type": "dom-plan-step", "actionId": message["actionId"], "index": index,
+                            "status": "ok", "detail": "done"}, RESULT_TOPIC)
+            self._send({"type": RESULT_TOPIC, "actionId": message["actionId"], "success": True,
+                        "result": "done"}, RESULT_TOPIC)
+
+
+class _FakeLocalParticipant:
+    def __init__(self, frontend: _FakeFrontend):
+        self.frontend = frontend
+
+    async def publish_data(self, payload, reliable: bool = True, topic: str = "") -> None:
+        self.frontend.receive(payload, topic)
+
+
+class _FakeRoom(rtc.EventEmitter):
+    def __init__(self, args):
+        super().__init__()
+        self.frontend = _FakeFrontend(self, args)
+        self.local_participant = _FakeLocalParticipant(self.frontend)
+
+
+class _FakeSession(rtc.EventEmitter):
+    def __init__(self, agent):
+        super().__init__()
+        self.current_agent = agent
+
+
+class _FakeAgent:
+    """The per-room state voice_agent_session puts on the assistant."""
+
+    def __init__(self, room: _FakeRoom, page_model: bool, cancellation: bool):
+        self._room = room
+        self._client = None
+        self._pending_actions = PendingActionRegistry()
+        self._pending_actions.attach(room)
+        self._page_model = None
+        if page_model:
+            self._page_model = PageModel()
+            self._page_model.attach(room)
+        self._tool_runs = ToolRuns() if cancellation else None
+
+
+# label -> (page model on the agent?, [(ms after the start, command)])
+SCRIPTS = {
+    "report, then another page": (True, [
+        (0, ("report", "productivity", "2 nov 2025")),
+        (1200, ("fast", "ads_reports")),
+    ]),
+    "5 reports back to back": (True, [
+        (i * 900, ("report", name, "2 nov 2025"))
+        for i, name in enumerate(["whatsapp", "productivity", "ads", "mail", "productivity"])
+    ]),
+    "plan, then stop": (True, [
+        (0, ("plan", [PlanStep(action="navigate", route="productivity_reports"),
+                      PlanStep(action="fill", text="Search", value="November"),
+                      PlanStep(action="click", text="View Report", date="2 nov 2025")])),
+        (1300, ("stop",)),
+    ]),
+    "legacy 3s wait, then a page": (False, [
+        (0, ("report", "whatsapp", "2 nov 2025")),
+        (1500, ("fast", "mail_reports")),
+    ]),
+}
+
+
+def expected_page(command: tuple, current: str) -> str:
+    kind = command[0]
+    if kind == "fast":
+        return ROUTES_BY_NAME[command[1]].pathname
+    if kind == "report":
+        return SECTION_PATHS[tools.REPORT_TYPE_SECTIONS[command[1]]]
+    if kind == "plan":
+        return next((ROUTES_BY_NAME[s.route].pathname for s in reversed(command[1]) if s.route), current)
+    return current
+
+
+async def play(script: list, page_model: bool, cancellation: bool, args) -> dict:
+    room = _FakeRoom(args)
+    frontend = room.frontend
+    agent = _FakeAgent(room, page_model, cancellation)
+    session = _FakeSession(agent)
+    if agent._tool_runs is not None:
+        agent._tool_runs.attach(session)
+
+    start = time.perf_counter()
+    issued: list[float] = []  # when each command was said
+    finished: dict[int, tuple[float, bool]] = {}  # command -> (when its tool returned, result for the LLM)
+
+    generating: dict[int, asyncio.Task] = {}  # replies still being generated by the LLM
+
+    async def call_tool(index: int, command: tuple) -> None:
+        _COMMAND.set(index)
+        await asyncio.sleep(args.llm_ms / 1000)
+        generating.pop(index, None)
+        kind = command[0]
+        name = {"report": "view_report_by_date", "plan": "run_dom_plan"}[kind]
+        context = RunContext(session=session, speech_handle=SpeechHandle.create(),
+                             function_call=FunctionCall(call_id=f"call_{index}", name=name, arguments="{}"))
+        try:
+            if kind == "report":
+                await tools.view_report_by_date(context, report_type=command[1], date=command[2])
+            else:
+                await tools.run_dom_plan(context, steps=command[1])
+            replied = True
+        except StopResponse:
+            replied = False
+        finished[index] = (time.perf_counter() - start, replied)
+
+    tool_tasks = []
+    page = frontend.pathname
+    for index, (at_ms, command) in enumerate(script):
+        await asyncio.sleep(max(0.0, at_ms / 1000 - (time.perf_counter() - start)))
+        issued.append(time.perf_counter() - start)
+        frontend.latest = index
+        page = expected_page(command, page)
+        _COMMAND.set(index)
+        # What AgentSession and VoiceAssistant.on_user_turn_completed do with the new turn. A reply
+        # still being generated is interrupted by AgentSession itself, before its tools start.
+        for task in generating.values():
+            task.cancel()
+        generating.clear()
+        session.emit("user_input_transcribed", UserInputTranscribedEvent(transcript="...", is_final=True))
+        if agent._tool_runs is not None:
+            agent._tool_runs.cancel("new_turn")
+        if command[0] == "fast":
+            await tools.send_navigation_url(agent, None, ROUTES_BY_NAME[command[1]].pathname)
+        elif command[0] != "stop":
+            generating[index] = asyncio.create_task(call_tool(index, command))
+            tool_tasks.append(generating[index])
+
+    await asyncio.gather(*tool_tasks, return_exceptions=True)
+    while frontend.tasks:
+        await asyncio.gather(*list(frontend.tasks))
+
+    stale = [what for command, latest, what in frontend.effects if command < latest]
+    busy = sum(max(0.0, finished[i][0] - issued[i + 1]) for i in finished if i + 1 < len(issued))
+    replies = sum(1 for i, (at, replied) in finished.items() if replied and i + 1 < len(issued) and at > issued[i + 1])
+    return {"stale": stale, "final": frontend.pathname == page, "busy_ms": busy * 1000,
+            "replies": replies, "revoked": agent._pending_actions.revoked,
+            "pending": len(agent._pending_actions),
+            "running": len(agent._tool_runs) if agent._tool_runs is not None else 0}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-ms", type=float, default=600)
+    parser.add_argument("--render-ms", type=float, default=1500)
+    parser.add_argument("--step-ms", type=float, default=400)
+    parser.add_argument("--rtt-ms", type=float, default=40)
+    args = parser.parse_args()
+    logging.getLogger("agent-tools").setLevel(logging.ERROR)  # the superseded tools' page timeouts
+
+    print(f"{'script':>28} {'cancel':>6} {'stale':>5} {'final page':>10} {'busy ms':>8} {'replies':>7} {'revoked':>7}")
+    for label, (page_model, script) in SCRIPTS.items():
+        for cancellation in (False, True):
+            result = await play(script, page_model, cancellation, args)
+            print(f"{label:>28} {'on' if cancellation else 'off':>6} {len(result['stale']):>5} "
+                  f"{'ok' if result['final'] else 'WRONG':>10} {result['busy_ms']:>8.0f} "
+                  f"{result['replies']:>7} {result['revoked']:>7}")
+            if cancellation:
+                assert not result["stale"], f"{label}: stale effects {result['stale']}"
+                assert result["final"], f"{label}: wrong final page"
+                assert result["replies"] == 0, f"{label}: superseded tool replied"
+            assert result["pending"] == 0 and result["running"] == 0, f"{label}: leaked {result}"
+            if not cancellation and result["stale"]:
+                print(f"{'':>36}stale: {'; '.join(result['stale'])}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
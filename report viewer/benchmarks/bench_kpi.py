@@ -0,0 +1,163 @@
+"""
+KPI aggregates over a year of synthetic rows: load, incremental refresh and
+range queries.
+
+Generates --days days of `reports` (one per section per day, with gaps),
+`posts` (--posts-per-day over a few platforms, some published, some failed),
+`content` ideas and `bot_status` rows. It applies them in PostgREST pages, as
+a first refresh would, then a batch of updates (posts published or failed,
+reports moved). Range queries with random metrics, groups and spans are timed
+two ways:
+- aggregates: the calls get_kpi makes (total, daily, previous period,
+  breakdown by group), from the prefix sums
+- scan: the same totals counted over the rows in Python, which is what
+  answering without the aggregates (or a GROUP BY per question) costs here
+Every query's totals are checked against the scan.
+
+Usage:
+    python benchmarks/bench_kpi.py [--days 365] [--posts-per-day 60] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import kpi_aggregates  # noqa: E402
+from kpi_aggregates import METRICS, PAGE_ROWS, KPIAggregates  # noqa: E402
+from routes import SECTION_PATHS  # noqa: E402
+
+PLATFORMS = ["facebook", "instagram", "linkedin", "x"]
+
+
+def _stamp(day: date, rng: random.Random) -> str:
+    moment = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(86400))
+    return moment.isoformat(timespec="microseconds")
+
+
+def fixture_rows(days: int, posts_per_day: int, rng: random.Random) -> dict[str, list[dict]]:
+    first = date.today() - timedelta(days=days - 1)
+    tables = {"reports": [], "posts": [], "content": [], "bot_status": []}
+    for offset in range(days):
+        day = first + timedelta(days=offset)
+        for section in SECTION_PATHS:
+            if rng.random() < 0.85:
+                tables["reports"].append({"id": str(uuid.UUID(int=rng.getrandbits(128))), "section": section,
+                                          "report_date": day.isoformat(), "updated_at": _stamp(day, rng)})
+        for _ in range(rng.randint(posts_per_day // 2, posts_per_day * 3 // 2)):
+            created = _stamp(day, rng)
+            status = rng.choices(["posted", "not_posted", "failed"], [0.7, 0.2, 0.1])[0]
+            tables["posts"].append({"id": str(uuid.UUID(int=rng.getrandbits(128))), "platform": rng.choice(PLATFORMS),
+                                    "posting_status": status, "created_at": created,
+                                    "posted_at": created if status == "posted" else None, "updated_at": created})
+        for _ in range(rng.randint(5, 30)):
+            created = _stamp(day, rng)
+            tables["content"].append({"id": str(uuid.UUID(int=rng.getrandbits(128))),
+                                      "is_posted": rng.random() < 0.4, "created_at": created, "updated_at": created})
+    for n in range(12):
+        tables["bot_status"].append({"id": str(n), "bot_name": f"bot-{n}", "is_active": rng.random() < 0.7,
+                                     "last_updated": _stamp(first, rng)})
+    return tables
+
+
+def scan_total(tables: dict[str, list[dict]], metric: str, start: date, end: date, group: str | None) -> int:
+    """The same count as KPIAggregates.total, by looking at every row."""
+    table = "reports" if metric == "reports" else metric.split("_")[0]
+    total = 0
+    for row in tables[table]:
+        for m, g, value, timestamp in kpi_aggregates._row_cells(table, row):
+            if m != metric or (group is not None and g != group):
+                continue
+            day = date.fromisoformat(value[:10])
+            if timestamp:
+                moment = datetime.fromisoformat(value) + timedelta(hours=kpi_aggregates.KPI_UTC_OFFSET_HOURS)
+                day = moment.date()
+            total += start <= day <= end
+    return total
+
+
+def pct(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--posts-per-day", type=int, default=60)
+    parser.add_argument("--updates", type=int, default=500, help="rows changed by the incremental refresh")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=50, help="queries also answered by scanning the rows")
+    args = parser.parse_args()
+
+    rng = random.Random(24)
+    tables = fixture_rows(args.days, args.posts_per_day, rng)
+    rows = sum(len(t) for t in tables.values())
+
+    aggregates = KPIAggregates()
+    start = time.perf_counter()
+    for table, table_rows in tables.items():
+        for i in range(0, len(table_rows), PAGE_ROWS):
+            aggregates.apply(table, table_rows[i:i + PAGE_ROWS])
+    load = time.perf_counter() - start
+    counts = aggregates._counts
+    print(f"load: {rows} rows ({', '.join(f'{t} {len(r)}' for t, r in tables.items())}) in {load * 1000:.0f}ms "
+          f"({rows / load:,.0f} rows/s); matrix {counts.shape[0]} series x {counts.shape[1]} days, "
+          f"{counts.nbytes / 1024:.0f} kB")
+
+    # Incremental refresh: posts get published or fail, reports move a day
+    updates = {"posts": [], "reports": []}
+    for row in rng.sample(tables["posts"], args.updates):
+        status = rng.choice(["posted", "failed"])
+        row.update(posting_status=status, updated_at=_stamp(date.today(), rng),
+                   posted_at=row["created_at"] if status == "posted" else None)
+        updates["posts"].append(row)
+    for row in rng.sample(tables["reports"], args.updates // 10):
+        row["report_date"] = (date.fromisoformat(row["report_date"]) + timedelta(days=1)).isoformat()
+        updates["reports"].append(row)
+    start = time.perf_counter()
+    for table, table_rows in updates.items():
+        aggregates.apply(table, table_rows)
+    print(f"refresh: {sum(len(r) for r in updates.values())} changed rows in "
+          f"{(time.perf_counter() - start) * 1000:.2f}ms")
+
+    first, last = aggregates.days
+    groups = {metric: [None] + sorted({g for m, g in aggregates._series if m == metric}) for metric in METRICS}
+    queries = []
+    for _ in range(args.queries):
+        metric = rng.choice(list(METRICS))
+        a = first + timedelta(days=rng.randrange((last - first).days + 1))
+        b = min(last, a + timedelta(days=rng.choice([0, 6, 29, 89, 364])))
+        queries.append((metric, a, b, rng.choice(groups[metric])))
+
+    answer_ms = []
+    for metric, a, b, group in queries:
+        t = time.perf_counter()
+        length = (b - a).days + 1
+        aggregates.total(metric, a, b, group)
+        aggregates.daily(metric, a, b, group)
+        aggregates.total(metric, a - timedelta(days=length), a - timedelta(days=1), group)
+        if group is None:
+            aggregates.by_group(metric, a, b)
+        answer_ms.append((time.perf_counter() - t) * 1000)
+
+    scan_ms, mismatches = [], 0
+    for metric, a, b, group in queries[:args.scans]:
+        t = time.perf_counter()
+        expected = scan_total(tables, metric, a, b, group)
+        scan_ms.append((time.perf_counter() - t) * 1000)
+        mismatches += expected != aggregates.total(metric, a, b, group)
+
+    print(f"{'method':<11} {'queries':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    print(f"{'aggregates':<11} {len(answer_ms):>7} {statistics.median(answer_ms):>8.3f} {pct(answer_ms, 95):>8.3f}")
+    print(f"{'scan':<11} {len(scan_ms):>7} {statistics.median(scan_ms):>8.1f} {pct(scan_ms, 95):>8.1f}")
+    print(f"totals checked against the scan: {len(scan_ms)}, mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Load test: how many concurrent voice_agent_session jobs one worker sustains.
+
+Runs the real voice_agent_session entrypoint for --sessions concurrent rooms
+in this process (as AGENT_JOB_EXECUTOR=thread would), with no network at all:
+  - MockSTT / MockLLM / MockTTS from mock_providers.py, with configurable
+    latencies
+  - a fake room per session. An in-process fake frontend answers navigation
+    with page-content snapshots, dom-actions with dom-action-results, and the
+    capabilities and page-content requests.
+  - MockAudioOutput in place of RoomIO's audio track
+Each synthetic user waits for the greeting, then works through a bilingual
+script: fast-path navigation commands, view_report_by_date requests (an LLM
+tool call followed by a second LLM pass) and a plain question. It waits
+--think-ms between turns.
+
+For each concurrency level the harness prints:
+  - throughput (turns/s) and failed turns
+  - response latency percentiles (end of user speech to first reply audio)
+  - per-stage percentiles from livekit's metrics: end-of-utterance delay,
+    LLM TTFT, TTS TTFB
+  - event-loop lag
+  - CPU time and RSS growth per session
+A level is "degraded" when its p95 response latency exceeds the first
+level's by more than --degrade (default 50%), or when turns fail.
+
+As a regression gate: with --gate N the harness exits 1 if any level up to N
+sessions is degraded.
+
+Usage:
+    python benchmarks/bench_load.py [--sessions 1 10 50 100 200] [--turns 6] [--think-ms 1000]
+        [--llm-ms 400] [--tts-ms 150] [--playback-speed 10] [--degrade 0.5] [--gate 50]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("LIVEKIT_API_KEY", "bench-api-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "bench-api-secret-0123456789abcdef0123")
+os.environ.setdefault("RESPONSE_CACHE_MAX_ENTRIES", "0")  # time the LLM path, not cached answers
+
+from livekit import rtc  # noqa: E402
+from livekit.agents import AgentSession, metrics  # noqa: E402
+
+import agent  # noqa: E402
+from bench_page_model import _Keys, report_page  # noqa: E402
+from client_capabilities import CAPABILITIES_TOPIC  # noqa: E402
+from mock_providers import MockAudioOutput, MockLLM, MockSTT, MockTTS  # noqa: E402
+from page_model import PAGE_CONTENT_TOPIC  # noqa: E402
+from pending_actions import RESULT_TOPIC  # noqa: E402
+from routes import SECTION_PATHS  # noqa: E402
+
+# (what the user says, the tool call the LLM makes for it, if any). Plain
+# navigation is expected to take the fast path and never reach the LLM.
+SCRIPT = [
+    ("open the WhatsApp reports", None),
+    ("Get me the productivity report of 2 February 2025",
+     ("view_report_by_date", {"report_type": "productivity", "date": "2 February 2025"})),
+    ("افتح تقارير الإعلانات", None),
+    ("عايز تقرير الواتساب بتاع 5 يناير 2025",
+     ("view_report_by_date", {"report_type": "whatsapp", "date": "5 يناير 2025"})),
+    ("what can you do on this page?", None),
+    ("go to the mail reports", None),
+]
+TOOL_CALLS = dict(SCRIPT)
+
+REPORT_PATHS = set(SECTION_PATHS.values())
+
+
+@dataclass
+class _Packet:
+    data: bytes
+    topic: str
+    participant: object = None
+
+
+@dataclass
+class _Identity:
+    identity: str
+
+
+class _FakeFrontend:
+    """The browser side of a room: answers the agent's data messages like the React app."""
+
+    def __init__(self, room: "_FakeRoom", rtt_ms: float, render_ms: float, step_ms: float, cards: int):
+        self.room = room
+        self.rtt = rtt_ms / 1000
+        self.render = render_ms / 1000
+        self.step = step_ms / 1000
+        self.cards = cards
+        self.pathname = "/dashboard"
+        self.seq = 0
+        self.keys = _Keys()
+        self.tasks: set[asyncio.Task] = set()
+
+    def receive(self, payload: bytes, topic: str) -> None:
+        task = asyncio.get_running_loop().create_task(self._handle(json.loads(payload), topic))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def _send(self, body: dict, topic: str) -> None:
+        self.room.emit("data_received", _Packet(json.dumps(body).encode("utf-8"), topic, self.room.frontend))
+
+    def _snapshot(self) -> dict:
+        self.seq += 1
+        cards = self.cards if self.pathname in REPORT_PATHS else 0
+        return {"type": "page-content", "seq": self.seq,
+                "content": report_page(self.keys, self.pathname, cards)}
+
+    async def _handle(self, message: dict, topic: str) -> None:
+        await asyncio.sleep(self.rtt / 2)
+        kind = message.get("type")
+        if kind == "capabilities-request":
+            self._send({"type": "client-capabilities", "navigation": {"channel": "data"}}, CAPABILITIES_TOPIC)
+        elif kind == "page-content-request":
+            self._send(self._snapshot(), PAGE_CONTENT_TOPIC)
+        elif kind == "agent-navigation-url":
+            await asyncio.sleep(self.render)
+            self.pathname = message["pathname"]
+            self._send(self._snapshot(), PAGE_CONTENT_TOPIC)
+        elif kind == "dom-plan":
+            for index, _ in enumerate(message["steps"]):
+                await asyncio.sleep(self.step)
+                self._send({"type": "dom-plan-step", "actionId": message["actionId"], "index": index,
+                            "status": "ok", "detail": "done"}, RESULT_TOPIC)
+            self._send({"type": RESULT_TOPIC, "actionId": message["actionId"], "success": True,
+                        "result": "done"}, RESULT_TOPIC)
+        elif kind == "dom-action":
+            await asyncio.sleep(self.step)
+            self._send({"type": RESULT_TOPIC, "actionId": message["actionId"], "success": True,
+                        "result": "done"}, RESULT_TOPIC)
+
+
+class _FakeLocalParticipant:
+    identity = "agent"
+
+    def __init__(self, frontend: _FakeFrontend):
+        self.frontend = frontend
+
+    async def publish_data(self, payload, reliable: bool = True, topic: str = "") -> None:
+        self.frontend.receive(payload, topic)
+
+    async def set_metadata(self, metadata: str) -> None:
+        pass
+
+    async def set_attributes(self, attributes: dict) -> None:
+        pass
+
+
+class _FakeRoom(rtc.EventEmitter):
+    def __init__(self, name: str, args):
+        super().__init__()
+        self.name = name
+        self.frontend = _Identity("user")
+        self.remote_participants = {"user": self.frontend}
+        self.local_participant = _FakeLocalParticipant(
+            _FakeFrontend(self, args.rtt_ms, args.render_ms, args.step_ms, args.cards))
+
+    def isconnected(self) -> bool:
+        return True
+
+
+class _FakeProc:
+    def __init__(self, userdata: dict):
+        self.userdata = userdata
+
+
+class _FakeJobContext:
+    """What voice_agent_session uses of a JobContext."""
+
+    def __init__(self, room: _FakeRoom, userdata: dict):
+        self.room = room
+        self.proc = _FakeProc(userdata)
+        self._shutdown_callbacks = []
+
+    def add_shutdown_callback(self, callback) -> None:
+        self._shutdown_callbacks.append(callback)
+
+    async def shutdown(self) -> None:
+        for callback in self._shutdown_callbacks:
+            await callback()
+
+
+@dataclass
+class _Probe:
+    """One session's handles and measurements."""
+    output: MockAudioOutput
+    session: AgentSession | None = None
+    replies: asyncio.Event = field(default_factory=asyncio.Event)
+    stages: dict[str, list[float]] = field(default_factory=dict)
+
+    def on_state(self, event) -> None:
+        if event.old_state == "speaking" and event.new_state == "listening":
+            self.replies.set()
+
+    def on_metrics(self, event) -> None:
+        m = event.metrics
+        if isinstance(m, metrics.EOUMetrics):
+            self.stages.setdefault("eou", []).append(m.end_of_utterance_delay * 1000)
+        elif isinstance(m, metrics.LLMMetrics) and m.ttft >= 0:
+            self.stages.setdefault("llm_ttft", []).append(m.ttft * 1000)
+        elif isinstance(m, metrics.TTSMetrics) and m.ttfb >= 0:
+            self.stages.setdefault("tts_ttfb", []).append(m.ttfb * 1000)
+
+
+_probe: contextvars.ContextVar[_Probe] = contextvars.ContextVar("probe")
+
+
+class _HarnessSession(AgentSession):
+    """AgentSession with mock audio output in place of RoomIO, and STT turn detection."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("turn_detection", "stt")
+        super().__init__(**kwargs)
+        probe = _probe.get()
+        probe.session = self
+        self.on("agent_state_changed", probe.on_state)
+        self.on("metrics_collected", probe.on_metrics)
+
+    async def start(self, agent, room=None, **kwargs):
+        self.output.audio = _probe.get().output
+        return await super().start(agent=agent, **kwargs)
+
+
+@dataclass
+class _LevelResult:
+    sessions: int
+    turns: int = 0
+    failed: int = 0
+    latencies: list[float] = field(default_factory=list)
+    stages: dict[str, list[float]] = field(default_factory=dict)
+    loop_lag: list[float] = field(default_factory=list)
+    wall: float = 0.0
+    cpu: float = 0.0
+    rss_growth_mb: float = 0.0
+
+
+async def user(index: int, args, result: _LevelResult) -> None:
+    """One synthetic participant: join, wait for the greeting, run the script, leave."""
+    stt = MockSTT(word_ms=args.word_ms, final_ms=args.final_ms)
+    llm = MockLLM(reply="Sure, here is what I found on this page.", ttft_ms=args.llm_ms,
+                  jitter_ms=args.llm_ms * 0.2, tool_call=TOOL_CALLS.get)
+    tts = MockTTS(ttfb_ms=args.tts_ms)
+    probe = _Probe(MockAudioOutput(speed=args.playback_speed))
+    _probe.set(probe)
+    ctx = _FakeJobContext(_FakeRoom(f"load-{index}", args), {"stt": stt, "llm": llm, "tts": tts})
+
+    await agent.voice_agent_session(ctx)
+    for turn in range(args.turns):
+        utterance, _ = SCRIPT[(index + turn) % len(SCRIPT)]
+        await asyncio.sleep(args.think_ms / 1000)
+        probe.replies.clear()
+        stt.say(utterance)
+        try:
+            await asyncio.wait_for(probe.replies.wait(), args.turn_timeout)
+        except asyncio.TimeoutError:
+            result.failed += 1
+            continue
+        result.turns += 1
+        result.latencies.append((probe.output.first_frame_at - stt.end_of_speech_at) * 1000)
+
+    await ctx.shutdown()
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(probe.session.aclose(), 5)
+    for stage, values in probe.stages.items():
+        result.stages.setdefault(stage, []).extend(values)
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def watch_loop(lags: list[float], interval: float = 0.05) -> None:
+    """Event-loop lag: how late a `interval` sleep wakes up."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run_level(sessions: int, args) -> _LevelResult:
+    result = _LevelResult(sessions)
+    rss_before, cpu_before, start = rss_mb(), cpu_seconds(), time.perf_counter()
+    peak_rss = rss_before
+    watcher = asyncio.create_task(watch_loop(result.loop_lag))
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, rss_mb())
+            await asyncio.sleep(0.2)
+
+    sampler = asyncio.create_task(sample_rss())
+    # Rooms arrive over --ramp-ms, not all in the same instant
+    users = []
+    for i in range(sessions):
+        users.append(asyncio.create_task(user(i, args, result)))
+        await asyncio.sleep(args.ramp_ms / 1000 / sessions)
+    await asyncio.gather(*users)
+    watcher.cancel()
+    sampler.cancel()
+
+    result.wall = time.perf_counter() - start
+    result.cpu = cpu_seconds() - cpu_before
+    result.rss_growth_mb = peak_rss - rss_before
+    return result
+
+
+def pct(values: list[float], q: int) -> float:
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    parser.add_argument("--turns", type=int, default=6, help="scripted turns per session")
+    parser.add_argument("--think-ms", type=float, default=1000, help="pause before each user turn")
+    parser.add_argument("--ramp-ms", type=float, default=2000, help="spread session starts over this long")
+    parser.add_argument("--word-ms", type=float, default=150)
+    parser.add_argument("--final-ms", type=float, default=200)
+    parser.add_argument("--llm-ms", type=float, default=400)
+    parser.add_argument("--tts-ms", type=float, default=150)
+    parser.add_argument("--rtt-ms", type=float, default=40)
+    parser.add_argument("--render-ms", type=float, default=150)
+    parser.add_argument("--step-ms", type=float, default=50)
+    parser.add_argument("--cards", type=int, default=30, help="report cards on report pages")
+    parser.add_argument("--playback-speed", type=float, default=10, help="play agent audio this much faster")
+    parser.add_argument("--turn-timeout", type=float, default=20)
+    parser.add_argument("--degrade", type=float, default=0.5, help="p95 growth over the first level that counts as degraded")
+    parser.add_argument("--gate", type=int, help="exit 1 if any level up to this many sessions is degraded")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    agent.AgentSession = _HarnessSession  # voice_agent_session builds its session through this name
+    logging.getLogger("livekit.agents").setLevel(logging.ERROR)
+
+    fast = sum(1 for text, _ in SCRIPT if agent.FAST_PATH_ROUTER and agent.FAST_PATH_ROUTER.match(text))
+    tools = sum(1 for _, call in SCRIPT if call)
+    print(f"script: {len(SCRIPT)} utterances ({fast} fast-path, {tools} tool calls, "
+          f"{len(SCRIPT) - fast - tools} plain LLM replies)")
+    print(f"{'sessions':>8} {'turns/s':>8} {'failed':>6} {'resp p50':>9} {'p95':>7} {'p99':>7} "
+          f"{'eou p95':>8} {'llm p95':>8} {'tts p95':>8} {'lag p95':>8} {'lag max':>8} "
+          f"{'cpu ms/s':>9} {'rss MB':>7}  (per session: cpu ms/s, rss MB)")
+
+    baseline = None
+    knee = None
+    for sessions in args.sessions:
+        r = await run_level(sessions, args)
+        p95 = pct(r.latencies, 95)
+        baseline = baseline if baseline is not None else p95
+        degraded = r.failed > 0 or p95 > baseline * (1 + args.degrade)
+        if degraded and knee is None:
+            knee = sessions
+        print(f"{sessions:>8} {r.turns / r.wall:>8.1f} {r.failed:>6} {pct(r.latencies, 50):>9.0f} {p95:>7.0f} "
+              f"{pct(r.latencies, 99):>7.0f} {pct(r.stages.get('eou', []), 95):>8.0f} "
+              f"{pct(r.stages.get('llm_ttft', []), 95):>8.0f} {pct(r.stages.get('tts_ttfb', []), 95):>8.0f} "
+              f"{pct(r.loop_lag, 95):>8.1f} {max(r.loop_lag, default=0):>8.1f} "
+              f"{r.cpu / r.wall / sessions * 1000:>9.1f} {r.rss_growth_mb / sessions:>7.2f}"
+              f"{'  degraded' if degraded else ''}")
+
+    print()
+    print(f"latency degrades at: {knee} sessions" if knee else
+          f"no degradation up to {args.sessions[-1]} sessions")
+    if args.gate is not None and knee is not None and knee <= args.gate:
+        sys.exit(f"gate failed: degraded at {knee} sessions (gate {args.gate})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
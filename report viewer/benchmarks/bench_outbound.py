@@ -0,0 +1,176 @@
+"""
+Outbound queue under a pathological tool loop: packets and bytes on the wire,
+with and without the queue.
+
+--loops tool loops run for --seconds. Each one calls a navigation and a DOM
+action back to back, every --interval-ms, as an LLM stuck re-calling
+view_report_by_date would. Meanwhile an interim-transcript storm fires a
+prefetch hint every --hint-ms without waiting for it. "direct" publishes
+every message the way the agent did before OutboundQueue. "queued" sends the
+same messages through outbound_for(room), with the keys and droppable flags
+of the real call sites, and the batch topic announced. The fake room takes
+--publish-ms per packet.
+
+"peak pkt/s" is the busiest 100 ms window scaled to a second. "last nav ok"
+checks that the frontend's last navigation is the last one requested.
+
+Usage:
+    python benchmarks/bench_outbound.py [--loops 4] [--seconds 2] [--interval-ms 5] [--hint-ms 2] [--publish-ms 1]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import outbound  # noqa: E402
+from outbound import outbound_for  # noqa: E402
+
+PAGES = ["/whatsapp-reports", "/ads-reports", "/meeting-reports", "/weekly-reports", "/dashboard"]
+
+WINDOW_S = 0.1
+
+
+class _FakeParticipant:
+    def __init__(self, publish_s: float):
+        self.publish_s = publish_s
+        self.packets: list[tuple[float, str, bytes]] = []
+
+    async def publish_data(self, payload, reliable=True, topic=""):
+        await asyncio.sleep(self.publish_s)
+        self.packets.append((time.perf_counter(), topic, payload))
+
+
+class _FakeRoom:
+    def __init__(self, publish_s: float):
+        self.local_participant = _FakeParticipant(publish_s)
+
+
+class _Capabilities:
+    batch_topic = "agent-batch"
+
+
+def _navigation(i: int) -> bytes:
+    pathname = PAGES[i % len(PAGES)]
+    return json.dumps({"type": "agent-navigation-url", "url": f"http://localhost:8080{pathname}",
+                       "pathname": pathname}).encode("utf-8")
+
+
+def _action(i: int) -> bytes:
+    return json.dumps({"type": "dom-action", "actionId": f"action-{i:06d}",
+                       "action": {"type": "click", "target": {"text": "2025-01-15"}, "value": None}}).encode("utf-8")
+
+
+def _hint(i: int) -> bytes:
+    pathname = PAGES[i % len(PAGES)]
+    return json.dumps({"type": "navigation-prefetch", "hintId": f"{i:012x}", "route": "reports",
+                       "target": pathname}).encode("utf-8")
+
+
+async def run(queued: bool, args) -> dict:
+    room = _FakeRoom(args.publish_ms / 1000)
+    queue = outbound_for(room)
+    queue.capabilities = _Capabilities()
+    latencies: list[float] = []
+    requested = 0
+    last_navigation = None
+
+    async def publish(payload: bytes, topic: str, **options) -> str:
+        start = time.perf_counter()
+        if queued:
+            outcome = await queue.send(payload, topic, **options)
+        else:
+            await room.local_participant.publish_data(payload, reliable=True, topic=topic)
+            outcome = outbound.SENT
+        latencies.append(time.perf_counter() - start)
+        return outcome
+
+    async def tool_loop(n: int, deadline: float) -> None:
+        nonlocal requested, last_navigation
+        i = 0
+        while time.perf_counter() < deadline:
+            payload = _navigation(n + i)
+            requested += 2
+            last_navigation = json.loads(payload)["pathname"]
+            await publish(payload, "agent-navigation", key="navigation")
+            await publish(_action(n * 100_000 + i), "dom-action")
+            i += 1
+            await asyncio.sleep(args.interval_ms / 1000)
+
+    async def hint_storm(deadline: float) -> None:
+        nonlocal requested
+        tasks = set()
+        i = 0
+        while time.perf_counter() < deadline:
+            requested += 1
+            task = asyncio.create_task(publish(_hint(i), "agent-navigation-prefetch", droppable=True))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            i += 1
+            await asyncio.sleep(args.hint_ms / 1000)
+        await asyncio.gather(*tasks)
+
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    await asyncio.gather(*(tool_loop(n, deadline) for n in range(args.loops)), hint_storm(deadline))
+    elapsed = time.perf_counter() - start
+
+    packets = room.local_participant.packets
+    delivered = []  # (topic, message) as the frontend sees them after unpacking batches
+    for _, topic, payload in packets:
+        message = json.loads(payload)
+        if topic == _Capabilities.batch_topic:
+            delivered.extend((inner["topic"], json.loads(inner["payload"])) for inner in message["messages"])
+        else:
+            delivered.append((topic, message))
+    navigations = [message["pathname"] for topic, message in delivered if topic == "agent-navigation"]
+
+    windows: dict[int, int] = {}
+    for sent_at, _, _ in packets:
+        bucket = int((sent_at - start) / WINDOW_S)
+        windows[bucket] = windows.get(bucket, 0) + 1
+    latencies_ms = sorted(s * 1000 for s in latencies)
+    stats = queue.stats
+    return {
+        "requested": requested,
+        "delivered": len(delivered),
+        "packets": len(packets),
+        "kB": sum(len(payload) for _, _, payload in packets) / 1024,
+        "pkt_s": len(packets) / elapsed,
+        "peak_pkt_s": max(windows.values(), default=0) / WINDOW_S,
+        "merged": stats.merged if queued else 0,
+        "dropped": stats.dropped if queued else 0,
+        "p50_ms": statistics.median(latencies_ms),
+        "p95_ms": statistics.quantiles(latencies_ms, n=100)[94],
+        "last_nav_ok": bool(navigations) and navigations[-1] == last_navigation,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loops", type=int, default=4, help="concurrent tool loops")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--interval-ms", type=float, default=5, help="pause between a loop's tool calls")
+    parser.add_argument("--hint-ms", type=float, default=2, help="pause between prefetch hints")
+    parser.add_argument("--publish-ms", type=float, default=1, help="fake publish_data latency")
+    args = parser.parse_args()
+
+    print(f"{args.loops} tool loops every {args.interval_ms:g}ms + a hint every {args.hint_ms:g}ms "
+          f"for {args.seconds:g}s; queue: {outbound.OUTBOUND_RATE:g} msg/s per topic, burst "
+          f"{outbound.OUTBOUND_BURST}, frame {outbound.OUTBOUND_FRAME_MS:g}ms, {outbound.OUTBOUND_MAX_QUEUED} queued")
+    print(f"{'mode':<8} {'requested':>9} {'delivered':>9} {'packets':>8} {'kB':>8} {'pkt/s':>7} "
+          f"{'peak pkt/s':>10} {'merged':>7} {'dropped':>7} {'p50 ms':>7} {'p95 ms':>7} {'last nav ok':>11}")
+    for queued in (False, True):
+        r = await run(queued, args)
+        print(f"{'queued' if queued else 'direct':<8} {r['requested']:>9} {r['delivered']:>9} {r['packets']:>8} "
+              f"{r['kB']:>8.1f} {r['pkt_s']:>7.0f} {r['peak_pkt_s']:>10.0f} {r['merged']:>7} {r['dropped']:>7} "
+              f"{r['p50_ms']:>7.1f} {r['p95_ms']:>7.1f} {str(r['last_nav_ok']):>11}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""
+Prompt size and LLM time to first token with the page context added to a turn.
+
+Synthetic report pages with --elements visible elements are fed to the
+PageContextBuilder the agent uses. For each page, the harness compares the
+bounded context with dumping the whole page-content JSON into the prompt. It
+prints the tokens each one adds to the instructions and tool schemas, plus the
+build time with a cold cache (new page version) and a warm one (same page and
+keywords).
+
+Token counts use tiktoken when it is installed, otherwise ~4 chars/token.
+With --live and OPENAI_API_KEY set, it also streams real chat completions with
+each prompt and reports time to first token.
+
+Usage:
+    python benchmarks/bench_page_context.py [--elements 10 100 1000] [--live] [--model gpt-4.1-mini] [--turns 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("LIVEKIT_API_KEY", "bench-api-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "bench-api-secret-0123456789abcdef0123")
+
+from livekit.agents.llm.utils import build_legacy_openai_schema  # noqa: E402
+
+from agent import AGENT_INSTRUCTIONS  # noqa: E402
+from bench_page_model import _Keys, report_card, sidebar  # noqa: E402
+from bench_prompt_tokens import count_tokens  # noqa: E402
+from page_context import PageContextBuilder  # noqa: E402
+from page_model import PageModel  # noqa: E402
+from tools import ALL_TOOLS  # noqa: E402
+
+UTTERANCES = ["click view report for 5 February 2025", "اضغط على تحديث", "what can I do on this page?",
+              "search for the march reports", "sign me out"]
+
+
+def synthetic_page(elements: int) -> dict:
+    """Sidebar first, then report cards with their View Report buttons, `elements` in all."""
+    keys = _Keys()
+    page = sidebar(keys)
+    budget = elements - sum(len(v) for v in page.values())
+    if budget < 0:
+        page["links"] = page["links"][:max(0, len(page["links"]) + budget)]
+    for i in range(max(0, budget) // 2):
+        card, button = report_card(keys, i)
+        page["cards"].append(card)
+        page["buttons"].append(button)
+    return {"pathname": "/whatsapp-reports", "title": "Report Viewer", "elements": page}
+
+
+def timed_us(fn, repeat: int = 50) -> float:
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1e6)
+    return statistics.median(samples)
+
+
+async def time_to_first_token(client, model: str, tools: list[dict], messages: list[dict]) -> float:
+    start = time.perf_counter()
+    stream = await client.chat.completions.create(model=model, messages=messages, tools=tools, stream=True)
+    elapsed = None
+    async for chunk in stream:
+        delta = chunk.choices[0].delta if chunk.choices else None
+        if elapsed is None and delta is not None and (delta.content or delta.tool_calls):
+            elapsed = (time.perf_counter() - start) * 1000
+    return elapsed
+
+
+async def live(args, prompts: dict[str, str], tools: list[dict]) -> None:
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI()
+    for label, system in prompts.items():
+        values = []
+        for i in range(args.turns):
+            messages = [{"role": "system", "content": system},
+                        {"role": "user", "content": UTTERANCES[i % len(UTTERANCES)]}]
+            values.append(await time_to_first_token(client, args.model, tools, messages))
+        print(f"{label:>22} TTFT: p50={statistics.median(values):.0f}ms max={max(values):.0f}ms ({args.model})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--elements", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--live", action="store_true", help="measure TTFT against the OpenAI API")
+    parser.add_argument("--model", default="gpt-4.1-mini")
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+
+    tools = [build_legacy_openai_schema(tool) for tool in ALL_TOOLS]
+    base_tokens = count_tokens(AGENT_INSTRUCTIONS) + count_tokens(json.dumps(tools, ensure_ascii=False))
+    print(f"instructions + tool schemas: {base_tokens} tokens")
+    print(f"{'elements':>8} {'full dump':>10} {'context':>8} {'max ctx':>8} {'cold us':>8} {'warm us':>8}")
+
+    prompts = {"no page": AGENT_INSTRUCTIONS}
+    for elements in args.elements:
+        content = synthetic_page(elements)
+        model = PageModel()
+        model.update(content, 1)
+        builder = PageContextBuilder()
+
+        dump = json.dumps(content, ensure_ascii=False)
+        contexts = [builder.build(model, utterance) for utterance in UTTERANCES]
+        sizes = [count_tokens(context) for context in contexts]
+
+        def cold():
+            model.version += 1
+            builder.build(model, UTTERANCES[0])
+
+        cold_us = timed_us(cold, 10)
+        warm_us = timed_us(lambda: builder.build(model, UTTERANCES[0]))
+        print(f"{elements:>8} {count_tokens(dump):>10} {statistics.median(sizes):>8.0f} {max(sizes):>8} "
+              f"{cold_us:>8.0f} {warm_us:>8.1f}")
+        prompts[f"{elements} el, full dump"] = f"{AGENT_INSTRUCTIONS}\n\nCurrent page content:\n{dump}"
+        prompts[f"{elements} el, context"] = f"{AGENT_INSTRUCTIONS}\n\n{contexts[0]}"
+
+    print(f"\ncontext for {args.elements[-1]} elements and {UTTERANCES[0]!r}:\n{contexts[0]}")
+
+    if args.live:
+        if not os.getenv("OPENAI_API_KEY"):
+            sys.exit("--live needs OPENAI_API_KEY")
+        asyncio.run(live(args, prompts, tools))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Page-content bytes per update (full snapshots vs deltas) and click-target
+resolution time, on synthetic report pages with hundreds of cards.
+
+Deltas are built with a port of PageContentSender's buildDelta and applied
+through PageModel.on_data_received, like messages from a real frontend.
+"sent" is what the frontend publishes: the delta, or the full snapshot when
+that is smaller. Each scenario starts from a page with --cards report cards
+plus the sidebar:
+  card_changed   one card's text changes (e.g. a status badge)
+  cards_appended --append more cards load at the end (pagination)
+  route_change   another report page; sidebar links and buttons survive
+
+Usage:
+    python benchmarks/bench_page_model.py [--cards 100 300 1000] [--append 20] [--lookups 2000]
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from page_model import ELEMENT_KINDS, PAGE_CONTENT_TOPIC, PageModel  # noqa: E402
+from routes import ROUTES  # noqa: E402
+
+
+@dataclass
+class _Packet:
+    data: bytes
+    topic: str = PAGE_CONTENT_TOPIC
+
+
+class _Keys:
+    def __init__(self):
+        self.next = 0
+
+    def __call__(self) -> str:
+        self.next += 1
+        return f"e{self.next}"
+
+
+def sidebar(keys: _Keys) -> dict:
+    return {
+        "buttons": [{"key": keys(), "text": "Toggle Sidebar"}, {"key": keys(), "text": "Sign out"},
+                    {"key": keys(), "text": "Refresh", "ariaLabel": "Refresh reports"}],
+        "inputs": [{"key": keys(), "type": "text", "placeholder": "Search reports..."}],
+        "links": [{"key": keys(), "text": route.label_en.title(), "href": f"https://example.app{route.pathname}"}
+                  for route in ROUTES],
+        "cards": [],
+    }
+
+
+def report_card(keys: _Keys, i: int) -> tuple[dict, dict]:
+    day = f"{1 + i % 28} {('January', 'February', 'March', 'April')[i // 28 % 4]} 2025"
+    card = {"key": keys(), "text": f"WhatsApp Report {day} Messages: {100 + i} Groups: 12 Status: Ready View Report",
+            "date": day}
+    button = {"key": keys(), "text": "View Report", "ariaLabel": f"View Report {day}"}
+    return card, button
+
+
+def report_page(keys: _Keys, pathname: str, cards: int, base: dict | None = None) -> dict:
+    elements = copy.deepcopy(base) if base else sidebar(keys)
+    elements["cards"] = []
+    elements["buttons"] = elements["buttons"][:3]
+    for i in range(cards):
+        card, button = report_card(keys, i)
+        elements["cards"].append(card)
+        elements["buttons"].append(button)
+    return {"pathname": pathname, "title": "Report Viewer", "elements": elements}
+
+
+def build_delta(prev: dict, nxt: dict) -> dict | None:
+    """PageContentSender's buildDelta."""
+    changes = {}
+    for kind in ELEMENT_KINDS:
+        before = {el["key"]: json.dumps(el) for el in prev["elements"][kind]}
+        next_keys = [el["key"] for el in nxt["elements"][kind]]
+        next_key_set = set(next_keys)
+        change = {}
+        upsert = [el for el in nxt["elements"][kind] if before.get(el["key"]) != json.dumps(el)]
+        remove = [key for key in before if key not in next_key_set]
+        if upsert:
+            change["upsert"] = upsert
+        if remove:
+            change["remove"] = remove
+        expected = [key for key in before if key in next_key_set] + [key for key in next_keys if key not in before]
+        if expected != next_keys:
+            change["order"] = next_keys
+        if change:
+            changes[kind] = change
+    return changes or None
+
+
+def message_bytes(prev: dict, nxt: dict, seq: int) -> tuple[bytes, bytes]:
+    full = json.dumps({"type": "page-content", "seq": seq, "content": nxt}).encode()
+    delta = json.dumps({"type": "page-content-delta", "seq": seq, "base": seq - 1, "pathname": nxt["pathname"],
+                        "title": nxt["title"], "changes": build_delta(prev, nxt) or {}}).encode()
+    return full, delta
+
+
+def scenarios(cards: int, append: int):
+    keys = _Keys()
+    start = report_page(keys, "/whatsapp-reports", cards)
+
+    changed = copy.deepcopy(start)
+    changed["elements"]["cards"][cards // 2]["text"] = changed["elements"]["cards"][cards // 2]["text"].replace(
+        "Ready", "Archived")
+    yield "card_changed", start, changed
+
+    appended = copy.deepcopy(start)
+    for i in range(cards, cards + append):
+        card, button = report_card(keys, i)
+        appended["elements"]["cards"].append(card)
+        appended["elements"]["buttons"].append(button)
+    yield "cards_appended", start, appended
+
+    yield "route_change", start, report_page(keys, "/productivity-reports", cards, base=start["elements"])
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--append", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'cards':>6} {'scenario':>15} {'full B':>9} {'delta B':>9} {'sent B':>9} {'saved':>6} {'apply us':>9}")
+    for cards in args.cards:
+        for name, prev, nxt in scenarios(cards, args.append):
+            full, delta = message_bytes(prev, nxt, 2)
+
+            def apply():
+                model = PageModel()
+                model.update(prev, 1)
+                model.on_data_received(_Packet(delta))
+                assert model.seq == 2 and model.content["elements"] == nxt["elements"], name
+
+            snapshot_us = timed(lambda: PageModel().update(nxt, 2), 20)
+            apply_us = timed(apply, 20) - timed(lambda: PageModel().update(prev, 1), 20)
+            sent = min(len(full), len(delta))
+            print(f"{cards:>6} {name:>15} {len(full):>9} {len(delta):>9} {sent:>9} "
+                  f"{1 - sent / len(full):>6.0%} {apply_us:>9.0f}  (full snapshot: {snapshot_us:.0f}us)")
+
+    print()
+    print(f"{'cards':>6} {'lookup':>15} {'median us':>10}")
+    for cards in args.cards:
+        model = PageModel()
+        page = report_page(_Keys(), "/whatsapp-reports", cards)
+        page["elements"]["buttons"][1]["id"] = "sign-out"
+        model.update(page, 1)
+        last_day = page["elements"]["cards"][-1]["date"]
+        lookups = {
+            "by_id": lambda: model.resolve(element_id="sign-out"),
+            "exact_text": lambda: model.resolve("Refresh"),
+            "indexed_text": lambda: model.resolve("View Report", index=cards - 1),
+            "partial_text": lambda: model.resolve(f"report {last_day}"),
+            "missing": lambda: model.resolve("Export to Excel"),
+        }
+        for name, lookup in lookups.items():
+            assert name == "missing" or lookup() is not None, name
+            print(f"{cards:>6} {name:>15} {timed(lookup, args.lookups):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Load test for the acknowledged DOM-action protocol.
+
+Fires thousands of concurrent send_dom_action() calls at an in-process fake
+room whose "frontend" answers each `dom-action` with a `dom-action-result`
+after a random delay. A fraction of actions fail or are never answered so the
+timeout path is exercised too. At the end the registry must be empty.
+
+Usage:
+    python benchmarks/bench_pending_actions.py [--actions 5000] [--timeout 1.0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Load the registry, not the room's outbound rate limit (bench_outbound covers that)
+os.environ.setdefault("AGENT_OUTBOUND_RATE", "1000000")
+os.environ.setdefault("AGENT_OUTBOUND_BURST", "1000000")
+os.environ.setdefault("AGENT_OUTBOUND_MAX_QUEUED", "1000000")
+os.environ.setdefault("AGENT_OUTBOUND_FRAME_MS", "0")
+
+from pending_actions import RESULT_TOPIC, PendingActionRegistry  # noqa: E402
+from tools import send_dom_action  # noqa: E402
+
+
+@dataclass
+class _Packet:
+    data: bytes
+    topic: str
+    participant: object = None
+
+
+class _FakeFrontend:
+    """Answers dom-action messages the way DOMInteractionExecutor does."""
+
+    def __init__(self, registry, rng, max_delay, fail_rate, drop_rate):
+        self.registry = registry
+        self.rng = rng
+        self.max_delay = max_delay
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.tasks = set()
+
+    async def publish_data(self, payload, reliable=True, topic=""):
+        message = json.loads(payload)
+        roll = self.rng.random()
+        if roll < self.drop_rate:
+            return
+        success = roll >= self.drop_rate + self.fail_rate
+        task = asyncio.create_task(self._answer(message["actionId"], success))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _answer(self, action_id, success):
+        await asyncio.sleep(self.rng.uniform(0, self.max_delay))
+        body = {"type": RESULT_TOPIC, "actionId": action_id, "success": success}
+        body["result" if success else "error"] = "Clicked: element" if success else "Element not found"
+        self.registry.on_data_received(_Packet(json.dumps(body).encode(), RESULT_TOPIC))
+
+
+class _FakeRoom:
+    def __init__(self, participant):
+        self.local_participant = participant
+
+
+class _FakeAgent:
+    def __init__(self, room, registry):
+        self._room = room
+        self._pending_actions = registry
+
+
+async def _timed(agent, timeout):
+    start = time.perf_counter()
+    result = await send_dom_action(agent, None, "click", {"text": "View Report"}, timeout=timeout)
+    return (time.perf_counter() - start) * 1000, result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--actions", type=int, default=5000)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    parser.add_argument("--max-delay", type=float, default=0.3)
+    parser.add_argument("--fail-rate", type=float, default=0.05)
+    parser.add_argument("--drop-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    registry = PendingActionRegistry()
+    frontend = _FakeFrontend(registry, random.Random(1), args.max_delay, args.fail_rate, args.drop_rate)
+    agent = _FakeAgent(_FakeRoom(frontend), registry)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_timed(agent, args.timeout) for _ in range(args.actions)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(ms for ms, _ in results)
+    succeeded = sum(1 for _, r in results if r)
+    timed_out = sum(1 for _, r in results if not r and "No response" in r.message)
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"actions={args.actions} elapsed={elapsed:.2f}s throughput={args.actions / elapsed:.0f}/s "
+        f"ok={succeeded} failed={args.actions - succeeded - timed_out} timed_out={timed_out}"
+    )
+    print(f"latency p50={q[49]:.1f}ms p95={q[94]:.1f}ms p99={q[98]:.1f}ms max={latencies[-1]:.1f}ms")
+    print(f"pending after run: {len(registry)}")
+    if len(registry):
+        sys.exit("registry leaked pending actions")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Prompt tokens per turn and LLM time to first token: per-page tools vs navigate(route).
+
+"before" rebuilds the old tool set from the route registry, with one
+navigation tool per page and a "Use when user asks to: ..." docstring of
+English and Arabic phrases like the ones it replaced. "after" is the agent's
+current ALL_TOOLS. Both use the current AGENT_INSTRUCTIONS, so the difference
+is the tool schemas alone.
+
+Token counts use tiktoken when it is installed, otherwise ~4 chars/token.
+With --live and OPENAI_API_KEY set, also streams real chat completions for a
+few navigation turns and reports time to first token (content or tool call).
+
+Usage:
+    python benchmarks/bench_prompt_tokens.py [--live] [--model gpt-4.1-mini] [--turns 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("LIVEKIT_API_KEY", "bench-api-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "bench-api-secret-0123456789abcdef0123")
+
+from livekit.agents import RunContext, function_tool  # noqa: E402
+from livekit.agents.llm.utils import build_legacy_openai_schema  # noqa: E402
+
+from agent import AGENT_INSTRUCTIONS  # noqa: E402
+from mock_providers import estimate_tokens  # noqa: E402
+from routes import ROUTES  # noqa: E402
+from tools import ALL_TOOLS, DOM_TOOLS, where_am_i  # noqa: E402
+
+TURNS = ["Open dashboard", "وريني تقارير الواتساب", "Show me the courses page", "افتح الإعدادات",
+         "take me to the meeting notes"]
+
+
+def legacy_tools() -> list:
+    """One tool per page, with docstrings in the pre-registry style."""
+    tools = []
+    for route in ROUTES:
+        english = [alias for alias in route.aliases if alias.isascii()]
+        arabic = [alias for alias in route.aliases if not alias.isascii()]
+        lines = [f"Navigate to {route.label_en}.", "Use when user asks to:"]
+        for alias in english:
+            lines += [f"- Go to {alias}", f"- Navigate to {alias}", f"- Show {alias}", f"- Open {alias}"]
+        quoted = ", ".join(f'"{verb} {alias}"' for alias in arabic for verb in ("عايز اروح على", "افتح"))
+        lines.append(f"- Arabic: {quoted}")
+
+        async def navigate_page(context: RunContext):
+            return None
+
+        tools.append(function_tool(navigate_page, name=f"open_{route.name}", description="\n".join(lines)))
+    return tools + [where_am_i] + DOM_TOOLS
+
+
+def schemas(tools: list) -> list[dict]:
+    return [build_legacy_openai_schema(tool) for tool in tools]
+
+
+def count_tokens(text: str) -> int:
+    try:
+        import tiktoken
+    except ImportError:
+        return estimate_tokens(text)
+    return len(tiktoken.get_encoding("o200k_base").encode(text))
+
+
+async def time_to_first_token(client, model: str, tools: list[dict], transcript: str) -> float:
+    start = time.perf_counter()
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=[{"role": "system", "content": AGENT_INSTRUCTIONS}, {"role": "user", "content": transcript}],
+        tools=tools,
+        stream=True,
+    )
+    elapsed = None
+    async for chunk in stream:
+        delta = chunk.choices[0].delta if chunk.choices else None
+        if elapsed is None and delta is not None and (delta.content or delta.tool_calls):
+            elapsed = (time.perf_counter() - start) * 1000
+    return elapsed
+
+
+async def live(args, variants: dict[str, list[dict]]) -> None:
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI()
+    results = {label: [] for label in variants}
+    for i in range(args.turns):
+        transcript = TURNS[i % len(TURNS)]
+        for label, tools in variants.items():  # interleaved so both see the same conditions
+            results[label].append(await time_to_first_token(client, args.model, tools, transcript))
+    for label, values in results.items():
+        print(f"{label:>6} TTFT: p50={statistics.median(values):.0f}ms max={max(values):.0f}ms ({args.model})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="measure TTFT against the OpenAI API")
+    parser.add_argument("--model", default="gpt-4.1-mini")
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    variants = {"before": schemas(legacy_tools()), "after": schemas(ALL_TOOLS)}
+    instructions = count_tokens(AGENT_INSTRUCTIONS)
+    print(f"instructions: {instructions} tokens")
+    for label, tools in variants.items():
+        tool_tokens = count_tokens(json.dumps(tools, ensure_ascii=False))
+        print(f"{label:>6}: {len(tools)} tools, {tool_tokens} tool-schema tokens, "
+              f"{instructions + tool_tokens} prompt tokens per turn before history")
+
+    if args.live:
+        if not os.getenv("OPENAI_API_KEY"):
+            sys.exit("--live needs OPENAI_API_KEY")
+        asyncio.run(live(args, variants))
+
+
+if __name__ == "__main__":
+    main()
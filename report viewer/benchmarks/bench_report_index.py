@@ -0,0 +1,83 @@
+"""
+Report index lookups on fixture data.
+
+Builds a ReportIndex from synthetic `reports` rows (one report per section per
+day over several years, with gaps), applies an incremental batch of updates
+and times lookups and nearest-date suggestions. No database needed.
+
+Usage:
+    python benchmarks/bench_report_index.py [--years 3] [--lookups 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from report_index import SECTION_PATHS, ReportIndex  # noqa: E402
+
+
+def fixture_rows(years: int, rng: random.Random) -> list[dict]:
+    start = date.today() - timedelta(days=365 * years)
+    rows = []
+    for section in SECTION_PATHS:
+        for offset in range(365 * years):
+            if rng.random() < 0.15:  # days without a report
+                continue
+            day = start + timedelta(days=offset)
+            rows.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "section": section,
+                "report_date": day.isoformat(),
+                "updated_at": f"{day.isoformat()}T20:00:00+00:00",
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    rows = fixture_rows(args.years, rng)
+
+    start = time.perf_counter()
+    index = ReportIndex.from_rows(rows)
+    print(f"load: {len(index)} reports in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    # Incremental refresh: a day's worth of edits, some moving a report's date
+    updates = []
+    for row in rng.sample(rows, 50):
+        moved = date.fromisoformat(row["report_date"]) + timedelta(days=rng.choice([0, 0, 1]))
+        updates.append({**row, "report_date": moved.isoformat(), "updated_at": "2099-01-01T00:00:00+00:00"})
+    start = time.perf_counter()
+    index.apply(updates)
+    print(f"refresh: {len(updates)} rows in {(time.perf_counter() - start) * 1000:.2f}ms, high water {index.high_water}")
+
+    sections = list(SECTION_PATHS)
+    first = date.fromisoformat(min(r["report_date"] for r in rows))
+    queries = [(rng.choice(sections), first + timedelta(days=rng.randrange(365 * args.years)))
+               for _ in range(args.lookups)]
+
+    start = time.perf_counter()
+    hits = sum(1 for section, day in queries if index.lookup(section, day) is not None)
+    lookup_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    start = time.perf_counter()
+    for section, day in queries[:10_000]:
+        index.closest_dates(section, day)
+    closest_us = (time.perf_counter() - start) / min(len(queries), 10_000) * 1e6
+
+    print(f"lookup: {lookup_us:.2f}us/query, hit rate {hits / len(queries):.0%}")
+    print(f"closest_dates: {closest_us:.2f}us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Report search: build time, query latency and retrieval quality of the
+in-worker hybrid index.
+
+Generates --reports synthetic bilingual report rows across the four report
+sections, plus meeting summaries (HTML) and weekly analyses (JSON). Each
+report mentions a few topics, and one fact per report is planted with a
+unique project code. The harness then:
+- builds the index and reports chunks, build time and on-disk size
+- asks one question per planted fact (English, Arabic, or with the code
+  spelled out as STT writes it; with and without a date) and reports query p50/p95 and how often the fact's report is the
+  first hit (and in the top 3), for BM25 alone, the vectors alone, and both
+- measures an incremental update of --updates rows
+- round-trips the corpus through a pg_dump COPY file and a saved index, and
+  checks both give the same answers
+
+Usage:
+    python benchmarks/bench_report_search.py [--reports 3000] [--queries 300] [--updates 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import report_search  # noqa: E402
+from report_index import REPORT_TYPE_SECTIONS  # noqa: E402
+from report_search import ReportSearchIndex, build_from_dump  # noqa: E402
+
+SECTIONS = ["whatsapp_reports", "productivity_reports", "ads_reports", "mail_reports"]
+TYPE_OF = {section: name for name, section in REPORT_TYPE_SECTIONS.items() if name != "email"}
+TOPICS = [
+    ("The site inspection at the {place} tower was delayed because of missing permits.",
+     "تأخرت معاينة الموقع في برج {place} بسبب نقص التصاريح."),
+    ("Client feedback on the {place} villa design was mostly positive.",
+     "ملاحظات العميل على تصميم فيلا {place} كانت إيجابية في الغالب."),
+    ("The ads campaign for {place} reached 12,400 people with a 3.1% click rate.",
+     "الحملة الإعلانية لمشروع {place} وصلت إلى 12400 شخص بنسبة نقر 3.1%."),
+    ("Three engineers worked overtime on the {place} structural calculations.",
+     "ثلاثة مهندسين عملوا ساعات إضافية على الحسابات الإنشائية لمشروع {place}."),
+    ("The supplier invoice for {place} steel was sent to accounting for approval.",
+     "فاتورة المورد لحديد مشروع {place} اتبعتت للحسابات للموافقة."),
+    ("WhatsApp messages from {place} residents asked about the handover date.",
+     "رسائل واتساب من سكان {place} سألت عن ميعاد التسليم."),
+]
+PLACES = ["Maadi", "Zamalek", "New Cairo", "Sheikh Zayed", "Nasr City", "Heliopolis", "6 October", "Tagamoa"]
+FACTS = [
+    ("The concrete pour for project {code} is rescheduled to the {n}th because of the heat wave.",
+     "what happened with the concrete pour of project {code}?",
+     "ايه اللي حصل في صب الخرسانة لمشروع {code}؟"),
+    ("Project {code} needs {n} more site engineers before the next phase.",
+     "how many engineers does project {code} need?",
+     "مشروع {code} محتاج كام مهندس؟"),
+    ("The budget review for project {code} flagged a {n}% overrun on finishing work.",
+     "was there a budget overrun on project {code}?",
+     "فيه زيادة في ميزانية مشروع {code}؟"),
+]
+START = date(2024, 1, 1)
+
+
+def stamp(day: date, n: int) -> str:
+    return f"{day.isoformat()}T08:{n // 60 % 60:02d}:{n % 60:02d}+00:00"
+
+
+def corpus(reports: int, rng: random.Random) -> tuple[dict[str, list[dict]], list[tuple]]:
+    """{table: rows} and the planted (question_en, question_ar, row id, section, day) facts."""
+    tables = {"reports": [], "meeting_summaries": [], "weekly_analyses": []}
+    facts = []
+    for n in range(reports):
+        section = SECTIONS[n % len(SECTIONS)]
+        day = START + timedelta(days=n // len(SECTIONS))
+        sentences = []
+        for _ in range(rng.randint(6, 14)):
+            en, ar = rng.choice(TOPICS)
+            sentences.append((en if rng.random() < 0.5 else ar).format(place=rng.choice(PLACES)))
+        code = f"PX{n:05d}"
+        fact, question_en, question_ar = rng.choice(FACTS)
+        sentences.insert(rng.randrange(len(sentences) + 1), fact.format(code=code, n=rng.randint(2, 30)))
+        row_id = f"r-{n}"
+        tables["reports"].append({"id": row_id, "section": section, "report_date": day.isoformat(),
+                                  "content": " ".join(sentences), "content_type": "text",
+                                  "updated_at": stamp(day, n)})
+        facts.append((question_en.format(code=code), question_ar.format(code=code), row_id, section, day))
+    for n in range(reports // 20):
+        day = START + timedelta(days=n * 3)
+        items = "".join(f"<li>{rng.choice(TOPICS)[rng.randrange(2)].format(place=rng.choice(PLACES))}</li>"
+                        for _ in range(6))
+        tables["meeting_summaries"].append({"id": f"m-{n}", "meeting_name": f"Weekly sync {n}",
+                                            "meeting_type": "sync", "created_at": stamp(day, n),
+                                            "summary_html": f"<h2>Decisions</h2><ul>{items}</ul>",
+                                            "updated_at": stamp(day, n)})
+    for n in range(reports // 28):
+        week = START + timedelta(weeks=n)
+        analysis = {"summary": f"Busiest project was {rng.choice(PLACES)}.",
+                    "totals": {"reports": rng.randint(10, 40), "delays": rng.randint(0, 5)},
+                    "highlights": [rng.choice(TOPICS)[0].format(place=rng.choice(PLACES)) for _ in range(3)]}
+        tables["weekly_analyses"].append({"id": f"w-{n}", "week_start": week.isoformat(), "reports_count": 28,
+                                          "analysis_data": analysis, "updated_at": stamp(week, n)})
+    return tables, facts
+
+
+def build(tables: dict[str, list[dict]]) -> ReportSearchIndex:
+    index = ReportSearchIndex()
+    for source, rows in tables.items():
+        index.apply(source, rows)
+    return index
+
+
+def evaluate(index: ReportSearchIndex, facts: list[tuple], queries: int, rng: random.Random) -> dict:
+    """Latency and hit rates over `queries` questions (mixing languages, dates and types)."""
+    latencies, first, top3 = [], 0, 0
+    for question_en, question_ar, row_id, section, day in rng.sample(facts, min(queries, len(facts))):
+        roll = rng.random()
+        if roll < 0.4:
+            question = question_en
+        elif roll < 0.8:
+            question = question_ar
+        else:  # STT spells the code out: "P X 00012"
+            code = next(word for word in question_en.split() if word.startswith("PX")).rstrip("?")
+            question = question_en.replace(code, f"P X {code[2:]}")
+        with_date = rng.random() < 0.3
+        start = time.perf_counter()
+        hits = index.search(question, report_type=TYPE_OF[section] if with_date else None,
+                            day=day if with_date else None)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids = [hit.doc_id for hit in hits]
+        first += bool(ids) and ids[0] == row_id
+        top3 += row_id in ids
+    latencies.sort()
+    n = len(latencies)
+    return {"p50": statistics.median(latencies), "p95": latencies[int(n * 0.95) - 1], "max": latencies[-1],
+            "first": first / n, "top3": top3 / n}
+
+
+def write_pg_dump(path: str, tables: dict[str, list[dict]]) -> None:
+    def field(value) -> str:
+        if value is None:
+            return "\\N"
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, ensure_ascii=False)
+        return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("-- PostgreSQL database dump\nSET client_encoding = 'UTF8';\n\n")
+        for table, rows in tables.items():
+            columns = list(rows[0])
+            f.write(f"COPY public.{table} ({', '.join(columns)}) FROM stdin;\n")
+            for row in rows:
+                f.write("\t".join(field(row.get(c)) for c in columns) + "\n")
+            f.write("\\.\n\n")
+
+
+class _FakePostgREST:
+    """select() over in-memory tables, honouring the updated_at filter, order and paging."""
+
+    def __init__(self, tables: dict[str, list[dict]]):
+        self.tables = tables
+        self.requests = 0
+
+    async def select(self, table, columns="*", filters=None, order=None, limit=None, offset=None):
+        self.requests += 1
+        rows = sorted(self.tables[table], key=lambda row: (row["updated_at"], row["id"]))
+        if filters and "updated_at" in filters:
+            since = filters["updated_at"][3:]
+            rows = [row for row in rows if row["updated_at"] > since]
+        rows = rows[offset or 0:]
+        return rows[:limit] if limit is not None else rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--updates", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    tables, facts = corpus(args.reports, rng)
+    documents = sum(len(rows) for rows in tables.values())
+
+    start = time.perf_counter()
+    index = build(tables)
+    build_s = time.perf_counter() - start
+    print(f"{documents} documents -> {len(index)} chunks, built in {build_s:.2f}s "
+          f"({build_s / documents * 1000:.2f}ms/document)")
+
+    print(f"\n{'ranking':>8} {'p50 ms':>7} {'p95 ms':>7} {'max ms':>7} {'top-1':>6} {'top-3':>6}")
+    for label, weight in (("bm25", 0.0), ("vector", 1.0), ("hybrid", report_search.VECTOR_WEIGHT)):
+        saved, report_search.VECTOR_WEIGHT = report_search.VECTOR_WEIGHT, weight
+        result = evaluate(index, facts, args.queries, random.Random(9))
+        report_search.VECTOR_WEIGHT = saved
+        print(f"{label:>8} {result['p50']:>7.2f} {result['p95']:>7.2f} {result['max']:>7.2f} "
+              f"{result['first']:>6.0%} {result['top3']:>6.0%}")
+
+    # Incremental refresh: rewrite a few reports and pick them up by updated_at
+    client = _FakePostgREST(tables)
+    asyncio.run(index.refresh(client))
+    requests = client.requests
+    later = "2099-01-01T00:00:00+00:00"
+    for row in rng.sample(tables["reports"], args.updates):
+        row["content"] += " Project ZZ-UPDATED was added to the handover list."
+        row["updated_at"] = later
+    start = time.perf_counter()
+    changed = asyncio.run(index.refresh(client))
+    print(f"\nincremental refresh: {changed} changed rows re-indexed in "
+          f"{(time.perf_counter() - start) * 1000:.1f}ms, {client.requests - requests} requests")
+    hits = index.search("which projects are on the handover list ZZ-UPDATED", limit=args.updates)
+    assert len(hits) == args.updates, f"{len(hits)} of {args.updates} updated reports found"
+    assert len(index) == sum(1 for chunk in index._chunks if chunk is not None)
+
+    # Offline build from a dump, then a cold load of the saved index
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = os.path.join(tmp, "dump.sql")
+        write_pg_dump(dump, tables)
+        start = time.perf_counter()
+        built = build_from_dump(dump, os.path.join(tmp, "index"))
+        print(f"pg_dump build: {built.documents} documents in {time.perf_counter() - start:.2f}s")
+        size = sum(os.path.getsize(os.path.join(tmp, "index", name)) for name in os.listdir(os.path.join(tmp, "index")))
+        start = time.perf_counter()
+        loaded = ReportSearchIndex.load(os.path.join(tmp, "index"))
+        print(f"saved index: {size / 1e6:.1f}MB on disk, loaded in {(time.perf_counter() - start) * 1000:.0f}ms")
+        for question_en, question_ar, row_id, _, _ in facts[:50]:
+            for question in (question_en, question_ar):
+                expected = [hit.doc_id for hit in index.search(question)]
+                assert [hit.doc_id for hit in built.search(question)] == expected, question
+                assert [hit.doc_id for hit in loaded.search(question)] == expected, question
+        print("dump build and saved index answer like the live index")
+
+    hit = index.search(facts[0][1])[0]
+    print(f"\nexample: {facts[0][1]!r}\n  -> {hit.cite()}: {hit.snippet}")
+    assert result["p95"] < 50, f"query p95 {result['p95']:.1f}ms"
+
+
+if __name__ == "__main__":
+    main()
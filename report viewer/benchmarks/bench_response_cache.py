@@ -0,0 +1,125 @@
+"""
+Response cache: hit rate, LLM calls and response latency over many sessions
+asking the same few questions.
+
+Runs --sessions sessions of the real voice_agent_session, one after the
+other in one worker process, over bench_load's fake room, frontend and mock
+providers. Each one asks the questions of SCRIPT in one of their phrasings
+(spelling and diacritics variants included). None of them is answered by
+the fast path. "no cache" sends every turn to the LLM. "cache" starts from
+an empty response cache shared by the sessions, as in a worker.
+
+"resp" is from the end of the user's speech to the first audio frame of the
+reply. "llm calls/turn" counts completions, second passes after tools
+included.
+
+Usage:
+    python benchmarks/bench_response_cache.py [--sessions 10] [--llm-ms 400] [--tts-ms 150]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import agent  # noqa: E402
+import response_cache  # noqa: E402
+from bench_load import _FakeJobContext, _FakeRoom, _HarnessSession, _Probe, _probe  # noqa: E402
+from mock_providers import MockAudioOutput, MockLLM, MockSTT, MockTTS  # noqa: E402
+
+# (phrasings, the LLM's tool call or None for a spoken answer)
+SCRIPT = [
+    (["what can you do for me", "what can you do for me?", "What can you do for me"], None),
+    (["ازاي اشوف الموافقات", "إزاي أشوف الموافقات؟", "ازاى اشوف الموافقه"], None),
+    (["where are the ads reports", "where are the ad reports", "Where are the ads reports?"],
+     ("navigate", {"route": "ads_reports"})),
+    (["which page is this", "which page is this?", "Which page is this"], ("where_am_i", {})),
+]
+TOOL_CALLS = {phrasing: call for phrasings, call in SCRIPT for phrasing in phrasings}
+
+
+async def session(index: int, cached: bool, args) -> tuple[list[float], list[int], int]:
+    stt = MockSTT(word_ms=args.word_ms, final_ms=args.final_ms)
+    llm = MockLLM(reply="I can open any dashboard page, find reports by date and answer questions about them.",
+                  ttft_ms=args.llm_ms, tool_call=TOOL_CALLS.get)
+    probe = _Probe(MockAudioOutput(speed=args.playback_speed))
+    _probe.set(probe)
+    ctx = _FakeJobContext(_FakeRoom(f"cache-{index}", args), {"stt": stt, "llm": llm, "tts": MockTTS(ttfb_ms=args.tts_ms)})
+
+    await agent.voice_agent_session(ctx)
+    await asyncio.wait_for(probe.replies.wait(), args.turn_timeout)  # the greeting
+    assistant = probe.session.current_agent
+    if not cached:
+        assistant._response_cache = None
+
+    latencies, requests, failed = [], [], 0
+    for phrasings, _ in SCRIPT:
+        await asyncio.sleep(args.think_ms / 1000)
+        before = llm.requests
+        probe.replies.clear()
+        stt.say(phrasings[index % len(phrasings)])
+        try:
+            await asyncio.wait_for(probe.replies.wait(), args.turn_timeout)
+        except asyncio.TimeoutError:
+            failed += 1
+            continue
+        latencies.append((probe.output.first_frame_at - stt.end_of_speech_at) * 1000)
+        requests.append(llm.requests - before)
+
+    await ctx.shutdown()
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(probe.session.aclose(), 5)
+    return latencies, requests, failed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--think-ms", type=float, default=300, help="pause before each user turn")
+    parser.add_argument("--word-ms", type=float, default=150)
+    parser.add_argument("--final-ms", type=float, default=200)
+    parser.add_argument("--llm-ms", type=float, default=400)
+    parser.add_argument("--tts-ms", type=float, default=150)
+    parser.add_argument("--rtt-ms", type=float, default=40)
+    parser.add_argument("--render-ms", type=float, default=150)
+    parser.add_argument("--step-ms", type=float, default=50)
+    parser.add_argument("--cards", type=int, default=30)
+    parser.add_argument("--playback-speed", type=float, default=10)
+    parser.add_argument("--turn-timeout", type=float, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("livekit.agents").setLevel(logging.ERROR)
+    agent.AgentSession = _HarnessSession
+
+    fast = [p for phrasings, _ in SCRIPT for p in phrasings if agent.FAST_PATH_ROUTER and agent.FAST_PATH_ROUTER.match(p)]
+    if fast:
+        sys.exit(f"the fast path answers {fast}; pick other phrasings")
+
+    print(f"{args.sessions} sessions x {len(SCRIPT)} questions, LLM TTFT {args.llm_ms:g}ms, TTS TTFB {args.tts_ms:g}ms")
+    print(f"{'mode':<9} {'turns':>5} {'failed':>6} {'resp p50':>9} {'p95':>6} {'llm calls/turn':>14}")
+    for cached in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            response_cache._cache = response_cache.ResponseCache(directory=directory)
+            latencies, requests, failed = [], [], 0
+            for i in range(args.sessions):
+                l, r, f = await session(i, cached, args)
+                latencies += l
+                requests += r
+                failed += f
+            summary = response_cache._cache.stats.summary()
+        latencies.sort()
+        print(f"{'cache' if cached else 'no cache':<9} {len(latencies):>5} {failed:>6} {statistics.median(latencies):>9.0f} "
+              f"{statistics.quantiles(latencies, n=100)[94]:>6.0f} {statistics.fmean(requests):>14.2f}")
+        if cached:
+            print(f"response cache: {summary}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+"""
+Session resumption: reconnect-to-ready time and worker jobs saved.
+
+Runs the real voice_agent_session over bench_load's fake room, frontend and
+mock providers. The synthetic user says a few things, then reloads the page
+--reloads times: it leaves the room, stays away --offline-ms, and comes back
+with a fresh frontend. The last reload stays away past the grace period
+(--grace-ms), so that job ends and a new one has to start.
+
+Compared:
+- new job: what every reconnect cost before stable rooms. This is the time
+  from the job starting to the end of its greeting, with the history lost.
+- resumed: the live session carries on. This is the time from the rejoin to
+  the new frontend's page snapshot. "history kept" checks that the chat
+  history still holds the turns from before the reload, and "greeted" that
+  the agent did not greet again.
+
+Usage:
+    python benchmarks/bench_resumption.py [--reloads 5] [--offline-ms 800] [--grace-ms 3000] [--rtt-ms 40]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("RESPONSE_CACHE_MAX_ENTRIES", "0")  # time the LLM path, not cached answers
+
+from livekit import rtc  # noqa: E402
+
+import agent  # noqa: E402
+from bench_load import (  # noqa: E402
+    SCRIPT, _FakeFrontend, _FakeJobContext, _FakeRoom, _HarnessSession, _Probe, _probe,
+)
+from mock_providers import MockAudioOutput, MockLLM, MockSTT, MockTTS  # noqa: E402
+
+
+@dataclass
+class _User:
+    identity: str
+    kind: int = rtc.ParticipantKind.PARTICIPANT_KIND_STANDARD
+    disconnect_reason: int = rtc.DisconnectReason.CLIENT_INITIATED
+
+
+class _ResumableJobContext(_FakeJobContext):
+    """A job context whose room can be deleted and whose job can end on its own."""
+
+    def __init__(self, room, userdata):
+        super().__init__(room, userdata)
+        self.ended = asyncio.Event()
+
+    def delete_room(self, room_name: str | None = None) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+    def shutdown(self, reason: str = "") -> asyncio.Future:
+        self.ended.set()
+        return asyncio.ensure_future(super().shutdown())
+
+
+async def speak(stt: MockSTT, probe: _Probe, utterance: str, timeout: float) -> bool:
+    probe.replies.clear()
+    stt.say(utterance)
+    try:
+        await asyncio.wait_for(probe.replies.wait(), timeout)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+async def start_job(room: _FakeRoom, args) -> tuple[_ResumableJobContext, _Probe, MockSTT, float]:
+    """Run voice_agent_session until its greeting is done; returns the seconds that took."""
+    stt = MockSTT(word_ms=args.word_ms, final_ms=args.final_ms)
+    llm = MockLLM(reply="Sure, here is what I found on this page.", ttft_ms=args.llm_ms,
+                  jitter_ms=args.llm_ms * 0.2, tool_call=dict(SCRIPT).get)
+    probe = _Probe(MockAudioOutput(speed=args.playback_speed))
+    _probe.set(probe)
+    ctx = _ResumableJobContext(room, {"stt": stt, "llm": llm, "tts": MockTTS(ttfb_ms=args.tts_ms)})
+    start = time.perf_counter()
+    await agent.voice_agent_session(ctx)
+    # the greeting is said from a task; wait until it has played out
+    await asyncio.wait_for(probe.replies.wait(), args.turn_timeout)
+    return ctx, probe, stt, time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reloads", type=int, default=5)
+    parser.add_argument("--offline-ms", type=float, default=800, help="time away during a reload")
+    parser.add_argument("--grace-ms", type=float, default=3000, help="how long the agent waits for the user")
+    parser.add_argument("--word-ms", type=float, default=150)
+    parser.add_argument("--final-ms", type=float, default=200)
+    parser.add_argument("--llm-ms", type=float, default=400)
+    parser.add_argument("--tts-ms", type=float, default=150)
+    parser.add_argument("--rtt-ms", type=float, default=40)
+    parser.add_argument("--render-ms", type=float, default=150)
+    parser.add_argument("--step-ms", type=float, default=50)
+    parser.add_argument("--cards", type=int, default=30)
+    parser.add_argument("--playback-speed", type=float, default=10)
+    parser.add_argument("--turn-timeout", type=float, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("livekit.agents").setLevel(logging.ERROR)
+    agent.AgentSession = _HarnessSession
+
+    room = _FakeRoom("voice-bench-user", args)
+    ctx, probe, stt, cold = await start_job(room, args)
+    assistant = probe.session.current_agent
+    assistant._resumer.grace = args.grace_ms / 1000
+    resume_stats = assistant._resumer.stats  # the job that serves the reloads
+    new_jobs = [cold]
+    history_kept = greeted = 0
+
+    for i in range(args.reloads):
+        utterance, _ = SCRIPT[i % len(SCRIPT)]
+        await speak(stt, probe, utterance, args.turn_timeout)
+        before = len(assistant.chat_ctx.items)
+
+        # The page reloads: the user leaves, and a new frontend joins later
+        user = _User("user")
+        room.remote_participants.pop("user")
+        room.emit("participant_disconnected", user)
+        away = args.offline_ms if i < args.reloads - 1 else args.grace_ms * 1.5
+        await asyncio.sleep(away / 1000)
+        if ctx.ended.is_set():
+            # Past the grace period: the job is gone, a new one starts
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(probe.session.aclose(), 5)
+            room = _FakeRoom("voice-bench-user", args)
+            ctx, probe, stt, cold = await start_job(room, args)
+            new_jobs.append(cold)
+            assistant = probe.session.current_agent
+            continue
+
+        room.local_participant.frontend = _FakeFrontend(room, args.rtt_ms, args.render_ms, args.step_ms, args.cards)
+        room.remote_participants["user"] = room.frontend
+        probe.replies.clear()
+        room.emit("participant_connected", user)
+        while assistant._resumer.stats.jobs_saved + assistant._resumer.stats.not_ready <= i:
+            await asyncio.sleep(0.01)
+        greeted += probe.replies.is_set()
+        history_kept += len(assistant.chat_ctx.items) >= before
+
+    await ctx.shutdown()
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(probe.session.aclose(), 5)
+
+    summary = resume_stats.summary()
+    resumed = summary["jobs_saved"]
+    print(f"{args.reloads} reloads, {args.offline_ms:g}ms away (the last one {args.grace_ms * 1.5:g}ms), "
+          f"grace {args.grace_ms:g}ms")
+    print(f"{'path':<10} {'count':>5} {'p50 ms':>7} {'max ms':>7}")
+    print(f"{'new job':<10} {len(new_jobs):>5} {statistics.median(new_jobs) * 1000:>7.0f} {max(new_jobs) * 1000:>7.0f}")
+    print(f"{'resumed':<10} {resumed:>5} {summary.get('ready_p50_ms', float('nan')):>7.0f} "
+          f"{summary.get('ready_max_ms', float('nan')):>7.0f}")
+    print(f"worker jobs saved: {resumed} of {args.reloads} reconnects; expired: {summary['expired']}; "
+          f"history kept: {history_kept}/{resumed}; greeted again: {greeted}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
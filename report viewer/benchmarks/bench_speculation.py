@@ -0,0 +1,102 @@
+"""
+Speculative prefetch hints on interim transcripts: hit rate, wasted hints and
+head start.
+
+Replays the fast-path corpus (plus self-corrections) as a streaming STT would
+deliver it: a growing interim transcript every --word-ms, then the final one
+--final-ms after the last word. The transcripts go through a
+SpeculativeNavigator attached to a fake session and room. "head start" is how
+much earlier than the final transcript the frontend was told which page to
+load.
+
+Usage:
+    python benchmarks/bench_speculation.py [--word-ms 250] [--final-ms 300] [--speed 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_fast_path import CORPUS  # noqa: E402
+from speculation import SpeculativeNavigator  # noqa: E402
+
+# The user changes their mind mid-sentence: the first hint must be cancelled
+CORRECTIONS = [
+    "Show WhatsApp reports no wait the ads reports",
+    "افتح الداشبورد لا لا افتح الإعدادات",
+    "open bots and tell me which ones are down",
+]
+
+
+@dataclass
+class _Transcribed:
+    transcript: str
+    is_final: bool
+
+
+class _FakeSession:
+    def __init__(self):
+        self.handlers = []
+
+    def on(self, event, callback):
+        self.handlers.append(callback)
+
+    def emit(self, transcript: str, is_final: bool):
+        for handler in self.handlers:
+            handler(_Transcribed(transcript, is_final))
+
+
+class _FakeParticipant:
+    def __init__(self):
+        self.messages = []
+
+    async def publish_data(self, payload, reliable=True, topic=""):
+        self.messages.append(json.loads(payload))
+
+
+class _FakeRoom:
+    def __init__(self):
+        self.local_participant = _FakeParticipant()
+
+
+async def speak(session: _FakeSession, utterance: str, word_s: float, final_s: float) -> None:
+    words = utterance.split()
+    for i in range(1, len(words) + 1):
+        await asyncio.sleep(word_s)
+        session.emit(" ".join(words[:i]), is_final=False)
+    await asyncio.sleep(final_s)
+    session.emit(utterance, is_final=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--word-ms", type=float, default=250)
+    parser.add_argument("--final-ms", type=float, default=300, help="final transcript delay after the last word")
+    parser.add_argument("--speed", type=float, default=10, help="replay this many times faster than real time")
+    args = parser.parse_args()
+
+    session, room = _FakeSession(), _FakeRoom()
+    navigator = SpeculativeNavigator()
+    navigator.attach(session, room)
+
+    for utterance in CORPUS + CORRECTIONS:
+        before = len(room.local_participant.messages)
+        await speak(session, utterance, args.word_ms / 1000 / args.speed, args.final_ms / 1000 / args.speed)
+        await asyncio.sleep(0)
+        sent = [f"{m['type'].replace('navigation-', '')}:{m['target']}" for m in room.local_participant.messages[before:]]
+        print(f"{utterance[:48]:<48} {' '.join(sent) or '-'}")
+
+    stats = navigator.stats.summary()
+    print()
+    print(f"hints={stats['hints']} hits={stats['hits']} wasted={stats['wasted']} hit_rate={stats['hit_rate']:.0%}")
+    print(f"head start per hit: avg={stats['saved_ms_avg'] * args.speed:.0f}ms "
+          f"total={stats['saved_ms_total'] * args.speed:.0f}ms (real time)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+"""
+Worker startup and first-greeting latency against mock providers.
+
+Measures, without LiveKit or provider credentials:
+  - worker process startup: importing agent.py and running prewarm() in a
+    fresh interpreter, as the AgentServer does for each idle process
+  - first greeting, cold: providers built after the job arrives (the old path)
+  - first greeting, prewarmed: providers taken from the process userdata
+  - per-call overhead of the tool helpers (send_navigation_url,
+    send_dom_action) against a room whose publish_data returns at once, with
+    the outbound queue's rate limit and batching frame out of the way
+
+The greeting runs through a text-only AgentSession with MockLLM (the agent's
+session LLM; the greeting itself is fixed text), so the numbers isolate
+agent-side setup from provider latency.
+
+As a regression gate, --budget-import-ms, --budget-prewarm-ms and
+--budget-call-us make it exit 1 when a median goes over its budget. For
+where the import time goes, run startup_profile.py.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 20] [--startup-runs 3] [--calls 2000]
+        [--budget-import-ms 2500] [--budget-prewarm-ms 400] [--budget-call-us 300]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+# Plugin constructors only check that credentials are present
+os.environ.setdefault("LIVEKIT_API_KEY", "bench-api-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "bench-api-secret-0123456789abcdef0123")
+# Per-call timings measure the helpers, not the outbound queue's pacing
+os.environ.setdefault("AGENT_OUTBOUND_RATE", "1000000")
+os.environ.setdefault("AGENT_OUTBOUND_BURST", "1000000")
+os.environ.setdefault("AGENT_OUTBOUND_FRAME_MS", "0")
+
+from mock_providers import MockLLM  # noqa: E402
+
+WORKER_STARTUP = """
+import json, time
+start = time.perf_counter()
+import agent
+imported = time.perf_counter()
+class Proc:
+    userdata = {}
+agent.prewarm(Proc())
+print(json.dumps({"import_ms": (imported - start) * 1000, "prewarm_ms": (time.perf_counter() - imported) * 1000,
+                  "phases": Proc.userdata["prewarm_phases"]}))
+"""
+
+
+def worker_startup(runs: int) -> list[dict]:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", WORKER_STARTUP], cwd=ROOT, capture_output=True,
+                             text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+async def first_greeting(userdata: dict) -> float:
+    """Job start -> greeting finished, mirroring voice_agent_session."""
+    import agent
+    from livekit.agents import AgentSession
+
+    started = time.perf_counter()
+    if "llm" not in userdata:
+        agent.build_providers()  # cold path: plugins constructed per job
+    session = AgentSession(llm=MockLLM())
+    await session.start(agent=agent.VoiceAssistant())
+    await session.say(agent.GREETING)
+    elapsed = (time.perf_counter() - started) * 1000
+    # A text-only session occasionally stalls in aclose() right after say()
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(session.aclose(), 2)
+    return elapsed
+
+
+def summary(values: list[float]) -> str:
+    q = statistics.quantiles(values, n=20) if len(values) > 1 else values * 19
+    return f"p50={statistics.median(values):.1f}ms p95={q[18]:.1f}ms"
+
+
+class _Participant:
+    async def publish_data(self, payload, reliable=True, topic=""):
+        pass
+
+
+class _Room:
+    local_participant = _Participant()
+
+
+class _Assistant:
+    """What the helpers read off the agent: a room, no frontend capabilities, no acks."""
+
+    def __init__(self):
+        self._room = _Room()
+
+
+async def helper_calls(calls: int) -> dict[str, list[float]]:
+    """Microseconds per send_navigation_url / send_dom_action call."""
+    import tools
+
+    assistant = _Assistant()
+    helpers = {
+        "send_navigation_url": lambda i: tools.send_navigation_url(
+            assistant, None, f"{tools.FRONTEND_BASE_URL}/reports/ads?date=2025-01-{i % 28 + 1:02d}"),
+        "send_dom_action": lambda i: tools.send_dom_action(
+            assistant, None, "click", {"text": f"Report {i}", "role": "button"}),
+    }
+    logging.getLogger("agent-tools").setLevel(logging.WARNING)
+    samples = {}
+    for name, call in helpers.items():
+        for i in range(calls // 10):  # warm up
+            await call(i)
+        samples[name] = []
+        for i in range(calls):
+            started = time.perf_counter()
+            if not await call(i):
+                sys.exit(f"{name} failed in the benchmark room")
+            samples[name].append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+async def greetings(runs: int) -> tuple[list[float], list[float]]:
+    import agent
+
+    class Proc:
+        userdata = {}
+
+    agent.prewarm(Proc())
+    cold = [await first_greeting({}) for _ in range(runs)]
+    warm = [await first_greeting(Proc.userdata) for _ in range(runs)]
+    return cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--startup-runs", type=int, default=3)
+    parser.add_argument("--calls", type=int, default=2000, help="calls per tool helper")
+    parser.add_argument("--budget-import-ms", type=float, help="fail if the median worker import is slower")
+    parser.add_argument("--budget-prewarm-ms", type=float, help="fail if the median prewarm() is slower")
+    parser.add_argument("--budget-call-us", type=float, help="fail if a helper's median call is slower")
+    args = parser.parse_args()
+
+    startup = worker_startup(args.startup_runs)
+    print(f"worker import:  {summary([s['import_ms'] for s in startup])}")
+    print(f"worker prewarm: {summary([s['prewarm_ms'] for s in startup])} ("
+          + ", ".join(f"{phase} {statistics.median(s['phases'][phase] for s in startup):.1f}ms"
+                      for phase in startup[0]["phases"]) + ")")
+
+    cold, warm = asyncio.run(greetings(args.runs))
+    print(f"first greeting, cold:      {summary(cold)}")
+    print(f"first greeting, prewarmed: {summary(warm)}")
+    print(f"saved per job: {statistics.median(cold) - statistics.median(warm):.1f}ms (median)")
+
+    calls = asyncio.run(helper_calls(args.calls))
+    for name, samples in calls.items():
+        q = statistics.quantiles(samples, n=20)
+        print(f"{name + ':':<21} p50={statistics.median(samples):.1f}us p95={q[18]:.1f}us")
+
+    over = []
+    checks = [("worker import", statistics.median(s["import_ms"] for s in startup), args.budget_import_ms, "ms"),
+              ("worker prewarm", statistics.median(s["prewarm_ms"] for s in startup), args.budget_prewarm_ms, "ms")]
+    checks += [(name, statistics.median(samples), args.budget_call_us, "us") for name, samples in calls.items()]
+    for name, value, budget, unit in checks:
+        if budget is not None and value > budget:
+            over.append(f"{name} {value:.1f}{unit} > {budget:g}{unit}")
+    if over:
+        sys.exit("over budget: " + "; ".join(over))
+
+
+if __name__ == "__main__":
+    main()
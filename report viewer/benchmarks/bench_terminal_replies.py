@@ -0,0 +1,118 @@
+"""
+Terminal tool replies: response latency and LLM calls per navigation turn,
+with and without the second LLM pass.
+
+Runs the real voice_agent_session over bench_load's fake room, frontend and
+mock providers. Every utterance misses the fast-path router, so the mock LLM
+answers it with a navigate or where_am_i call. "llm pass" is the usual flow:
+the tool output goes back to the LLM, which writes the spoken confirmation.
+"terminal" speaks the tool's own confirmation instead.
+
+"resp" is from the end of the user's speech to the first audio frame of the
+reply. "prompt tok" is the mock LLM's prompt estimate summed over the turn.
+
+Usage:
+    python benchmarks/bench_terminal_replies.py [--rounds 3] [--llm-ms 400] [--tts-ms 150]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("RESPONSE_CACHE_MAX_ENTRIES", "0")  # time the LLM path, not cached answers
+
+import agent  # noqa: E402
+from bench_load import _FakeJobContext, _FakeRoom, _HarnessSession, _Probe, _probe  # noqa: E402
+from mock_providers import MockAudioOutput, MockLLM, MockSTT, MockTTS  # noqa: E402
+
+# Phrasings the fast-path router does not know, so the LLM picks the tool
+SCRIPT = [
+    ("I'd like to see how our ads are doing lately", ("navigate", {"route": "ads_reports"})),
+    ("which page is this?", ("where_am_i", {})),
+    ("ودّيني على ملخصات الاجتماعات لو سمحت", ("navigate", {"route": "meeting_summary"})),
+    ("take me somewhere I can check the bots", ("navigate", {"route": "bots"})),
+    ("انا فين دلوقتي؟", ("where_am_i", {})),
+]
+TOOL_CALLS = dict(SCRIPT)
+
+
+async def run(terminal: bool, args) -> dict:
+    stt = MockSTT(word_ms=args.word_ms, final_ms=args.final_ms)
+    llm = MockLLM(reply="Done, the page is open.", ttft_ms=args.llm_ms, tool_call=TOOL_CALLS.get)
+    probe = _Probe(MockAudioOutput(speed=args.playback_speed))
+    _probe.set(probe)
+    ctx = _FakeJobContext(_FakeRoom("terminal-bench", args), {"stt": stt, "llm": llm, "tts": MockTTS(ttfb_ms=args.tts_ms)})
+
+    await agent.voice_agent_session(ctx)
+    await asyncio.wait_for(probe.replies.wait(), args.turn_timeout)  # the greeting
+    assistant = probe.session.current_agent
+    assistant._terminal.enabled = terminal
+
+    latencies, requests, tokens, failed = [], [], [], 0
+    for _ in range(args.rounds):
+        for utterance, _ in SCRIPT:
+            await asyncio.sleep(args.think_ms / 1000)
+            before_requests, before_tokens = llm.requests, sum(llm.prompt_tokens)
+            probe.replies.clear()
+            stt.say(utterance)
+            try:
+                await asyncio.wait_for(probe.replies.wait(), args.turn_timeout)
+            except asyncio.TimeoutError:
+                failed += 1
+                continue
+            latencies.append((probe.output.first_frame_at - stt.end_of_speech_at) * 1000)
+            requests.append(llm.requests - before_requests)
+            tokens.append(sum(llm.prompt_tokens) - before_tokens)
+
+    summary = assistant._terminal.stats.summary()
+    await ctx.shutdown()
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(probe.session.aclose(), 5)
+    return {"latencies": latencies, "requests": requests, "tokens": tokens, "failed": failed, "stats": summary}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3, help="times through the script")
+    parser.add_argument("--think-ms", type=float, default=300, help="pause before each user turn")
+    parser.add_argument("--word-ms", type=float, default=150)
+    parser.add_argument("--final-ms", type=float, default=200)
+    parser.add_argument("--llm-ms", type=float, default=400)
+    parser.add_argument("--tts-ms", type=float, default=150)
+    parser.add_argument("--rtt-ms", type=float, default=40)
+    parser.add_argument("--render-ms", type=float, default=150)
+    parser.add_argument("--step-ms", type=float, default=50)
+    parser.add_argument("--cards", type=int, default=30)
+    parser.add_argument("--playback-speed", type=float, default=10)
+    parser.add_argument("--turn-timeout", type=float, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("livekit.agents").setLevel(logging.ERROR)
+    agent.AgentSession = _HarnessSession
+
+    missed = [text for text, _ in SCRIPT if agent.FAST_PATH_ROUTER and agent.FAST_PATH_ROUTER.match(text)]
+    if missed:
+        sys.exit(f"the fast path answers {missed}; pick other phrasings")
+
+    print(f"{len(SCRIPT)} tool-call utterances x {args.rounds}, LLM TTFT {args.llm_ms:g}ms, TTS TTFB {args.tts_ms:g}ms")
+    print(f"{'mode':<9} {'turns':>5} {'failed':>6} {'resp p50':>9} {'p95':>6} {'llm calls/turn':>14} "
+          f"{'prompt tok/turn':>15}")
+    for terminal in (False, True):
+        r = await run(terminal, args)
+        latencies = sorted(r["latencies"])
+        p95 = statistics.quantiles(latencies, n=100)[94] if len(latencies) > 1 else latencies[0]
+        print(f"{'terminal' if terminal else 'llm pass':<9} {len(latencies):>5} {r['failed']:>6} "
+              f"{statistics.median(latencies):>9.0f} {p95:>6.0f} {statistics.fmean(r['requests']):>14.2f} "
+              f"{statistics.fmean(r['tokens']):>15.0f}")
+        if terminal:
+            print(f"terminal stats: {r['stats']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Per-call overhead of the tracing layer.
+
+Times a no-op coroutine called bare, through traced_tool, and through
+traced_publish. It does this first with no tracer provider (the default) and
+then with an SDK provider exporting to memory, which is roughly the cost of
+AGENT_TRACE_FILE or OTLP minus the export itself.
+
+Usage:
+    python benchmarks/bench_tracing.py [--calls 50000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from opentelemetry import trace  # noqa: E402
+
+from tracing import traced_publish, traced_tool  # noqa: E402
+
+
+async def noop(route: str = "dashboard"):
+    return route
+
+
+traced_noop = traced_tool(noop)
+
+
+async def per_call_us(calls: int) -> dict:
+    results = {}
+    for label, fn in (("bare", noop), ("traced_tool", traced_noop)):
+        start = time.perf_counter()
+        for _ in range(calls):
+            await fn(route="bots")
+        results[label] = (time.perf_counter() - start) / calls * 1e6
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        with traced_publish("agent-navigation", 120):
+            await noop()
+    results["traced_publish"] = (time.perf_counter() - start) / calls * 1e6
+    return results
+
+
+def report(label: str, results: dict) -> None:
+    overhead = results["traced_tool"] - results["bare"]
+    print(f"{label:>12}: bare={results['bare']:.2f}us traced_tool={results['traced_tool']:.2f}us "
+          f"(+{overhead:.2f}us) traced_publish={results['traced_publish']:.2f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50_000)
+    args = parser.parse_args()
+
+    report("no provider", asyncio.run(per_call_us(args.calls)))
+
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    report("sdk, memory", asyncio.run(per_call_us(args.calls)))
+    print(f"spans recorded: {len(exporter.get_finished_spans())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+voice_conversations writes: one UPDATE per utterance vs the batched TranscriptWriter.
+
+Simulates --rooms concurrent sessions. Each adds --turns turns, one every
+--turn-ms (with jitter), then ends. A fake PostgREST client takes --db-ms per
+request. The harness prints the requests, rows and bytes each strategy sends,
+the peak number of requests in flight, and how long the last session's close
+took. It also checks that every turn was written and that memory stays bounded
+while the database is failing.
+
+Rooms are named `voice-<user id>` as livekit-token names them. The fake
+rejects rows without a user_id, as the table's NOT NULL constraint does; for
+the real schema, see tests/test_conversation_log.py.
+
+With --live, the writer runs against the Supabase configured in SUPABASE_URL /
+SUPABASE_SERVICE_ROLE_KEY instead. Point those at a local stack (`supabase
+start`, whose Postgres has the voice_conversations table) and pass the id of
+an existing auth user with --user-id: every room writes as that user.
+
+Usage:
+    python benchmarks/bench_transcript_writer.py [--rooms 50] [--turns 20] [--turn-ms 2000] [--db-ms 30] [--speed 20]
+        [--live --user-id UUID]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import conversation_log  # noqa: E402
+from conversation_log import MAX_TRANSCRIPT_TURNS, Conversation, TranscriptWriter  # noqa: E402
+from supabase_client import SupabaseError, get_supabase  # noqa: E402
+
+
+class _FakePostgREST:
+    """Counts requests and bytes; each request takes `db_ms` (and fails while `down`)."""
+
+    def __init__(self, db_ms: float):
+        self.db = db_ms / 1000
+        self.requests = 0
+        self.rows = 0
+        self.bytes = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.down = False
+        self.stored: dict[str, dict] = {}
+
+    async def _request(self, rows: list[dict]) -> list[dict]:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.db)
+            if self.down:
+                raise SupabaseError("POST voice_conversations failed (503): unavailable")
+            if any(not row.get("user_id") for row in rows):
+                raise SupabaseError('POST voice_conversations failed (400): null value in column "user_id"')
+            self.rows += len(rows)
+            self.bytes += len(json.dumps(rows))
+            for row in rows:
+                self.stored[row["id"]] = row
+            return []
+        finally:
+            self.in_flight -= 1
+
+    async def upsert(self, table: str, rows: list[dict], on_conflict: str) -> list[dict]:
+        return await self._request(rows)
+
+    async def update(self, table: str, values: dict, filters: dict) -> list[dict]:
+        return await self._request([{"id": filters["id"][3:], **values}])
+
+
+def utterance(rng: random.Random, role: str) -> str:
+    words = ["show", "me", "the", "whatsapp", "reports", "for", "yesterday", "افتح", "التقارير", "please"]
+    return " ".join(rng.choice(words) for _ in range(rng.randint(4, 30 if role == "assistant" else 12)))
+
+
+def room_name(room: int, args) -> str:
+    return f"voice-{args.user_id or uuid.UUID(int=room + 1)}"
+
+
+async def session(writer, client, naive: bool, room: int, args, rng: random.Random) -> float:
+    name = room_name(room, args)
+    conversation = Conversation(name) if naive else writer.open(name)
+    for turn in range(args.turns):
+        await asyncio.sleep(args.turn_ms / 1000 / args.speed * rng.uniform(0.5, 1.5))
+        role = "user" if turn % 2 == 0 else "assistant"
+        if naive:
+            conversation.add(role, utterance(rng, role))
+            row = conversation.row()
+            await client.update("voice_conversations", {k: v for k, v in row.items() if k != "id"},
+                                {"id": f"eq.{row['id']}"})
+        else:
+            writer.add(conversation, role, utterance(rng, role))
+    start = time.perf_counter()
+    if naive:
+        conversation.close()
+    else:
+        await writer.close(conversation)
+    return time.perf_counter() - start
+
+
+async def run(naive: bool, args) -> None:
+    client = _FakePostgREST(args.db_ms)
+    writer = TranscriptWriter(client, flush_seconds=conversation_log.TRANSCRIPT_FLUSH_SECONDS / args.speed)
+    rng = random.Random(7)
+    closes = await asyncio.gather(*(session(writer, client, naive, room, args, rng) for room in range(args.rooms)))
+    await writer.aclose()
+    turns = args.rooms * args.turns
+    written = sum(len(row["transcript"]) for row in client.stored.values())
+    assert written == turns, f"{written} of {turns} turns written"
+    label = "per-utterance" if naive else "batched"
+    print(f"{label:>14} {client.requests:>9} {client.rows:>7} {client.bytes / 1e6:>8.2f} "
+          f"{client.peak_in_flight:>9} {max(closes) * 1000:>9.0f}")
+
+
+async def outage(args) -> None:
+    """The database is down: the writer retries, memory stays bounded, closed rooms are dropped."""
+    client = _FakePostgREST(args.db_ms)
+    client.down = True
+    writer = TranscriptWriter(client, flush_turns=10**9, flush_seconds=3600)
+    conversation = writer.open(room_name(0, args))
+    for i in range(MAX_TRANSCRIPT_TURNS * 3):
+        writer.add(conversation, "user", f"turn {i}")
+    for _ in range(conversation_log.MAX_FLUSH_FAILURES):
+        await writer.close(conversation)
+    await writer.aclose()
+    assert len(conversation.turns) == MAX_TRANSCRIPT_TURNS
+    assert not writer._dirty, "closed conversation still buffered"
+    print(f"outage: {writer.stats.summary()}, turns kept {len(conversation.turns)}")
+
+
+async def live(args) -> None:
+    if get_supabase() is None or not args.user_id:
+        sys.exit("--live needs SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY and --user-id")
+    writer = TranscriptWriter(flush_seconds=conversation_log.TRANSCRIPT_FLUSH_SECONDS / args.speed)
+    rng = random.Random(7)
+    start = time.perf_counter()
+    await asyncio.gather(*(session(writer, None, False, room, args, rng) for room in range(args.rooms)))
+    await writer.aclose()
+    print(f"live: {writer.stats.summary()} in {time.perf_counter() - start:.1f}s")
+    await get_supabase().close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--turn-ms", type=float, default=2000)
+    parser.add_argument("--db-ms", type=float, default=30)
+    parser.add_argument("--speed", type=float, default=20, help="replay this many times faster than real time")
+    parser.add_argument("--live", action="store_true", help="write to the configured Supabase")
+    parser.add_argument("--user-id", help="auth.users id the --live rooms belong to")
+    args = parser.parse_args()
+
+    if args.live:
+        await live(args)
+        return
+    print(f"{args.rooms} rooms x {args.turns} turns")
+    print(f"{'strategy':>14} {'requests':>9} {'rows':>7} {'MB sent':>8} {'in flight':>9} {'close ms':>9}")
+    for naive in (True, False):
+        await run(naive, args)
+    print()
+    await outage(args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""
+TTS cache: time to first audio frame for cached vs live confirmations.
+
+A fake TTS stands in for openai/tts-1 (--tts-ms to first frame, then 20ms
+24kHz frames). Plays a session's worth of navigation confirmations through
+TTSCache.synthesize in a temporary cache directory and reports time to first
+frame on misses and hits, the provider calls made, eviction under a small
+size budget, and the delay added to ordinary (uncached) LLM replies.
+
+Usage:
+    python benchmarks/bench_tts_cache.py [--utterances 200] [--tts-ms 250]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from livekit import rtc  # noqa: E402
+
+from intent_router import split_confirmation  # noqa: E402
+from routes import ROUTES  # noqa: E402
+from tts_cache import TTSCache  # noqa: E402
+
+SAMPLE_RATE = 24000
+VOICE = "openai/tts-1:nova"
+
+
+class FakeTTS:
+    def __init__(self, ttfb_ms: float):
+        self.ttfb_ms = ttfb_ms
+        self.calls = 0
+
+    async def __call__(self, text):
+        self.calls += 1
+        content = "".join([chunk async for chunk in text])
+        await asyncio.sleep(self.ttfb_ms / 1000)
+        samples = SAMPLE_RATE // 50
+        for _ in range(max(1, len(content) // 3)):  # ~60ms of audio per word
+            yield rtc.AudioFrame(bytes(samples * 2), SAMPLE_RATE, 1, samples)
+
+
+async def words(text: str):
+    for i, word in enumerate(text.split(" ")):
+        yield word if i == 0 else f" {word}"
+
+
+async def first_frame_ms(cache: TTSCache, tts: FakeTTS, text: str) -> float:
+    start = time.perf_counter()
+    first = None
+    async for _ in cache.synthesize(words(text), VOICE, tts):
+        if first is None:
+            first = (time.perf_counter() - start) * 1000
+    return first
+
+
+async def run(args) -> None:
+    phrases = [
+        phrase
+        for route in ROUTES
+        for phrase in (split_confirmation(route.confirmation, "ar"), split_confirmation(route.confirmation, "en"))
+    ]
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSCache(directory, max_bytes=64 * 1024 * 1024)
+        cache.register(phrases)
+        tts = FakeTTS(args.tts_ms)
+
+        misses, hits = [], []
+        for _ in range(args.utterances):
+            text = rng.choice(phrases)
+            before = cache.hits
+            elapsed = await first_frame_ms(cache, tts, text)
+            (hits if cache.hits > before else misses).append(elapsed)
+
+        print(f"utterances={args.utterances} provider calls={tts.calls} stats={cache.stats()}")
+        print(f"first frame, miss: p50={statistics.median(misses):.1f}ms")
+        print(f"first frame, hit:  p50={statistics.median(hits):.2f}ms p95={statistics.quantiles(hits, n=20)[18]:.2f}ms")
+
+        reply = "Sure, the productivity report for November second shows twelve completed tasks."
+        uncached = [await first_frame_ms(cache, tts, reply) for _ in range(5)]
+        print(f"uncached reply first frame: p50={statistics.median(uncached):.1f}ms "
+              f"(live TTS alone: {args.tts_ms:.0f}ms)")
+
+        # Eviction: budget for roughly a third of the phrases
+        small = TTSCache(os.path.join(directory, "small"), max_bytes=cache.size_bytes // 3)
+        small.register(phrases)
+        for text in phrases:
+            await first_frame_ms(small, tts, text)
+        print(f"eviction at {small.max_bytes // 1024}KB budget: {small.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--utterances", type=int, default=200)
+    parser.add_argument("--tts-ms", type=float, default=250.0, help="fake TTS time to first frame")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
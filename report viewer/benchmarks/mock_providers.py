@@ -0,0 +1,258 @@
+"""
+Mock providers for the benchmarks and load harnesses.
+
+MockLLM streams a canned reply (or a single tool call) after a configurable
+time-to-first-token, with no network. It reports a rough prompt-token
+estimate (characters / 4 over the chat context and tool schemas) in its usage
+chunk, so harnesses can compare prompt sizes without a tokenizer.
+
+MockSTT transcribes scripted utterances (`say()`) word by word, with interim
+transcripts and an END_OF_SPEECH for `turn_detection="stt"`. MockTTS returns
+silent PCM sized to the text after a time-to-first-byte. MockAudioOutput plays
+the audio out on a clock (optionally sped up) instead of publishing a track.
+"""
+
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from livekit import rtc
+from livekit.agents import APIConnectOptions, llm, stt, tts
+from livekit.agents.voice.io import AudioOutput, AudioOutputCapabilities
+from livekit.agents.llm import ChatChunk, ChoiceDelta, CompletionUsage, FunctionToolCall, is_function_tool
+from livekit.agents.llm.utils import build_legacy_openai_schema
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token, close enough for relative comparisons."""
+    return max(1, len(text) // 4)
+
+
+def prompt_text(chat_ctx: llm.ChatContext, tools: list | None = None) -> str:
+    """The text an LLM would be sent for this context: messages plus tool schemas."""
+    parts = [item.text_content or "" for item in chat_ctx.items if item.type == "message"]
+    for tool in tools or []:
+        if is_function_tool(tool):
+            parts.append(json.dumps(build_legacy_openai_schema(tool)))
+    return "\n".join(parts)
+
+
+class MockLLM(llm.LLM):
+    """LLM that answers after `ttft_ms` (+/- `jitter_ms`), streaming `reply` word by word.
+
+    With `tool_call=("name", {"arg": ...})` the first turn calls that tool
+    instead, and the follow-up turn (after the tool output) streams `reply`.
+    `tool_call` can also be a function of the user's last message returning
+    such a tuple, or None to just reply.
+    """
+
+    def __init__(self, reply: str = "Hello! How can I help you with the dashboard?",
+                 ttft_ms: float = 300.0, jitter_ms: float = 0.0, token_ms: float = 5.0,
+                 tool_call: tuple[str, dict] | None = None):
+        super().__init__()
+        self.reply = reply
+        self.ttft_ms = ttft_ms
+        self.jitter_ms = jitter_ms
+        self.token_ms = token_ms
+        self.tool_call = tool_call
+        self.requests = 0
+        self.prompt_tokens: list[int] = []
+
+    @property
+    def model(self) -> str:
+        return "mock"
+
+    @property
+    def provider(self) -> str:
+        return "mock"
+
+    def chat(self, *, chat_ctx: llm.ChatContext, tools=None,
+             conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS, **kwargs) -> "MockLLMStream":
+        self.requests += 1
+        return MockLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class MockLLMStream(llm.LLMStream):
+    async def _run(self) -> None:
+        mock: MockLLM = self._llm
+        delay = mock.ttft_ms + random.uniform(-mock.jitter_ms, mock.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+        request_id = uuid.uuid4().hex
+        prompt_tokens = estimate_tokens(prompt_text(self._chat_ctx, self._tools))
+        mock.prompt_tokens.append(prompt_tokens)
+
+        answered_tool = any(item.type == "function_call_output" for item in self._chat_ctx.items[-2:])
+        tool_call = mock.tool_call
+        if callable(tool_call):
+            user_text = next((item.text_content or "" for item in reversed(self._chat_ctx.items)
+                              if item.type == "message" and item.role == "user"), "")
+            tool_call = tool_call(user_text)
+        if tool_call is not None and not answered_tool:
+            name, arguments = tool_call
+            self._event_ch.send_nowait(ChatChunk(id=request_id, delta=ChoiceDelta(
+                role="assistant",
+                tool_calls=[FunctionToolCall(name=name, arguments=json.dumps(arguments),
+                                             call_id=f"call_{request_id[:8]}")],
+            )))
+            completion_tokens = 10
+        else:
+            words = mock.reply.split(" ")
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(mock.token_ms / 1000)
+                self._event_ch.send_nowait(ChatChunk(id=request_id, delta=ChoiceDelta(
+                    role="assistant", content=word if i == 0 else f" {word}")))
+            completion_tokens = len(words)
+
+        self._event_ch.send_nowait(ChatChunk(id=request_id, usage=CompletionUsage(
+            completion_tokens=completion_tokens,
+            prompt_tokens=prompt_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )))
+
+
+class MockSTT(stt.STT):
+    """Streaming STT that "hears" the utterances passed to `say()`.
+
+    Each word arrives `word_ms` after the previous one as a growing interim
+    transcript. The final transcript and END_OF_SPEECH follow `final_ms` after
+    the last word. `end_of_speech_at` is when the last one was sent.
+    """
+
+    def __init__(self, word_ms: float = 250.0, final_ms: float = 300.0):
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=True))
+        self.word_ms = word_ms
+        self.final_ms = final_ms
+        self.end_of_speech_at = 0.0
+        self._utterances: asyncio.Queue[str] = asyncio.Queue()
+
+    @property
+    def model(self) -> str:
+        return "mock"
+
+    @property
+    def provider(self) -> str:
+        return "mock"
+
+    def say(self, text: str) -> None:
+        self._utterances.put_nowait(text)
+
+    async def _recognize_impl(self, buffer, *, language=None, conn_options=DEFAULT_API_CONNECT_OPTIONS):
+        raise NotImplementedError("MockSTT only streams")
+
+    def stream(self, *, language=None, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+               ) -> "MockRecognizeStream":
+        return MockRecognizeStream(stt=self, conn_options=conn_options)
+
+
+class MockRecognizeStream(stt.RecognizeStream):
+    def _event(self, kind: stt.SpeechEventType, text: str = "") -> stt.SpeechEvent:
+        language = "ar" if any("\u0600" <= ch <= "\u06ff" for ch in text) else "en"
+        alternatives = [stt.SpeechData(language=language, text=text, confidence=0.95)] if text else []
+        return stt.SpeechEvent(type=kind, alternatives=alternatives)
+
+    async def _drain_input(self) -> None:
+        async for _ in self._input_ch:
+            pass
+
+    async def _run(self) -> None:
+        mock: MockSTT = self._stt
+        drain = asyncio.create_task(self._drain_input())
+        try:
+            while True:
+                text = await mock._utterances.get()
+                self._event_ch.send_nowait(self._event(stt.SpeechEventType.START_OF_SPEECH))
+                words = text.split()
+                for i in range(1, len(words) + 1):
+                    await asyncio.sleep(mock.word_ms / 1000)
+                    self._event_ch.send_nowait(self._event(stt.SpeechEventType.INTERIM_TRANSCRIPT,
+                                                           " ".join(words[:i])))
+                await asyncio.sleep(mock.final_ms / 1000)
+                self._event_ch.send_nowait(self._event(stt.SpeechEventType.FINAL_TRANSCRIPT, text))
+                self._event_ch.send_nowait(self._event(stt.SpeechEventType.END_OF_SPEECH))
+                mock.end_of_speech_at = time.perf_counter()
+        finally:
+            drain.cancel()
+
+
+class MockTTS(tts.TTS):
+    """Non-streaming TTS: silent 16 kHz PCM, `ms_per_char` of audio per character, after `ttfb_ms`."""
+
+    def __init__(self, ttfb_ms: float = 150.0, ms_per_char: float = 60.0, sample_rate: int = 16000):
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=False), sample_rate=sample_rate,
+                         num_channels=1)
+        self.ttfb_ms = ttfb_ms
+        self.ms_per_char = ms_per_char
+        self.requests = 0
+
+    @property
+    def model(self) -> str:
+        return "mock"
+
+    @property
+    def provider(self) -> str:
+        return "mock"
+
+    def synthesize(self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+                   ) -> "MockChunkedStream":
+        self.requests += 1
+        return MockChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class MockChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        mock: MockTTS = self._tts
+        output_emitter.initialize(request_id=uuid.uuid4().hex, sample_rate=mock.sample_rate, num_channels=1,
+                                  mime_type="audio/pcm")
+        await asyncio.sleep(mock.ttfb_ms / 1000)
+        samples = int(len(self.input_text) * mock.ms_per_char / 1000 * mock.sample_rate)
+        output_emitter.push(bytes(2 * samples))
+        output_emitter.flush()
+
+
+class MockAudioOutput(AudioOutput):
+    """Audio sink that "plays" each segment for its duration divided by `speed`.
+
+    `first_frame_at` is when the first frame of the current segment arrived,
+    i.e. when the user would start hearing the reply.
+    """
+
+    def __init__(self, speed: float = 1.0):
+        super().__init__(label="MockAudioOutput", capabilities=AudioOutputCapabilities(pause=False))
+        self.speed = speed
+        self.first_frame_at = 0.0
+        self.segments = 0
+        self._pushed = 0.0
+        self._segment_started = False
+        self._playout: asyncio.Task | None = None
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        if not self._segment_started:
+            self._segment_started = True
+            self.first_frame_at = time.perf_counter()
+        self._pushed += frame.duration
+
+    def flush(self) -> None:
+        super().flush()
+        if not self._segment_started:
+            return
+        duration, self._pushed, self._segment_started = self._pushed, 0.0, False
+        self.segments += 1
+        self._playout = asyncio.create_task(self._play(duration))
+
+    async def _play(self, duration: float) -> None:
+        await asyncio.sleep(duration / self.speed)
+        self.on_playback_finished(playback_position=duration, interrupted=False)
+
+    def clear_buffer(self) -> None:
+        if self._playout is not None and not self._playout.done():
+            self._playout.cancel()
+            self.on_playback_finished(playback_position=0.0, interrupted=True)
+        elif self._segment_started:
+            self.on_playback_finished(playback_position=0.0, interrupted=True)
+        self._pushed, self._segment_started = 0.0, False
@@ -0,0 +1,130 @@
+"""
+Frontend capability handshake and navigation publish accounting.
+
+The frontend (CapabilityAnnouncer) announces on the `client-capabilities`
+topic which channel it takes navigation from. It does so when it connects,
+when the agent joins, and whenever the agent asks with a
+`capabilities-request`. send_navigation_url then publishes on that one
+channel only. Frontends that never announce get the `agent-navigation` data
+topic, which every version of AgentNavigationListener handles.
+
+A frontend that can unpack batched messages also announces its batch topic
+(BatchedDataRelay). Until it does, OutboundQueue sends one packet per message.
+"""
+
+import asyncio
+import json
+import logging
+import statistics
+
+from outbound import outbound_for
+
+logger = logging.getLogger("agent-tools")
+
+CAPABILITIES_TOPIC = "client-capabilities"
+NAVIGATION_TOPIC = "agent-navigation"
+
+# Navigation channels a frontend can ask for
+NAVIGATION_CHANNELS = ("data", "metadata")
+
+
+class PublishStats:
+    """Latency and size of the agent's navigation publishes."""
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.bytes_sent = 0
+        self.failures = 0
+
+    def record(self, seconds: float, size: int, ok: bool = True) -> None:
+        if not ok:
+            self.failures += 1
+            return
+        self.latencies.append(seconds)
+        self.bytes_sent += size
+
+    def summary(self) -> dict:
+        if not self.latencies:
+            return {"count": 0, "failures": self.failures}
+        latencies_ms = sorted(s * 1000 for s in self.latencies)
+        quantiles = statistics.quantiles(latencies_ms, n=100) if len(latencies_ms) > 1 else latencies_ms * 99
+        return {
+            "count": len(latencies_ms),
+            "failures": self.failures,
+            "p50_ms": round(quantiles[49], 2),
+            "p95_ms": round(quantiles[94], 2),
+            "bytes_sent": self.bytes_sent,
+            "bytes_per_publish": round(self.bytes_sent / len(latencies_ms), 1),
+        }
+
+
+class ClientCapabilities:
+    """What the room's frontend listens on, plus room readiness for publishing."""
+
+    def __init__(self):
+        self.navigation_channel = "data"
+        self.navigation_topic = NAVIGATION_TOPIC
+        self.batch_topic: str | None = None
+        self.announced = False
+        self.publish_stats = PublishStats()
+        self._room = None
+        self._ready = asyncio.Event()
+
+    def attach(self, room) -> None:
+        """Track the room's capability announcements and participants."""
+        self._room = room
+        room.on("data_received", self.on_data_received)
+        room.on("participant_connected", lambda participant: self._check_ready())
+        room.on("connection_state_changed", lambda state: self._check_ready())
+        self._check_ready()
+
+    def _check_ready(self) -> None:
+        room = self._room
+        if room is not None and room.isconnected() and room.remote_participants:
+            self._ready.set()
+        else:
+            self._ready.clear()
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Wait until the room is connected and the frontend has joined."""
+        self._check_ready()
+        if self._ready.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def request(self) -> None:
+        """Ask the frontend to (re)announce, for when its announcement predates attach()."""
+        payload = json.dumps({"type": "capabilities-request"}).encode("utf-8")
+        try:
+            await outbound_for(self._room).send(payload, CAPABILITIES_TOPIC, key="capabilities-request")
+        except Exception as e:
+            logger.warning(f"Could not request client capabilities: {e}")
+
+    def on_data_received(self, packet) -> None:
+        """`data_received` handler for `client-capabilities` announcements."""
+        if packet.topic != CAPABILITIES_TOPIC:
+            return
+        try:
+            message = json.loads(packet.data)
+        except (ValueError, UnicodeDecodeError):
+            logger.warning("Ignoring malformed client-capabilities payload")
+            return
+        if isinstance(message, dict) and message.get("type") == "client-capabilities":
+            self.update(message)
+
+    def update(self, message: dict) -> None:
+        navigation = message.get("navigation") or {}
+        channel = navigation.get("channel")
+        if channel not in NAVIGATION_CHANNELS:
+            logger.warning(f"Unknown navigation channel {channel!r}, keeping {self.navigation_channel}")
+            return
+        self.navigation_channel = channel
+        self.navigation_topic = navigation.get("topic") or NAVIGATION_TOPIC
+        self.batch_topic = (message.get("batch") or {}).get("topic")
+        self.announced = True
+        logger.info(f"🤝 Frontend navigation channel: {channel} ({self.navigation_topic}), "
+                    f"batches: {self.batch_topic or 'no'}")
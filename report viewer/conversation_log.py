@@ -0,0 +1,330 @@
+"""
+Batched persistence of voice transcripts to the `voice_conversations` table.
+
+Each room's conversation is one row: {id, user_id, room_name, transcript,
+duration_seconds, language}. `transcript` is a JSONB array of {role, content,
+timestamp} entries, the same shape useVoiceAssistant keeps on the frontend.
+`user_id` (NOT NULL, references auth.users, and what the table's RLS policies
+match on) comes from the room name: livekit-token gives each user the room
+`voice-<user id>`. For other rooms it is the user's participant identity once
+they join, if that is a user id; until then the conversation is buffered but
+not written. The worker's TranscriptWriter
+buffers the turns of all its rooms. It doesn't write once per utterance: it
+upserts every changed row in a single PostgREST request (on the client-side
+row id). A flush runs when TRANSCRIPT_FLUSH_TURNS turns of writable
+conversations are pending across rooms, every TRANSCRIPT_FLUSH_SECONDS, and
+when a room's session ends.
+
+Each write of a conversation sends its whole transcript: an upsert replaces
+the JSONB array, it can't append to it. A long conversation therefore costs
+up to MAX_TRANSCRIPT_TURNS turns per flush it changed in, however few turns
+are new: 100 turns of 100 characters are ~18 kB of JSON (~44 kB in Arabic,
+escaped). Flushes are at most one per
+TRANSCRIPT_FLUSH_SECONDS unless turns pile up, and a request carries at most
+MAX_FLUSH_ROWS rows and MAX_FLUSH_BYTES of JSON (a larger row goes alone). With
+the default process-per-job executor a worker process has one room, so a
+batch is that room's turns of the last few seconds. With AGENT_JOB_EXECUTOR=thread
+one request carries every room of the process.
+
+Memory is bounded. A conversation keeps at most MAX_TRANSCRIPT_TURNS turns
+(the oldest are dropped) of at most MAX_TURN_CHARS characters each. Closed
+conversations that can't be written are dropped after MAX_FLUSH_FAILURES
+attempts.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+
+from supabase_client import SupabaseError, get_supabase
+
+logger = logging.getLogger("agent-data")
+
+VOICE_CONVERSATIONS_TABLE = "voice_conversations"
+
+# Pending turns (all rooms of the worker) that trigger a flush
+TRANSCRIPT_FLUSH_TURNS = int(os.getenv("AGENT_TRANSCRIPT_FLUSH_TURNS", "20"))
+# Max seconds a turn waits in the buffer
+TRANSCRIPT_FLUSH_SECONDS = float(os.getenv("AGENT_TRANSCRIPT_FLUSH_SECONDS", "5"))
+
+MAX_TRANSCRIPT_TURNS = int(os.getenv("AGENT_TRANSCRIPT_MAX_TURNS", "500"))
+MAX_TURN_CHARS = 2000
+MAX_FLUSH_ROWS = 100       # rows per upsert request
+MAX_FLUSH_BYTES = 1 << 20  # JSON bytes per upsert request
+MAX_FLUSH_FAILURES = 5     # attempts before a closed conversation is dropped
+
+# livekit-token's per-user room names: ROOM_PREFIX + the Supabase user id
+ROOM_PREFIX = "voice-"
+
+_ARABIC_CHAR = re.compile(r'[\u0600-\u06FF]')
+
+
+class TranscriptWriterStats:
+    """Flushes of a writer: requests, rows, turns and bytes written, failures."""
+
+    def __init__(self):
+        self.flushes = 0
+        self.rows = 0
+        self.turns = 0
+        self.bytes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.flush_seconds: list[float] = []
+
+    def record(self, rows: int, turns: int, size: int, seconds: float) -> None:
+        self.flushes += 1
+        self.rows += rows
+        self.turns += turns
+        self.bytes += size
+        self.flush_seconds.append(seconds)
+
+    def summary(self) -> dict:
+        return {
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "turns": self.turns,
+            "turns_per_flush": round(self.turns / self.flushes, 1) if self.flushes else 0.0,
+            "bytes_per_flush": round(self.bytes / self.flushes) if self.flushes else 0,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "flush_ms_max": round(max(self.flush_seconds) * 1000, 1) if self.flush_seconds else 0.0,
+        }
+
+
+def _as_user_id(value: str | None) -> str | None:
+    try:
+        return str(uuid.UUID(value)) if value else None
+    except ValueError:
+        return None
+
+
+def user_id_for(room_name: str, identity: str | None = None) -> str | None:
+    """The Supabase user id a room's conversation belongs to, or None if unknown.
+
+    Taken from a `voice-<user id>` room name, else from the participant
+    identity (livekit-token defaults it to the user id).
+    """
+    if room_name.startswith(ROOM_PREFIX):
+        user_id = _as_user_id(room_name[len(ROOM_PREFIX):])
+        if user_id is not None:
+            return user_id
+    return _as_user_id(identity)
+
+
+class Conversation:
+    """One room's transcript, as buffered by a TranscriptWriter."""
+
+    def __init__(self, room_name: str, resume: dict | None = None, user_id: str | None = None):
+        self.id = str(uuid.uuid4())
+        self.room_name = room_name
+        self.user_id = user_id or user_id_for(room_name)  # None: not written until set
+        self.turns: list[dict] = []
+        self.pending = 0  # turns added since the last successful flush
+        self.closed = False
+        self.failures = 0
+        self._started = time.monotonic()
+        self._ended: float | None = None
+        self._arabic_turns = 0
+        self._user_turns = 0
+        if resume is not None:  # continue an earlier row of this room (resumption.load_recent_conversation)
+            self.id = resume["id"]
+            self.user_id = resume.get("user_id") or self.user_id
+            self.turns = list(resume.get("transcript") or [])[-MAX_TRANSCRIPT_TURNS:]
+            self._started -= resume.get("duration_seconds") or 0
+
+    def add(self, role: str, content: str) -> None:
+        if role == "user":
+            self._user_turns += 1
+            if _ARABIC_CHAR.search(content):
+                self._arabic_turns += 1
+        self.turns.append({
+            "role": role,
+            "content": content[:MAX_TURN_CHARS],
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+        if len(self.turns) > MAX_TRANSCRIPT_TURNS:
+            del self.turns[0]
+        self.pending += 1
+
+    def close(self) -> None:
+        self.closed = True
+        self._ended = time.monotonic()
+
+    @property
+    def language(self) -> str:
+        """'ar' when most of the user's turns were in Arabic, else 'en'."""
+        return "ar" if self._arabic_turns * 2 > self._user_turns else "en"
+
+    def row(self) -> dict:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "room_name": self.room_name,
+            "transcript": list(self.turns),
+            "duration_seconds": int((self._ended or time.monotonic()) - self._started),
+            "language": self.language,
+        }
+
+
+class TranscriptWriter:
+    """Buffers the transcripts of a worker's rooms and upserts them in batches."""
+
+    def __init__(self, client=None, flush_turns: int = TRANSCRIPT_FLUSH_TURNS,
+                 flush_seconds: float = TRANSCRIPT_FLUSH_SECONDS):
+        self._client = client
+        self.flush_turns = flush_turns
+        self.flush_seconds = flush_seconds
+        self.stats = TranscriptWriterStats()
+        self._dirty: dict[str, Conversation] = {}
+        self._flushing: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def open(self, room_name: str, resume: dict | None = None, user_id: str | None = None) -> Conversation:
+        """Start buffering a new conversation for `room_name` (or continue the `resume` row)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return Conversation(room_name, resume, user_id)
+
+    def attach(self, session, room_name: str, resume: dict | None = None,
+               user_id: str | None = None) -> Conversation:
+        """Record the user and assistant messages `session` adds to its chat history."""
+        conversation = self.open(room_name, resume, user_id)
+
+        def on_item_added(event) -> None:
+            item = event.item
+            if getattr(item, "type", None) == "message" and item.role in ("user", "assistant"):
+                text = item.text_content
+                if text:
+                    self.add(conversation, item.role, text)
+
+        session.on("conversation_item_added", on_item_added)
+        return conversation
+
+    @property
+    def pending_turns(self) -> int:
+        """Turns waiting to be written, of conversations whose user is known."""
+        return sum(c.pending for c in self._dirty.values() if c.user_id is not None)
+
+    def add(self, conversation: Conversation, role: str, content: str) -> None:
+        conversation.add(role, content)
+        self._dirty[conversation.id] = conversation
+        if conversation.user_id is not None and self.pending_turns >= self.flush_turns:
+            self._wake.set()
+
+    async def close(self, conversation: Conversation) -> None:
+        """Session ended: write the conversation's final state now."""
+        conversation.close()
+        self._dirty[conversation.id] = conversation
+        if self._flushing is not None and not self._flushing.done():
+            # Started before this close: wait for it, then join the next one
+            await asyncio.shield(self._flushing)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Upsert every changed conversation. Returns the rows written.
+
+        Concurrent callers (e.g. several rooms ending together) share one flush.
+        """
+        if self._flushing is None or self._flushing.done():
+            self._flushing = asyncio.get_running_loop().create_task(self._flush_all())
+        return await asyncio.shield(self._flushing)
+
+    async def _flush_all(self) -> int:
+        # Only what's dirty now: turns added meanwhile wait for the next flush
+        due = set(self._dirty)
+        written = 0
+        while True:
+            rows = await self._flush_batch(due)
+            if not rows:
+                break
+            written += rows
+        return written
+
+    async def _flush_batch(self, due: set[str]) -> int:
+        client = self._client or get_supabase()
+        if client is None:
+            self._dirty.clear()
+            return 0
+
+        for conversation in [c for c in self._dirty.values() if c.user_id is None and c.closed]:
+            del self._dirty[conversation.id]
+            self.stats.dropped += 1
+            logger.error(f"Dropping transcript of room {conversation.room_name}: no user id")
+        # Conversations whose user isn't known yet stay buffered
+        batch, rows, size = [], [], 0
+        for conversation in self._dirty.values():
+            if conversation.user_id is None or conversation.id not in due:
+                continue
+            row = conversation.row()
+            row_size = len(json.dumps(row))
+            if batch and (len(batch) >= MAX_FLUSH_ROWS or size + row_size > MAX_FLUSH_BYTES):
+                break
+            batch.append(conversation)
+            rows.append(row)
+            size += row_size
+        if not batch:
+            return 0
+        pending = [conversation.pending for conversation in batch]
+        for conversation in batch:
+            del self._dirty[conversation.id]
+            due.discard(conversation.id)
+            conversation.pending = 0
+        turns = sum(pending)
+
+        start = time.perf_counter()
+        try:
+            await client.upsert(VOICE_CONVERSATIONS_TABLE, rows, on_conflict="id")
+        except SupabaseError as e:
+            self.stats.failures += 1
+            logger.warning(f"Could not write {len(rows)} voice conversations: {e}")
+            for conversation, count in zip(batch, pending):
+                conversation.pending += count
+                conversation.failures += 1
+                if conversation.closed and conversation.failures >= MAX_FLUSH_FAILURES:
+                    self.stats.dropped += 1
+                    logger.error(f"Dropping transcript of room {conversation.room_name} "
+                                 f"after {conversation.failures} failed writes")
+                    continue
+                self._dirty.setdefault(conversation.id, conversation)
+            return 0
+        self.stats.record(len(rows), turns, size, time.perf_counter() - start)
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._dirty:
+                await self.flush()
+
+    async def aclose(self) -> None:
+        """Flush what's buffered and stop the background task."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+_writer: TranscriptWriter | None = None
+_writer_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_transcript_writer() -> TranscriptWriter | None:
+    """This process's shared writer, or None when Supabase isn't configured."""
+    global _writer, _writer_loop
+    if get_supabase() is None:
+        return None
+    loop = asyncio.get_running_loop()
+    if _writer is None or _writer_loop is not loop:
+        _writer = TranscriptWriter()
+        _writer_loop = loop
+    return _writer
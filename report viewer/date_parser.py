@@ -0,0 +1,284 @@
+"""
+Table-driven parser for the spoken dates passed to view_report_by_date.
+
+Turns English and Egyptian Arabic date expressions into `datetime.date`:
+"2 nov 2025", "November 2, 2025", "2/11/2025", "2025-11-02", "2 نوفمبر",
+"٢ نوفمبر ٢٠٢٥", "yesterday", "امبارح", "last Sunday", "الحد اللي فات",
+"3 days ago", "من 3 ايام". Dates without a year resolve to the most recent
+past occurrence, since reports are only ever about the past. Results are
+memoized per (utterance, today) in an LRU cache.
+
+parse_period() does the same for the date ranges of KPI questions: "this
+month", "الأسبوع ده", "last week", "الشهر اللي فات", "last 30 days",
+"آخر 3 شهور", "November 2025", "2025", or any single day parse_date() knows.
+"""
+
+import calendar
+import os
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+
+from intent_router import normalize, tokenize
+
+# Parsed utterances kept per worker process
+DATE_CACHE_SIZE = int(os.getenv("DATE_CACHE_SIZE", "4096"))
+
+# ==================== LOOKUP TABLES ====================
+
+
+def _table(entries: dict[str, int]) -> dict[str, int]:
+    """Key a {"word word ...": value} table by normalized, stemmed tokens."""
+    return {token: value for words, value in entries.items() for token in tokenize(words)}
+
+
+MONTHS = _table({
+    "jan january يناير": 1,
+    "feb february فبراير": 2,
+    "mar march مارس": 3,
+    "apr april ابريل إبريل أبريل": 4,
+    "may مايو": 5,
+    "jun june يونيو يونيه": 6,
+    "jul july يوليو يوليه": 7,
+    "aug august اغسطس أغسطس": 8,
+    "sep sept september سبتمبر": 9,
+    "oct october اكتوبر أكتوبر": 10,
+    "nov november نوفمبر": 11,
+    "dec december ديسمبر": 12,
+})
+
+# Monday == 0, as in date.weekday()
+WEEKDAYS = _table({
+    "mon monday الاتنين الاثنين": 0,
+    "tue tues tuesday التلات التلاتاء الثلاثاء": 1,
+    "wed wednesday الاربع الاربعاء الأربعاء": 2,
+    "thu thur thurs thursday الخميس": 3,
+    "fri friday الجمعة": 4,
+    "sat saturday السبت": 5,
+    "sun sunday الحد الأحد الاحد": 6,
+})
+
+# Single-word days relative to today
+RELATIVE_DAYS = _table({
+    "today النهارده انهارده النهاردة اليوم": 0,
+    "yesterday امبارح امس أمس": -1,
+    "tomorrow بكره بكرة": 1,
+})
+
+# Multi-word days relative to today, as token tuples
+RELATIVE_PHRASES = {
+    tuple(tokenize("day before yesterday")): -2,
+    tuple(tokenize("اول امبارح")): -2,
+    tuple(tokenize("أول امبارح")): -2,
+}
+
+# Lengths of "N <unit> ago" units, in days
+UNITS = _table({
+    "day days يوم ايام أيام": 1,
+    "week weeks اسبوع أسبوع اسابيع أسابيع": 7,
+})
+
+# Lengths of the periods of KPI questions, in days (30 and 365 stand for calendar months and years)
+PERIOD_UNITS = _table({
+    "day days يوم ايام أيام": 1,
+    "week weeks اسبوع أسبوع اسابيع أسابيع": 7,
+    "month months شهر شهور اشهر أشهر": 30,
+    "year years سنه سنة سنين عام": 365,
+})
+
+LAST_WORDS = frozenset(tokenize("last previous past فات فاتت الماضي الماضيه"))
+THIS_WORDS = frozenset(tokenize("this current ده دي دا هذا هذه حالي"))
+ROLLING_WORDS = frozenset(tokenize("last past اخر آخر"))  # with a number: "last 30 days"
+AGO_WORDS = frozenset(tokenize("ago من قبل"))
+
+_ORDINAL = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)\b')
+_NUMERIC_DATE = re.compile(r'\b(\d{1,4})[/.\-](\d{1,2})[/.\-](\d{1,4})\b')
+
+
+# ==================== PARSER ====================
+
+def _safe_date(year: int, month: int, day: int) -> date | None:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _full_year(year: int) -> int:
+    return year + 2000 if year < 100 else year
+
+
+def _most_recent(month: int, day: int, today: date) -> date | None:
+    """The latest date with this month/day that isn't in the future."""
+    for year in (today.year, today.year - 1):
+        candidate = _safe_date(year, month, day)
+        if candidate is not None and candidate <= today:
+            return candidate
+    return None
+
+
+def _numeric_date(a: int, b: int, c: int, day_first: bool) -> date | None:
+    """Y-M-D, D/M/Y or M/D/Y. Unambiguous values win over `day_first`."""
+    if a > 31:
+        return _safe_date(a, b, c)
+    year = _full_year(c)
+    if a > 12:
+        return _safe_date(year, b, a)
+    if b > 12:
+        return _safe_date(year, a, b)
+    return _safe_date(year, b, a) if day_first else _safe_date(year, a, b)
+
+
+def _weekday(weekday: int, today: date, last: bool) -> date:
+    """Most recent `weekday` on or before today ("last" excludes today)."""
+    back = (today.weekday() - weekday) % 7
+    if back == 0 and last:
+        back = 7
+    return today - timedelta(days=back)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse(text: str, today: date, day_first: bool) -> date | None:
+    text = _ORDINAL.sub(r'\1', normalize(text))
+
+    numeric = _NUMERIC_DATE.search(text)
+    if numeric:
+        return _numeric_date(*(int(g) for g in numeric.groups()), day_first)
+
+    tokens = tokenize(text)
+    for phrase, offset in RELATIVE_PHRASES.items():
+        n = len(phrase)
+        if any(tuple(tokens[i:i + n]) == phrase for i in range(len(tokens) - n + 1)):
+            return today + timedelta(days=offset)
+
+    numbers, month, weekday, relative, unit = [], None, None, None, None
+    last = ago = False
+    for token in tokens:
+        if token.isdigit():
+            numbers.append(int(token))
+        elif token in MONTHS and month is None:
+            month = MONTHS[token]
+        elif token in WEEKDAYS:
+            weekday = WEEKDAYS[token]
+        elif token in RELATIVE_DAYS:
+            relative = RELATIVE_DAYS[token]
+        elif token in UNITS:
+            unit = UNITS[token]
+        elif token in LAST_WORDS:
+            last = True
+        elif token in AGO_WORDS:
+            ago = True
+
+    if month is not None:
+        years = [n for n in numbers if n > 31]
+        days = [n for n in numbers if n <= 31]
+        if not days:
+            return None  # a whole month is a range, not a report date
+        if years:
+            return _safe_date(_full_year(years[0]), month, days[0])
+        if len(days) >= 2:
+            return _safe_date(_full_year(days[1]), month, days[0])
+        return _most_recent(month, days[0], today)
+
+    if relative is not None:
+        return today + timedelta(days=relative)
+    if unit is not None and ago:
+        return today - timedelta(days=unit * (numbers[0] if numbers else 1))
+    if weekday is not None:
+        return _weekday(weekday, today, last)
+    return None
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _month_range(year: int, month: int) -> tuple[date, date]:
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _calendar_period(unit: int, today: date, back: int) -> tuple[date, date]:
+    """The day, week (Monday first), month or year `back` periods before the one holding today."""
+    if unit == 1:
+        day = today - timedelta(days=back)
+        return day, day
+    if unit == 7:
+        start = today - timedelta(days=today.weekday() + 7 * back)
+        return start, start + timedelta(days=6)
+    if unit == 30:
+        start = _add_months(today.replace(day=1), -back)
+        return _month_range(start.year, start.month)
+    return date(today.year - back, 1, 1), date(today.year - back, 12, 31)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_period(text: str, today: date) -> tuple[date, date] | None:
+    tokens = tokenize(_ORDINAL.sub(r'\1', normalize(text)))
+    numbers, unit, month = [], None, None
+    this = last = rolling = False
+    for token in tokens:
+        if token.isdigit():
+            numbers.append(int(token))
+        elif token in PERIOD_UNITS and unit is None:
+            unit = PERIOD_UNITS[token]
+        elif token in MONTHS and month is None:
+            month = MONTHS[token]
+        elif token in THIS_WORDS:
+            this = True
+        if token in LAST_WORDS:
+            last = True
+        if token in ROLLING_WORDS:
+            rolling = True
+
+    if unit is not None and rolling and numbers:
+        # "last 30 days", "آخر 3 شهور": the N units up to and including today
+        n = numbers[0]
+        if unit == 30:
+            start = _add_months(today, -n)
+        elif unit == 365:
+            start = _add_months(today, -12 * n)
+        else:
+            start = today - timedelta(days=unit * n)
+        return start + timedelta(days=1), today
+    if unit is not None and (this or last):
+        return _calendar_period(unit, today, 1 if last else 0)
+
+    years = [n for n in numbers if n > 31]
+    if month is not None and len(years) == len(numbers):
+        # A whole month: "November 2025", "نوفمبر" (the most recent one)
+        year = years[0] if years else (today.year if month <= today.month else today.year - 1)
+        return _month_range(year, month)
+    if month is None and unit is None and len(numbers) == 1 and years:
+        return date(years[0], 1, 1), date(years[0], 12, 31)
+
+    day = _parse(text, today, True)
+    return (day, day) if day is not None else None
+
+
+def parse_period(text: str, today: date | None = None) -> tuple[date, date] | None:
+    """Parse a spoken period into its first and last day (inclusive), or None.
+
+    Periods run to their calendar end ("this month" includes the rest of the
+    month); "last N days" ends today.
+    """
+    if not text:
+        return None
+    return _parse_period(text.strip(), today or date.today())
+
+
+def parse_date(text: str, today: date | None = None, day_first: bool = True) -> date | None:
+    """Parse a spoken date expression, or return None when it isn't a single day.
+
+    `day_first` decides ambiguous numeric dates like 2/11/2025 (Egypt writes
+    day first); unambiguous ones such as 25/11/2025 or 11/25/2025 parse either way.
+    """
+    if not text:
+        return None
+    return _parse(text.strip(), today or date.today(), day_first)
+
+
+def cache_info():
+    """LRU cache statistics for parsed utterances."""
+    return _parse.cache_info()
@@ -0,0 +1,147 @@
+"""
+Multi-step DOM action plans, sent to the frontend as one `dom-plan` message.
+
+A compound request ("open productivity, filter to November, open the 2nd
+report") used to take one LLM turn and one `dom-action` round trip per step.
+run_dom_plan sends the whole sequence at once on the `dom-action` topic:
+
+    {"type": "dom-plan", "actionId": "...", "steps": [
+        {"op": "navigate", "pathname": "/productivity-reports"},
+        {"op": "fill", "target": {"text": "Search"}, "value": "November"},
+        {"op": "click", "target": {"text": "View Report", "index": 1},
+         "when": {"present": {"text": "View Report"}}, "optional": true}]}
+
+DOMInteractionExecutor runs the steps in order. Element steps wait up to
+`timeoutMs` for their target to appear. A step whose `when` condition doesn't
+hold is skipped. A failed step ends the plan unless it is `optional`. After
+each step the frontend acks on `dom-action-result` with a `dom-plan-step`
+message ({actionId, index, status, detail}). When the plan ends it sends the
+usual `dom-action-result` for the plan's actionId.
+
+Plans are validated before sending. The limits on step count, field lengths,
+timeouts and encoded size keep a plan well under the 15 KiB LiveKit
+recommends for one reliable data packet (send_dom_action only checks 64 KiB).
+"""
+
+import json
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from routes import ROUTES_BY_NAME, RouteName
+
+PLAN_OPS = ("navigate", "wait_for", "click", "fill", "scroll")
+
+MAX_PLAN_STEPS = 10
+MAX_FIELD_CHARS = 200      # element text, ids, dates
+MAX_FILL_CHARS = 1000      # a fill step's value
+STEP_TIMEOUT_MS = 3000     # wait for an element step's target to appear
+NAVIGATE_TIMEOUT_MS = 6000  # wait for a navigated page's route to render
+MAX_PLAN_TIMEOUT_MS = 30000
+MAX_PLAN_BYTES = 8 * 1024
+
+
+class PlanError(ValueError):
+    """A plan that can't be sent, with a message the LLM can act on."""
+
+
+class PlanStep(BaseModel):
+    """One step of a DOM plan, as the LLM writes it."""
+    action: Literal[PLAN_OPS]
+    route: RouteName | None = Field(None, description="navigate: page to open")
+    text: str | None = Field(None, description="Element text or label (click/fill/scroll/wait_for)")
+    element_id: str | None = None
+    index: int | None = Field(None, description="0-based, among elements matching text")
+    date: str | None = Field(None, description="click: report card date")
+    value: str | None = Field(None, description="fill: text to enter")
+    if_present: str | None = Field(None, description="Only run if an element with this text is on the page")
+    optional: bool = Field(False, description="Continue the plan if this step fails")
+
+
+def _check_length(value: str | None, limit: int, what: str) -> None:
+    if value is not None and len(value) > limit:
+        raise PlanError(f"{what} is longer than {limit} characters")
+
+
+def build_plan(steps: list[PlanStep], page=None) -> list[dict]:
+    """Validate the LLM's steps and convert them to `dom-plan` wire steps.
+
+    Element targets of steps that run before the first navigate are resolved
+    against `page` (a PageModel) when possible, so the frontend gets the
+    element's key.
+    """
+    if not steps:
+        raise PlanError("The plan has no steps")
+    if len(steps) > MAX_PLAN_STEPS:
+        raise PlanError(f"The plan has {len(steps)} steps; split it into plans of at most {MAX_PLAN_STEPS}")
+
+    wire = []
+    navigated = False
+    total_timeout = 0
+    for i, step in enumerate(steps, start=1):
+        for field in ("text", "element_id", "date", "if_present"):
+            _check_length(getattr(step, field), MAX_FIELD_CHARS, f"Step {i} {field}")
+        _check_length(step.value, MAX_FILL_CHARS, f"Step {i} value")
+
+        out: dict = {"op": step.action}
+        if step.action == "navigate":
+            route = ROUTES_BY_NAME.get(step.route or "")
+            if route is None:
+                raise PlanError(f"Step {i}: unknown route {step.route!r}. Available: {', '.join(ROUTES_BY_NAME)}")
+            out["pathname"] = route.pathname
+            navigated = True
+        else:
+            target = {}
+            if step.element_id:
+                target["id"] = step.element_id
+            if step.text:
+                target["text"] = step.text
+            if step.index is not None:
+                target["index"] = step.index
+            if step.date:
+                target["date"] = step.date
+            if not target:
+                raise PlanError(f"Step {i} ({step.action}) needs text, element_id or date")
+            if page is not None and page.content is not None and not navigated and not step.date:
+                element = page.resolve(step.text, step.element_id, step.index)
+                if element is not None and element.get("key"):
+                    target["key"] = element["key"]
+            out["target"] = target
+            if step.action == "fill":
+                if step.value is None:
+                    raise PlanError(f"Step {i} (fill) needs a value")
+                out["value"] = step.value
+
+        timeout = NAVIGATE_TIMEOUT_MS if step.action == "navigate" else STEP_TIMEOUT_MS
+        out["timeoutMs"] = timeout
+        total_timeout += timeout
+        if step.if_present:
+            out["when"] = {"present": {"text": step.if_present}}
+        if step.optional:
+            out["optional"] = True
+        wire.append(out)
+
+    if total_timeout > MAX_PLAN_TIMEOUT_MS:
+        raise PlanError(f"The plan could wait up to {total_timeout / 1000:g}s; the limit is "
+                        f"{MAX_PLAN_TIMEOUT_MS / 1000:g}s")
+    return wire
+
+
+def encode_plan(plan_id: str, wire_steps: list[dict]) -> bytes:
+    """The `dom-plan` message for `wire_steps`, enforcing MAX_PLAN_BYTES."""
+    payload = json.dumps({"type": "dom-plan", "actionId": plan_id, "steps": wire_steps},
+                         ensure_ascii=False).encode("utf-8")
+    if len(payload) > MAX_PLAN_BYTES:
+        raise PlanError(f"The plan is {len(payload)} bytes, over the {MAX_PLAN_BYTES}-byte limit")
+    return payload
+
+
+def describe_steps(steps: list[dict], total: int) -> str:
+    """Summarize `dom-plan-step` acks, e.g. "2 of 3 steps done: ok, ok, failed (...)"."""
+    done = sum(1 for step in steps if step.get("status") == "ok")
+    statuses = ", ".join(
+        step.get("status", "?") + (f" ({step['detail']})" if step.get("status") == "failed" and step.get("detail")
+                                   else "")
+        for step in steps
+    )
+    return f"{done} of {total} steps done: {statuses}" if steps else f"0 of {total} steps acknowledged"
@@ -0,0 +1,165 @@
+"""
+Sliding-window chat history for long voice sessions.
+
+AgentSession appends every turn to the agent's chat context. A room that stays
+open all day would otherwise send its whole history to the LLM on every
+turn. HistoryWindow keeps:
+- the instructions
+- the last HISTORY_RECENT_TURNS user turns verbatim
+- one system message with a running summary of everything older
+
+Most old turns are navigation, so the summary mostly counts the pages
+visited. It also lists the reports opened, other tools used and the last few
+questions asked. The summary is built without an LLM call, and its size is
+bounded by construction.
+
+Trimming happens in chunks: only once the history holds twice the window
+(HISTORY_RECENT_TURNS more turns than it keeps). Between trims the prompt
+prefix stays identical, so provider-side prompt caching keeps working. When
+trimming, tool calls and their results are dropped from all but the last
+HISTORY_TOOL_TURNS kept turns. The assistant's reply after a tool call
+already says what it did.
+"""
+
+import json
+import os
+from collections import Counter
+
+from livekit.agents.llm import ChatContext, ChatMessage
+
+from intent_router import IntentRouter
+from routes import ROUTES, ROUTES_BY_NAME
+
+# User turns kept verbatim (the history grows to twice this before a trim)
+HISTORY_RECENT_TURNS = int(os.getenv("AGENT_HISTORY_RECENT_TURNS", "8"))
+
+# Kept turns that keep their tool calls and results
+HISTORY_TOOL_TURNS = int(os.getenv("AGENT_HISTORY_TOOL_TURNS", "2"))
+
+SUMMARY_MESSAGE_ID = "history-summary"
+
+# Entries of each summary list, and characters of a quoted question
+MAX_SUMMARY_ENTRIES = 5
+MAX_QUOTE_CHARS = 80
+
+_TOOL_ITEMS = ("function_call", "function_call_output")
+
+_router = IntentRouter(ROUTES)
+
+
+class HistoryStats:
+    """Trims of a session: how many, and the items they removed."""
+
+    def __init__(self):
+        self.trims = 0
+        self.turns_summarized = 0
+        self.items_removed = 0
+
+    def record(self, turns: int, items: int) -> None:
+        self.trims += 1
+        self.turns_summarized += turns
+        self.items_removed += items
+
+    def summary(self) -> dict:
+        return {"trims": self.trims, "turns_summarized": self.turns_summarized,
+                "items_removed": self.items_removed}
+
+
+def _split_turns(items: list) -> tuple[list, list[list]]:
+    """(leading items, turns): each turn is a user message and what follows it."""
+    head, turns = [], []
+    for item in items:
+        if item.type == "message" and item.role == "user":
+            turns.append([item])
+        elif turns:
+            turns[-1].append(item)
+        else:
+            head.append(item)
+    return head, turns
+
+
+class HistoryWindow:
+    """Keeps recent turns verbatim and folds older ones into a running summary."""
+
+    def __init__(self, recent_turns: int = HISTORY_RECENT_TURNS, tool_turns: int = HISTORY_TOOL_TURNS):
+        self.recent_turns = recent_turns
+        self.tool_turns = tool_turns
+        self.stats = HistoryStats()
+        self._turns = 0
+        self._pages: Counter[str] = Counter()
+        self._reports: list[str] = []
+        self._tools: Counter[str] = Counter()
+        self._questions: list[str] = []
+        self._stripped: dict[str, list] = {}  # user message id -> tool calls dropped from its turn
+
+    def trim(self, chat_ctx: ChatContext) -> ChatContext | None:
+        """A trimmed copy of `chat_ctx`, or None while it is within bounds."""
+        head, turns = _split_turns(chat_ctx.items)
+        if len(turns) <= 2 * self.recent_turns:
+            return None
+
+        old, kept = turns[:-self.recent_turns], turns[-self.recent_turns:]
+        for turn in old:
+            self._summarize(turn)
+
+        items = [item for item in head if item.id != SUMMARY_MESSAGE_ID]
+        # Items are kept sorted by created_at (new turns are inserted by it)
+        items.append(ChatMessage(id=SUMMARY_MESSAGE_ID, role="system", content=[self.render()],
+                                 created_at=kept[0][0].created_at - 1e-3))
+        for i, turn in enumerate(kept):
+            if i < len(kept) - self.tool_turns:
+                calls = [item for item in turn if item.type == "function_call"]
+                if calls:
+                    self._stripped.setdefault(turn[0].id, []).extend(calls)
+                turn = [item for item in turn if item.type not in _TOOL_ITEMS]
+            items.extend(turn)
+
+        before = len(chat_ctx.items)
+        self.stats.record(len(old), before - len(items) + 1)
+        return ChatContext(items)
+
+    def _summarize(self, turn: list) -> None:
+        self._turns += 1
+        calls = self._stripped.pop(turn[0].id, []) + [item for item in turn if item.type == "function_call"]
+        for call in calls:
+            try:
+                arguments = json.loads(call.arguments or "{}")
+            except ValueError:
+                arguments = {}
+            if call.name == "navigate" and arguments.get("route") in ROUTES_BY_NAME:
+                self._pages[arguments["route"]] += 1
+            elif call.name == "view_report_by_date":
+                self._remember(self._reports, f"{arguments.get('report_type') or 'whatsapp'} report of "
+                                              f"{arguments.get('date') or '?'}")
+            else:
+                self._tools[call.name] += 1
+        if calls:
+            return
+
+        said = turn[0].text_content or ""
+        match = _router.match(said)
+        if match is not None:  # fast-path navigation: no tool call in the history
+            self._pages[match.route] += 1
+        else:
+            self._remember(self._questions, said[:MAX_QUOTE_CHARS])
+
+    @staticmethod
+    def _remember(entries: list[str], entry: str) -> None:
+        if entry in entries:
+            entries.remove(entry)
+        entries.append(entry)
+        del entries[:-MAX_SUMMARY_ENTRIES]
+
+    def render(self) -> str:
+        lines = [f"Summary of the {self._turns} earlier turns of this conversation:"]
+        if self._pages:
+            pages = ", ".join(f"{ROUTES_BY_NAME[name].label_en}" + (f" (x{count})" if count > 1 else "")
+                              for name, count in self._pages.most_common())
+            lines.append(f"- Pages visited: {pages}")
+        if self._reports:
+            lines.append(f"- Reports opened (latest last): {'; '.join(self._reports)}")
+        if self._tools:
+            lines.append(f"- Other actions: {', '.join(f'{name} x{n}' for name, n in self._tools.most_common())}")
+        if self._questions:
+            lines.append(f"- Recent questions: {' | '.join(self._questions)}")
+        return "\n".join(lines)
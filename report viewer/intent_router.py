@@ -0,0 +1,169 @@
+"""
+Deterministic fast-path intent router for plain navigation commands.
+
+Matches the final STT transcript of a turn against the route aliases in
+routes.py, so that commands like "افتح الداشبورد" or
+"open WhatsApp reports" can be published straight to the frontend without an
+LLM round-trip. Anything ambiguous (several sections, dates, questions, clicks,
+negations, long sentences) returns None and is left to the LLM.
+"""
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from routes import Route
+
+# ==================== TEXT NORMALIZATION ====================
+
+_ARABIC_MARKS = re.compile(r'[\u064B-\u0652\u0670\u0640]')  # harakat, dagger alef, tatweel
+_ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ة': 'ه', 'ؤ': 'و', 'ئ': 'ي',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+})
+_TOKEN = re.compile(r'[a-z0-9]+|[\u0621-\u064A]+')
+_ARABIC_PREFIXES = ('وال', 'بال', 'فال', 'لل', 'ال')
+_ARABIC_CHAR = re.compile(r'[\u0600-\u06FF]')
+
+
+def _stem(token: str) -> str:
+    """Strip the Arabic definite article and simple English plurals."""
+    if _ARABIC_CHAR.match(token):
+        for prefix in _ARABIC_PREFIXES:
+            if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+                return token[len(prefix):]
+        return token
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop Arabic diacritics, unify alef/yaa/taa marbuta and Arabic-Indic digits."""
+    return _ARABIC_MARKS.sub('', text.lower()).translate(_ARABIC_LETTERS)
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalize Arabic/English text and split it into stemmed tokens."""
+    return [_stem(t) for t in _TOKEN.findall(normalize(text))]
+
+
+# Filler words that carry no section information (already normalized/stemmed)
+STOPWORDS = frozenset(tokenize("""
+    go to the a an my me i us you we please can could would let want need get
+    of for on at in and now just navigate show open see view take bring up
+    redirect switch page report data
+    عايز عاوز عايزه عاوزه اروح روح روحي نروح علي الي افتح افتحي افتحلي وريني
+    ورينا اعرض اعرضلي شوف اشوف هات خدني صفحه تقارير تقرير بتاع بتاعه لو سمحت
+    ممكن انا يا من في دلوقتي
+"""))
+
+# Words that mark the utterance as a navigation command
+NAVIGATION_CUES = frozenset(tokenize("""
+    go open show navigate take bring see view redirect switch
+    اروح روح روحي نروح افتح افتحي افتحلي وريني ورينا اعرض اعرضلي شوف اشوف هات
+    خدني عايز عاوز عايزه عاوزه
+"""))
+
+# Words that mean the user wants something other than a plain page switch:
+# dates (view_report_by_date), questions, clicks/form input, negations.
+DECLINE_WORDS = frozenset(tokenize("""
+    jan january feb february mar march apr april may jun june jul july aug
+    august sep sept september oct october nov november dec december
+    today yesterday tomorrow last week month year
+    what how why when where which who click press select choose fill type
+    search filter find read tell not dont don no never
+    يناير فبراير مارس ابريل مايو يونيو يوليو اغسطس سبتمبر اكتوبر نوفمبر ديسمبر
+    النهارده امبارح بكره امس اسبوع شهر سنه
+    ايه ازاي ليه امتي فين مين اضغط دوس اختار اكتب ابحث اقرا قولي مش لا متفتحش
+"""))
+
+
+# ==================== ROUTER ====================
+
+def detect_language(text: str) -> str:
+    """'ar' if the text has any Arabic letters, else 'en'."""
+    return 'ar' if _ARABIC_CHAR.search(text) else 'en'
+
+
+def split_confirmation(confirmation: str, language: str) -> str:
+    """Pick the Arabic or English half of a bilingual "عربي... English..." confirmation."""
+    arabic, sep, english = confirmation.partition('... ')
+    if not sep:
+        return confirmation
+    return f"{arabic}..." if language == 'ar' else english
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    """A confident match of an utterance to a single route."""
+    route: str
+    pathname: str
+    confirmation: str
+    language: str
+    confidence: float
+
+    @property
+    def spoken_confirmation(self) -> str:
+        return split_confirmation(self.confirmation, self.language)
+
+
+class IntentRouter:
+    """Keyword router over the route registry's aliases.
+
+    Each route owns the non-filler words of its aliases ("whatsapp", "واتساب",
+    "انتاجيه", ...). Words shared by more than one route are discarded, so a
+    match always names exactly one section.
+    """
+
+    def __init__(self, routes: Iterable[Route], min_confidence: float = 0.6, max_tokens: int = 10):
+        self.min_confidence = min_confidence
+        self.max_tokens = max_tokens
+
+        owners: dict[str, set[Route]] = {}
+        for route in routes:
+            for alias in route.aliases:
+                for token in tokenize(alias):
+                    if token not in STOPWORDS and token not in DECLINE_WORDS:
+                        owners.setdefault(token, set()).add(route)
+
+        self.keywords: dict[str, Route] = {
+            token: next(iter(owned)) for token, owned in owners.items() if len(owned) == 1
+        }
+
+    def match(self, transcript: str) -> IntentMatch | None:
+        """Return the navigation intent of `transcript`, or None to defer to the LLM."""
+        tokens = tokenize(transcript)
+        if not tokens or len(tokens) > self.max_tokens:
+            return None
+
+        routes = set()
+        hits = unknown = 0
+        has_cue = False
+        for token in tokens:
+            if token in DECLINE_WORDS or token.isdigit():
+                return None
+            route = self.keywords.get(token)
+            if route is not None:
+                routes.add(route)
+                hits += 1
+            elif token in NAVIGATION_CUES:
+                has_cue = True
+            elif token not in STOPWORDS:
+                unknown += 1
+
+        if len(routes) != 1:
+            return None
+        # A bare section name ("تقارير الواتساب") is fine, anything with
+        # unrecognized words needs an explicit navigation verb.
+        if unknown and not has_cue:
+            return None
+
+        confidence = hits / (hits + unknown)
+        if confidence < self.min_confidence:
+            return None
+
+        route = routes.pop()
+        return IntentMatch(route.name, route.pathname, route.confirmation, detect_language(transcript), confidence)
@@ -0,0 +1,135 @@
+"""
+Cancellation of page-driving tools when the user barges in or moves on.
+
+AgentSession only cancels a turn's tools while its reply is still being
+generated. Once the reply has been spoken it waits for the tools to finish,
+even if the user has already said something else. A view_report_by_date
+waiting for its page would then still navigate and click long after the
+user asked for another page.
+
+ToolRuns tracks the tools wrapped with @interruptible and cancels them when:
+- a transcript arrives while they run (barge-in): interim or final, with at
+  least BARGE_IN_MIN_WORDS words that are not BACKCHANNEL_WORDS
+- the user's next turn is committed (on_user_turn_completed), unless it is
+  only an acknowledgement: "ok", "تمام" or "yes" said while the agent waits
+  for a page keeps the request going
+- a tool of a newer reply starts
+
+A cancelled tool stops at its current await. A navigation it has not yet
+published is dropped. Its pending DOM actions are revoked on the frontend
+(PendingActionRegistry sends `dom-action-cancel`). It ends with StopResponse,
+so the LLM does not answer for a request the user has abandoned.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from collections import Counter
+
+from livekit.agents import RunContext, StopResponse
+
+from intent_router import tokenize
+
+logger = logging.getLogger("agent-tools")
+
+# Transcript words (acknowledgements aside) that count as barging in
+BARGE_IN_MIN_WORDS = int(os.getenv("AGENT_BARGE_IN_MIN_WORDS", "2"))
+
+# Acknowledgements and fillers said while the agent works: neither a barge-in nor a new request
+BACKCHANNEL_WORDS = frozenset(tokenize("""
+    ok okay yes yeah yep sure right fine alright good thanks thank uh um hmm mhm huh
+    تمام ماشي اه ايوه طيب حاضر اوكي شكرا كويس
+"""))
+
+
+def is_backchannel(text: str) -> bool:
+    """True when `text` is only acknowledgements and fillers ("ok", "تمام", "yes yes")."""
+    return all(word in BACKCHANNEL_WORDS for word in tokenize(text))
+
+
+class InterruptionStats:
+    """Tool runs of a session: how many started, and how many were cancelled and why."""
+
+    def __init__(self):
+        self.runs = 0
+        self.cancelled: Counter[str] = Counter()
+
+    def record(self, reason: str, runs: int) -> None:
+        self.cancelled[reason] += runs
+
+    def summary(self) -> dict:
+        return {"runs": self.runs, **{f"cancelled_{reason}": n for reason, n in sorted(self.cancelled.items())}}
+
+
+class ToolRuns:
+    """In-flight @interruptible tools of one room, keyed by the reply (speech) that called them."""
+
+    def __init__(self):
+        self.stats = InterruptionStats()
+        self._runs: dict[asyncio.Task, str] = {}
+        self._cancelled: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def attach(self, session) -> None:
+        """Cancel in-flight tools on the user's transcripts."""
+        session.on("user_input_transcribed", self.on_transcript)
+
+    def on_transcript(self, ev) -> None:
+        if not self._runs:
+            return
+        words = [word for word in tokenize(ev.transcript) if word not in BACKCHANNEL_WORDS]
+        if len(words) >= BARGE_IN_MIN_WORDS:
+            self.cancel("barge_in")
+
+    def on_user_turn(self, text: str) -> None:
+        """The user's turn was committed: a new request supersedes the running tools, an acknowledgement doesn't."""
+        if not is_backchannel(text):
+            self.cancel("new_turn")
+
+    def cancel(self, reason: str, keep: str | None = None) -> int:
+        """Cancel the in-flight tools (except those of reply `keep`). Returns how many."""
+        tasks = [task for task, speech_id in self._runs.items()
+                 if speech_id != keep and task not in self._cancelled and not task.done()]
+        for task in tasks:
+            self._cancelled.add(task)
+            task.cancel()
+        if tasks:
+            self.stats.record(reason, len(tasks))
+            logger.info(f"Cancelled {len(tasks)} in-flight tool(s): {reason}")
+        return len(tasks)
+
+    async def run(self, speech_id: str, coro):
+        """Await `coro` as a tool of reply `speech_id`; StopResponse if it gets cancelled."""
+        self.cancel("superseded", keep=speech_id)
+        self.stats.runs += 1
+        task = asyncio.get_running_loop().create_task(coro)
+        self._runs[task] = speech_id
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if task in self._cancelled and not asyncio.current_task().cancelling():
+                raise StopResponse() from None
+            raise
+        finally:
+            self._runs.pop(task, None)
+            self._cancelled.discard(task)
+
+
+def interruptible(func):
+    """Run a function tool under its room's ToolRuns (agent._tool_runs), when there is one.
+
+    Goes under @function_tool, which still sees the wrapped signature.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        context = next((a for a in (*args, *kwargs.values()) if isinstance(a, RunContext)), None)
+        runs = getattr(context.session.current_agent, "_tool_runs", None) if context is not None else None
+        if runs is None:
+            return await func(*args, **kwargs)
+        return await runs.run(context.speech_handle.id, func(*args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,331 @@
+"""
+In-worker KPI aggregates for numbers asked by voice: "how many WhatsApp
+reports this month", "أداء الإعلانات الأسبوع ده".
+
+Four tables feed them:
+- reports: reports per dashboard section, by report_date
+- posts: posts created (created_at), published (posted_at) and failed to
+  publish (posting_status, on their updated_at), per platform
+- content: content ideas added (created_at) and posted (is_posted, on their
+  updated_at)
+- bot_status: which bots are active now (a snapshot, not a series)
+
+The counts are one int32 matrix: a row per (metric, group) series, a column
+per day. Its prefix sums are cached, so a range total costs two lookups per
+series, however long the range. Each table row remembers the cells it was
+counted in. When an update moves it (a post gets published, a report changes
+date), it is taken out of them before being counted again. Cells change in
+bulk, with np.add.at over a whole page of rows.
+
+The aggregates are loaded once per worker process and refreshed
+incrementally by updated_at (bot_status: last_updated) every KPI_REFRESH
+seconds. Rows deleted in the database stay counted until the worker
+restarts. Timestamps count on their day at UTC+KPI_UTC_OFFSET_HOURS (Cairo
+winter time by default).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import date, timedelta
+from typing import Literal
+
+import numpy as np
+
+from routes import ROUTES_BY_PATH, SECTION_PATHS
+from supabase_client import SupabaseError, get_supabase
+
+logger = logging.getLogger("agent-data")
+
+# Seconds before a query triggers an incremental refresh
+KPI_REFRESH = float(os.getenv("KPI_REFRESH", "60"))
+
+# Hours added to UTC timestamps before taking their day
+KPI_UTC_OFFSET_HOURS = float(os.getenv("KPI_UTC_OFFSET_HOURS", "2"))
+
+PAGE_ROWS = 1000           # rows per PostgREST request when loading
+DAY_PADDING = 64           # spare day columns added when the matrix grows
+
+# Table -> (columns to fetch, timestamp the incremental refresh follows)
+SOURCES = {
+    "reports": ("id,section,report_date,updated_at", "updated_at"),
+    "posts": ("id,platform,posting_status,created_at,posted_at,updated_at", "updated_at"),
+    "content": ("id,is_posted,created_at,updated_at", "updated_at"),
+    "bot_status": ("id,bot_name,is_active,last_updated", "last_updated"),
+}
+
+# Series metrics -> how they are spoken
+METRICS = {
+    "reports": "reports",
+    "posts_created": "posts created",
+    "posts_published": "posts published",
+    "posts_failed": "posts that failed to publish",
+    "content_created": "content ideas added",
+    "content_posted": "content ideas posted",
+}
+BOTS_METRIC = "bots_active"
+
+# get_kpi's metric argument (an enum in its schema)
+KPIMetric = Literal[tuple(METRICS) + (BOTS_METRIC,)]
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _day_number(day: date) -> int:
+    return (day - _EPOCH).days
+
+
+def _date(day_number: int) -> date:
+    return _EPOCH + timedelta(days=int(day_number))
+
+
+def day_numbers(values: list[str], timestamps: bool) -> np.ndarray:
+    """Days since 1970-01-01 of ISO dates, or of UTC timestamps shifted by KPI_UTC_OFFSET_HOURS."""
+    if not values:
+        return np.empty(0, dtype=np.int64)
+    if not timestamps:
+        return np.array([v[:10] for v in values], dtype="datetime64[D]").astype(np.int64)
+    seconds = np.array([v[:19] for v in values], dtype="datetime64[s]")
+    seconds = seconds + np.timedelta64(int(KPI_UTC_OFFSET_HOURS * 3600), "s")
+    return seconds.astype("datetime64[D]").astype(np.int64)
+
+
+def _row_cells(table: str, row: dict) -> list[tuple[str, str, str, bool]]:
+    """(metric, group, date or timestamp, is timestamp) cells a table row counts in."""
+    if table == "reports":
+        return [("reports", row["section"], str(row["report_date"]), False)]
+    if table == "posts":
+        platform = (row.get("platform") or "").lower()
+        cells = [("posts_created", platform, row["created_at"], True)]
+        if row.get("posted_at"):
+            cells.append(("posts_published", platform, row["posted_at"], True))
+        if row.get("posting_status") == "failed":
+            cells.append(("posts_failed", platform, row["updated_at"], True))
+        return cells
+    if table == "content":
+        cells = [("content_created", "", row["created_at"], True)]
+        if row.get("is_posted"):
+            cells.append(("content_posted", "", row["updated_at"], True))
+        return cells
+    return []
+
+
+def group_label(metric: str, group: str) -> str:
+    """A series' group as spoken: "WhatsApp reports" for a section, the platform name for posts."""
+    if metric == "reports":
+        route = ROUTES_BY_PATH.get(SECTION_PATHS.get(group, ""))
+        return route.label_en if route is not None else group
+    return group or "all"
+
+
+class KPIAggregates:
+    """Per-day counts of every (metric, group) series, with range totals from prefix sums."""
+
+    def __init__(self):
+        self._series: dict[tuple[str, str], int] = {}
+        self._metric_rows: dict[str, list[int]] = {}
+        self._counts = np.zeros((0, 0), dtype=np.int32)
+        self._origin = 0  # day number of column 0
+        self._prefix: np.ndarray | None = None
+        self._cells: dict[tuple[str, str], tuple[tuple[int, int], ...]] = {}  # (table, id) -> (series, day)
+        self.bots: dict[str, bool] = {}
+        self.high_water: dict[str, str] = {}
+        self._at_high_water: dict[str, set[str]] = {}  # table -> ids of the rows stamped with its high water
+        self.loaded = False
+        self.refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        """Table rows counted."""
+        return len(self._cells) + len(self.bots)
+
+    @property
+    def days(self) -> tuple[date, date] | None:
+        """First and last day with any count."""
+        if not self._counts.size:
+            return None
+        columns = np.flatnonzero(self._counts.any(axis=0))
+        if not len(columns):
+            return None
+        return _date(self._origin + columns[0]), _date(self._origin + columns[-1])
+
+    # ---------- updates ----------
+
+    def apply(self, table: str, rows: list[dict]) -> int:
+        """Count (or recount) `table` rows. Returns rows applied."""
+        if not rows:
+            return 0
+        stamp = SOURCES[table][1]
+        for row in rows:
+            value = str(row.get(stamp) or "")
+            if value > self.high_water.get(table, ""):
+                self.high_water[table] = value
+                self._at_high_water[table] = {row["id"]}
+            elif value == self.high_water.get(table):
+                self._at_high_water[table].add(row["id"])
+        if table == "bot_status":
+            for row in rows:
+                self.bots[row["bot_name"]] = bool(row.get("is_active"))
+            return len(rows)
+
+        owners, series, values, is_timestamp = [], [], [], []
+        old_series, old_days = [], []
+        for row in rows:
+            for s, d in self._cells.pop((table, row["id"]), ()):
+                old_series.append(s)
+                old_days.append(d)
+            for metric, group, value, timestamp in _row_cells(table, row):
+                owners.append(row["id"])
+                series.append(self._series_row(metric, group))
+                values.append(value)
+                is_timestamp.append(timestamp)
+
+        is_timestamp = np.array(is_timestamp, dtype=bool)
+        days = np.empty(len(values), dtype=np.int64)
+        days[~is_timestamp] = day_numbers([v for v, t in zip(values, is_timestamp) if not t], False)
+        days[is_timestamp] = day_numbers([v for v, t in zip(values, is_timestamp) if t], True)
+        series = np.array(series, dtype=np.int64)
+
+        if len(days):
+            self._ensure_days(int(days.min()), int(days.max()))
+        if old_series:
+            np.subtract.at(self._counts, (np.array(old_series), np.array(old_days) - self._origin), 1)
+        np.add.at(self._counts, (series, days - self._origin), 1)
+        self._prefix = None
+
+        cells: dict[str, list[tuple[int, int]]] = {}
+        for owner, s, d in zip(owners, series.tolist(), days.tolist()):
+            cells.setdefault(owner, []).append((s, d))
+        for owner, owned in cells.items():
+            self._cells[(table, owner)] = tuple(owned)
+        return len(rows)
+
+    def _series_row(self, metric: str, group: str) -> int:
+        row = self._series.get((metric, group))
+        if row is None:
+            row = self._series[(metric, group)] = len(self._series)
+            self._metric_rows.setdefault(metric, []).append(row)
+            self._counts = np.vstack([self._counts, np.zeros((1, self._counts.shape[1]), dtype=np.int32)])
+        return row
+
+    def _ensure_days(self, first: int, last: int) -> None:
+        """Grow the matrix (with some padding) to have columns for days `first` to `last`."""
+        width = self._counts.shape[1]
+        if width == 0:
+            self._origin = first - DAY_PADDING
+            self._counts = np.zeros((len(self._series), last - first + 1 + 2 * DAY_PADDING), dtype=np.int32)
+            return
+        left = max(0, self._origin - first + DAY_PADDING) if first < self._origin else 0
+        right = max(0, last - (self._origin + width - 1) + DAY_PADDING) if last >= self._origin + width else 0
+        if left or right:
+            self._counts = np.pad(self._counts, ((0, 0), (left, right)))
+            self._origin -= left
+
+    # ---------- queries ----------
+
+    def _prefix_sums(self) -> np.ndarray:
+        if self._prefix is None:
+            prefix = np.zeros((self._counts.shape[0], self._counts.shape[1] + 1), dtype=np.int64)
+            np.cumsum(self._counts, axis=1, out=prefix[:, 1:])
+            self._prefix = prefix
+        return self._prefix
+
+    def _columns(self, start: date, end: date) -> tuple[int, int]:
+        """Column span [a, b) of the days from `start` to `end`, clipped to the matrix."""
+        width = self._counts.shape[1]
+        a = min(max(_day_number(start) - self._origin, 0), width)
+        b = min(max(_day_number(end) - self._origin + 1, 0), width)
+        return a, max(a, b)
+
+    def _rows(self, metric: str, group: str | None) -> list[int]:
+        if group is None:
+            return self._metric_rows.get(metric, [])
+        row = self._series.get((metric, group))
+        return [] if row is None else [row]
+
+    def total(self, metric: str, start: date, end: date, group: str | None = None) -> int:
+        """Count of `metric` from `start` to `end` (inclusive), for one group or all of them."""
+        rows = self._rows(metric, group)
+        if not rows:
+            return 0
+        a, b = self._columns(start, end)
+        prefix = self._prefix_sums()
+        return int((prefix[rows, b] - prefix[rows, a]).sum())
+
+    def by_group(self, metric: str, start: date, end: date) -> dict[str, int]:
+        """Count of `metric` per group from `start` to `end`, largest first."""
+        a, b = self._columns(start, end)
+        prefix = self._prefix_sums()
+        totals = {group: int(prefix[row, b] - prefix[row, a])
+                  for (m, group), row in self._series.items() if m == metric}
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def daily(self, metric: str, start: date, end: date, group: str | None = None) -> np.ndarray:
+        """Count of `metric` on each day from `start` to `end`."""
+        result = np.zeros((end - start).days + 1, dtype=np.int64)
+        rows = self._rows(metric, group)
+        a, b = self._columns(start, end)
+        if rows and b > a:
+            offset = self._origin + a - _day_number(start)
+            result[offset:offset + b - a] = self._counts[rows, a:b].sum(axis=0)
+        return result
+
+    # ---------- Supabase ----------
+
+    async def refresh(self, client) -> int:
+        """Fetch rows updated since the last refresh (all rows the first time), page by page.
+
+        Rows stamped with the high-water mark itself are fetched again (gte):
+        another row written in the same microsecond may not have been
+        committed at the last refresh. The ones already counted are skipped.
+        Returns rows applied.
+        """
+        changed = 0
+        for table, (columns, stamp) in SOURCES.items():
+            since = self.high_water.get(table)
+            filters = {stamp: f"gte.{since}"} if since else None
+            counted = set(self._at_high_water.get(table, ()))
+            offset = 0
+            while True:
+                rows = await client.select(table, columns, filters=filters, order=f"{stamp}.asc,id.asc",
+                                           limit=PAGE_ROWS, offset=offset)
+                fresh = [row for row in rows if row["id"] not in counted or str(row.get(stamp) or "") != since]
+                changed += self.apply(table, fresh)
+                if len(rows) < PAGE_ROWS:
+                    break
+                offset += PAGE_ROWS
+        self.loaded = True
+        self.refreshed_at = time.monotonic()
+        return changed
+
+
+_aggregates = KPIAggregates()
+_aggregates_lock: asyncio.Lock | None = None
+
+
+async def get_kpi_aggregates() -> KPIAggregates | None:
+    """This worker's KPI aggregates, loaded on first use and refreshed when stale.
+
+    Returns None when Supabase isn't configured or the first load failed.
+    """
+    global _aggregates_lock
+    client = get_supabase()
+    if client is None:
+        return None
+    if _aggregates_lock is None:
+        _aggregates_lock = asyncio.Lock()
+
+    async with _aggregates_lock:
+        if not _aggregates.loaded or time.monotonic() - _aggregates.refreshed_at > KPI_REFRESH:
+            first = not _aggregates.loaded
+            start = time.perf_counter()
+            try:
+                changed = await _aggregates.refresh(client)
+            except SupabaseError as e:
+                logger.warning(f"KPI aggregates {'unavailable' if first else 'refresh failed'}: {e}")
+                _aggregates.refreshed_at = time.monotonic()
+            else:
+                if first or changed:
+                    logger.info(f"KPI aggregates {'loaded' if first else 'refreshed'}: {changed} rows in "
+                                f"{(time.perf_counter() - start) * 1000:.0f}ms")
+    return _aggregates if _aggregates.loaded else None
@@ -0,0 +1,252 @@
+"""
+Per-room outbound queue for the agent's data-channel messages.
+
+Every publish_data of the agent goes through one OutboundQueue per room.
+Without it, a tool stuck in a loop (or a burst of interim transcripts) puts
+every message on the wire, and the frontend runs each one in turn. The queue
+bounds what a room can send:
+- coalescing: a message with a `key` replaces a queued, not yet sent message
+  with the same key. Only the latest navigation goes out, and repeated
+  capability and page-content requests collapse into one. The replaced
+  sender gets "merged".
+- rate limiting: a token bucket per topic (OUTBOUND_RATE messages/s, bursts
+  of OUTBOUND_BURST). Droppable messages (prefetch hints) that find their
+  bucket empty are dropped rather than delayed, since a late hint is useless.
+  At most OUTBOUND_MAX_QUEUED messages wait. Past that, the oldest droppable
+  one is dropped, or else the new one.
+- batching: a message to an idle room goes out at once. Messages that come
+  within OUTBOUND_FRAME_MS of a publish go out together at the end of the
+  frame, as one `batch` packet on the topic the frontend announced
+  (BatchedDataRelay re-emits each message on its own topic). Frontends that
+  announce no batch topic get one packet per message.
+
+Metadata navigation (set_metadata) bypasses the queue, since it is
+last-write-wins already.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from dataclasses import dataclass, field
+
+from tracing import traced_publish
+
+logger = logging.getLogger("agent-tools")
+
+# Messages per second per topic, and the burst a topic may send at once
+OUTBOUND_RATE = float(os.getenv("AGENT_OUTBOUND_RATE", "20"))
+OUTBOUND_BURST = int(os.getenv("AGENT_OUTBOUND_BURST", "10"))
+
+# Window (ms) after a publish in which further messages are batched together
+OUTBOUND_FRAME_MS = float(os.getenv("AGENT_OUTBOUND_FRAME_MS", "20"))
+
+# Messages waiting in a room's queue before new ones are dropped
+OUTBOUND_MAX_QUEUED = int(os.getenv("AGENT_OUTBOUND_MAX_QUEUED", "32"))
+
+BATCH_TYPE = "batch"
+
+SENT, MERGED, DROPPED = "sent", "merged", "dropped"
+
+
+class OutboundStats:
+    """What a room's queue did with its messages, and what it put on the wire."""
+
+    def __init__(self):
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+        self.batched = 0
+        self.packets = 0
+        self.bytes_sent = 0
+        self.failures = 0
+
+    def record(self, messages: int, size: int, batched: bool = False) -> None:
+        self.sent += messages
+        self.packets += 1
+        self.bytes_sent += size
+        if batched:
+            self.batched += messages
+
+    def summary(self) -> dict:
+        return {"sent": self.sent, "packets": self.packets, "bytes_sent": self.bytes_sent,
+                "batched": self.batched, "merged": self.merged, "dropped": self.dropped,
+                "failures": self.failures}
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float = OUTBOUND_RATE, burst: int = OUTBOUND_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> bool:
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+@dataclass(eq=False)
+class _Message:
+    payload: bytes
+    topic: str
+    key: str | None
+    droppable: bool
+    label: str
+    future: asyncio.Future = field(repr=False)
+
+
+class OutboundQueue:
+    """Coalesces, rate limits and batches one room's publish_data calls."""
+
+    def __init__(self, room, capabilities=None):
+        self._room = weakref.ref(room)  # the registry is keyed by the room, so don't keep it alive
+        self.capabilities = capabilities  # ClientCapabilities: which batch topic the frontend announced
+        self.stats = OutboundStats()
+        self._queue: list[_Message] = []
+        self._buckets: dict[str, TokenBucket] = {}
+        self._next_flush = 0.0
+        self._flusher: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def room(self):
+        return self._room()
+
+    async def send(self, payload: bytes, topic: str, *, key: str | None = None, droppable: bool = False,
+                   label: str | None = None) -> str:
+        """Queue `payload` for `topic` and wait until it is sent, merged or dropped.
+
+        Raises what publish_data raised. A caller cancelled while its message
+        still waits takes the message out of the queue.
+        """
+        loop = asyncio.get_running_loop()
+        message = _Message(payload, topic, key, droppable, label or topic, loop.create_future())
+        if not self._enqueue(message):
+            return DROPPED
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush_loop())
+        try:
+            return await asyncio.shield(message.future)
+        except asyncio.CancelledError:
+            if message in self._queue:
+                self._queue.remove(message)
+            # A publish error nobody awaits any more must not be logged as unretrieved
+            message.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            raise
+
+    def _enqueue(self, message: _Message) -> bool:
+        if message.key is not None:
+            for i, queued in enumerate(self._queue):
+                if queued.key == message.key:
+                    self._queue[i] = message
+                    self._resolve(queued, MERGED)
+                    self.stats.merged += 1
+                    return True
+        if len(self._queue) >= OUTBOUND_MAX_QUEUED:
+            victim = next((queued for queued in self._queue if queued.droppable), None)
+            if victim is None:
+                self.stats.dropped += 1
+                logger.warning(f"Outbound queue full, dropping {message.label} message")
+                return False
+            self._drop(victim)
+        self._queue.append(message)
+        return True
+
+    def _drop(self, message: _Message) -> None:
+        self._queue.remove(message)
+        self._resolve(message, DROPPED)
+        self.stats.dropped += 1
+
+    @staticmethod
+    def _resolve(message: _Message, outcome: str) -> None:
+        if not message.future.done():
+            message.future.set_result(outcome)
+
+    def _bucket(self, topic: str) -> TokenBucket:
+        bucket = self._buckets.get(topic)
+        if bucket is None:
+            bucket = self._buckets[topic] = TokenBucket()
+        return bucket
+
+    def _take_ready(self) -> list[_Message]:
+        """Messages whose topic has a token, in queue order; droppable ones without a token are dropped."""
+        ready, waiting, blocked = [], [], set()
+        for message in self._queue:
+            if message.topic not in blocked and self._bucket(message.topic).take():
+                ready.append(message)
+            elif message.droppable:
+                self._resolve(message, DROPPED)
+                self.stats.dropped += 1
+            else:
+                blocked.add(message.topic)  # keep the topic's order
+                waiting.append(message)
+        self._queue = waiting
+        return ready
+
+    async def _flush_loop(self) -> None:
+        while self._queue:
+            delay = self._next_flush - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            ready = self._take_ready()
+            if not ready:
+                if self._queue:
+                    await asyncio.sleep(min(self._bucket(m.topic).wait_time() for m in self._queue))
+                continue
+            self._next_flush = time.monotonic() + OUTBOUND_FRAME_MS / 1000
+            await self._publish(ready)
+
+    async def _publish(self, messages: list[_Message]) -> None:
+        batch_topic = getattr(self.capabilities, "batch_topic", None)
+        if batch_topic and len(messages) > 1:
+            payload = json.dumps({"type": BATCH_TYPE, "messages": [
+                {"topic": m.topic, "payload": m.payload.decode("utf-8")} for m in messages]}).encode("utf-8")
+            await self._publish_packet(messages, payload, batch_topic, BATCH_TYPE)
+        else:
+            for message in messages:
+                await self._publish_packet([message], message.payload, message.topic, message.label)
+
+    async def _publish_packet(self, messages: list[_Message], payload: bytes, topic: str, label: str) -> None:
+        try:
+            with traced_publish(label, len(payload)):
+                await self.room.local_participant.publish_data(payload, reliable=True, topic=topic)
+        except Exception as e:
+            self.stats.failures += 1
+            for message in messages:
+                if not message.future.done():
+                    message.future.set_exception(e)
+            return
+        self.stats.record(len(messages), len(payload), batched=len(messages) > 1)
+        for message in messages:
+            self._resolve(message, SENT)
+
+
+_queues: "weakref.WeakKeyDictionary[object, OutboundQueue]" = weakref.WeakKeyDictionary()
+
+
+def outbound_for(room) -> OutboundQueue:
+    """The room's OutboundQueue (created on first use)."""
+    queue = _queues.get(room)
+    if queue is None:
+        queue = _queues[room] = OutboundQueue(room)
+    return queue
@@ -0,0 +1,115 @@
+"""
+Compact view of the user's current page for the LLM prompt.
+
+Report pages can carry hundreds of cards, so the page model is never dumped
+into the instructions. For each turn the VoiceAssistant adds one system
+message to that turn's context only. The message holds the page's visible
+elements, ranked by word overlap with what the user just said and cut off at
+a hard token budget. Identical elements (the "View Report" button on every
+card) are collapsed into one line with a count.
+
+Indexing an element list is the expensive part, so it is done once per
+(pathname, page version). The rendered text is also cached per set of
+utterance keywords until the page changes.
+"""
+
+import os
+from collections import OrderedDict
+
+from intent_router import STOPWORDS, tokenize
+from page_model import ELEMENT_KINDS, element_label
+from routes import ROUTES_BY_PATH
+
+# Hard upper bound on the page context's size, in (estimated) tokens
+PAGE_CONTEXT_TOKENS = int(os.getenv("AGENT_PAGE_CONTEXT_TOKENS", "300"))
+
+# Characters of an element's label kept in its line
+MAX_LABEL_CHARS = 80
+
+_KIND_NAMES = {"buttons": "button", "inputs": "input", "links": "link", "cards": "card"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate: ~4 UTF-8 bytes per token (so ~2 Arabic letters)."""
+    return len(text.encode("utf-8")) // 4 + 1
+
+
+class PageContextBuilder:
+    """Renders a PageModel into a bounded, utterance-ranked prompt snippet."""
+
+    def __init__(self, max_tokens: int = PAGE_CONTEXT_TOKENS, cache_size: int = 32):
+        self.max_tokens = max_tokens
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._page_key: tuple | None = None
+        self._header = ""
+        self._entries: list[tuple[str, int, frozenset[str]]] = []  # line, tokens, words; in page order
+        self._rendered: OrderedDict[frozenset[str], str] = OrderedDict()
+
+    def build(self, page, utterance: str = "") -> str | None:
+        """The page context for this turn, or None before the frontend has sent its page."""
+        if page is None or page.content is None:
+            return None
+        page_key = (page.pathname, page.version)
+        if page_key != self._page_key:
+            self._index(page)
+            self._page_key = page_key
+
+        words = frozenset(tokenize(utterance)) - STOPWORDS
+        rendered = self._rendered.get(words)
+        if rendered is not None:
+            self.hits += 1
+            self._rendered.move_to_end(words)
+            return rendered
+
+        self.misses += 1
+        rendered = self._render(words)
+        self._rendered[words] = rendered
+        if len(self._rendered) > self.cache_size:
+            self._rendered.popitem(last=False)
+        return rendered
+
+    def _index(self, page) -> None:
+        route = ROUTES_BY_PATH.get(page.pathname)
+        name = route.label_en if route else page.content.get("title") or "a page"
+        self._header = f"The user is looking at {name} ({page.pathname})."
+        self._rendered.clear()
+
+        counts: dict[tuple[str, str], int] = {}
+        words: dict[tuple[str, str], frozenset[str]] = {}
+        for kind in ELEMENT_KINDS:
+            for element in page.elements(kind):
+                label = " ".join(element_label(element).split())[:MAX_LABEL_CHARS]
+                if not label:
+                    continue
+                key = (kind, label)
+                counts[key] = counts.get(key, 0) + 1
+                if key not in words:
+                    searchable = " ".join(filter(None, (element.get("text"), element.get("ariaLabel"),
+                                                        element.get("date"), element.get("placeholder"))))
+                    words[key] = frozenset(tokenize(searchable))
+
+        self._entries = []
+        for (kind, label), count in counts.items():
+            line = f"- {_KIND_NAMES[kind]}: {label}" + (f" (x{count})" if count > 1 else "")
+            self._entries.append((line, estimate_tokens(line) + 1, words[(kind, label)]))
+
+    def _render(self, words: frozenset[str]) -> str:
+        entries = self._entries
+        if words:
+            # Stable sort: ties (and everything unrelated) keep page order
+            entries = sorted(entries, key=lambda entry: -len(words & entry[2]))
+
+        budget = self.max_tokens - estimate_tokens(self._header) - 16  # room for the "shown" line
+        lines = []
+        for line, tokens, _ in entries:
+            if tokens > budget:
+                break
+            lines.append(line)
+            budget -= tokens
+
+        if not lines:
+            return self._header
+        shown = f"Visible elements, most relevant first ({len(lines)} of {len(entries)} distinct shown):"
+        return "\n".join([self._header, shown, *lines])
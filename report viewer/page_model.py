@@ -0,0 +1,313 @@
+"""
+Agent-side view of the page the user is looking at.
+
+PageContentSender publishes the current page inventory on the `page-content`
+topic whenever the route changes or the page finishes rendering. PageModel
+keeps the latest snapshot per room, lets tools wait for a page to become
+ready instead of sleeping for a fixed delay, and resolves click targets
+against the elements the user can actually see.
+
+Every element carries a `key` (its `data-agent-key` attribute on the page).
+The first message is a full snapshot:
+
+    {"type": "page-content", "seq": 1, "content": {pathname, title, elements}}
+
+after which only what changed is sent, relative to the previous `seq`:
+
+    {"type": "page-content-delta", "seq": 2, "base": 1, "pathname", "title",
+     "changes": {"cards": {"upsert": [...], "remove": [keys], "order": [keys]}}}
+
+Upserted elements replace the element with the same key or are appended;
+`order` is only sent when the kind's key order changed some other way. A
+delta whose `base` isn't the model's `seq` (agent joined late, missed
+message) triggers a `page-content-request`, answered with a full snapshot.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import statistics
+import time
+from typing import Callable
+
+from outbound import outbound_for
+
+logger = logging.getLogger("agent-tools")
+
+PAGE_CONTENT_TOPIC = "page-content"
+
+ELEMENT_KINDS = ("buttons", "inputs", "links", "cards")
+
+# Kinds click_element can target, in the order a text match prefers them
+CLICKABLE_KINDS = ("buttons", "links", "cards")
+
+# The fixed delay view_report_by_date used before page-ready signals, kept for
+# comparison in PageWaitStats
+LEGACY_PAGE_LOAD_DELAY = 3.0
+
+
+def is_page_ready(content: dict, pathname: str, require_cards: bool = False) -> bool:
+    """True when `content` is the page at `pathname` (with report cards rendered, if required)."""
+    if content.get("pathname") != pathname:
+        return False
+    if require_cards:
+        return bool((content.get("elements") or {}).get("cards"))
+    return True
+
+
+class PageWaitStats:
+    """Measured page-ready waits compared with the legacy fixed delay."""
+
+    def __init__(self, fixed_delay: float = LEGACY_PAGE_LOAD_DELAY):
+        self.fixed_delay = fixed_delay
+        self.waits: list[float] = []
+        self.timeouts = 0
+
+    def record(self, seconds: float, ready: bool) -> None:
+        self.waits.append(seconds)
+        if not ready:
+            self.timeouts += 1
+
+    def summary(self) -> dict:
+        if not self.waits:
+            return {"count": 0}
+        waits_ms = sorted(w * 1000 for w in self.waits)
+        quantiles = statistics.quantiles(waits_ms, n=100) if len(waits_ms) > 1 else waits_ms * 99
+        return {
+            "count": len(waits_ms),
+            "timeouts": self.timeouts,
+            "p50_ms": round(quantiles[49], 1),
+            "p95_ms": round(quantiles[94], 1),
+            "fixed_delay_ms": self.fixed_delay * 1000,
+            "saved_ms_total": round(sum(self.fixed_delay * 1000 - w for w in waits_ms), 1),
+        }
+
+
+class PageUpdateStats:
+    """Size of the page-content messages received, snapshots vs deltas."""
+
+    def __init__(self):
+        self.bytes = {"snapshot": 0, "delta": 0}
+        self.counts = {"snapshot": 0, "delta": 0}
+        self.resyncs = 0
+
+    def record(self, kind: str, size: int) -> None:
+        self.bytes[kind] += size
+        self.counts[kind] += 1
+
+    def summary(self) -> dict:
+        summary = {"resyncs": self.resyncs}
+        for kind, count in self.counts.items():
+            summary[f"{kind}s"] = count
+            summary[f"{kind}_bytes_avg"] = round(self.bytes[kind] / count) if count else 0
+        return summary
+
+
+def element_label(element: dict) -> str:
+    """What the user would call an element: its text, else its aria-label, id or name."""
+    return (element.get("text") or element.get("ariaLabel") or element.get("id")
+            or element.get("name") or element.get("placeholder") or "")
+
+
+class PageModel:
+    """Latest `page-content` snapshot for a room, plus waiters for page readiness."""
+
+    def __init__(self):
+        self.content: dict | None = None
+        self.seq: int | None = None
+        self.version = 0  # bumped on every snapshot or delta
+        self.updated_at = 0.0
+        self.wait_stats = PageWaitStats()
+        self.update_stats = PageUpdateStats()
+        self._elements: dict[str, dict[str, dict]] = {}  # kind -> key -> element, in page order
+        self._search: list[tuple[str, str, dict]] | None = None  # (text, aria-label) lowercased, element
+        self._exact: dict[str, list[dict]] = {}  # lowercased text or aria-label -> elements
+        self._digest: str | None = None
+        self._room = None
+        self._resync: asyncio.Task | None = None
+        self._waiters: list[tuple[Callable[[dict], bool], asyncio.Future]] = []
+
+    @property
+    def pathname(self) -> str | None:
+        return self.content.get("pathname") if self.content else None
+
+    @property
+    def digest(self) -> str:
+        """Short hash of the page content ("" without any), computed once per version."""
+        if self.content is None:
+            return ""
+        if self._digest is None:
+            state = json.dumps(self.content, ensure_ascii=False, sort_keys=True)
+            self._digest = hashlib.sha1(state.encode("utf-8")).hexdigest()[:16]
+        return self._digest
+
+    def attach(self, room) -> None:
+        """Start tracking the room's `page-content` messages."""
+        self._room = room
+        room.on("data_received", self.on_data_received)
+
+    def on_data_received(self, packet) -> None:
+        """`data_received` handler for `page-content` snapshots and deltas."""
+        if packet.topic != PAGE_CONTENT_TOPIC:
+            return
+        try:
+            message = json.loads(packet.data)
+        except (ValueError, UnicodeDecodeError):
+            logger.warning("Ignoring malformed page-content payload")
+            return
+        if not isinstance(message, dict):
+            return
+        if message.get("type") == "page-content-delta":
+            self.update_stats.record("delta", len(packet.data))
+            if not self.apply_delta(message):
+                self._request_resync()
+            return
+        content = message.get("content")
+        if isinstance(content, dict):
+            self.update_stats.record("snapshot", len(packet.data))
+            self.update(content, message.get("seq"))
+
+    def update(self, content: dict, seq: int | None = None) -> None:
+        """Store a full snapshot and release every waiter it satisfies."""
+        self._elements = {}
+        for kind in ELEMENT_KINDS:
+            elements = (content.get("elements") or {}).get(kind) or []
+            # Frontends from before element keys: fall back to position
+            self._elements[kind] = {el.get("key") or f"{kind}:{i}": el for i, el in enumerate(elements)}
+        self.seq = seq
+        self._set_content(content)
+
+    def apply_delta(self, delta: dict) -> bool:
+        """Apply a `page-content-delta`. False if it doesn't follow the current snapshot or is malformed."""
+        if self.content is None or self.seq is None or delta.get("base") != self.seq:
+            return False
+        changes = delta.get("changes") or {}
+        # Check it all before changing anything: a delta is applied whole or not at all
+        if not isinstance(changes, dict) or not all(
+                isinstance(change, dict)
+                and all(isinstance(element, dict) and element.get("key") for element in change.get("upsert") or ())
+                for change in changes.values()):
+            logger.warning("Ignoring page-content-delta with malformed changes")
+            return False
+        for kind, change in changes.items():
+            elements = self._elements.setdefault(kind, {})
+            for key in change.get("remove") or ():
+                elements.pop(key, None)
+            for element in change.get("upsert") or ():
+                elements[element["key"]] = element
+            if change.get("order"):
+                self._elements[kind] = {key: elements[key] for key in change["order"] if key in elements}
+        self.seq = delta.get("seq")
+        self._set_content({
+            "pathname": delta.get("pathname", self.content.get("pathname")),
+            "title": delta.get("title", self.content.get("title")),
+            "elements": {kind: list(elements.values()) for kind, elements in self._elements.items()},
+        })
+        return True
+
+    def _request_resync(self) -> None:
+        if self._room is None or (self._resync is not None and not self._resync.done()):
+            return
+        self.update_stats.resyncs += 1
+        self._resync = asyncio.get_running_loop().create_task(self.request_snapshot())
+
+    async def request_snapshot(self) -> None:
+        """Ask the frontend for a full snapshot (after joining, or when a delta can't be applied)."""
+        payload = json.dumps({"type": "page-content-request"}).encode("utf-8")
+        try:
+            await outbound_for(self._room).send(payload, PAGE_CONTENT_TOPIC, key="page-content-request")
+        except Exception as e:
+            logger.warning(f"Could not request page content: {e}")
+
+    def _set_content(self, content: dict) -> None:
+        self.content = content
+        self.version += 1
+        self.updated_at = time.monotonic()
+        self._search = None
+        self._digest = None
+        for predicate, future in self._waiters:
+            if not future.done() and predicate(content):
+                future.set_result(content)
+
+    def reset(self) -> None:
+        """Forget the page (its frontend reloaded); pending waiters keep waiting."""
+        self.content = None
+        self.seq = None
+        self._digest = None
+        self._elements = {}
+        self._search = None
+        self._exact = {}
+
+    def expect_snapshot(self) -> asyncio.Future:
+        """Start waiting for the next snapshot or delta, whatever its page."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((lambda content: True, future))
+        return future
+
+    def expect(self, pathname: str, require_cards: bool = False) -> asyncio.Future:
+        """Start waiting for `pathname` to be ready. Call before publishing the navigation.
+
+        Resolves immediately if the current snapshot already satisfies it
+        (navigating to the page you're on doesn't re-send page content).
+        """
+        future = asyncio.get_running_loop().create_future()
+        predicate = lambda content: is_page_ready(content, pathname, require_cards)  # noqa: E731
+        if self.content is not None and predicate(self.content):
+            future.set_result(self.content)
+        else:
+            self._waiters.append((predicate, future))
+        return future
+
+    async def wait(self, future: asyncio.Future, timeout: float) -> dict | None:
+        """Wait for an `expect()` future, giving up after `timeout` seconds."""
+        start = time.perf_counter()
+        try:
+            content = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            content = None
+        finally:
+            self._waiters = [w for w in self._waiters if w[1] is not future]
+            if not future.done():
+                future.cancel()
+
+        self.wait_stats.record(time.perf_counter() - start, content is not None)
+        return content
+
+    def elements(self, kind: str) -> list[dict]:
+        return list(self._elements.get(kind, {}).values())
+
+    def resolve(self, text: str | None = None, element_id: str | None = None,
+                index: int | None = None) -> dict | None:
+        """Find the element a click means, the way DOMInteractionExecutor would.
+
+        By id first, then by exact and then partial text or aria-label match
+        over buttons, links and cards; `index` picks among several matches.
+        None when nothing on the current page matches.
+        """
+        if element_id:
+            for kind in CLICKABLE_KINDS + ("inputs",):
+                for element in self._elements.get(kind, {}).values():
+                    if element.get("id") == element_id:
+                        return element
+        wanted = (text or "").lower().strip()
+        if not wanted:
+            return None
+
+        if self._search is None:
+            self._build_search()
+        matches = self._exact.get(wanted)
+        if not matches:
+            matches = [el for label, aria, el in self._search if wanted in label or wanted in aria]
+        position = index or 0
+        return matches[position] if 0 <= position < len(matches) else None
+
+    def _build_search(self) -> None:
+        self._search = []
+        self._exact = {}
+        for kind in CLICKABLE_KINDS:
+            for element in self._elements.get(kind, {}).values():
+                label, aria = (element.get("text") or "").lower(), (element.get("ariaLabel") or "").lower()
+                self._search.append((label, aria, element))
+                for name in {label, aria} - {""}:
+                    self._exact.setdefault(name, []).append(element)
@@ -0,0 +1,159 @@
+"""
+Registry of DOM actions waiting for an acknowledgement from the frontend.
+
+send_dom_action() publishes a `dom-action` message with a fresh `actionId`
+and waits here until DOMInteractionExecutor publishes the matching
+`dom-action-result` (or the per-action timeout expires), so tools can report
+what actually happened on the page instead of assuming success.
+
+`dom-plan` messages (dom_plan.py) use the same registry: the frontend also
+publishes a `dom-plan-step` ack on the result topic after each step, which is
+collected per plan and keeps its wait alive.
+
+When a wait is cancelled (the user barged in or moved on, see
+interruptions.py) the action is revoked: a `dom-action-cancel` message with
+its `actionId` tells the frontend to drop it, or to stop a plan before its
+next step.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+
+from outbound import outbound_for
+
+logger = logging.getLogger("agent-tools")
+
+ACTION_TOPIC = "dom-action"
+RESULT_TOPIC = "dom-action-result"
+CANCEL_TYPE = "dom-action-cancel"
+
+
+@dataclass(frozen=True)
+class DOMActionResult:
+    """Outcome of a DOM action. Truthy when the frontend reported success."""
+    success: bool
+    message: str = ""
+    steps: tuple = ()  # `dom-plan-step` acks, for plans
+
+    def __bool__(self) -> bool:
+        return self.success
+
+
+class PendingActionRegistry:
+    """Maps in-flight `actionId`s to futures resolved by `dom-action-result` messages."""
+
+    def __init__(self):
+        self._pending: dict[str, asyncio.Future] = {}
+        self._steps: dict[str, list[dict]] = {}  # plan actionId -> step acks so far
+        self._room = None
+        self._cancels: set[asyncio.Task] = set()
+        self.revoked = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def attach(self, room) -> None:
+        """Start resolving actions from the room's `data_received` events."""
+        self._room = room
+        room.on("data_received", self.on_data_received)
+
+    def register(self, action_id: str, plan: bool = False) -> asyncio.Future:
+        """Create the future for `action_id`. Must be called before publishing the action."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending[action_id] = future
+        if plan:
+            self._steps[action_id] = []
+        return future
+
+    def resolve(self, action_id: str, result: DOMActionResult) -> bool:
+        """Resolve a pending action. Unknown or already finished ids are ignored."""
+        future = self._pending.get(action_id)
+        if future is None or future.done():
+            return False
+        future.set_result(result)
+        return True
+
+    async def wait(self, action_id: str, timeout: float) -> DOMActionResult:
+        """Wait for the frontend's result for `action_id`, always releasing its entry.
+
+        For plans, `timeout` is the longest silence allowed: every step ack
+        starts it again.
+        """
+        future = self._pending.get(action_id)
+        if future is None:
+            return DOMActionResult(False, f"Unknown action {action_id}")
+        steps = self._steps.get(action_id)
+        try:
+            while True:
+                acked = len(steps) if steps is not None else 0
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(future), timeout)
+                except asyncio.TimeoutError:
+                    if steps is not None and len(steps) > acked:
+                        continue
+                    result = DOMActionResult(False, f"No response from the page after {timeout:g}s")
+                if steps is not None:
+                    result = DOMActionResult(result.success, result.message, tuple(steps))
+                return result
+        except asyncio.CancelledError:
+            if not future.done():
+                self._send_cancel(action_id)
+            raise
+        finally:
+            self._pending.pop(action_id, None)
+            self._steps.pop(action_id, None)
+            if not future.done():
+                future.cancel()
+
+    def discard(self, action_id: str) -> None:
+        """Forget an action that was never published."""
+        self._steps.pop(action_id, None)
+        future = self._pending.pop(action_id, None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    def revoke(self, action_id: str) -> None:
+        """Forget an action that may have been published, and tell the frontend to drop it."""
+        if action_id in self._pending:
+            self.discard(action_id)
+            self._send_cancel(action_id)
+
+    def _send_cancel(self, action_id: str) -> None:
+        # Runs from cancelled tasks, so the publish gets a task of its own
+        if self._room is None:
+            return
+        self.revoked += 1
+        payload = json.dumps({"type": CANCEL_TYPE, "actionId": action_id}).encode("utf-8")
+        task = asyncio.get_running_loop().create_task(self._publish_cancel(payload))
+        self._cancels.add(task)
+        task.add_done_callback(self._cancels.discard)
+
+    async def _publish_cancel(self, payload: bytes) -> None:
+        try:
+            await outbound_for(self._room).send(payload, ACTION_TOPIC, label=CANCEL_TYPE)
+        except Exception as e:
+            logger.warning(f"Failed to send {CANCEL_TYPE}: {e}")
+
+    def on_data_received(self, packet) -> None:
+        """`data_received` handler: resolve the action named in a `dom-action-result`."""
+        if packet.topic != RESULT_TOPIC:
+            return
+        try:
+            message = json.loads(packet.data)
+        except (ValueError, UnicodeDecodeError):
+            logger.warning("Ignoring malformed dom-action-result payload")
+            return
+        action_id = message.get("actionId") if isinstance(message, dict) else None
+        if not action_id:
+            return
+        if message.get("type") == "dom-plan-step":
+            steps = self._steps.get(action_id)
+            if steps is not None:
+                steps.append({"index": message.get("index"), "status": message.get("status"),
+                              "detail": message.get("detail") or ""})
+            return
+        success = bool(message.get("success"))
+        text = message.get("result") if success else message.get("error")
+        self.resolve(action_id, DOMActionResult(success, str(text or "")))
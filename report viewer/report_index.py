@@ -0,0 +1,193 @@
+"""
+In-worker index of the `reports` table keyed by (section, report_date).
+
+view_report_by_date resolves the exact report row here, so it can tell the
+user straight away when no report exists for a date. When one does exist, the
+agent navigates once and clicks the report's button by id, with no DOM text
+scanning. The index is loaded once per worker process and refreshed
+incrementally by `updated_at`, in pages of PAGE_ROWS (PostgREST caps a
+response at its max-rows, 1000 by default, and a single unpaged select would
+silently lose the newest reports).
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import date
+
+from routes import SECTION_PATHS
+from supabase_client import SupabaseError, get_supabase
+
+logger = logging.getLogger("agent-data")
+
+# Seconds before a lookup triggers an incremental refresh
+REPORT_INDEX_REFRESH = float(os.getenv("REPORT_INDEX_REFRESH", "60"))
+
+PAGE_ROWS = 1000           # rows per PostgREST request
+COLUMNS = "id,section,report_date,updated_at"
+
+# view_report_by_date report_type -> dashboard_section
+REPORT_TYPE_SECTIONS = {
+    "whatsapp": "whatsapp_reports",
+    "productivity": "productivity_reports",
+    "ads": "ads_reports",
+    "mail": "mail_reports",
+    "email": "mail_reports",
+}
+
+
+@dataclass(frozen=True)
+class ReportEntry:
+    id: str
+    section: str
+    report_date: date
+    updated_at: str
+
+    @property
+    def pathname(self) -> str:
+        return SECTION_PATHS.get(self.section, "/dashboard")
+
+
+class ReportIndex:
+    """(section, report_date) -> report, with sorted dates per section for suggestions."""
+
+    def __init__(self):
+        self._entries: dict[tuple[str, date], ReportEntry] = {}
+        self._keys_by_id: dict[str, tuple[str, date]] = {}
+        self._dates: dict[str, list[date]] = {}
+        self.high_water = ""  # max updated_at seen, ISO timestamp
+        self.loaded = False
+        self.refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> "ReportIndex":
+        """Build an index from `reports` rows (e.g. fixture data or a dump)."""
+        index = cls()
+        index.apply(rows)
+        index.loaded = True
+        return index
+
+    def apply(self, rows: list[dict]) -> int:
+        """Insert or move rows (id, section, report_date, updated_at). Returns rows that changed.
+
+        Rows already indexed as they are (a refresh fetches the rows at the
+        high-water timestamp again) are skipped.
+        """
+        changed = 0
+        for row in rows:
+            entry = ReportEntry(
+                id=row["id"],
+                section=row["section"],
+                report_date=date.fromisoformat(str(row["report_date"])[:10]),
+                updated_at=str(row.get("updated_at") or ""),
+            )
+            old_key = self._keys_by_id.get(entry.id)
+            if old_key is not None and self._entries.get(old_key) == entry:
+                continue
+            if old_key is not None and old_key != (entry.section, entry.report_date):
+                self._remove(old_key)
+            self._insert(entry)
+            changed += 1
+            if entry.updated_at > self.high_water:
+                self.high_water = entry.updated_at
+        return changed
+
+    def _insert(self, entry: ReportEntry) -> None:
+        key = (entry.section, entry.report_date)
+        if key not in self._entries:
+            bisect.insort(self._dates.setdefault(entry.section, []), entry.report_date)
+        self._entries[key] = entry
+        self._keys_by_id[entry.id] = key
+
+    def _remove(self, key: tuple[str, date]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._keys_by_id.pop(entry.id, None)
+        dates = self._dates.get(key[0], [])
+        i = bisect.bisect_left(dates, key[1])
+        if i < len(dates) and dates[i] == key[1]:
+            dates.pop(i)
+
+    def lookup(self, section: str, day: date) -> ReportEntry | None:
+        return self._entries.get((section, day))
+
+    def closest_dates(self, section: str, day: date, n: int = 3) -> list[date]:
+        """The `n` report dates in `section` nearest to `day`."""
+        dates = self._dates.get(section, [])
+        i = bisect.bisect_left(dates, day)
+        window = dates[max(0, i - n):i + n]
+        return sorted(window, key=lambda d: abs((d - day).days))[:n]
+
+    async def _fetch(self, client, filters: dict | None) -> int:
+        """Apply every row matching `filters`, page by page. Returns rows that changed."""
+        changed = 0
+        offset = 0
+        while True:
+            rows = await client.select("reports", COLUMNS, filters=filters, order="updated_at.asc,id.asc",
+                                       limit=PAGE_ROWS, offset=offset)
+            changed += self.apply(rows)
+            if len(rows) < PAGE_ROWS:
+                return changed
+            offset += PAGE_ROWS
+
+    async def load(self, client) -> None:
+        """Full load of the reports table."""
+        self._entries.clear()
+        self._keys_by_id.clear()
+        self._dates.clear()
+        self.high_water = ""
+        await self._fetch(client, None)
+        self.loaded = True
+        self.refreshed_at = time.monotonic()
+        logger.info(f"Report index loaded: {len(self)} reports")
+
+    async def refresh(self, client) -> int:
+        """Fetch only rows updated since the last load/refresh.
+
+        Rows stamped with the high-water `updated_at` itself are fetched again
+        (gte): another row written in the same microsecond may not have been
+        committed at the last refresh. apply() skips the ones already indexed.
+        Deleted reports are not seen by incremental refreshes; they disappear
+        on the next full load (worker restart).
+        """
+        filters = {"updated_at": f"gte.{self.high_water}"} if self.high_water else None
+        changed = await self._fetch(client, filters)
+        self.refreshed_at = time.monotonic()
+        return changed
+
+
+_index = ReportIndex()
+_index_lock: asyncio.Lock | None = None
+
+
+async def get_report_index() -> ReportIndex | None:
+    """This worker's report index, loaded on first use and refreshed when stale.
+
+    Returns None when Supabase isn't configured or the first load failed, in
+    which case callers fall back to matching the date on the page.
+    """
+    global _index_lock
+    client = get_supabase()
+    if client is None:
+        return None
+    if _index_lock is None:
+        _index_lock = asyncio.Lock()
+
+    async with _index_lock:
+        try:
+            if not _index.loaded:
+                await _index.load(client)
+            elif time.monotonic() - _index.refreshed_at > REPORT_INDEX_REFRESH:
+                changed = await _index.refresh(client)
+                if changed:
+                    logger.info(f"Report index refreshed: {changed} changed reports")
+        except SupabaseError as e:
+            logger.warning(f"Report index unavailable: {e}")
+    return _index if _index.loaded else None
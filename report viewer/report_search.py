@@ -0,0 +1,569 @@
+"""
+In-worker hybrid search over report content, for answering questions by voice.
+
+The `reports` content, `meeting_summaries` and `weekly_analyses` are split
+into chunks of about CHUNK_WORDS words, on sentence boundaries. Each chunk is
+indexed twice:
+- BM25 over the intent router's Arabic/English tokens (normalized letters,
+  definite article and plurals stripped)
+- a hashed character-trigram vector, so near-misses such as spelling and
+  morphology variants and transliterations still match
+
+A query takes the top chunks of both rankings. It scores each of them by its
+BM25 score (relative to the best one) blended with its vector similarity. The
+best chunks are returned as snippets that cite their source and date. The filters (report type, date) are applied before ranking.
+
+The index lives on local disk in REPORT_SEARCH_DIR: chunk metadata as JSON
+and the vectors as a .npy matrix. A worker loads it once, and refreshes it
+from Supabase by `updated_at` every REPORT_SEARCH_REFRESH seconds. Without
+Supabase the on-disk index is used as is. build_from_dump() creates one
+offline from a pg_dump (plain format) or a JSON dump of the three tables.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import time
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from html.parser import HTMLParser
+
+import numpy as np
+
+from intent_router import STOPWORDS, normalize, tokenize
+from report_index import REPORT_TYPE_SECTIONS
+from routes import ROUTES_BY_PATH, SECTION_PATHS
+from supabase_client import SupabaseError, get_supabase
+
+logger = logging.getLogger("agent-data")
+
+REPORT_SEARCH_DIR = os.getenv("REPORT_SEARCH_DIR",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), ".report_search"))
+
+# Seconds before a search triggers an incremental refresh
+REPORT_SEARCH_REFRESH = float(os.getenv("REPORT_SEARCH_REFRESH", "300"))
+
+CHUNK_WORDS = 120
+VECTOR_DIM = 512
+PAGE_ROWS = 500            # rows per PostgREST request when loading
+VECTOR_WEIGHT = 0.3        # share of the vector similarity in the fused score
+CANDIDATES = 50            # chunks taken from each ranking before fusion
+COMMON_TERM_SHARE = 0.5    # query terms in more of the chunks than this are skipped
+SNIPPET_CHARS = 320
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Table -> columns to fetch. Each row becomes one document.
+SOURCES = {
+    "reports": "id,section,report_date,content,content_type,updated_at",
+    "meeting_summaries": "id,meeting_name,meeting_type,summary_html,created_at,updated_at",
+    "weekly_analyses": "id,week_start,reports_count,analysis_data,updated_at",
+}
+
+# search_reports report_type -> (table, dashboard_section or None)
+SEARCH_TYPES = {
+    **{name: ("reports", section) for name, section in REPORT_TYPE_SECTIONS.items()},
+    "meeting": ("meeting_summaries", None),
+    "weekly": ("weekly_analyses", None),
+}
+
+_SENTENCE_END = re.compile(r'(?<=[.!?؟\n])\s+')
+_BLOCK_TAGS = frozenset(("p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "table", "ul", "ol"))
+
+
+# ==================== TEXT EXTRACTION ====================
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts: list[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return re.sub(r'[ \t\r\f\v]+', ' ', "".join(parser.parts)).strip()
+
+
+def json_to_text(value, prefix: str = "") -> str:
+    """Flatten JSON into "key: value" lines, so numbers keep their labels."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return value
+    lines = []
+    if isinstance(value, dict):
+        for key, item in value.items():
+            label = f"{prefix} {key}".strip().replace("_", " ")
+            if isinstance(item, (dict, list)):
+                lines.append(json_to_text(item, label))
+            else:
+                lines.append(f"{label}: {item}.")
+    elif isinstance(value, list):
+        for item in value:
+            lines.append(json_to_text(item, prefix) if isinstance(item, (dict, list)) else f"{prefix}: {item}.")
+    else:
+        lines.append(f"{prefix}: {value}.")
+    return "\n".join(line for line in lines if line)
+
+
+def content_to_text(content: str | None, content_type: str | None = None) -> str:
+    if not content:
+        return ""
+    kind = (content_type or "").lower()
+    stripped = content.lstrip()
+    if "json" in kind or stripped[:1] in "{[":
+        return json_to_text(content)
+    if "html" in kind or stripped.startswith("<"):
+        return html_to_text(content)
+    return content
+
+
+def _day(value) -> date | None:
+    try:
+        return date.fromisoformat(str(value)[:10]) if value else None
+    except ValueError:
+        return None
+
+
+def document(source: str, row: dict) -> dict:
+    """A row as {title, text, section, day, until} for chunking."""
+    if source == "reports":
+        section = row.get("section")
+        route = ROUTES_BY_PATH.get(SECTION_PATHS.get(section, ""))
+        title = route.label_en.capitalize() if route else "Report"
+        day = _day(row.get("report_date"))
+        return {"title": title, "text": content_to_text(row.get("content"), row.get("content_type")),
+                "section": section, "day": day, "until": day}
+    if source == "meeting_summaries":
+        name = row.get("meeting_name") or row.get("meeting_type") or "meeting"
+        day = _day(row.get("created_at"))
+        return {"title": f"Meeting summary: {name}", "text": content_to_text(row.get("summary_html"), "html"),
+                "section": None, "day": day, "until": day}
+    day = _day(row.get("week_start"))
+    return {"title": "Weekly analysis", "text": json_to_text(row.get("analysis_data") or {}),
+            "section": None, "day": day, "until": day + timedelta(days=6) if day else None}
+
+
+def chunk_text(text: str, words: int = CHUNK_WORDS) -> list[str]:
+    """Pack sentences into chunks of at most ~`words` words. Each chunk repeats the previous chunk's last sentence."""
+    sentences = [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+    chunks, current, size = [], [], 0
+    for sentence in sentences:
+        n = len(sentence.split())
+        if current and size + n > words:
+            chunks.append(" ".join(current))
+            current, size = current[-1:], len(current[-1].split())
+        current.append(sentence)
+        size += n
+    if current and (not chunks or len(current) > 1):
+        chunks.append(" ".join(current))
+    return chunks
+
+
+# ==================== INDEX ====================
+
+def _terms(text: str) -> list[str]:
+    return [t for t in tokenize(text) if t not in STOPWORDS]
+
+
+def _query_terms(text: str) -> list[str]:
+    """Query terms, plus codes STT spelled out ("P X 00012" also looks for "px00012")."""
+    tokens = tokenize(text)
+    joined, run = [], []
+    for token in tokens + [""]:
+        if run and (len(run[-1]) > 2 or not token):
+            if len(run) > 1:
+                joined.append("".join(run))
+            run = []
+        if token:
+            run.append(token)
+    return [t for t in tokens if t not in STOPWORDS] + joined
+
+
+def embed(text: str) -> np.ndarray:
+    """Hashed character-trigram vector (sublinear tf, L2-normalized)."""
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    grams = Counter()
+    for word in normalize(text).split():
+        word = f"#{word}#"
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    for gram, count in grams.items():
+        h = zlib.crc32(gram.encode("utf-8"))
+        vector[h % VECTOR_DIM] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    source: str
+    doc_id: str
+    title: str
+    day: date | None
+    snippet: str
+    score: float
+
+    def cite(self) -> str:
+        when = f", {self.day.strftime('%d %B %Y')}" if self.day else ""
+        return f"{self.title}{when}"
+
+
+class ReportSearchIndex:
+    """Chunks with a BM25 inverted index and a vector matrix, updatable per document."""
+
+    def __init__(self):
+        self._chunks: list[dict | None] = []   # row i of the vector matrix is chunk i
+        self._free: list[int] = []
+        self._vectors = np.zeros((0, VECTOR_DIM), dtype=np.float32)
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._docs: dict[tuple[str, str], list[int]] = {}
+        self._total_terms = 0
+        self.high_water: dict[str, str] = {}   # table -> max updated_at seen
+        self._at_high_water: dict[str, set[str]] = {}  # table -> ids of the rows stamped with its high water
+        self.refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._chunks) - len(self._free)
+
+    @property
+    def documents(self) -> int:
+        return len(self._docs)
+
+    # ---------- updates ----------
+
+    def apply(self, source: str, rows: list[dict]) -> int:
+        """(Re)index `rows` of `source`. Returns the rows applied."""
+        for row in rows:
+            doc_id = str(row["id"])
+            self._remove((source, doc_id))
+            doc = document(source, row)
+            ids = [self._add(source, doc_id, doc, text) for text in chunk_text(doc["text"])]
+            if ids:
+                self._docs[(source, doc_id)] = ids
+            updated = str(row.get("updated_at") or "")
+            if updated > self.high_water.get(source, ""):
+                self.high_water[source] = updated
+                self._at_high_water[source] = {doc_id}
+            elif updated == self.high_water.get(source):
+                self._at_high_water[source].add(doc_id)
+        return len(rows)
+
+    def _add(self, source: str, doc_id: str, doc: dict, text: str) -> int:
+        terms = Counter(_terms(f"{doc['title']} {text}"))
+        chunk = {"source": source, "doc": doc_id, "title": doc["title"], "text": text,
+                 "section": doc["section"], "day": doc["day"], "until": doc["until"],
+                 "terms": terms, "length": sum(terms.values())}
+        if self._free:
+            i = self._free.pop()
+            self._chunks[i] = chunk
+        else:
+            i = len(self._chunks)
+            self._chunks.append(chunk)
+            if i >= len(self._vectors):
+                grown = np.zeros((max(64, 2 * len(self._vectors)), VECTOR_DIM), dtype=np.float32)
+                grown[:len(self._vectors)] = self._vectors
+                self._vectors = grown
+        self._vectors[i] = embed(f"{doc['title']} {text}")
+        for term, tf in terms.items():
+            self._postings[term][i] = tf
+        self._total_terms += chunk["length"]
+        return i
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        for i in self._docs.pop(key, ()):
+            chunk = self._chunks[i]
+            for term in chunk["terms"]:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(i, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_terms -= chunk["length"]
+            self._chunks[i] = None
+            self._vectors[i] = 0.0
+            self._free.append(i)
+
+    # ---------- queries ----------
+
+    def _allowed(self, source: str | None, section: str | None, day: date | None) -> set[int] | None:
+        """Chunks passing the filters, or None when there are none."""
+        if source is None and section is None and day is None:
+            return None
+        return {i for i, chunk in enumerate(self._chunks)
+                if chunk is not None
+                and (source is None or chunk["source"] == source)
+                and (section is None or chunk["section"] == section)
+                and (day is None or (chunk["day"] is not None and chunk["day"] <= day <= chunk["until"]))}
+
+    def _bm25(self, terms: list[str], allowed: set[int] | None) -> dict[int, float]:
+        """BM25 score of every allowed chunk with at least one of `terms`.
+
+        Terms in more than COMMON_TERM_SHARE of the chunks are skipped when the
+        query has rarer ones: they barely change the ranking and have the
+        longest posting lists.
+        """
+        n = len(self)
+        scores: dict[int, float] = defaultdict(float)
+        if not n:
+            return scores
+        avg = self._total_terms / n
+        postings_of = [p for p in (self._postings.get(term) for term in set(terms)) if p]
+        if any(len(p) <= COMMON_TERM_SHARE * n for p in postings_of):
+            postings_of = [p for p in postings_of if len(p) <= COMMON_TERM_SHARE * n]
+        for postings in postings_of:
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings.items():
+                if allowed is not None and i not in allowed:
+                    continue
+                length = self._chunks[i]["length"]
+                scores[i] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg))
+        return scores
+
+    def _nearest(self, similarity: np.ndarray, allowed: set[int] | None) -> list[int]:
+        """The CANDIDATES allowed chunks most similar to the query (removed chunks have similarity 0)."""
+        if allowed is not None:
+            rows = np.fromiter(allowed, dtype=np.int64, count=len(allowed))
+        else:
+            rows = np.arange(len(similarity))
+        if not len(rows):
+            return []
+        pool = min(CANDIDATES, len(rows))
+        top = rows[np.argpartition(-similarity[rows], pool - 1)[:pool]]
+        return [int(i) for i in top[np.argsort(-similarity[top])] if similarity[i] > 0]
+
+    def search(self, query: str, report_type: str | None = None, day: date | None = None,
+               limit: int = 3) -> list[SearchHit]:
+        """Best `limit` chunks for `query`, optionally of one report type and covering `day`."""
+        source, section = SEARCH_TYPES.get((report_type or "").lower(), (None, None))
+        allowed = self._allowed(source, section, day)
+
+        terms = _query_terms(query)
+        bm25 = self._bm25(terms, allowed)
+        similarity = self._vectors[:len(self._chunks)] @ embed(query)
+        top = max(bm25.values(), default=0.0) or 1.0
+        candidates = set(sorted(bm25, key=bm25.get, reverse=True)[:CANDIDATES])
+        candidates.update(self._nearest(similarity, allowed))
+        fused = {i: (1 - VECTOR_WEIGHT) * bm25.get(i, 0.0) / top + VECTOR_WEIGHT * max(0.0, float(similarity[i]))
+                 for i in candidates}
+
+        # Without query terms (e.g. "what did it say on Nov 2"), the date filter alone picks the chunks
+        if not fused and day is not None:
+            fused = dict.fromkeys(sorted(allowed)[:limit], 0.0)
+
+        hits, seen = [], set()
+        for i in sorted(fused, key=fused.get, reverse=True):
+            chunk = self._chunks[i]
+            key = (chunk["source"], chunk["doc"])
+            if key in seen:  # one snippet per document
+                continue
+            seen.add(key)
+            hits.append(SearchHit(chunk["source"], chunk["doc"], chunk["title"], chunk["day"],
+                                  snippet(chunk["text"], terms), round(fused[i], 4)))
+            if len(hits) == limit:
+                break
+        return hits
+
+    # ---------- persistence ----------
+
+    def save(self, directory: str = REPORT_SEARCH_DIR) -> None:
+        """Write the index atomically: vectors.npy, then index.json, which refers to it."""
+        os.makedirs(directory, exist_ok=True)
+        chunks = [None if c is None else {**c, "day": str(c["day"] or ""), "until": str(c["until"] or "")}
+                  for c in self._chunks]
+        state = {"dim": VECTOR_DIM, "rows": len(self._chunks), "high_water": self.high_water,
+                 "docs": [[s, d, ids] for (s, d), ids in self._docs.items()], "chunks": chunks}
+        for name, write in (("vectors.npy", lambda f: np.save(f, self._vectors[:len(self._chunks)])),
+                            ("index.json", lambda f: f.write(json.dumps(state, ensure_ascii=False).encode("utf-8")))):
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, os.path.join(directory, name))
+
+    @classmethod
+    def load(cls, directory: str = REPORT_SEARCH_DIR) -> "ReportSearchIndex | None":
+        """The index saved in `directory`, or None if there is none (or it doesn't match this version)."""
+        try:
+            with open(os.path.join(directory, "index.json"), "rb") as f:
+                state = json.loads(f.read())
+            vectors = np.load(os.path.join(directory, "vectors.npy"))
+        except (OSError, ValueError) as e:
+            logger.info(f"No report search index in {directory}: {e}")
+            return None
+        if state.get("dim") != VECTOR_DIM or vectors.shape != (state["rows"], VECTOR_DIM):
+            logger.warning(f"Ignoring report search index in {directory}: saved with another layout")
+            return None
+        index = cls()
+        index._vectors = np.array(vectors, dtype=np.float32)
+        index.high_water = state["high_water"]
+        index._docs = {(s, d): ids for s, d, ids in state["docs"]}
+        for i, chunk in enumerate(state["chunks"]):
+            if chunk is None:
+                index._chunks.append(None)
+                index._free.append(i)
+                continue
+            chunk["day"], chunk["until"] = _day(chunk["day"]), _day(chunk["until"])
+            chunk["terms"] = Counter(chunk["terms"])
+            index._chunks.append(chunk)
+            for term, tf in chunk["terms"].items():
+                index._postings[term][i] = tf
+            index._total_terms += chunk["length"]
+        return index
+
+    # ---------- Supabase ----------
+
+    async def refresh(self, client) -> int:
+        """Fetch rows updated since the last refresh (all rows the first time), page by page.
+
+        Rows stamped with the high-water updated_at itself are fetched again
+        (gte): another row written in the same microsecond may not have been
+        committed at the last refresh. The ones this process already indexed
+        are skipped (after loading a saved index, they are indexed once more:
+        apply() replaces a document's chunks). Deleted rows are not seen by
+        incremental refreshes; rebuild the index to drop them.
+        """
+        changed = 0
+        for source, columns in SOURCES.items():
+            since = self.high_water.get(source)
+            filters = {"updated_at": f"gte.{since}"} if since else None
+            indexed = set(self._at_high_water.get(source, ()))
+            offset = 0
+            while True:
+                rows = await client.select(source, columns, filters=filters, order="updated_at.asc,id.asc",
+                                           limit=PAGE_ROWS, offset=offset)
+                fresh = [row for row in rows
+                         if str(row["id"]) not in indexed or str(row.get("updated_at") or "") != since]
+                changed += self.apply(source, fresh)
+                if len(rows) < PAGE_ROWS:
+                    break
+                offset += PAGE_ROWS
+        self.refreshed_at = time.monotonic()
+        return changed
+
+
+def snippet(text: str, terms: list[str], max_chars: int = SNIPPET_CHARS) -> str:
+    """The sentence window of `text` with the most query terms, up to `max_chars`."""
+    if len(text) <= max_chars:
+        return text
+    sentences = [s for s in _SENTENCE_END.split(text) if s.strip()]
+    wanted = set(terms)
+    best = max(range(len(sentences)), key=lambda i: len(wanted.intersection(tokenize(sentences[i]))), default=0)
+    out = sentences[best]
+    for sentence in sentences[best + 1:]:
+        if len(out) + len(sentence) + 1 > max_chars:
+            break
+        out = f"{out} {sentence}"
+    return out if len(out) <= max_chars else out[:max_chars - 3].rsplit(" ", 1)[0] + "..."
+
+
+# ==================== OFFLINE BUILD ====================
+
+_COPY = re.compile(r'^COPY (?:\w+\.)?"?(\w+)"? \(([^)]*)\) FROM stdin;$')
+_COPY_ESCAPE = re.compile(r'\\(.)')
+_COPY_CHARS = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "\\": "\\"}
+
+
+def read_pg_dump(path: str, tables=SOURCES) -> dict[str, list[dict]]:
+    """Rows of `tables` from the COPY blocks of a plain-format pg_dump."""
+    rows: dict[str, list[dict]] = {table: [] for table in tables}
+    with open(path, encoding="utf-8") as f:
+        table, columns = None, []
+        for line in f:
+            line = line.rstrip("\n")
+            if table is None:
+                match = _COPY.match(line)
+                if match and match.group(1) in rows:
+                    table = match.group(1)
+                    columns = [c.strip().strip('"') for c in match.group(2).split(",")]
+                continue
+            if line == "\\.":
+                table = None
+                continue
+            values = [None if v == "\\N" else _COPY_ESCAPE.sub(lambda m: _COPY_CHARS.get(m.group(1), m.group(1)), v)
+                      for v in line.split("\t")]
+            rows[table].append(dict(zip(columns, values)))
+    return rows
+
+
+def build_from_dump(path: str, directory: str = REPORT_SEARCH_DIR) -> ReportSearchIndex:
+    """Build and save an index from a pg_dump (.sql) or a JSON dump ({table: [rows]})."""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            tables = json.load(f)
+    else:
+        tables = read_pg_dump(path)
+    index = ReportSearchIndex()
+    for source in SOURCES:
+        index.apply(source, tables.get(source) or [])
+    index.save(directory)
+    logger.info(f"Report search index built from {path}: {index.documents} documents, {len(index)} chunks")
+    return index
+
+
+# ==================== WORKER INDEX ====================
+
+_index: ReportSearchIndex | None = None
+_index_lock: asyncio.Lock | None = None
+
+
+async def get_report_search() -> ReportSearchIndex | None:
+    """This worker's search index: loaded from disk on first use, refreshed from Supabase when stale.
+
+    Returns None when there is neither a saved index nor Supabase.
+    """
+    global _index, _index_lock
+    if _index_lock is None:
+        _index_lock = asyncio.Lock()
+
+    async with _index_lock:
+        if _index is None:
+            _index = await asyncio.to_thread(ReportSearchIndex.load) or ReportSearchIndex()
+        client = get_supabase()
+        if client is not None and time.monotonic() - _index.refreshed_at > REPORT_SEARCH_REFRESH:
+            try:
+                changed = await _index.refresh(client)
+            except SupabaseError as e:
+                logger.warning(f"Report search refresh failed: {e}")
+                _index.refreshed_at = time.monotonic()
+            else:
+                if changed:
+                    logger.info(f"Report search index refreshed: {changed} changed documents")
+                    await asyncio.to_thread(_index.save)
+    return _index if len(_index) or client is not None else None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the report search index from a database dump.")
+    parser.add_argument("dump", help="plain-format pg_dump (.sql) or JSON dump ({table: [rows]})")
+    parser.add_argument("--out", default=REPORT_SEARCH_DIR, help="index directory")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    build_from_dump(args.dump, args.out)
@@ -0,0 +1,348 @@
+"""
+Worker-wide cache of the LLM's answers to questions users keep asking.
+
+"what can you do", "where are the ads reports" and "ازاي اشوف الموافقات" come
+up in many sessions, and each of them cost a full LLM completion.
+VoiceAssistant.llm_node looks the user's utterance up here first. A hit
+replays the cached answer as the LLM's stream: its text, or its tool calls,
+which then run as usual. A miss goes to the LLM, and the answer is stored.
+
+Lookup:
+- scope: the user's page and language. An answer is only reused on the same
+  page, in the same language. A spoken answer without tool calls may have
+  been drawn from the page content injected into the turn (page_context.py),
+  so its scope also holds the page content's digest (PageModel.digest): it
+  is only replayed while the page shows the same content. Answers that call
+  tools are not tied to the content, since their calls run again on replay
+  and read the page and data as they are then.
+- the exact utterance (normalized by the intent router's tokenizer), else the
+  most similar cached one in scope by its hashed character-trigram vector
+  (report_search.embed), above RESPONSE_CACHE_SIMILARITY. A similar
+  utterance must also have the same content words, except for spelling
+  variants, and the same numbers. "open the ads reports" never matches
+  "open the mail reports".
+
+Only first passes are stored (the turn's last item is the user's message),
+and only when they ran to the end. They must call nothing but
+CACHEABLE_TOOLS, whose arguments come from the utterance alone. DOM tools
+depend on what is on the page and are never cached. Follow-ups are neither
+looked up nor stored: one-word utterances, and replies to a question of the
+agent. Entries expire after RESPONSE_CACHE_TTL seconds, and the least
+recently used ones are evicted past RESPONSE_CACHE_MAX_ENTRIES.
+
+Every entry belongs to a fingerprint of the instructions, the tool schemas
+and the model. Changing any of them invalidates the cache. The cache lives in
+each process and is shared across the worker's job processes through
+RESPONSE_CACHE_DIR: loaded on first use, merged back at the end of each
+session. Set RESPONSE_CACHE_MAX_ENTRIES=0 to disable it.
+"""
+
+import difflib
+import hashlib
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+from livekit.agents.llm import ChatChunk, ChatContext, ChoiceDelta, FunctionToolCall, is_function_tool
+from livekit.agents.llm.utils import build_legacy_openai_schema
+
+from intent_router import STOPWORDS, detect_language, tokenize
+from report_search import embed
+
+logger = logging.getLogger("voice-agent")
+
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR",
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), ".response_cache"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+
+# Seconds an answer is reused for
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+
+# Trigram cosine similarity above which a different phrasing counts as the same question
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.8"))
+
+# Tools whose arguments depend only on the utterance, so a cached call is still right
+CACHEABLE_TOOLS = frozenset({"navigate", "where_am_i", "view_report_by_date", "search_reports", "get_kpi"})
+
+MIN_UTTERANCE_TOKENS = 2   # shorter utterances are follow-ups more often than questions
+MAX_REPLY_CHARS = 600      # longer answers are not worth keeping
+SPELLING_RATIO = 0.75      # difflib ratio above which two content words are spelling variants
+
+
+def fingerprint(instructions: str, tools: list, model: str) -> str:
+    """Hash of what an answer depends on besides the utterance."""
+    schemas = sorted((build_legacy_openai_schema(tool) for tool in tools if is_function_tool(tool)),
+                     key=lambda schema: schema["function"]["name"])
+    state = json.dumps([instructions, schemas, model], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(state.encode("utf-8")).hexdigest()[:16]
+
+
+def cacheable_utterance(chat_ctx: ChatContext) -> str | None:
+    """The user's message if the LLM is about to answer it and the answer can be shared.
+
+    None for tool results (second passes), one-word utterances, and replies
+    to a question of the agent ("yes", "the second one"), whose meaning
+    depends on the conversation.
+    """
+    items = [item for item in chat_ctx.items
+             if not (item.type == "message" and item.role in ("system", "developer"))]  # page context, summary
+    if not items or items[-1].type != "message" or items[-1].role != "user":
+        return None
+    utterance = items[-1].text_content or ""
+    if len(tokenize(utterance)) < MIN_UTTERANCE_TOKENS:
+        return None
+    previous = next((item for item in reversed(items[:-1]) if item.type == "message"), None)
+    if previous is not None and previous.role == "assistant" and \
+            (previous.text_content or "").rstrip().endswith(("?", "؟")):
+        return None
+    return utterance
+
+
+def _content_terms(text: str) -> list[str]:
+    return [t for t in tokenize(text) if t not in STOPWORDS]
+
+
+def same_terms(a: list[str], b: list[str]) -> bool:
+    """Same numbers, and every other content word of either has a spelling variant in the other."""
+    if {t for t in a if t.isdigit()} != {t for t in b if t.isdigit()}:
+        return False
+    for terms, others in ((a, b), (b, a)):
+        for term in set(terms) - set(others):
+            if term.isdigit() or not any(difflib.SequenceMatcher(None, term, other).ratio() >= SPELLING_RATIO
+                                         for other in others if not other.isdigit()):
+                return False
+    return True
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """What the LLM answered: spoken text, tool calls (name, JSON arguments), or both."""
+    text: str = ""
+    tool_calls: tuple[tuple[str, str], ...] = ()
+
+    def chunks(self) -> list[ChatChunk]:
+        """The answer as an LLM stream, with fresh call ids."""
+        request_id = f"cached_{uuid.uuid4().hex[:12]}"
+        chunks = []
+        if self.text:
+            chunks.append(ChatChunk(id=request_id, delta=ChoiceDelta(role="assistant", content=self.text)))
+        if self.tool_calls:
+            chunks.append(ChatChunk(id=request_id, delta=ChoiceDelta(role="assistant", tool_calls=[
+                FunctionToolCall(name=name, arguments=arguments, call_id=f"call_{uuid.uuid4().hex[:12]}")
+                for name, arguments in self.tool_calls])))
+        return chunks
+
+
+@dataclass
+class _Entry:
+    scope: tuple[str, str, str]  # page, language, page content digest ("" for tool-call answers)
+    utterance: str
+    terms: list[str]
+    vector: np.ndarray = field(repr=False)
+    response: CachedResponse
+    stored_at: float
+
+
+class ResponseCacheStats:
+    """Lookups, hit rate and lookup time."""
+
+    def __init__(self):
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.lookup_seconds: list[float] = []
+
+    def record(self, seconds: float, hit: bool, similar: bool = False) -> None:
+        self.lookup_seconds.append(seconds)
+        if hit:
+            self.hits += 1
+            self.similar_hits += similar
+        else:
+            self.misses += 1
+
+    def summary(self) -> dict:
+        lookups = self.hits + self.misses
+        summary = {"lookups": lookups, "hits": self.hits, "similar_hits": self.similar_hits,
+                   "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                   "stores": self.stores, "evictions": self.evictions}
+        if self.lookup_seconds:
+            lookup_ms = sorted(s * 1000 for s in self.lookup_seconds)
+            summary["lookup_p50_ms"] = round(statistics.median(lookup_ms), 3)
+            summary["lookup_max_ms"] = round(lookup_ms[-1], 3)
+        return summary
+
+
+class ResponseCache:
+    """LRU + TTL map of (fingerprint, page, language, content, utterance) to the LLM's answer."""
+
+    def __init__(self, directory: str = RESPONSE_CACHE_DIR, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl: float = RESPONSE_CACHE_TTL, similarity: float = RESPONSE_CACHE_SIMILARITY):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.fingerprint: str | None = None
+        self.stats = ResponseCacheStats()
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()  # least recently used first
+        self._scopes: dict[tuple, dict[tuple, _Entry]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def use(self, fingerprint: str) -> None:
+        """Serve answers for this configuration; entries of any other one are dropped."""
+        if fingerprint == self.fingerprint:
+            return
+        if self._entries:
+            logger.info(f"Response cache invalidated: configuration {self.fingerprint} -> {fingerprint}")
+        self.fingerprint = fingerprint
+        self._entries.clear()
+        self._scopes.clear()
+
+    @staticmethod
+    def _scope(page: str | None, language: str, content: str = "") -> tuple[str, str, str]:
+        return (page or "", language, content)
+
+    def lookup(self, utterance: str, page: str | None, content: str = "") -> CachedResponse | None:
+        """The answer for `utterance` on `page`, whose content has digest `content`."""
+        start = time.perf_counter()
+        language = detect_language(utterance)
+        scopes = [self._scope(page, language, content)]
+        if content:
+            scopes.append(self._scope(page, language))  # tool-call answers hold for any content
+        normalized = " ".join(tokenize(utterance))
+        entry = next((self._entries[key] for key in ((*scope, normalized) for scope in scopes)
+                      if key in self._entries), None)
+        similar = False
+        if entry is None:
+            entry = self._nearest(scopes, utterance)
+            similar = entry is not None
+        if entry is not None and time.time() - entry.stored_at > self.ttl:
+            self._remove(entry)
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(self._key(entry))
+        self.stats.record(time.perf_counter() - start, entry is not None, similar)
+        return entry.response if entry is not None else None
+
+    def _nearest(self, scopes: list[tuple], utterance: str) -> _Entry | None:
+        candidates = [entry for scope in scopes for entry in self._scopes.get(scope, {}).values()]
+        if not candidates:
+            return None
+        similarity = np.stack([entry.vector for entry in candidates]) @ embed(utterance)
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.similarity:
+            return None
+        entry = candidates[best]
+        return entry if same_terms(_content_terms(utterance), entry.terms) else None
+
+    def store(self, utterance: str, page: str | None, response: CachedResponse, content: str = "") -> bool:
+        """Keep the answer, if it is one that can be reused. `content`: digest of the page content it saw."""
+        if self.max_entries <= 0 or not (response.text or response.tool_calls):
+            return False
+        if len(response.text) > MAX_REPLY_CHARS or any(name not in CACHEABLE_TOOLS for name, _ in response.tool_calls):
+            return False
+        scope = self._scope(page, detect_language(utterance), "" if response.tool_calls else content)
+        self._insert(_Entry(scope, utterance, _content_terms(utterance), embed(utterance), response, time.time()))
+        self.stats.stores += 1
+        return True
+
+    @staticmethod
+    def _key(entry: _Entry) -> tuple:
+        return (*entry.scope, " ".join(tokenize(entry.utterance)))
+
+    def _insert(self, entry: _Entry) -> None:
+        key = self._key(entry)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._scopes[old.scope].pop(key, None)
+        self._entries[key] = entry
+        self._scopes.setdefault(entry.scope, {})[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries.values())))
+            self.stats.evictions += 1
+
+    def _remove(self, entry: _Entry) -> None:
+        key = self._key(entry)
+        self._entries.pop(key, None)
+        scope = self._scopes.get(entry.scope)
+        if scope is not None:
+            scope.pop(key, None)
+            if not scope:
+                del self._scopes[entry.scope]
+
+    # ---------- persistence ----------
+
+    @property
+    def _path(self) -> str:
+        return os.path.join(self.directory, "responses.json")
+
+    def _read(self) -> list[dict]:
+        """Unexpired entries saved for this configuration, least recently used first."""
+        try:
+            with open(self._path, "rb") as f:
+                state = json.loads(f.read())
+        except (OSError, ValueError):
+            return []
+        if state.get("fingerprint") != self.fingerprint:
+            return []
+        now = time.time()
+        # Spoken answers saved before entries held their page content can't be told apart: skip them
+        return [row for row in state.get("entries", [])
+                if now - row["stored_at"] <= self.ttl and ("content" in row or row["tool_calls"])]
+
+    def load(self) -> int:
+        """Add the entries other processes saved; returns how many."""
+        loaded = 0
+        for row in reversed(self._read()):  # most recently used first, while there is room
+            if len(self._entries) >= self.max_entries:
+                break
+            scope = self._scope(row["page"], row["language"], row.get("content", ""))
+            key = (*scope, " ".join(tokenize(row["utterance"])))
+            if key in self._entries:
+                continue
+            response = CachedResponse(row["text"], tuple((name, arguments) for name, arguments in row["tool_calls"]))
+            self._insert(_Entry(scope, row["utterance"], _content_terms(row["utterance"]),
+                                embed(row["utterance"]), response, row["stored_at"]))
+            self._entries.move_to_end(key, last=False)  # what was on disk is older than what this process used
+            loaded += 1
+        return loaded
+
+    def save(self) -> None:
+        """Merge this process's entries into the shared file, atomically."""
+        self.load()
+        rows = [{"page": entry.scope[0], "language": entry.scope[1], "content": entry.scope[2],
+                 "utterance": entry.utterance, "text": entry.response.text, "tool_calls": [list(call) for call in entry.response.tool_calls],
+                 "stored_at": entry.stored_at} for entry in self._entries.values()]
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps({"fingerprint": self.fingerprint, "entries": rows}, ensure_ascii=False).encode("utf-8"))
+        os.replace(tmp, self._path)
+
+
+_cache: ResponseCache | None = None
+
+
+def get_response_cache(fingerprint: str) -> ResponseCache | None:
+    """This process's cache for `fingerprint` (loaded from disk on first use), or None when disabled."""
+    global _cache
+    if RESPONSE_CACHE_MAX_ENTRIES <= 0:
+        return None
+    if _cache is None:
+        _cache = ResponseCache()
+    if _cache.fingerprint != fingerprint:
+        _cache.use(fingerprint)
+        loaded = _cache.load()
+        if loaded:
+            logger.info(f"Response cache: {loaded} answers loaded from {_cache.directory}")
+    return _cache
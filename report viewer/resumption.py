@@ -0,0 +1,199 @@
+"""
+Session resumption for stable per-user rooms.
+
+livekit-token gives each user one room (`voice-<user id>`). Before, every
+connect minted a new room, so every page reload or network blip dispatched a
+new voice_agent_session. The new job rebuilt AgentSession, lost the
+conversation and greeted again. Now the agent outlives its user by a grace
+period:
+
+- The user leaves: AgentSession is not closed (close_on_disconnect=False).
+  Whatever the agent was saying and doing is stopped, and SessionResumer
+  starts a RESUME_GRACE_SECONDS timer. Once it expires, the room is deleted
+  and the job ends.
+- The user rejoins within the grace period: the live session (history, tool
+  state, warmed indexes) carries on with no new job and no greeting. The page
+  model is reset and the new frontend is asked for its capabilities and a page
+  snapshot. "ready" is when that snapshot arrives.
+- The job is gone anyway (grace expired, worker restarted): the next job
+  loads the room's last conversation from voice_conversations if it was
+  updated less than RESUME_WINDOW_SECONDS ago. The row must belong to the
+  room's user (user_id, which the table's RLS policies match on too). It
+  seeds the chat history with the last RESUME_HISTORY_TURNS turns, continues
+  the same transcript row and skips the greeting.
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from livekit import rtc
+from livekit.agents.llm import ChatContext
+
+from conversation_log import VOICE_CONVERSATIONS_TABLE, user_id_for
+from supabase_client import SupabaseError, get_supabase
+
+logger = logging.getLogger("voice-agent")
+
+# Seconds the agent waits in the room for its user to come back
+RESUME_GRACE_SECONDS = float(os.getenv("AGENT_RESUME_GRACE_SECONDS", "120"))
+
+# A new job picks up the room's last conversation if it was updated this recently
+RESUME_WINDOW_SECONDS = float(os.getenv("AGENT_RESUME_WINDOW_SECONDS", "1800"))
+
+# Turns of that conversation put back into the chat history
+RESUME_HISTORY_TURNS = int(os.getenv("AGENT_RESUME_HISTORY_TURNS", "16"))
+
+# Longest wait for the rejoined frontend's page snapshot
+RESUME_READY_TIMEOUT = 10.0
+
+# Longest a new job waits for the previous conversation before greeting as usual
+RESUME_LOAD_TIMEOUT = float(os.getenv("AGENT_RESUME_LOAD_TIMEOUT", "2"))
+
+
+class ResumeStats:
+    """Rejoins served by the live session (worker jobs saved) and how fast they were ready."""
+
+    def __init__(self):
+        self.disconnects = 0
+        self.jobs_saved = 0
+        self.expired = 0
+        self.rehydrated_turns = 0
+        self.ready_seconds: list[float] = []
+        self.not_ready = 0
+
+    def record(self, seconds: float, ready: bool) -> None:
+        self.jobs_saved += 1
+        if ready:
+            self.ready_seconds.append(seconds)
+        else:
+            self.not_ready += 1
+
+    def summary(self) -> dict:
+        summary = {"disconnects": self.disconnects, "jobs_saved": self.jobs_saved, "expired": self.expired,
+                   "rehydrated_turns": self.rehydrated_turns, "not_ready": self.not_ready}
+        if self.ready_seconds:
+            ready_ms = sorted(s * 1000 for s in self.ready_seconds)
+            summary["ready_p50_ms"] = round(statistics.median(ready_ms), 1)
+            summary["ready_max_ms"] = round(ready_ms[-1], 1)
+        return summary
+
+
+def _is_user(participant) -> bool:
+    return participant.kind != rtc.ParticipantKind.PARTICIPANT_KIND_AGENT
+
+
+class SessionResumer:
+    """Keeps a room's session alive for RESUME_GRACE_SECONDS after its user leaves."""
+
+    def __init__(self, grace: float = RESUME_GRACE_SECONDS):
+        self.grace = grace
+        self.stats = ResumeStats()
+        self._room = None
+        self._on_leave: Callable[[], None] | None = None
+        self._on_rejoin: Callable[[], Awaitable[bool]] | None = None
+        self._on_expire: Callable[[], Awaitable[None]] | None = None
+        self._timer: asyncio.Task | None = None
+        self._resync: asyncio.Task | None = None
+
+    @property
+    def waiting(self) -> bool:
+        """True while the user is gone and the grace period runs."""
+        return self._timer is not None and not self._timer.done()
+
+    def attach(self, room, on_leave: Callable[[], None], on_rejoin: Callable[[], Awaitable[bool]],
+               on_expire: Callable[[], Awaitable[None]]) -> None:
+        """Track the room's users.
+
+        on_leave: the last user left (stop speaking and acting)
+        on_rejoin: a user is back; resync and return whether the page is ready
+        on_expire: nobody came back within the grace period (end the job)
+        """
+        self._room = room
+        self._on_leave, self._on_rejoin, self._on_expire = on_leave, on_rejoin, on_expire
+        room.on("participant_disconnected", self.on_participant_disconnected)
+        room.on("participant_connected", self.on_participant_connected)
+
+    def on_participant_disconnected(self, participant) -> None:
+        if not _is_user(participant) or self.waiting:
+            return
+        if any(_is_user(p) for p in self._room.remote_participants.values()):
+            return
+        self.stats.disconnects += 1
+        logger.info(f"User left, keeping the session for {self.grace:g}s")
+        self._on_leave()
+        self._timer = asyncio.get_running_loop().create_task(self._expire())
+
+    def on_participant_connected(self, participant) -> None:
+        if not _is_user(participant) or not self.waiting:
+            return
+        self._timer.cancel()
+        self._timer = None
+        logger.info(f"User {participant.identity} rejoined, resuming the session")
+        self._resync = asyncio.get_running_loop().create_task(self._rejoined())
+
+    async def _rejoined(self) -> None:
+        start = time.perf_counter()
+        try:
+            ready = await self._on_rejoin()
+        except Exception as e:
+            logger.warning(f"Resync after rejoin failed: {e}")
+            ready = False
+        elapsed = time.perf_counter() - start
+        self.stats.record(elapsed, ready)
+        logger.info(f"Resumed session {'ready' if ready else 'not ready'} {elapsed * 1000:.0f}ms after rejoin")
+
+    async def _expire(self) -> None:
+        await asyncio.sleep(self.grace)
+        self.stats.expired += 1
+        logger.info(f"No user came back within {self.grace:g}s, ending the session")
+        await self._on_expire()
+
+    def close(self) -> None:
+        for task in (self._timer, self._resync):
+            if task is not None:
+                task.cancel()
+
+
+async def load_recent_conversation(room_name: str, client=None, window: float = RESUME_WINDOW_SECONDS,
+                                   user_id: str | None = None) -> dict | None:
+    """The room's last voice_conversations row of its user, if it was updated within `window` seconds.
+
+    `user_id` defaults to the one in the room name (conversation_log.user_id_for);
+    without one there is nothing to resume.
+    """
+    client = client or get_supabase()
+    user_id = user_id or user_id_for(room_name)
+    if client is None or window <= 0 or user_id is None:
+        return None
+    since = (datetime.now(timezone.utc) - timedelta(seconds=window)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    try:
+        rows = await asyncio.wait_for(
+            client.select(VOICE_CONVERSATIONS_TABLE, "id,user_id,transcript,duration_seconds",
+                          filters={"user_id": f"eq.{user_id}", "room_name": f"eq.{room_name}",
+                                   "updated_at": f"gt.{since}"},
+                          order="updated_at.desc", limit=1),
+            RESUME_LOAD_TIMEOUT)
+    except (SupabaseError, asyncio.TimeoutError) as e:
+        logger.warning(f"Could not load the previous conversation of {room_name}: {e}")
+        return None
+    return rows[0] if rows and rows[0].get("transcript") else None
+
+
+def history_turns(row: dict, limit: int = RESUME_HISTORY_TURNS) -> list[dict]:
+    """The last `limit` user/assistant turns of a conversation row."""
+    turns = [turn for turn in row.get("transcript") or []
+             if isinstance(turn, dict) and turn.get("role") in ("user", "assistant") and turn.get("content")]
+    return turns[-limit:] if limit > 0 else []
+
+
+def resumed_chat_ctx(row: dict, limit: int = RESUME_HISTORY_TURNS) -> ChatContext:
+    """The chat history a new job starts from when it picks up `row`."""
+    chat_ctx = ChatContext.empty()
+    for turn in history_turns(row, limit):
+        chat_ctx.add_message(role=turn["role"], content=turn["content"])
+    return chat_ctx
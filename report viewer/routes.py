@@ -0,0 +1,70 @@
+"""
+Route registry: every dashboard page the agent can navigate to.
+
+One table drives the `navigate` tool's route enum, the fast-path intent
+router's keywords, the report section -> page mapping used by
+view_report_by_date, the spoken confirmations and the navigation part of the
+agent instructions. Adding a page means adding one Route here.
+"""
+
+from dataclasses import dataclass
+from typing import Literal
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str                  # value of the navigate tool's `route` argument
+    pathname: str
+    label_en: str
+    label_ar: str
+    aliases: tuple[str, ...]   # words users say for this page, English and Egyptian Arabic
+    section: str | None = None  # dashboard_section of the page's reports, if any
+
+    @property
+    def confirmation(self) -> str:
+        """Bilingual "عربي... English..." confirmation spoken after navigating."""
+        return f"جاري فتح {self.label_ar}... Opening {self.label_en}..."
+
+
+ROUTES = (
+    Route("dashboard", "/dashboard", "the dashboard", "الداشبورد",
+          ("dashboard", "main page", "overview", "الداشبورد")),
+    Route("whatsapp_reports", "/whatsapp-reports", "WhatsApp reports", "تقارير الواتساب",
+          ("whatsapp", "whatsapp analytics", "الواتساب"), section="whatsapp_reports"),
+    Route("productivity_reports", "/productivity-reports", "productivity reports", "تقارير الإنتاجية",
+          ("productivity", "الإنتاجية"), section="productivity_reports"),
+    Route("ads_reports", "/ads-reports", "ads reports", "تقارير الإعلانات",
+          ("ads", "advertising", "الإعلانات"), section="ads_reports"),
+    Route("mail_reports", "/mail-reports", "mail reports", "تقارير الإيميلات",
+          ("mail", "email", "الإيميلات", "البريد"), section="mail_reports"),
+    Route("bots", "/bots", "bots page", "صفحة البوتات",
+          ("bots", "bot controls", "البوتات")),
+    Route("social_posts", "/social-posts", "social posts", "صفحة البوستات",
+          ("social posts", "social media", "البوستات", "السوشيال ميديا")),
+    Route("content_ideas", "/content-ideas", "content ideas", "صفحة الأفكار",
+          ("content ideas", "الأفكار", "أفكار المحتوى")),
+    Route("meeting_summary", "/meeting-summary", "meeting summary", "صفحة الاجتماعات",
+          ("meeting summary", "meetings", "meeting notes", "الاجتماعات", "ملخص الاجتماعات")),
+    Route("courses_prices", "/courses-prices", "courses and prices", "صفحة الكورسات",
+          ("courses", "course pricing", "courses prices", "الكورسات", "أسعار الكورسات")),
+    Route("home", "/", "home page", "الصفحة الرئيسية",
+          ("home", "homepage", "home page", "الصفحة الرئيسية", "الهوم")),
+    Route("admin_settings", "/admin/settings", "admin settings", "صفحة الإعدادات",
+          ("admin settings", "settings", "admin panel", "الإعدادات", "الأدمن")),
+    Route("awaiting_approval", "/awaiting-approval", "awaiting approval page", "الموافقات",
+          ("awaiting approval", "pending approvals", "approval", "الموافقات", "الموافقات المعلقة")),
+)
+
+ROUTES_BY_NAME = {route.name: route for route in ROUTES}
+ROUTES_BY_PATH = {route.pathname: route for route in ROUTES}
+
+# Route argument type for tools (an enum in the tool schema)
+RouteName = Literal[tuple(ROUTES_BY_NAME)]
+
+# dashboard_section enum value -> frontend pathname
+SECTION_PATHS = {route.section: route.pathname for route in ROUTES if route.section}
+
+
+def route_list() -> str:
+    """One "- name: English / عربي" line per route, for the agent instructions."""
+    return "\n".join(f"- {route.name}: {route.label_en} / {route.label_ar}" for route in ROUTES)
@@ -0,0 +1,143 @@
+"""
+Speculative navigation hints from interim STT transcripts.
+
+The STT streams interim hypotheses long before the final transcript. The
+turn detector and the fast path (or the LLM) come after the final one.
+SpeculativeNavigator runs the intent router on each interim transcript. Once
+a route matches with high confidence, it publishes a prefetch hint so the
+frontend can start loading that page's data:
+
+    {"type": "navigation-prefetch", "hintId": "...", "route": "ads_reports", "target": "/ads-reports"}
+
+The hint deliberately has no `pathname`/`url` field, because
+AgentNavigationListener navigates on those in any message.
+
+When the final transcript arrives, the hint is either committed or cancelled:
+- Committed: the final transcript matches the same route. Nothing is sent;
+  the navigation that follows uses the warmed data.
+- Cancelled: anything else. A `navigation-prefetch-cancel` with the hintId is
+  sent, and the frontend aborts the request.
+
+A hint is also replaced (and counted as wasted) when a later interim
+hypothesis matches a different route. Hints and cancels are droppable in the
+room's OutboundQueue: when their topic is over its rate they are dropped, not
+delayed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+
+from intent_router import IntentRouter
+from outbound import outbound_for
+from routes import ROUTES
+
+logger = logging.getLogger("voice-agent")
+
+PREFETCH_TOPIC = "agent-navigation-prefetch"
+
+# Interim transcripts change under you, so hints need more confidence than the fast path
+SPECULATION_MIN_CONFIDENCE = float(os.getenv("AGENT_SPECULATION_MIN_CONFIDENCE", "0.8"))
+
+
+class SpeculationStats:
+    """Prefetch hints of a session: hits, wasted hints and the head start hits gave."""
+
+    def __init__(self):
+        self.hints = 0
+        self.hits = 0
+        self.wasted = 0
+        self.saved: list[float] = []  # seconds from hint to final transcript, per hit
+
+    def summary(self) -> dict:
+        resolved = self.hits + self.wasted
+        return {
+            "hints": self.hints,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "hit_rate": round(self.hits / resolved, 3) if resolved else 0.0,
+            "saved_ms_avg": round(sum(self.saved) / len(self.saved) * 1000, 1) if self.saved else 0.0,
+            "saved_ms_total": round(sum(self.saved) * 1000, 1),
+        }
+
+
+@dataclass
+class _Hint:
+    hint_id: str
+    route: str
+    pathname: str
+    sent_at: float
+
+
+class SpeculativeNavigator:
+    """Publishes prefetch hints for interim transcripts and resolves them on the final one."""
+
+    def __init__(self, router: IntentRouter | None = None):
+        self.router = router or IntentRouter(ROUTES, min_confidence=SPECULATION_MIN_CONFIDENCE)
+        self.stats = SpeculationStats()
+        self._room = None
+        self._hint: _Hint | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def attach(self, session, room) -> None:
+        """Watch the session's transcripts and publish hints into `room`."""
+        self._room = room
+        session.on("user_input_transcribed", self.on_transcript)
+
+    def on_transcript(self, event) -> None:
+        """`user_input_transcribed` handler."""
+        if event.is_final:
+            self.on_final(event.transcript)
+        else:
+            self.on_interim(event.transcript)
+
+    def on_interim(self, transcript: str) -> None:
+        match = self.router.match(transcript)
+        if match is None or (self._hint is not None and self._hint.route == match.route):
+            return
+        if self._hint is not None:
+            self._cancel()
+        self._hint = _Hint(uuid.uuid4().hex[:12], match.route, match.pathname, time.perf_counter())
+        self.stats.hints += 1
+        logger.debug(f"🔮 Prefetch hint: {match.route} from interim {transcript!r}")
+        self._publish({"type": "navigation-prefetch", "hintId": self._hint.hint_id,
+                       "route": match.route, "target": match.pathname})
+
+    def on_final(self, transcript: str) -> None:
+        hint = self._hint
+        if hint is None:
+            return
+        match = self.router.match(transcript)
+        if match is not None and match.route == hint.route:
+            self._hint = None
+            self.stats.hits += 1
+            self.stats.saved.append(time.perf_counter() - hint.sent_at)
+        else:
+            self._cancel()
+
+    def close(self) -> None:
+        """Cancel an unresolved hint (session ending)."""
+        if self._hint is not None:
+            self._cancel()
+
+    def _cancel(self) -> None:
+        hint, self._hint = self._hint, None
+        self.stats.wasted += 1
+        self._publish({"type": "navigation-prefetch-cancel", "hintId": hint.hint_id, "target": hint.pathname})
+
+    def _publish(self, message: dict) -> None:
+        if self._room is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._send(json.dumps(message).encode("utf-8")))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, payload: bytes) -> None:
+        try:
+            await outbound_for(self._room).send(payload, PREFETCH_TOPIC, droppable=True)
+        except Exception as e:
+            logger.warning(f"Could not publish prefetch hint: {e}")
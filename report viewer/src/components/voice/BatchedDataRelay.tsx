@@ -0,0 +1,48 @@
+import { useEffect } from 'react';
+import { useRoomContext } from '@livekit/components-react';
+import { RoomEvent } from 'livekit-client';
+
+export const BATCH_TOPIC = 'agent-batch';
+
+/**
+ * Unpacks the agent's batched messages. Messages the agent publishes within
+ * one frame window arrive together on BATCH_TOPIC as
+ * `{ type: 'batch', messages: [{ topic, payload }] }`; each one is re-emitted
+ * as a DataReceived event on its own topic, so every other listener (and
+ * useDataChannel) sees it as if it had been published alone.
+ */
+export const BatchedDataRelay = () => {
+  const room = useRoomContext();
+
+  useEffect(() => {
+    if (!room) return;
+
+    const handleDataReceived = (
+      payload: Uint8Array,
+      participant?: any,
+      kind?: any,
+      topic?: string
+    ) => {
+      if (topic !== BATCH_TOPIC) return;
+
+      try {
+        const message = JSON.parse(new TextDecoder().decode(payload));
+        if (message?.type !== 'batch' || !Array.isArray(message.messages)) return;
+        const encoder = new TextEncoder();
+        for (const inner of message.messages) {
+          if (typeof inner?.topic !== 'string' || typeof inner?.payload !== 'string') continue;
+          room.emit(RoomEvent.DataReceived, encoder.encode(inner.payload), participant, kind, inner.topic);
+        }
+      } catch (error) {
+        console.error('[BatchedDataRelay] Error parsing batch:', error);
+      }
+    };
+
+    room.on(RoomEvent.DataReceived, handleDataReceived);
+    return () => {
+      room.off(RoomEvent.DataReceived, handleDataReceived);
+    };
+  }, [room]);
+
+  return null;
+};
@@ -0,0 +1,69 @@
+import { useEffect, useCallback } from 'react';
+import { useRoomContext } from '@livekit/components-react';
+import { RoomEvent } from 'livekit-client';
+import { BATCH_TOPIC } from './BatchedDataRelay';
+
+const CAPABILITIES_TOPIC = 'client-capabilities';
+
+// Navigation is taken from the agent-navigation data topic
+// (AgentNavigationListener), so the agent doesn't also need to set metadata.
+// Batched messages are unpacked by BatchedDataRelay.
+const CAPABILITIES = {
+  type: 'client-capabilities',
+  version: 1,
+  navigation: { channel: 'data', topic: 'agent-navigation' },
+  batch: { topic: BATCH_TOPIC },
+};
+
+/**
+ * Tells the agent which channels this frontend listens on. Announces when the
+ * room connects, when the agent joins, and when the agent asks.
+ */
+export const CapabilityAnnouncer = () => {
+  const room = useRoomContext();
+
+  const announce = useCallback(() => {
+    if (!room || room.state !== 'connected') return;
+
+    const payload = new TextEncoder().encode(JSON.stringify(CAPABILITIES));
+    room.localParticipant.publishData(payload, { reliable: true, topic: CAPABILITIES_TOPIC })
+      .catch((err) => {
+        console.error('[CapabilityAnnouncer] Failed to announce capabilities:', err);
+      });
+  }, [room]);
+
+  useEffect(() => {
+    if (!room) return;
+
+    const handleDataReceived = (
+      payload: Uint8Array,
+      participant?: any,
+      kind?: any,
+      topic?: string
+    ) => {
+      if (topic !== CAPABILITIES_TOPIC) return;
+
+      try {
+        const message = JSON.parse(new TextDecoder().decode(payload));
+        if (message?.type === 'capabilities-request') {
+          announce();
+        }
+      } catch (error) {
+        console.error('[CapabilityAnnouncer] Error parsing data message:', error);
+      }
+    };
+
+    room.on(RoomEvent.DataReceived, handleDataReceived);
+    room.on(RoomEvent.Connected, announce);
+    room.on(RoomEvent.ParticipantConnected, announce);
+    announce();
+
+    return () => {
+      room.off(RoomEvent.DataReceived, handleDataReceived);
+      room.off(RoomEvent.Connected, announce);
+      room.off(RoomEvent.ParticipantConnected, announce);
+    };
+  }, [room, announce]);
+
+  return null;
+};
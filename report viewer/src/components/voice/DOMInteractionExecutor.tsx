@@ -1,11 +1,13 @@
-import { useEffect, useCallback } from 'react';
+import { useEffect, useCallback, useRef } from 'react';
 import { useRoomContext, useDataChannel } from '@livekit/components-react';
 import { RoomEvent } from 'livekit-client';
+import { useNavigate } from 'react-router-dom';
 import { useToast } from '@/hooks/use-toast';
 
 interface DOMAction {
   type: 'click' | 'fill' | 'read' | 'focus' | 'scroll';
   target: {
+    key?: string; // data-agent-key resolved by the agent's page model
     id?: string;
     selector?: string;
     index?: number;
@@ -13,17 +15,81 @@ interface DOMAction {
     name?: string;
     role?: string;
     date?: string; // For finding report cards by date
+    reportId?: string; // Exact report resolved by the agent's report index
   };
   value?: string; // For fill actions
 }
 
+// One step of a dom-plan message (see dom_plan.py on the agent)
+interface DOMPlanStep {
+  op: 'navigate' | 'wait_for' | 'click' | 'fill' | 'scroll';
+  pathname?: string; // navigate
+  target?: DOMAction['target'];
+  value?: string; // fill
+  timeoutMs?: number; // how long to wait for the target (or page) to appear
+  when?: { present?: DOMAction['target'] }; // skip the step unless this holds
+  optional?: boolean; // keep going if this step fails
+}
+
+const PLAN_POLL_MS = 100;
+const DEFAULT_STEP_TIMEOUT_MS = 3000;
+// actionIds remembered as handled or revoked; the oldest are forgotten past this
+const MAX_REMEMBERED_ACTION_IDS = 256;
+
+// Add `id` to an insertion-ordered set, dropping the oldest ids beyond the cap
+const remember = (ids: Set<string>, id: string) => {
+  ids.delete(id);
+  ids.add(id);
+  for (const oldest of ids) {
+    if (ids.size <= MAX_REMEMBERED_ACTION_IDS) break;
+    ids.delete(oldest);
+  }
+};
+
+// Thrown when the agent revokes an action (dom-action-cancel): the user moved on
+class ActionCancelledError extends Error {}
+
+// Poll `check` until it returns something or `timeoutMs` passes (or `cancelled` says to stop)
+const waitFor = async <T,>(
+  check: () => T | null,
+  timeoutMs: number,
+  cancelled: () => boolean = () => false,
+): Promise<T | null> => {
+  const deadline = Date.now() + timeoutMs;
+  for (;;) {
+    if (cancelled()) throw new ActionCancelledError('Cancelled by the agent');
+    const value = check();
+    if (value || Date.now() >= deadline) return value;
+    await new Promise((resolve) => setTimeout(resolve, PLAN_POLL_MS));
+  }
+};
+
 export const DOMInteractionExecutor = () => {
   const room = useRoomContext();
+  const navigate = useNavigate();
   const { toast } = useToast();
 
   const findElement = (target: DOMAction['target']): HTMLElement | null => {
     console.log('[DOMInteractionExecutor] 🔍 Finding element with target:', target);
 
+    // Element resolved by the agent from the page content we sent it
+    if (target.key) {
+      const el = document.querySelector(`[data-agent-key="${CSS.escape(target.key)}"]`);
+      if (el) {
+        console.log('[DOMInteractionExecutor] ✅ Found element by agent key:', target.key);
+        return el as HTMLElement;
+      }
+    }
+
+    // Report resolved by the agent: its View Report button carries data-report-id
+    if (target.reportId) {
+      const el = document.querySelector(`[data-report-id="${CSS.escape(target.reportId)}"]`);
+      if (el) {
+        console.log('[DOMInteractionExecutor] ✅ Found report by id:', target.reportId);
+        return el as HTMLElement;
+      }
+    }
+
     // Try by ID first
     if (target.id) {
       const el = document.getElementById(target.id);
@@ -296,7 +362,7 @@ export const DOMInteractionExecutor = () => {
     let element: HTMLElement | null = null;
 
     // Special handling for report cards with dates
-    if (action.type === 'click' && action.target.date) {
+    if (action.type === 'click' && action.target.date && !action.target.reportId) {
       element = findReportCardByDate(action.target.date);
       if (!element && action.target.text === 'View Report') {
         // If we found a card but no button, try to find the button separately
@@ -360,6 +426,152 @@ export const DOMInteractionExecutor = () => {
     }
   }, []);
 
+  // Both listeners below receive the same packet, so run each actionId once.
+  // Both sets are capped (remember()): they only need to outlive a duplicate
+  // delivery or a cancel racing its action, not the page.
+  const handledActionIdsRef = useRef<Set<string>>(new Set());
+  // actionIds the agent revoked with dom-action-cancel
+  const cancelledActionIdsRef = useRef<Set<string>>(new Set());
+
+  const sendResult = useCallback((actionId: string | undefined, success: boolean, detail: string) => {
+    if (!actionId || !room || room.state !== 'connected') return;
+
+    const response = success
+      ? { type: 'dom-action-result', actionId, result: detail, success: true }
+      : { type: 'dom-action-result', actionId, error: detail, success: false };
+    const responseBytes = new TextEncoder().encode(JSON.stringify(response));
+
+    room.localParticipant.publishData(
+      responseBytes,
+      { reliable: true, topic: 'dom-action-result' }
+    ).catch((err) => {
+      console.error('[DOMInteractionExecutor] Failed to send result:', err);
+    });
+  }, [room]);
+
+  const sendPlanStep = useCallback((planId: string, index: number, status: 'ok' | 'skipped' | 'failed', detail: string) => {
+    if (!room || room.state !== 'connected') return;
+
+    const ack = { type: 'dom-plan-step', actionId: planId, index, status, detail };
+    room.localParticipant.publishData(
+      new TextEncoder().encode(JSON.stringify(ack)),
+      { reliable: true, topic: 'dom-action-result' }
+    ).catch((err) => {
+      console.error('[DOMInteractionExecutor] Failed to send plan step ack:', err);
+    });
+  }, [room]);
+
+  const findTarget = (target: DOMAction['target']): HTMLElement | null =>
+    target.date && !target.reportId && !target.key ? findReportCardByDate(target.date) : findElement(target);
+
+  // Run a dom-plan's steps in order, acking each; resolves with the plan's summary
+  const executePlan = useCallback(async (planId: string, steps: DOMPlanStep[]): Promise<string> => {
+    const cancelled = () => cancelledActionIdsRef.current.has(planId);
+    let completed = 0;
+    for (const [index, step] of steps.entries()) {
+      const timeoutMs = step.timeoutMs ?? DEFAULT_STEP_TIMEOUT_MS;
+      if (cancelled()) throw new ActionCancelledError('Cancelled by the agent');
+
+      if (step.when?.present && !findElement(step.when.present)) {
+        sendPlanStep(planId, index, 'skipped', 'Condition not met');
+        continue;
+      }
+
+      try {
+        let detail: string;
+        if (step.op === 'navigate') {
+          if (!step.pathname) throw new Error('navigate step without pathname');
+          navigate(step.pathname);
+          const arrived = await waitFor(() => window.location.pathname === step.pathname || null, timeoutMs, cancelled);
+          if (!arrived) throw new Error(`Page ${step.pathname} did not open`);
+          detail = `Opened ${step.pathname}`;
+        } else {
+          const target = step.target ?? {};
+          const element = await waitFor(() => findTarget(target), timeoutMs, cancelled);
+          if (!element) throw new Error(`Element not found: ${JSON.stringify(target)}`);
+          detail = step.op === 'wait_for'
+            ? `Found: ${target.text || target.id || 'element'}`
+            : await executeAction({ type: step.op, target, value: step.value });
+        }
+        completed += 1;
+        sendPlanStep(planId, index, 'ok', detail);
+      } catch (error) {
+        if (error instanceof ActionCancelledError) throw error;
+        const errorMsg = error instanceof Error ? error.message : 'Unknown error';
+        sendPlanStep(planId, index, 'failed', errorMsg);
+        if (!step.optional) {
+          throw new Error(`Step ${index + 1} (${step.op}) failed: ${errorMsg}`);
+        }
+      }
+    }
+    return `Completed ${completed} of ${steps.length} steps`;
+  }, [executeAction, navigate, sendPlanStep]);
+
+  const handleActionMessage = useCallback((actionData: any) => {
+    if (actionData?.type === 'dom-action-cancel') {
+      if (actionData.actionId) {
+        console.log('[DOMInteractionExecutor] 🛑 Action revoked by the agent:', actionData.actionId);
+        remember(cancelledActionIdsRef.current, actionData.actionId);
+      }
+      return;
+    }
+
+    if (actionData?.type === 'dom-plan' && Array.isArray(actionData.steps)) {
+      const planId: string | undefined = actionData.actionId;
+      if (!planId || handledActionIdsRef.current.has(planId)) return;
+      remember(handledActionIdsRef.current, planId);
+
+      console.log('[DOMInteractionExecutor] 🗺️ Executing DOM plan:', actionData.steps);
+      executePlan(planId, actionData.steps as DOMPlanStep[])
+        .then((result) => {
+          sendResult(planId, true, result);
+          toast({ title: 'Voice Action', description: result });
+        })
+        .catch((error) => {
+          if (error instanceof ActionCancelledError) {
+            console.log('[DOMInteractionExecutor] 🛑 Plan stopped:', planId);
+            cancelledActionIdsRef.current.delete(planId); // handled already keeps it from running again
+            return; // the agent no longer waits for it
+          }
+          const errorMsg = error instanceof Error ? error.message : 'Unknown error';
+          sendResult(planId, false, errorMsg);
+          toast({ title: 'Action Failed', description: errorMsg, variant: 'destructive' });
+        });
+      return;
+    }
+
+    if (actionData?.type !== 'dom-action' || !actionData.action) return;
+
+    const actionId: string | undefined = actionData.actionId;
+    if (actionId) {
+      if (handledActionIdsRef.current.has(actionId) || cancelledActionIdsRef.current.has(actionId)) return;
+      remember(handledActionIdsRef.current, actionId);
+    }
+
+    const action = actionData.action as DOMAction;
+    console.log('[DOMInteractionExecutor] 🎯🎯🎯 EXECUTING DOM ACTION! 🎯🎯🎯', action);
+
+    executeAction(action)
+      .then((result) => {
+        console.log('[DOMInteractionExecutor] ✅ Action result:', result);
+        sendResult(actionId, true, result);
+        toast({
+          title: 'Voice Action',
+          description: result,
+        });
+      })
+      .catch((error) => {
+        console.error('[DOMInteractionExecutor] ❌ Action failed:', error);
+        const errorMsg = error instanceof Error ? error.message : 'Unknown error';
+        sendResult(actionId, false, errorMsg);
+        toast({
+          title: 'Action Failed',
+          description: errorMsg,
+          variant: 'destructive',
+        });
+      });
+  }, [executeAction, executePlan, sendResult, toast]);
+
   // Listen for DOM actions via useDataChannel
   const { message } = useDataChannel('dom-action', (msg) => {
     console.log('[DOMInteractionExecutor] 📨 useDataChannel callback received message:', msg);
@@ -371,7 +583,11 @@ export const DOMInteractionExecutor = () => {
         actionData = JSON.parse(msg);
       } else if ((msg as any)?.payload) {
         const payload = (msg as any).payload;
-        actionData = typeof payload === 'string' ? JSON.parse(payload) : payload;
+        actionData = typeof payload === 'string'
+          ? JSON.parse(payload)
+          : payload instanceof Uint8Array
+            ? JSON.parse(new TextDecoder().decode(payload))
+            : payload;
       } else if ((msg as any)?.data) {
         const data = (msg as any).data;
         actionData = typeof data === 'string' ? JSON.parse(data) : data;
@@ -379,48 +595,7 @@ export const DOMInteractionExecutor = () => {
         actionData = msg;
       }
 
-      if (actionData.type === 'dom-action' && actionData.action) {
-        const action = actionData.action as DOMAction;
-        console.log('[DOMInteractionExecutor] 🎯🎯🎯 EXECUTING DOM ACTION! 🎯🎯🎯', action);
-
-        executeAction(action)
-          .then((result) => {
-            console.log('[DOMInteractionExecutor] ✅ Action result:', result);
-
-            // Send result back to agent
-            if (room && room.state === 'connected') {
-              const response = {
-                type: 'dom-action-result',
-                actionId: actionData.actionId,
-                result: result,
-                success: true,
-              };
-
-              const responseJson = JSON.stringify(response);
-              const responseBytes = new TextEncoder().encode(responseJson);
-
-              room.localParticipant.publishData(
-                responseBytes,
-                { reliable: true, topic: 'dom-action-result' }
-              ).catch((err) => {
-                console.error('[DOMInteractionExecutor] Failed to send result:', err);
-              });
-            }
-
-            toast({
-              title: 'Voice Action',
-              description: result,
-            });
-          })
-          .catch((error) => {
-            console.error('[DOMInteractionExecutor] ❌ Action failed:', error);
-            toast({
-              title: 'Action Failed',
-              description: error instanceof Error ? error.message : 'Unknown error',
-              variant: 'destructive',
-            });
-          });
-      }
+      handleActionMessage(actionData);
     } catch (e) {
       console.error('[DOMInteractionExecutor] Error parsing message:', e, msg);
     }
@@ -441,29 +616,7 @@ export const DOMInteractionExecutor = () => {
       try {
         const decoder = new TextDecoder();
         const rawText = decoder.decode(payload);
-        const message = JSON.parse(rawText);
-
-        if (message.type === 'dom-action' && message.action) {
-          const action = message.action as DOMAction;
-          console.log('[DOMInteractionExecutor] 🎯 Executing action from RoomEvent:', action);
-
-          executeAction(action)
-            .then((result) => {
-              console.log('[DOMInteractionExecutor] ✅ Action result:', result);
-              toast({
-                title: 'Voice Action',
-                description: result,
-              });
-            })
-            .catch((error) => {
-              console.error('[DOMInteractionExecutor] ❌ Action failed:', error);
-              toast({
-                title: 'Action Failed',
-                description: error instanceof Error ? error.message : 'Unknown error',
-                variant: 'destructive',
-              });
-            });
-        }
+        handleActionMessage(JSON.parse(rawText));
       } catch (error) {
         console.error('[DOMInteractionExecutor] Error parsing data message:', error);
       }
@@ -474,7 +627,7 @@ export const DOMInteractionExecutor = () => {
     return () => {
       room.off(RoomEvent.DataReceived, handleDataReceived);
     };
-  }, [room, executeAction, toast]);
+  }, [room, handleActionMessage]);
 
   return null;
 };
@@ -1,18 +1,21 @@
 import { useEffect, useRef } from 'react';
 import { useLocation } from 'react-router-dom';
 import { useRoomContext } from '@livekit/components-react';
+import { RoomEvent } from 'livekit-client';
 
 interface PageContent {
   pathname: string;
   title: string;
   elements: {
     buttons: Array<{
+      key: string;
       id?: string;
       text?: string;
       name?: string;
       ariaLabel?: string;
     }>;
     inputs: Array<{
+      key: string;
       id?: string;
       name?: string;
       type?: string;
@@ -21,12 +24,14 @@ interface PageContent {
       ariaLabel?: string;
     }>;
     links: Array<{
+      key: string;
       id?: string;
       text?: string;
       href?: string;
       ariaLabel?: string;
     }>;
     cards: Array<{
+      key: string;
       id?: string;
       text?: string;
       date?: string;
@@ -35,10 +40,69 @@ interface PageContent {
   };
 }
 
+type ElementKind = keyof PageContent['elements'];
+const ELEMENT_KINDS: ElementKind[] = ['buttons', 'inputs', 'links', 'cards'];
+
+interface KindChange {
+  upsert?: PageContent['elements'][ElementKind];
+  remove?: string[];
+  order?: string[];
+}
+
+// Stable per-element keys (data-agent-key), so the agent can target an
+// element exactly and deltas can name the elements that changed
+let nextAgentKey = 0;
+const agentKey = (el: HTMLElement): string => {
+  let key = el.getAttribute('data-agent-key');
+  if (!key) {
+    key = `e${++nextAgentKey}`;
+    el.setAttribute('data-agent-key', key);
+  }
+  return key;
+};
+
+/**
+ * Changes from `prev` to `next`, per element kind, in the agent's
+ * page-content-delta format (see page_model.py). Null when nothing changed.
+ */
+const buildDelta = (prev: PageContent, next: PageContent): Record<string, KindChange> | null => {
+  const changes: Record<string, KindChange> = {};
+  for (const kind of ELEMENT_KINDS) {
+    const before = new Map<string, string>(prev.elements[kind].map((el) => [el.key, JSON.stringify(el)]));
+    const nextKeys = next.elements[kind].map((el) => el.key);
+    const nextKeySet = new Set(nextKeys);
+
+    const change: KindChange = {};
+    const upsert = next.elements[kind].filter((el) => before.get(el.key) !== JSON.stringify(el));
+    const remove = [...before.keys()].filter((key) => !nextKeySet.has(key));
+    if (upsert.length) change.upsert = upsert as KindChange['upsert'];
+    if (remove.length) change.remove = remove;
+
+    // The agent keeps surviving elements in place and appends new ones; send
+    // the full order only when the page reordered things some other way
+    const expected = [...before.keys()].filter((key) => nextKeySet.has(key))
+      .concat(nextKeys.filter((key) => !before.has(key)));
+    if (expected.some((key, i) => key !== nextKeys[i])) change.order = nextKeys;
+
+    if (Object.keys(change).length) changes[kind] = change;
+  }
+  return Object.keys(changes).length ? changes : null;
+};
+
+// Quiet period after DOM mutations before the page counts as rendered
+const PAGE_SETTLE_DEBOUNCE_MS = 150;
+// How long after a route change to keep watching for the page to settle
+const PAGE_SETTLE_WINDOW_MS = 8000;
+
 export const PageContentSender = () => {
   const room = useRoomContext();
   const location = useLocation();
   const lastSentPathRef = useRef<string | null>(null);
+  // Last content the agent has, and its sequence number, for deltas
+  const lastSentContentRef = useRef<PageContent | null>(null);
+  const seqRef = useRef(0);
+  // Sends in flight, one after the other (see sendPageContent)
+  const sendQueueRef = useRef<Promise<void>>(Promise.resolve());
 
   const extractPageContent = (): PageContent | null => {
     try {
@@ -52,6 +116,7 @@ export const PageContentSender = () => {
         const htmlEl = el as HTMLElement;
         if (htmlEl.offsetParent !== null) {
           buttons.push({
+            key: agentKey(htmlEl),
             id: htmlEl.id || undefined,
             text: htmlEl.textContent?.trim() || undefined,
             name: (htmlEl as HTMLButtonElement).name || undefined,
@@ -66,6 +131,7 @@ export const PageContentSender = () => {
         if (htmlEl.offsetParent !== null) {
           const inputEl = el as HTMLInputElement;
           inputs.push({
+            key: agentKey(htmlEl),
             id: inputEl.id || undefined,
             name: inputEl.name || undefined,
             type: inputEl.type || undefined,
@@ -82,6 +148,7 @@ export const PageContentSender = () => {
         if (htmlEl.offsetParent !== null) {
           const linkEl = el as HTMLAnchorElement;
           links.push({
+            key: agentKey(htmlEl),
             id: linkEl.id || undefined,
             text: linkEl.textContent?.trim() || undefined,
             href: linkEl.href || undefined,
@@ -112,6 +179,7 @@ export const PageContentSender = () => {
 
           if (dateText || hasViewReport) {
             cards.push({
+              key: agentKey(htmlEl),
               id: htmlEl.id || undefined,
               text: htmlEl.textContent?.trim().substring(0, 200) || undefined,
               date: dateText || undefined,
@@ -137,7 +205,7 @@ export const PageContentSender = () => {
     }
   };
 
-  const sendPageContent = async () => {
+  const publishPageContent = async (full: boolean) => {
     if (!room || room.state !== 'connected') {
       return;
     }
@@ -148,21 +216,41 @@ export const PageContentSender = () => {
     }
 
     try {
-      const message = {
-        type: 'page-content',
-        content: pageContent,
-      };
+      const previous = full ? null : lastSentContentRef.current;
+      const seq = seqRef.current + 1;
+      let messageJson = JSON.stringify({ type: 'page-content', seq, content: pageContent });
 
-      const messageJson = JSON.stringify(message);
+      // After the first snapshot only send what changed. The agent waits on
+      // page-content to know a page is ready, so send nothing when nothing did
+      if (previous) {
+        const changes = buildDelta(previous, pageContent);
+        if (!changes && previous.pathname === pageContent.pathname && previous.title === pageContent.title) {
+          return;
+        }
+        const deltaJson = JSON.stringify({
+          type: 'page-content-delta',
+          seq,
+          base: seqRef.current,
+          pathname: pageContent.pathname,
+          title: pageContent.title,
+          changes: changes ?? {},
+        });
+        if (deltaJson.length < messageJson.length) {
+          messageJson = deltaJson;
+        }
+      }
       const messageBytes = new TextEncoder().encode(messageJson);
 
       await (room.localParticipant as any).publishData(
         messageBytes,
         { reliable: true, topic: 'page-content' }
       );
+      lastSentContentRef.current = pageContent;
+      seqRef.current = seq;
 
       console.log('[PageContentSender] ✅ Sent page content to agent:', {
         pathname: pageContent.pathname,
+        bytes: messageBytes.length,
         buttons: pageContent.elements.buttons.length,
         inputs: pageContent.elements.inputs.length,
         links: pageContent.elements.links.length,
@@ -175,6 +263,47 @@ export const PageContentSender = () => {
     }
   };
 
+  // The immediate send, the 1s timer, the settle send and the agent's
+  // snapshot requests can overlap. Each one builds its seq/base from the
+  // previous one's, so they go one at a time: two sends sharing a base would
+  // make the agent reject the second and ask for a full resync.
+  const sendPageContent = (full = false): Promise<void> => {
+    const send = sendQueueRef.current.then(() => publishPageContent(full));
+    sendQueueRef.current = send.catch(() => undefined);
+    return send;
+  };
+
+  // The agent asks for a full snapshot when it joins or misses a delta
+  const sendPageContentRef = useRef(sendPageContent);
+  sendPageContentRef.current = sendPageContent;
+
+  useEffect(() => {
+    if (!room) return;
+
+    const handleDataReceived = (
+      payload: Uint8Array,
+      participant?: any,
+      kind?: any,
+      topic?: string
+    ) => {
+      if (topic !== 'page-content') return;
+
+      try {
+        const message = JSON.parse(new TextDecoder().decode(payload));
+        if (message?.type === 'page-content-request') {
+          sendPageContentRef.current(true);
+        }
+      } catch (error) {
+        console.error('[PageContentSender] Error parsing data message:', error);
+      }
+    };
+
+    room.on(RoomEvent.DataReceived, handleDataReceived);
+    return () => {
+      room.off(RoomEvent.DataReceived, handleDataReceived);
+    };
+  }, [room]);
+
   // Send page content when route changes or room connects
   useEffect(() => {
     if (room && room.state === 'connected') {
@@ -186,7 +315,22 @@ export const PageContentSender = () => {
         sendPageContent();
       }, 1000);
 
-      return () => clearTimeout(timeout);
+      // Re-send as soon as the page settles (e.g. report cards loaded), so the
+      // agent doesn't have to guess how long rendering takes
+      let settleTimer: ReturnType<typeof setTimeout> | undefined;
+      const observer = new MutationObserver(() => {
+        clearTimeout(settleTimer);
+        settleTimer = setTimeout(() => sendPageContent(), PAGE_SETTLE_DEBOUNCE_MS);
+      });
+      observer.observe(document.body, { childList: true, subtree: true });
+      const stopObserving = setTimeout(() => observer.disconnect(), PAGE_SETTLE_WINDOW_MS);
+
+      return () => {
+        clearTimeout(timeout);
+        clearTimeout(settleTimer);
+        clearTimeout(stopObserving);
+        observer.disconnect();
+      };
     }
   }, [location.pathname, room?.state]);
 
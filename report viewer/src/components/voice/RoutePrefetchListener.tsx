@@ -0,0 +1,48 @@
+import { useEffect } from 'react';
+import { useRoomContext } from '@livekit/components-react';
+import { RoomEvent } from 'livekit-client';
+import { cancelPrefetch, prefetchRoute } from '@/lib/routePrefetch';
+
+const PREFETCH_TOPIC = 'agent-navigation-prefetch';
+
+/**
+ * Starts loading a page's data when the agent hints (from the user's interim
+ * transcript) that it is about to navigate there, and aborts it when the hint
+ * is cancelled. Navigation itself still comes from AgentNavigationListener.
+ */
+export const RoutePrefetchListener = () => {
+  const room = useRoomContext();
+
+  useEffect(() => {
+    if (!room) return;
+
+    const handleDataReceived = (
+      payload: Uint8Array,
+      participant?: any,
+      kind?: any,
+      topic?: string
+    ) => {
+      if (topic !== PREFETCH_TOPIC) return;
+
+      try {
+        const message = JSON.parse(new TextDecoder().decode(payload));
+        if (typeof message?.target !== 'string') return;
+        if (message.type === 'navigation-prefetch') {
+          const started = prefetchRoute(message.target);
+          console.log('[RoutePrefetchListener] 🔮 Prefetch hint:', message.target, started ? '(loading)' : '(nothing to load)');
+        } else if (message.type === 'navigation-prefetch-cancel') {
+          cancelPrefetch(message.target);
+        }
+      } catch (error) {
+        console.error('[RoutePrefetchListener] Error parsing data message:', error);
+      }
+    };
+
+    room.on(RoomEvent.DataReceived, handleDataReceived);
+    return () => {
+      room.off(RoomEvent.DataReceived, handleDataReceived);
+    };
+  }, [room]);
+
+  return null;
+};
@@ -13,6 +13,9 @@ import { useVoiceAssistantContext } from '@/contexts/VoiceAssistantContext';
 import { AgentNavigationListener } from '@/components/AgentNavigationListener';
 import { PageContentSender } from './PageContentSender';
 import { DOMInteractionExecutor } from './DOMInteractionExecutor';
+import { BatchedDataRelay } from './BatchedDataRelay';
+import { CapabilityAnnouncer } from './CapabilityAnnouncer';
+import { RoutePrefetchListener } from './RoutePrefetchListener';
 import { TranscriptCapture } from './TranscriptCapture';
 import { cn } from '@/lib/utils';
 import '@livekit/components-styles';
@@ -989,6 +992,9 @@ export const VoiceAssistantModal: React.FC<VoiceAssistantModalProps> = ({
           <AgentNavigationListener />
           <PageContentSender />
           <DOMInteractionExecutor />
+          <CapabilityAnnouncer />
+          <BatchedDataRelay />
+          <RoutePrefetchListener />
           <RoomAudioRenderer />
 
           {/* Minimal Controls with Status Indicator */}
@@ -0,0 +1,56 @@
+import { supabase } from '@/integrations/supabase/client';
+
+type ReportsResult = { data: any[] | null; error: unknown };
+
+// Report pages' initial query: section and sort column
+const REPORT_PAGES: Record<string, { section: string; orderBy: string }> = {
+  '/whatsapp-reports': { section: 'whatsapp_reports', orderBy: 'created_at' },
+  '/productivity-reports': { section: 'productivity_reports', orderBy: 'report_date' },
+  '/ads-reports': { section: 'ads_reports', orderBy: 'report_date' },
+  '/mail-reports': { section: 'mail_reports', orderBy: 'created_at' },
+};
+
+// A prefetched result older than this is refetched instead
+const PREFETCH_MAX_AGE_MS = 15_000;
+
+const prefetched = new Map<string, { result: Promise<ReportsResult>; at: number; controller: AbortController }>();
+
+const runQuery = (pathname: string, signal?: AbortSignal): Promise<ReportsResult> => {
+  const { section, orderBy } = REPORT_PAGES[pathname];
+  let query = supabase
+    .from('reports')
+    .select('*')
+    .eq('section', section)
+    .order(orderBy, { ascending: false });
+  if (signal) query = query.abortSignal(signal);
+  return Promise.resolve(query) as Promise<ReportsResult>;
+};
+
+/** Start loading a report page's data ahead of navigation. False if the page has nothing to prefetch. */
+export const prefetchRoute = (pathname: string): boolean => {
+  if (!REPORT_PAGES[pathname]) return false;
+  const existing = prefetched.get(pathname);
+  if (existing && Date.now() - existing.at < PREFETCH_MAX_AGE_MS) return true;
+
+  const controller = new AbortController();
+  prefetched.set(pathname, { result: runQuery(pathname, controller.signal), at: Date.now(), controller });
+  return true;
+};
+
+/** Drop (and abort) a prefetch the agent cancelled. */
+export const cancelPrefetch = (pathname: string) => {
+  const entry = prefetched.get(pathname);
+  if (!entry) return;
+  prefetched.delete(pathname);
+  entry.controller.abort();
+};
+
+/** A report page's reports: the prefetched result if there is a fresh one, otherwise a new query. */
+export const fetchReportsFor = (pathname: string): Promise<ReportsResult> => {
+  const entry = prefetched.get(pathname);
+  prefetched.delete(pathname);
+  if (entry && Date.now() - entry.at < PREFETCH_MAX_AGE_MS) {
+    return entry.result;
+  }
+  return runQuery(pathname);
+};
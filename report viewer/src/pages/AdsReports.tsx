@@ -4,7 +4,7 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { Badge } from '@/components/ui/badge';
 import { Button } from '@/components/ui/button';
 import { Calendar, BarChart3, FileText, ExternalLink } from 'lucide-react';
-import { supabase } from '@/integrations/supabase/client';
+import { fetchReportsFor } from '@/lib/routePrefetch';
 import { useToast } from '@/hooks/use-toast';
 import { withPageAccessibility } from '@/lib/withPageAccessibility';
 
@@ -51,11 +51,8 @@ const AdsReports = () => {
 
   const fetchReports = async () => {
     try {
-      const { data, error } = await supabase
-        .from('reports')
-        .select('*')
-        .eq('section', 'ads_reports')
-        .order('report_date', { ascending: false });
+      // Uses the agent-prefetched result when the voice assistant is navigating here
+      const { data, error } = await fetchReportsFor('/ads-reports');
 
       if (error) throw error;
       setReports(data || []);
@@ -173,6 +170,7 @@ const AdsReports = () => {
                       {report.content_type === 'html' ? 'HTML' : 'TEXT'}
                     </Badge>
                     <Button
+                      data-report-id={report.id}
                       onClick={(e) => {
                         e.stopPropagation();
                         openReport(report);
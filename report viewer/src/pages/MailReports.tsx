@@ -6,6 +6,7 @@ import { Button } from '@/components/ui/button';
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from '@/components/ui/dialog';
 import { ScrollArea } from '@/components/ui/scroll-area';
 import { supabase } from '@/integrations/supabase/client';
+import { fetchReportsFor } from '@/lib/routePrefetch';
 import { useEffect, useState } from 'react';
 import { useToast } from '@/hooks/use-toast';
 import DOMPurify from 'dompurify';
@@ -49,11 +50,8 @@ const MailReports = () => {
   const fetchMailReports = async () => {
     try {
       setLoading(true);
-      const { data, error } = await supabase
-        .from('reports')
-        .select('*')
-        .eq('section', 'mail_reports')
-        .order('created_at', { ascending: false });
+      // Uses the agent-prefetched result when the voice assistant is navigating here
+      const { data, error } = await fetchReportsFor('/mail-reports');
 
       if (error) {
         throw error;
@@ -193,6 +191,8 @@ const MailReports = () => {
                           <Button
                             variant="ghost"
                             size="sm"
+                            data-report-id={report.id}
+                            aria-label="View Report"
                             onClick={() => {
                               setSelectedReport(report);
                               setDialogOpen(true);
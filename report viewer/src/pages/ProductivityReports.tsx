@@ -4,7 +4,7 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { Badge } from '@/components/ui/badge';
 import { Button } from '@/components/ui/button';
 import { Calendar, BarChart3, FileText, ExternalLink } from 'lucide-react';
-import { supabase } from '@/integrations/supabase/client';
+import { fetchReportsFor } from '@/lib/routePrefetch';
 import { useToast } from '@/hooks/use-toast';
 import { withPageAccessibility } from '@/lib/withPageAccessibility';
 
@@ -28,11 +28,8 @@ const ProductivityReports = () => {
 
   const fetchReports = async () => {
     try {
-      const { data, error } = await supabase
-        .from('reports')
-        .select('*')
-        .eq('section', 'productivity_reports')
-        .order('report_date', { ascending: false });
+      // Uses the agent-prefetched result when the voice assistant is navigating here
+      const { data, error } = await fetchReportsFor('/productivity-reports');
 
       if (error) throw error;
       setReports(data || []);
@@ -148,6 +145,7 @@ const ProductivityReports = () => {
                       {report.content_type === 'html' ? 'HTML' : 'TEXT'}
                     </Badge>
                     <Button
+                      data-report-id={report.id}
                       onClick={(e) => {
                         e.stopPropagation();
                         openReport(report);
@@ -6,6 +6,7 @@ import { Button } from '@/components/ui/button';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { ScrollArea } from '@/components/ui/scroll-area';
 import { supabase } from '@/integrations/supabase/client';
+import { fetchReportsFor } from '@/lib/routePrefetch';
 import { useEffect, useState } from 'react';
 import { useToast } from '@/hooks/use-toast';
 import { Progress } from '@/components/ui/progress';
@@ -27,11 +28,8 @@ const WhatsAppReports = () => {
   const fetchWhatsAppReports = async () => {
     try {
       setLoading(true);
-      const { data, error } = await supabase
-        .from('reports')
-        .select('*')
-        .eq('section', 'whatsapp_reports')
-        .order('created_at', { ascending: false });
+      // Uses the agent-prefetched result when the voice assistant is navigating here
+      const { data, error } = await fetchReportsFor('/whatsapp-reports');
 
       if (error) {
         console.error('Error fetching WhatsApp reports:', error);
@@ -218,6 +216,8 @@ const WhatsAppReports = () => {
                           <Button
                             variant="ghost"
                             size="sm"
+                            data-report-id={report.id}
+                            aria-label="View Report"
                             onClick={() => {
                               setSelectedReport(report);
                               setDialogOpen(true);
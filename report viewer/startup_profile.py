@@ -0,0 +1,150 @@
+"""
+Worker cold-start profile: where the time goes between starting a worker
+process and it being ready for a job.
+
+Imports the agent in a fresh interpreter under `python -X importtime`, as
+the AgentServer does for each idle process, then runs prewarm(). Reports:
+- import time by top-level package (each module's own time, so a package
+  is not charged for what it imports from another one) and by first-party
+  module
+- imports prewarm() triggers on first use
+- prewarm() by phase (proc.userdata["prewarm_phases"])
+
+Usage:
+    python startup_profile.py [--top 12] [--module agent]
+"""
+
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# First-party modules: the .py files next to this one
+FIRST_PARTY = frozenset(name[:-3] for name in os.listdir(ROOT) if name.endswith(".py"))
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module} as target
+imported = time.perf_counter()
+class Proc:
+    userdata = {{}}
+print("import time: prewarm", file=sys.stderr)
+target.prewarm(Proc())
+print(json.dumps({{"import_ms": (imported - start) * 1000,
+                  "prewarm_ms": (time.perf_counter() - imported) * 1000,
+                  "prewarm_phases": Proc.userdata.get("prewarm_phases", {{}})}}))
+"""
+
+
+@dataclass
+class ImportTime:
+    """One line of `-X importtime` (times in ms)."""
+
+    name: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".")[0]
+
+
+@dataclass
+class StartupProfile:
+    import_ms: float
+    prewarm_ms: float
+    prewarm_phases: dict[str, float]
+    imports: list[ImportTime] = field(default_factory=list)  # importing the module
+    prewarm_imports: list[ImportTime] = field(default_factory=list)  # first imported by prewarm()
+
+    def by_package(self) -> list[tuple[str, float]]:
+        """Import time per top-level package, slowest first."""
+        totals = defaultdict(float)
+        for entry in self.imports:
+            totals[entry.package] += entry.self_ms
+        return sorted(totals.items(), key=lambda item: -item[1])
+
+    def first_party(self) -> list[ImportTime]:
+        """This repo's modules, slowest (own module-level code) first."""
+        return sorted((e for e in self.imports if e.name in FIRST_PARTY), key=lambda e: -e.self_ms)
+
+
+def parse_importtime(lines: list[str]) -> list[ImportTime]:
+    """Parse `import time: self [us] | cumulative | name` lines, skipping the header."""
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        stripped = name.lstrip(" ")
+        entries.append(ImportTime(stripped.strip(), int(self_us) / 1000, int(cumulative_us) / 1000,
+                                  (len(name) - len(stripped) - 1) // 2))
+    return entries
+
+
+def _subtree(entries: list[ImportTime], module: str) -> list[ImportTime]:
+    """`module`'s top-level import and everything it imported.
+
+    importtime prints children before their parent, so that is the run of
+    lines ending at `module`'s depth-0 line.
+    """
+    end = next(i for i, e in enumerate(entries) if e.depth == 0 and e.name == module)
+    start = end
+    while start > 0 and entries[start - 1].depth > 0:
+        start -= 1
+    return entries[start:end + 1]
+
+
+def profile(module: str = "agent") -> StartupProfile:
+    """Import `module` and run its prewarm() in a fresh interpreter, with -X importtime."""
+    env = dict(os.environ)
+    # Plugin constructors only check that credentials are present
+    env.setdefault("LIVEKIT_API_KEY", "startup-profile-key")
+    env.setdefault("LIVEKIT_API_SECRET", "startup-profile-secret-0123456789abcdef")
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT.format(module=module)],
+                         cwd=ROOT, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"profiling {module} failed:\n{out.stderr[-2000:]}")
+    lines = out.stderr.splitlines()
+    marker = lines.index("import time: prewarm")
+    timings = json.loads(out.stdout.strip().splitlines()[-1])
+    return StartupProfile(timings["import_ms"], timings["prewarm_ms"], timings["prewarm_phases"],
+                          imports=_subtree(parse_importtime(lines[:marker]), module),
+                          prewarm_imports=parse_importtime(lines[marker + 1:]))
+
+
+def report(result: StartupProfile, top: int = 12) -> str:
+    lines = [f"import {result.import_ms:.0f}ms, prewarm {result.prewarm_ms:.0f}ms", "", "import by package:"]
+    total = sum(ms for _, ms in result.by_package()) or 1
+    for package, ms in result.by_package()[:top]:
+        party = " (first-party)" if package in FIRST_PARTY else ""
+        lines.append(f"  {package:<32} {ms:>8.1f}ms {ms / total:>5.0%}{party}")
+    lines += ["", "first-party modules (own module-level code):"]
+    for entry in result.first_party()[:top]:
+        lines.append(f"  {entry.name:<32} {entry.self_ms:>8.1f}ms")
+    deferred = [e for e in result.prewarm_imports if e.depth == 0]
+    lines += ["", f"imported by prewarm: {sum(e.cumulative_ms for e in deferred):.1f}ms"]
+    for entry in sorted(deferred, key=lambda e: -e.cumulative_ms)[:top]:
+        lines.append(f"  {entry.name:<32} {entry.cumulative_ms:>8.1f}ms")
+    lines += ["", "prewarm phases:"]
+    for phase, ms in result.prewarm_phases.items():
+        lines.append(f"  {phase:<32} {ms:>8.1f}ms")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=12, help="rows per section")
+    parser.add_argument("--module", default="agent", help="worker entry module (must define prewarm)")
+    args = parser.parse_args()
+    print(report(profile(args.module), args.top))
@@ -42,7 +42,12 @@ serve(async (req) => {
     }
 
     // Parse request body
-    const { roomName, participantName } = await req.json()
+    const { participantName } = await req.json()
+
+    // One stable room per user (whatever the client asks for): a reload or
+    // network blip rejoins the room, where the agent keeps the session alive
+    // for a grace period
+    const roomName = `voice-${user.id}`
 
     // Get LiveKit credentials from environment
     const livekitUrl = Deno.env.get('LIVEKIT_URL')
@@ -62,7 +67,7 @@ serve(async (req) => {
     // Grant permissions to join the room
     at.addGrant({
       roomJoin: true,
-      room: roomName || 'voice-assistant',
+      room: roomName,
       canPublish: true,
       canSubscribe: true,
       canPublishData: true,
@@ -75,7 +80,7 @@ serve(async (req) => {
       JSON.stringify({
         token,
         url: livekitUrl,
-        roomName: roomName || 'voice-assistant',
+        roomName,
       }),
       {
         headers: { ...corsHeaders, 'Content-Type': 'application/json' },
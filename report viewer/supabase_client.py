@@ -0,0 +1,110 @@
+"""
+Minimal async Supabase (PostgREST) client shared by the agent's data features.
+
+One client and one pooled aiohttp session per worker process. The worker
+talks to the same Supabase project as the frontend, using the service-role
+key so it can read across row-level-security policies.
+"""
+
+import asyncio
+import json
+import logging
+import os
+
+import aiohttp
+
+logger = logging.getLogger("agent-data")
+
+SUPABASE_URL = os.getenv("SUPABASE_URL") or os.getenv("VITE_SUPABASE_URL", "")
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+
+# Max concurrent HTTP connections to Supabase per worker process
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "10"))
+
+
+class SupabaseError(Exception):
+    """Raised when a PostgREST request fails."""
+
+
+class SupabaseClient:
+    """Thin PostgREST wrapper over a pooled aiohttp session."""
+
+    def __init__(self, url: str, key: str, pool_size: int = SUPABASE_POOL_SIZE, timeout: float = 10.0):
+        self.base_url = f"{url.rstrip('/')}/rest/v1"
+        self._headers = {
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+        }
+        self._pool_size = pool_size
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: aiohttp.ClientSession | None = None
+
+    def _http(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self._headers,
+                timeout=self._timeout,
+                connector=aiohttp.TCPConnector(limit=self._pool_size),
+            )
+        return self._session
+
+    async def _request(self, method: str, table: str, params: dict | None = None,
+                       body=None, prefer: str | None = None) -> list[dict]:
+        headers = {"Prefer": prefer} if prefer else None
+        data = json.dumps(body) if body is not None else None
+        try:
+            async with self._http().request(method, f"{self.base_url}/{table}", params=params,
+                                            data=data, headers=headers) as resp:
+                text = await resp.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise SupabaseError(f"{method} {table} failed: {e!r}") from e
+        if resp.status >= 400:
+            raise SupabaseError(f"{method} {table} failed ({resp.status}): {text[:200]}")
+        return json.loads(text) if text else []
+
+    async def select(self, table: str, columns: str = "*", filters: dict | None = None,
+                     order: str | None = None, limit: int | None = None, offset: int | None = None) -> list[dict]:
+        """SELECT rows. `filters` uses PostgREST operators, e.g. {"updated_at": "gt.2025-11-01"}."""
+        params = {"select": columns, **(filters or {})}
+        if order:
+            params["order"] = order
+        if limit is not None:
+            params["limit"] = str(limit)
+        if offset:
+            params["offset"] = str(offset)
+        return await self._request("GET", table, params=params)
+
+    async def insert(self, table: str, rows: list[dict], returning: bool = False) -> list[dict]:
+        """INSERT rows in one request."""
+        prefer = "return=representation" if returning else "return=minimal"
+        return await self._request("POST", table, body=rows, prefer=prefer)
+
+    async def upsert(self, table: str, rows: list[dict], on_conflict: str) -> list[dict]:
+        """INSERT ... ON CONFLICT (on_conflict) DO UPDATE, in one request."""
+        return await self._request("POST", table, params={"on_conflict": on_conflict}, body=rows,
+                                   prefer="resolution=merge-duplicates,return=minimal")
+
+    async def update(self, table: str, values: dict, filters: dict) -> list[dict]:
+        """UPDATE rows matching `filters`."""
+        return await self._request("PATCH", table, params=filters, body=values, prefer="return=minimal")
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+_client: SupabaseClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_supabase() -> SupabaseClient | None:
+    """Return this process's shared client, or None when Supabase isn't configured."""
+    global _client, _client_loop
+    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+        return None
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = SupabaseClient(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+        _client_loop = loop
+    return _client
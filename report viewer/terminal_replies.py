@@ -0,0 +1,111 @@
+"""
+Terminal tool results: speak a deterministic tool's result without a second LLM pass.
+
+After a tool call, AgentSession sends the tool output back to the LLM for
+another completion. For navigate, that completion only turns
+"NAVIGATE:/ads-reports جاري فتح تقارير الإعلانات... Opening ads reports..."
+into a spoken confirmation. It costs a second LLM round trip (TTFT plus the
+whole prompt again) on every navigation command.
+
+Tools in terminal mode call TerminalReplies.reply(context, text) with the
+text to speak. A bilingual "عربي... English..." text is cut down to the
+language of the user's last transcript. When every tool of a step has
+replied this way, the `function_tools_executed` handler cancels the tool
+reply and says the text instead. The tool calls and outputs still go into
+the chat history. A step that also ran any other tool, or where a terminal
+tool failed without replying, gets the usual LLM pass.
+
+Savings are estimated per skipped pass:
+- latency: the session's mean LLM TTFT
+- prompt tokens: the last LLM call's prompt, plus the tool call and output
+  that would have been appended to it
+- completion tokens: the spoken text
+Set AGENT_TERMINAL_REPLIES=0 to always run the second pass.
+"""
+
+import logging
+import os
+import statistics
+
+from livekit.agents import RunContext, metrics as lk_metrics
+
+from intent_router import detect_language, split_confirmation
+from page_context import estimate_tokens
+
+logger = logging.getLogger("agent-tools")
+
+TERMINAL_REPLIES = os.getenv("AGENT_TERMINAL_REPLIES", "1") != "0"
+
+
+class TerminalStats:
+    """Second LLM passes skipped (and their estimated cost) or still run."""
+
+    def __init__(self):
+        self.skipped = 0
+        self.fallbacks = 0
+        self.saved_seconds = 0.0
+        self.saved_prompt_tokens = 0
+        self.saved_completion_tokens = 0
+
+    def record(self, seconds: float, prompt_tokens: int, completion_tokens: int) -> None:
+        self.skipped += 1
+        self.saved_seconds += seconds
+        self.saved_prompt_tokens += prompt_tokens
+        self.saved_completion_tokens += completion_tokens
+
+    def summary(self) -> dict:
+        return {"skipped": self.skipped, "fallbacks": self.fallbacks,
+                "saved_ms": round(self.saved_seconds * 1000), "saved_prompt_tokens": self.saved_prompt_tokens,
+                "saved_completion_tokens": self.saved_completion_tokens}
+
+
+class TerminalReplies:
+    """One session's terminal tool replies, keyed by function call id."""
+
+    def __init__(self, enabled: bool = TERMINAL_REPLIES):
+        self.enabled = enabled
+        self.language = "en"
+        self.stats = TerminalStats()
+        self._session = None
+        self._replies: dict[str, str] = {}
+        self._ttfts: list[float] = []
+        self._last_prompt_tokens = 0
+
+    def attach(self, session) -> None:
+        self._session = session
+        session.on("user_input_transcribed", self.on_transcript)
+        session.on("metrics_collected", lambda event: self.on_metrics(event.metrics))
+        session.on("function_tools_executed", self.on_tools_executed)
+
+    def on_transcript(self, ev) -> None:
+        if ev.is_final and ev.transcript.strip():
+            self.language = detect_language(ev.transcript)
+
+    def on_metrics(self, m) -> None:
+        if isinstance(m, lk_metrics.LLMMetrics) and not m.cancelled:
+            if m.ttft > 0:
+                self._ttfts.append(m.ttft)
+            self._last_prompt_tokens = m.prompt_tokens
+
+    def reply(self, context: RunContext, text: str) -> None:
+        """Speak `text` (or its half in the user's language) instead of the LLM's answer to this call."""
+        if self.enabled:
+            self._replies[context.function_call.call_id] = split_confirmation(text, self.language)
+
+    def on_tools_executed(self, ev) -> None:
+        replies = [self._replies.pop(call.call_id, None) for call in ev.function_calls]
+        if not ev.has_tool_reply or not any(replies):
+            return
+        if not all(replies):
+            self.stats.fallbacks += 1
+            return
+
+        ev.cancel_tool_reply()
+        text = " ".join(dict.fromkeys(replies))  # the same confirmation twice is said once
+        self._session.say(text)
+
+        tool_tokens = sum(estimate_tokens(call.arguments or "") + estimate_tokens(out.output)
+                          for call, out in ev.zipped() if out is not None)
+        seconds = statistics.fmean(self._ttfts) if self._ttfts else 0.0
+        self.stats.record(seconds, self._last_prompt_tokens + tool_tokens, estimate_tokens(text))
+        logger.info(f"Terminal reply for {', '.join(call.name for call in ev.function_calls)}: {text!r}")
@@ -0,0 +1,103 @@
+"""
+Shared fixtures.
+
+`postgrest` is an in-memory stand-in for the Supabase client over fixture
+rows. It follows the PostgREST behaviour the data modules depend on: filters
+(eq, gt, gte, lt, lte), multi-column order, limit/offset paging, and the
+server's max-rows cap on every response. It does not know the schema.
+
+`supabase_stack` and `auth_user` are for tests against a real database: a
+local Supabase stack (`supabase start` at the repository root, which applies
+supabase/migrations) whose API URL and service-role key are in
+TEST_SUPABASE_URL and TEST_SUPABASE_SERVICE_ROLE_KEY. Those tests are
+skipped when the variables are not set.
+"""
+
+import asyncio
+import operator
+import os
+import uuid
+
+import aiohttp
+import pytest
+
+TEST_SUPABASE_URL = os.getenv("TEST_SUPABASE_URL", "")
+TEST_SUPABASE_SERVICE_ROLE_KEY = os.getenv("TEST_SUPABASE_SERVICE_ROLE_KEY", "")
+
+_OPERATORS = {"eq": operator.eq, "gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+
+class FakePostgREST:
+    """Tables of fixture rows behind the SupabaseClient methods the worker uses."""
+
+    def __init__(self, tables: dict[str, list[dict]] | None = None, max_rows: int = 1000):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.max_rows = max_rows
+        self.requests: list[tuple[str, str, dict]] = []
+
+    def _matches(self, row: dict, filters: dict) -> bool:
+        for column, condition in filters.items():
+            op, _, value = condition.partition(".")
+            cell = row.get(column)
+            if cell is None or not _OPERATORS[op](str(cell), value):
+                return False
+        return True
+
+    async def select(self, table: str, columns: str = "*", filters: dict | None = None,
+                     order: str | None = None, limit: int | None = None, offset: int | None = None) -> list[dict]:
+        self.requests.append(("GET", table, {"filters": filters, "order": order, "limit": limit, "offset": offset}))
+        rows = [row for row in self.tables.get(table, []) if self._matches(row, filters or {})]
+        for term in reversed((order or "").split(",") if order else []):
+            column, _, direction = term.partition(".")
+            rows.sort(key=lambda row: str(row.get(column) or ""), reverse=direction == "desc")
+        rows = rows[offset or 0:]
+        rows = rows[:min(limit, self.max_rows) if limit is not None else self.max_rows]
+        if columns != "*":
+            rows = [{c: row.get(c) for c in columns.split(",")} for row in rows]
+        return [dict(row) for row in rows]
+
+    async def upsert(self, table: str, rows: list[dict], on_conflict: str) -> list[dict]:
+        self.requests.append(("POST", table, {"rows": len(rows)}))
+        stored = self.tables.setdefault(table, [])
+        for row in rows:
+            existing = next((r for r in stored if r[on_conflict] == row[on_conflict]), None)
+            if existing is None:
+                stored.append(dict(row))
+            else:
+                existing.update(row)
+        return []
+
+
+@pytest.fixture
+def postgrest():
+    """FakePostgREST, to build with the test's tables: postgrest({"reports": rows})."""
+    return FakePostgREST
+
+
+@pytest.fixture
+def supabase_stack() -> tuple[str, str]:
+    """(API URL, service-role key) of the local Supabase stack."""
+    if not TEST_SUPABASE_URL or not TEST_SUPABASE_SERVICE_ROLE_KEY:
+        pytest.skip("needs a local Supabase stack: set TEST_SUPABASE_URL and TEST_SUPABASE_SERVICE_ROLE_KEY")
+    return TEST_SUPABASE_URL, TEST_SUPABASE_SERVICE_ROLE_KEY
+
+
+async def _auth_admin(url: str, key: str, method: str, path: str, body: dict | None = None) -> dict:
+    headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+    async with aiohttp.ClientSession(headers=headers) as http:
+        async with http.request(method, f"{url.rstrip('/')}/auth/v1/admin/{path}", json=body) as resp:
+            resp.raise_for_status()
+            return await resp.json(content_type=None) or {}
+
+
+@pytest.fixture
+def auth_user(supabase_stack) -> str:
+    """Id of a throwaway auth.users row; deleting it afterwards cascades to its conversations."""
+    url, key = supabase_stack
+    user = asyncio.run(_auth_admin(url, key, "POST", "users", {
+        "email": f"agent-test-{uuid.uuid4().hex[:12]}@example.com",
+        "password": uuid.uuid4().hex,
+        "email_confirm": True,
+    }))
+    yield user["id"]
+    asyncio.run(_auth_admin(url, key, "DELETE", f"users/{user['id']}"))
@@ -0,0 +1,147 @@
+import asyncio
+import uuid
+
+import pytest
+
+import conversation_log
+from conversation_log import VOICE_CONVERSATIONS_TABLE, TranscriptWriter, user_id_for
+from supabase_client import SupabaseClient, SupabaseError
+
+USER_ID = "3f1c2a9e-5b7d-4e21-9a0c-6d8e4f2b1a73"
+
+
+def test_user_id_for():
+    assert user_id_for(f"voice-{USER_ID}") == USER_ID
+    assert user_id_for(f"voice-{USER_ID.upper()}") == USER_ID
+    assert user_id_for("voice-1718000000-abc12", identity=USER_ID) == USER_ID
+    assert user_id_for("voice-1718000000-abc12", identity="Ahmed") is None
+    assert user_id_for("some-room") is None
+
+
+def test_rows_carry_the_rooms_user(postgrest):
+    async def scenario():
+        db = postgrest()
+        writer = TranscriptWriter(db, flush_seconds=3600)
+        conversation = writer.open(f"voice-{USER_ID}")
+        writer.add(conversation, "user", "افتح تقارير الواتساب")
+        writer.add(conversation, "assistant", "Opening the WhatsApp reports.")
+        await writer.close(conversation)
+        await writer.aclose()
+        return db.tables[VOICE_CONVERSATIONS_TABLE]
+
+    [row] = asyncio.run(scenario())
+    assert row["user_id"] == USER_ID
+    assert row["room_name"] == f"voice-{USER_ID}"
+    assert [turn["role"] for turn in row["transcript"]] == ["user", "assistant"]
+    assert row["language"] == "ar"
+
+
+def test_conversation_waits_for_its_user(postgrest):
+    async def scenario():
+        db = postgrest()
+        writer = TranscriptWriter(db, flush_seconds=3600)
+        known_later = writer.open("support-room")
+        never_known = writer.open("demo-room")
+        writer.add(known_later, "user", "hello")
+        writer.add(never_known, "user", "hello")
+        await writer.flush()
+        assert VOICE_CONVERSATIONS_TABLE not in db.tables  # nothing writable yet
+
+        known_later.user_id = user_id_for("support-room", identity=USER_ID)
+        await writer.close(known_later)
+        await writer.close(never_known)
+        await writer.aclose()
+        return db.tables[VOICE_CONVERSATIONS_TABLE], writer
+
+    rows, writer = asyncio.run(scenario())
+    assert [row["room_name"] for row in rows] == ["support-room"]
+    assert rows[0]["user_id"] == USER_ID
+    assert writer.stats.dropped == 1
+    assert not writer._dirty
+
+
+def test_unwritable_turns_do_not_trigger_flushes(postgrest):
+    async def scenario():
+        writer = TranscriptWriter(postgrest(), flush_turns=3, flush_seconds=3600)
+        anonymous = writer.open("demo-room")
+        for n in range(10):
+            writer.add(anonymous, "user", f"turn {n}")
+        assert writer.pending_turns == 0
+        assert not writer._wake.is_set()
+
+        # Another room's turns wake the writer only when they add up to flush_turns themselves
+        known = writer.open(f"voice-{USER_ID}")
+        writer.add(known, "user", "hello")
+        assert not writer._wake.is_set()
+        writer.add(known, "assistant", "Hello!")
+        writer.add(known, "user", "open the ads reports")
+        assert writer.pending_turns == 3 and writer._wake.is_set()
+        await writer.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_requests_are_capped_in_bytes(postgrest, monkeypatch):
+    monkeypatch.setattr(conversation_log, "MAX_FLUSH_BYTES", 2500)  # two of these rows
+
+    async def scenario():
+        db = postgrest()
+        writer = TranscriptWriter(db, flush_seconds=3600)
+        for n in range(3):
+            conversation = writer.open(f"voice-{uuid.uuid4()}")
+            writer.add(conversation, "user", "x" * 900)
+        assert await writer.flush() == 3
+        await writer.aclose()
+        return db, writer
+
+    db, writer = asyncio.run(scenario())
+    assert [request[2]["rows"] for request in db.requests] == [2, 1]
+    assert len(db.tables[VOICE_CONVERSATIONS_TABLE]) == 3
+    assert writer.stats.summary()["bytes_per_flush"] > 0
+
+
+# ---------- against the real voice_conversations table (local Supabase stack) ----------
+
+def test_writes_to_voice_conversations(supabase_stack, auth_user):
+    url, key = supabase_stack
+
+    async def scenario():
+        client = SupabaseClient(url, key)
+        try:
+            writer = TranscriptWriter(client, flush_turns=2, flush_seconds=3600)
+            conversation = writer.open(f"voice-{auth_user}")
+            writer.add(conversation, "user", "show me yesterday's ads report")
+            writer.add(conversation, "assistant", "Opening the ads report of yesterday.")
+            await writer.flush()
+            writer.add(conversation, "user", "thanks")
+            await writer.close(conversation)
+            await writer.aclose()
+            rows = await client.select(VOICE_CONVERSATIONS_TABLE, "id,user_id,room_name,transcript,language",
+                                       filters={"id": f"eq.{conversation.id}"})
+            return rows, writer.stats
+        finally:
+            await client.close()
+
+    rows, stats = asyncio.run(scenario())
+    assert stats.failures == 0
+    [row] = rows
+    assert row["user_id"] == auth_user
+    assert row["room_name"] == f"voice-{auth_user}"
+    assert [turn["content"] for turn in row["transcript"]] == [
+        "show me yesterday's ads report", "Opening the ads report of yesterday.", "thanks"]
+    assert row["language"] == "en"
+
+
+def test_voice_conversations_rejects_rows_without_a_user(supabase_stack):
+    url, key = supabase_stack
+
+    async def scenario():
+        client = SupabaseClient(url, key)
+        try:
+            await client.upsert(VOICE_CONVERSATIONS_TABLE, [{"id": str(uuid.uuid4()), "room_name": "no-user",
+                                                             "transcript": []}], on_conflict="id")
+        finally:
+            await client.close()
+
+    with pytest.raises(SupabaseError):
+        asyncio.run(scenario())
@@ -0,0 +1,184 @@
+import asyncio
+import json
+from dataclasses import dataclass
+
+import pytest
+from livekit import rtc
+from livekit.agents import RunContext, StopResponse
+from livekit.agents.llm import FunctionCall
+from livekit.agents.voice import SpeechHandle
+from livekit.agents.voice.events import UserInputTranscribedEvent
+
+import tools
+from interruptions import ToolRuns
+from pending_actions import CANCEL_TYPE, RESULT_TOPIC, PendingActionRegistry
+
+
+@dataclass
+class _Packet:
+    data: bytes
+    topic: str
+    participant: object = None
+
+
+class _LocalParticipant:
+    def __init__(self):
+        self.published: list[dict] = []
+
+    async def publish_data(self, payload, reliable: bool = True, topic: str = "") -> None:
+        self.published.append(json.loads(payload))
+
+
+class _Room(rtc.EventEmitter):
+    def __init__(self):
+        super().__init__()
+        self.local_participant = _LocalParticipant()
+
+    def messages(self, kind: str) -> list[dict]:
+        return [m for m in self.local_participant.published if m.get("type") == kind]
+
+    def ack(self, action_id: str) -> None:
+        """The frontend reports the action done."""
+        body = {"type": RESULT_TOPIC, "actionId": action_id, "success": True, "result": "done"}
+        self.emit("data_received", _Packet(json.dumps(body).encode("utf-8"), RESULT_TOPIC))
+
+
+class _Agent:
+    def __init__(self, room: _Room):
+        self._room = room
+        self._client = None
+        self._page_model = None
+        self._pending_actions = PendingActionRegistry()
+        self._pending_actions.attach(room)
+        self._tool_runs = ToolRuns()
+
+
+class _Session(rtc.EventEmitter):
+    def __init__(self, agent: _Agent):
+        super().__init__()
+        self.current_agent = agent
+
+
+@pytest.fixture
+def room_agent():
+    room = _Room()
+    agent = _Agent(room)
+    session = _Session(agent)
+    agent._tool_runs.attach(session)
+    return room, agent, session
+
+
+def _context(session: _Session, n: int) -> RunContext:
+    """A tool call of a new reply (its own speech handle), as each new command gets."""
+    return RunContext(session=session, speech_handle=SpeechHandle.create(),
+                      function_call=FunctionCall(call_id=f"call_{n}", name="click_element", arguments="{}"))
+
+
+async def _until(condition, timeout: float = 1.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.005)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_next_command_cancels_the_in_flight_tool(room_agent):
+    room, agent, session = room_agent
+
+    async def scenario():
+        first = asyncio.create_task(tools.click_element(_context(session, 1), element_text="Export"))
+        await _until(lambda: len(room.messages("dom-action")) == 1)
+        first_id = room.messages("dom-action")[0]["actionId"]
+
+        second = asyncio.create_task(tools.click_element(_context(session, 2), element_text="Save"))
+        await _until(lambda: len(room.messages("dom-action")) == 2)
+        second_id = room.messages("dom-action")[1]["actionId"]
+
+        with pytest.raises(StopResponse):  # nothing for the LLM to answer, so nothing is spoken
+            await first
+        room.ack(first_id)  # a late result for the revoked action changes nothing
+        room.ack(second_id)
+        result = await second
+        await _until(lambda: room.messages(CANCEL_TYPE))
+        return first_id, result
+
+    first_id, result = asyncio.run(scenario())
+    assert result == "Clicked element: Save"
+    assert [m["actionId"] for m in room.messages(CANCEL_TYPE)] == [first_id]
+    assert agent._tool_runs.stats.summary() == {"runs": 2, "cancelled_superseded": 1}
+    assert len(agent._tool_runs) == 0
+    assert len(agent._pending_actions) == 0
+
+
+def test_rapid_back_to_back_commands_leave_only_the_last(room_agent):
+    room, agent, session = room_agent
+    targets = ["Export", "Save", "Share", "Delete", "Refresh"]
+
+    async def scenario():
+        calls = []
+        for n, target in enumerate(targets):
+            calls.append(asyncio.create_task(tools.click_element(_context(session, n), element_text=target)))
+            await _until(lambda: len(room.messages("dom-action")) == n + 1)
+        room.ack(room.messages("dom-action")[-1]["actionId"])
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        await _until(lambda: len(room.messages(CANCEL_TYPE)) == len(targets) - 1)
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, StopResponse) for r in results[:-1])
+    assert results[-1] == "Clicked element: Refresh"
+    revoked = {m["actionId"] for m in room.messages(CANCEL_TYPE)}
+    assert revoked == {m["actionId"] for m in room.messages("dom-action")[:-1]}
+    assert agent._tool_runs.stats.cancelled["superseded"] == len(targets) - 1
+    assert len(agent._pending_actions) == 0
+
+
+def test_barge_in_cancels_but_a_single_interim_word_does_not(room_agent):
+    room, agent, session = room_agent
+
+    async def scenario():
+        call = asyncio.create_task(tools.click_element(_context(session, 1), element_text="Export"))
+        await _until(lambda: room.messages("dom-action"))
+        session.emit("user_input_transcribed", UserInputTranscribedEvent(transcript="uh", is_final=False))
+        await asyncio.sleep(0.02)
+        assert not call.done()
+        session.emit("user_input_transcribed", UserInputTranscribedEvent(transcript="no wait", is_final=False))
+        with pytest.raises(StopResponse):
+            await call
+        await _until(lambda: room.messages(CANCEL_TYPE))
+
+    asyncio.run(scenario())
+    assert agent._tool_runs.stats.summary() == {"runs": 1, "cancelled_barge_in": 1}
+
+
+def test_final_acknowledgement_does_not_cancel_a_running_tool(room_agent):
+    room, agent, session = room_agent
+
+    async def scenario():
+        call = asyncio.create_task(tools.click_element(_context(session, 1), element_text="Export"))
+        await _until(lambda: room.messages("dom-action"))
+        for word in ("ok", "تمام", "yes"):
+            session.emit("user_input_transcribed", UserInputTranscribedEvent(transcript=word, is_final=True))
+            agent._tool_runs.on_user_turn(word)  # as on_user_turn_completed does with the committed turn
+        await asyncio.sleep(0.02)
+        assert not call.done()
+        room.ack(room.messages("dom-action")[0]["actionId"])
+        return await call
+
+    assert asyncio.run(scenario()) == "Clicked element: Export"
+    assert not room.messages(CANCEL_TYPE)
+    assert agent._tool_runs.stats.summary() == {"runs": 1}
+
+
+def test_new_request_cancels_a_running_tool(room_agent):
+    room, agent, session = room_agent
+
+    async def scenario():
+        call = asyncio.create_task(tools.click_element(_context(session, 1), element_text="Export"))
+        await _until(lambda: room.messages("dom-action"))
+        agent._tool_runs.on_user_turn("افتح الإيميلات")
+        with pytest.raises(StopResponse):
+            await call
+        await _until(lambda: room.messages(CANCEL_TYPE))
+
+    asyncio.run(scenario())
+    assert agent._tool_runs.stats.summary() == {"runs": 1, "cancelled_new_turn": 1}
@@ -0,0 +1,76 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from livekit.agents import RunContext
+from livekit.agents.llm import FunctionCall
+from livekit.agents.voice import SpeechHandle
+
+import kpi_aggregates
+import tools
+from kpi_aggregates import KPIAggregates
+
+
+@pytest.fixture
+def kpi_tables(postgrest, monkeypatch):
+    """Serve get_kpi from a fresh KPIAggregates over the given fixture tables."""
+    def use(tables: dict[str, list[dict]]):
+        monkeypatch.setattr(kpi_aggregates, "_aggregates", KPIAggregates())
+        monkeypatch.setattr(kpi_aggregates, "_aggregates_lock", None)
+        monkeypatch.setattr(kpi_aggregates, "get_supabase", lambda: postgrest(tables))
+    return use
+
+
+def _report(n: int, section: str, day: date) -> dict:
+    return {"id": f"r{n}", "section": section, "report_date": day.isoformat(), "updated_at": f"{day}T08:00:00+00:00"}
+
+
+def _get_kpi(**arguments) -> str:
+    async def call():
+        context = RunContext(session=None, speech_handle=SpeechHandle.create(),
+                             function_call=FunctionCall(call_id="call_kpi", name="get_kpi", arguments="{}"))
+        return await tools.get_kpi(context, **arguments)
+    return asyncio.run(call())
+
+
+def test_reports_over_a_period(kpi_tables):
+    today = date.today()
+    kpi_tables({"reports": [_report(1, "ads_reports", today), _report(2, "ads_reports", today),
+                            _report(3, "mail_reports", today - timedelta(days=1))]})
+    answer = _get_kpi(metric="reports", period="today")
+    assert answer.startswith("2 reports on ")
+    assert "The day before had 1." in answer
+
+
+def test_all_time_with_only_future_rows(kpi_tables):
+    # No period, and every counted day is after today: nothing has happened yet
+    tomorrow = date.today() + timedelta(days=1)
+    kpi_tables({"reports": [_report(1, "ads_reports", tomorrow),
+                            _report(2, "ads_reports", tomorrow + timedelta(days=3))]})
+    assert _get_kpi(metric="reports") == "There are no reports yet."
+
+
+def test_period_that_has_not_started(kpi_tables):
+    kpi_tables({"reports": [_report(1, "ads_reports", date.today())]})
+    assert _get_kpi(metric="reports", period="tomorrow").startswith("The period on ")
+    assert _get_kpi(metric="reports", period="tomorrow").endswith("has not started yet.")
+
+
+def test_refresh_picks_up_rows_sharing_the_high_water_stamp(postgrest):
+    today = date.today()
+    db = postgrest({"reports": [_report(1, "ads_reports", today), _report(2, "mail_reports", today)]})
+    aggregates = KPIAggregates()
+    asyncio.run(aggregates.refresh(db))
+    stamp = aggregates.high_water["reports"]
+
+    # Committed after the refresh, with the same updated_at as the newest row
+    db.tables["reports"].append({**_report(3, "ads_reports", today), "updated_at": stamp})
+    assert asyncio.run(aggregates.refresh(db)) == 1
+    assert aggregates.total("reports", today, today) == 3
+    reports_requests = [request for request in db.requests if request[1] == "reports"]
+    assert reports_requests[-1][2]["filters"] == {"updated_at": f"gte.{stamp}"}
+
+    # Nothing new: the rows at the high-water stamp come back but are not counted twice
+    assert asyncio.run(aggregates.refresh(db)) == 0
+    assert aggregates.total("reports", today, today) == 3
+    assert aggregates.total("reports", today, today, "ads_reports") == 2
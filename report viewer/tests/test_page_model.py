@@ -0,0 +1,51 @@
+import json
+
+from page_model import PAGE_CONTENT_TOPIC, PageModel
+
+SNAPSHOT = {"pathname": "/ads-reports", "title": "Ads reports", "elements": {
+    "buttons": [{"key": "e1", "text": "Export"}, {"key": "e2", "text": "Refresh"}],
+    "cards": [{"key": "e3", "text": "Ads report", "date": "2 Nov 2025"}],
+}}
+
+
+class _Packet:
+    def __init__(self, message: dict):
+        self.data = json.dumps(message).encode("utf-8")
+        self.topic = PAGE_CONTENT_TOPIC
+
+
+def _buttons(page: PageModel) -> list[str]:
+    return [element["text"] for element in page.content["elements"]["buttons"]]
+
+
+def test_delta_updates_the_snapshot():
+    page = PageModel()
+    page.update(SNAPSHOT, seq=1)
+    assert page.apply_delta({"type": "page-content-delta", "seq": 2, "base": 1, "changes": {
+        "buttons": {"remove": ["e2"], "upsert": [{"key": "e4", "text": "Share"}, {"key": "e1", "text": "Export CSV"}]},
+    }})
+    assert page.seq == 2
+    assert _buttons(page) == ["Export CSV", "Share"]
+    assert page.content["pathname"] == "/ads-reports"
+
+
+def test_delta_with_a_keyless_element_changes_nothing():
+    page = PageModel()
+    page.update(SNAPSHOT, seq=1)
+    delta = {"type": "page-content-delta", "seq": 2, "base": 1, "changes": {
+        "buttons": {"remove": ["e2"], "upsert": [{"text": "Share"}]},
+    }}
+    assert not page.apply_delta(delta)
+    assert page.seq == 1
+    assert _buttons(page) == ["Export", "Refresh"]
+
+    # Through the data_received handler: refused without raising
+    page.on_data_received(_Packet(delta))
+    assert page.seq == 1 and _buttons(page) == ["Export", "Refresh"]
+
+
+def test_delta_on_another_base_is_refused():
+    page = PageModel()
+    page.update(SNAPSHOT, seq=1)
+    assert not page.apply_delta({"type": "page-content-delta", "seq": 3, "base": 2, "changes": {}})
+    assert page.seq == 1
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import date, timedelta
+
+from report_index import PAGE_ROWS, ReportIndex
+
+SECTIONS = ["whatsapp_reports", "ads_reports", "mail_reports"]
+
+
+def report_rows(days: int, first: date = date(2023, 1, 1)) -> list[dict]:
+    """One report per section per day; updated_at follows report_date."""
+    rows = []
+    for offset in range(days):
+        day = first + timedelta(days=offset)
+        for section in SECTIONS:
+            rows.append({"id": f"{section}-{day}", "section": section, "report_date": day.isoformat(),
+                         "updated_at": f"{day}T08:00:00.000000+00:00"})
+    return rows
+
+
+def test_lookup_and_closest_dates():
+    index = ReportIndex.from_rows(report_rows(10))
+    entry = index.lookup("ads_reports", date(2023, 1, 4))
+    assert entry.id == "ads_reports-2023-01-04"
+    assert entry.pathname == "/ads-reports"
+    assert index.lookup("ads_reports", date(2023, 2, 1)) is None
+    assert index.closest_dates("ads_reports", date(2023, 1, 20), n=2) == [date(2023, 1, 10), date(2023, 1, 9)]
+
+
+def test_moved_report_leaves_its_old_date():
+    index = ReportIndex.from_rows(report_rows(3))
+    changed = index.apply([{"id": "mail_reports-2023-01-02", "section": "mail_reports",
+                            "report_date": "2023-01-05", "updated_at": "2023-01-06T00:00:00+00:00"}])
+    assert changed == 1
+    assert index.lookup("mail_reports", date(2023, 1, 2)) is None
+    assert index.lookup("mail_reports", date(2023, 1, 5)).id == "mail_reports-2023-01-02"
+    assert date(2023, 1, 2) not in index.closest_dates("mail_reports", date(2023, 1, 2), n=5)
+
+
+def test_load_pages_past_max_rows(postgrest):
+    rows = report_rows(700)  # 2100 reports, over PostgREST's default max-rows
+    db = postgrest({"reports": rows}, max_rows=PAGE_ROWS)
+    index = ReportIndex()
+    asyncio.run(index.load(db))
+
+    assert len(index) == len(rows)
+    newest = date(2023, 1, 1) + timedelta(days=699)
+    assert index.lookup("whatsapp_reports", newest) is not None
+    assert index.high_water == rows[-1]["updated_at"]
+    assert len(db.requests) == 3
+
+
+def test_refresh_picks_up_rows_sharing_the_high_water_stamp(postgrest):
+    rows = report_rows(5)
+    db = postgrest({"reports": rows})
+    index = ReportIndex()
+    asyncio.run(index.load(db))
+    stamp = index.high_water
+
+    # Committed after the load, with the same updated_at as the newest row
+    db.tables["reports"].append({"id": "late", "section": "ads_reports", "report_date": "2023-01-09",
+                                 "updated_at": stamp})
+    assert asyncio.run(index.refresh(db)) == 1
+    assert index.lookup("ads_reports", date(2023, 1, 9)).id == "late"
+
+    # Nothing new: the rows at the high-water stamp come back but change nothing
+    assert asyncio.run(index.refresh(db)) == 0
+    assert len(index) == len(rows) + 1
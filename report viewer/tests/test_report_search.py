@@ -0,0 +1,33 @@
+import asyncio
+
+from report_search import ReportSearchIndex
+
+STAMP = "2025-11-02T08:00:00.000000+00:00"
+
+
+def _meeting(n: int, name: str, summary: str, updated_at: str = STAMP) -> dict:
+    return {"id": n, "meeting_name": name, "meeting_type": "weekly", "summary_html": f"<p>{summary}</p>",
+            "created_at": updated_at, "updated_at": updated_at}
+
+
+def test_refresh_picks_up_rows_sharing_the_high_water_stamp(postgrest):
+    db = postgrest({"meeting_summaries": [
+        _meeting(1, "Ads sync", "The ads budget moves to the summer campaign.", "2025-11-01T08:00:00+00:00"),
+        _meeting(2, "Mail review", "Newsletter open rates dropped after the redesign."),
+    ]})
+    index = ReportSearchIndex()
+    asyncio.run(index.refresh(db))
+    assert index.documents == 2
+
+    # Committed after the refresh, with the same updated_at as the newest row
+    db.tables["meeting_summaries"].append(_meeting(3, "Bots standup", "The WhatsApp bot restarts nightly now."))
+    assert asyncio.run(index.refresh(db)) == 1
+    assert index.documents == 3
+    assert index.search("whatsapp bot restarts nightly")[0].doc_id == "3"
+    requests = [request for request in db.requests if request[1] == "meeting_summaries"]
+    assert requests[-1][2]["filters"] == {"updated_at": f"gte.{STAMP}"}
+
+    # Nothing new: the rows at the high-water stamp come back but are not indexed again
+    chunks = len(index)
+    assert asyncio.run(index.refresh(db)) == 0
+    assert len(index) == chunks
@@ -0,0 +1,47 @@
+from page_model import PageModel
+from response_cache import CachedResponse, ResponseCache
+
+PAGE = "/ads-reports"
+
+
+def _page(total: str) -> PageModel:
+    page = PageModel()
+    page.update({"pathname": PAGE, "title": "Ads reports",
+                 "elements": {"cards": [{"text": f"Total spend {total}", "key": "spend"}]}})
+    return page
+
+
+def test_spoken_answer_is_not_replayed_once_the_page_changes(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path))
+    cache.use("config")
+    before, after = _page("1,200 EGP"), _page("1,450 EGP")
+    assert before.digest and before.digest != after.digest
+
+    answer = CachedResponse("Total spend on this page is 1,200 EGP.")
+    assert cache.store("what is the total spend", PAGE, answer, before.digest)
+    assert cache.lookup("what is the total spend", PAGE, before.digest) == answer
+    assert cache.lookup("What is the total spend?", PAGE, before.digest) == answer
+    assert cache.lookup("what is the total spend", PAGE, after.digest) is None
+
+
+def test_tool_call_answer_is_replayed_whatever_the_page_shows(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path))
+    cache.use("config")
+    answer = CachedResponse("", (("get_kpi", '{"metric": "spend"}'),))
+    assert cache.store("what is the total spend", PAGE, answer, _page("1,200 EGP").digest)
+    assert cache.lookup("what is the total spend", PAGE, _page("1,450 EGP").digest) == answer
+    assert cache.lookup("what is the total spend", PAGE) == answer
+
+
+def test_saved_entries_keep_their_page_content(tmp_path):
+    before, after = _page("1,200 EGP"), _page("1,450 EGP")
+    cache = ResponseCache(directory=str(tmp_path))
+    cache.use("config")
+    cache.store("what is the total spend", PAGE, CachedResponse("It is 1,200 EGP."), before.digest)
+    cache.save()
+
+    other = ResponseCache(directory=str(tmp_path))
+    other.use("config")
+    assert other.load() == 1
+    assert other.lookup("what is the total spend", PAGE, after.digest) is None
+    assert other.lookup("what is the total spend", PAGE, before.digest).text == "It is 1,200 EGP."
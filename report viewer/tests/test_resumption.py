@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from conversation_log import VOICE_CONVERSATIONS_TABLE
+from resumption import load_recent_conversation, resumed_chat_ctx
+from supabase_client import SupabaseClient
+
+USER_ID = "3f1c2a9e-5b7d-4e21-9a0c-6d8e4f2b1a73"
+ROOM = f"voice-{USER_ID}"
+
+TRANSCRIPT = [
+    {"role": "user", "content": "افتح تقارير الإعلانات", "timestamp": "2026-10-17T09:00:00+00:00"},
+    {"role": "assistant", "content": "Opening the ads reports.", "timestamp": "2026-10-17T09:00:02+00:00"},
+    {"role": "system", "content": "not part of the conversation", "timestamp": "2026-10-17T09:00:03+00:00"},
+    {"role": "user", "content": "and yesterday's one?", "timestamp": "2026-10-17T09:00:10+00:00"},
+    {"role": "assistant", "content": "Here is yesterday's ads report.", "timestamp": "2026-10-17T09:00:12+00:00"},
+]
+
+
+def _ago(minutes: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(minutes=minutes)).isoformat()
+
+
+def _messages(chat_ctx) -> list[tuple[str, str]]:
+    return [(item.role, item.text_content) for item in chat_ctx.items]
+
+
+def test_seeded_conversation_is_rehydrated(postgrest):
+    other_user = str(uuid.uuid4())
+    db = postgrest({VOICE_CONVERSATIONS_TABLE: [
+        {"id": "mine", "user_id": USER_ID, "room_name": ROOM, "transcript": TRANSCRIPT,
+         "duration_seconds": 40, "updated_at": _ago(5)},
+        {"id": "older", "user_id": USER_ID, "room_name": ROOM, "transcript": TRANSCRIPT[:2],
+         "duration_seconds": 10, "updated_at": _ago(20)},
+        # Same room name, someone else's row (and newer): never resumed
+        {"id": "theirs", "user_id": other_user, "room_name": ROOM, "transcript": TRANSCRIPT[:1],
+         "duration_seconds": 5, "updated_at": _ago(1)},
+    ]})
+
+    row = asyncio.run(load_recent_conversation(ROOM, client=db))
+    assert row["id"] == "mine"
+    assert db.requests[-1][2]["filters"]["user_id"] == f"eq.{USER_ID}"
+
+    assert _messages(resumed_chat_ctx(row)) == [
+        ("user", "افتح تقارير الإعلانات"),
+        ("assistant", "Opening the ads reports."),
+        ("user", "and yesterday's one?"),
+        ("assistant", "Here is yesterday's ads report."),
+    ]
+    assert _messages(resumed_chat_ctx(row, limit=2)) == [
+        ("user", "and yesterday's one?"),
+        ("assistant", "Here is yesterday's ads report."),
+    ]
+
+
+def test_nothing_to_resume(postgrest):
+    db = postgrest({VOICE_CONVERSATIONS_TABLE: [
+        {"id": "stale", "user_id": USER_ID, "room_name": ROOM, "transcript": TRANSCRIPT,
+         "duration_seconds": 40, "updated_at": _ago(600)},
+    ]})
+    assert asyncio.run(load_recent_conversation(ROOM, client=db, window=1800)) is None
+    # A room name without a user id: no owner to match, so no query at all
+    requests = len(db.requests)
+    assert asyncio.run(load_recent_conversation("voice-1718000000-abc12", client=db)) is None
+    assert len(db.requests) == requests
+
+
+# ---------- against the real voice_conversations table (local Supabase stack) ----------
+
+def test_row_from_the_database_is_rehydrated(supabase_stack, auth_user):
+    url, key = supabase_stack
+    room = f"voice-{auth_user}"
+
+    async def scenario():
+        client = SupabaseClient(url, key)
+        try:
+            await client.upsert(VOICE_CONVERSATIONS_TABLE, [{
+                "id": str(uuid.uuid4()), "user_id": auth_user, "room_name": room,
+                "transcript": TRANSCRIPT, "duration_seconds": 40, "language": "ar",
+            }], on_conflict="id")
+            mine = await load_recent_conversation(room, client=client)
+            not_mine = await load_recent_conversation(room, client=client, user_id=str(uuid.uuid4()))
+            return mine, not_mine
+        finally:
+            await client.close()
+
+    mine, not_mine = asyncio.run(scenario())
+    assert not_mine is None
+    assert mine["user_id"] == auth_user
+    assert _messages(resumed_chat_ctx(mine))[-1] == ("assistant", "Here is yesterday's ads report.")
+    assert len(resumed_chat_ctx(mine).items) == 4
@@ -3,25 +3,61 @@ Custom function tools for the LiveKit voice agent.
 
 This module contains all custom tools that the agent can use, including:
 - Website navigation tools
-- DOM interaction tools (click elements, view reports by date)
+- DOM interaction tools (click elements, view reports by date, multi-step plans)
+- Report search (answer questions from report content, with citations)
+- KPIs (counts of reports, posts, content ideas and active bots over a period)
 """
 
 from livekit.agents import function_tool, RunContext
+import asyncio
 import logging
 import json
 import os
+import re
+import time
+import uuid
+from datetime import date, timedelta
+from urllib.parse import urlparse
+
+from client_capabilities import NAVIGATION_TOPIC
+from page_model import LEGACY_PAGE_LOAD_DELAY, element_label
+from pending_actions import DOMActionResult
+from date_parser import parse_date, parse_period
+from interruptions import interruptible
+from kpi_aggregates import BOTS_METRIC, METRICS, KPIMetric, get_kpi_aggregates, group_label
+from dom_plan import PlanError, PlanStep, build_plan, describe_steps, encode_plan
+from outbound import DROPPED, outbound_for
+from report_index import REPORT_TYPE_SECTIONS, get_report_index
+from routes import ROUTES_BY_NAME, ROUTES_BY_PATH, SECTION_PATHS, RouteName
+from tracing import traced_publish, traced_tool
 
 logger = logging.getLogger("agent-tools")
 
 # Frontend base URL for navigation (from environment)
 FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "https://report-viewer-plus.lovable.app")
 
+# Seconds to wait for the frontend to acknowledge a DOM action (for plans: the
+# longest wait between two step acks)
+DOM_ACTION_TIMEOUT = float(os.getenv("DOM_ACTION_TIMEOUT", "5"))
+
+# Upper bound in seconds on waiting for a navigated page to report it is ready
+PAGE_READY_TIMEOUT = float(os.getenv("PAGE_READY_TIMEOUT", "6"))
+
+# Seconds a navigation waits for the frontend to be in the room
+ROOM_READY_TIMEOUT = float(os.getenv("ROOM_READY_TIMEOUT", "2"))
+
+# Characters stripped from navigation pathnames and URLs (printable ASCII and Arabic are kept)
+_INVALID_PATH_CHARS = re.compile(r'[^\x20-\x7E\u0600-\u06FF/]')
+_INVALID_URL_CHARS = re.compile(r'[^\x20-\x7E\u0600-\u06FF/:.]')
+
 
 # ==================== NAVIGATION HELPER ====================
 
 async def send_navigation_url(agent_instance, context: RunContext, url: str):
     """
-    Helper function to send navigation URL to frontend via LiveKit data channel.
+    Helper function to send navigation URL to frontend on the channel it
+    announced in the capability handshake (the `agent-navigation` data topic
+    unless it asked otherwise).
 
     Args:
         agent_instance: The agent instance (needed to access room)
@@ -34,7 +70,6 @@ async def send_navigation_url(agent_instance, context: RunContext, url: str):
     try:
         # Extract pathname from URL if it's a full URL
         if url.startswith('http://') or url.startswith('https://'):
-            from urllib.parse import urlparse
             parsed = urlparse(url)
             pathname = parsed.path or '/'
         else:
@@ -46,7 +81,7 @@ async def send_navigation_url(agent_instance, context: RunContext, url: str):
         if not pathname.startswith('/'):
             pathname = '/' + pathname
 
-        logger.info(f"🔍 Normalized pathname: '{url}' -> '{pathname}'")
+        logger.debug(f"🔍 Normalized pathname: '{url}' -> '{pathname}'")
 
         # Validate inputs
         if not isinstance(pathname, str) or len(pathname) == 0:
@@ -57,9 +92,8 @@ async def send_navigation_url(agent_instance, context: RunContext, url: str):
             return False
 
         # Clean invalid characters
-        import re
-        pathname = re.sub(r'[^\x20-\x7E\u0600-\u06FF/]', '', pathname)
-        url = re.sub(r'[^\x20-\x7E\u0600-\u06FF/:.]', '', url)
+        pathname = _INVALID_PATH_CHARS.sub('', pathname)
+        url = _INVALID_URL_CHARS.sub('', url)
 
         # Create navigation message
         message = {
@@ -79,7 +113,7 @@ async def send_navigation_url(agent_instance, context: RunContext, url: str):
             logger.error(f"❌ Message too large: {len(message_bytes)} bytes")
             return False
 
-        logger.info(f"📤 Sending navigation: {url} -> {pathname}")
+        logger.debug(f"📤 Sending navigation: {url} -> {pathname}")
 
         # Get room from agent instance
         room = getattr(agent_instance, '_room', None)
@@ -87,62 +121,69 @@ async def send_navigation_url(agent_instance, context: RunContext, url: str):
             logger.error("❌ No room reference available")
             return False
 
-        # Send via data channel
-        import asyncio
-        await asyncio.sleep(0.1)  # Small delay for room readiness
+        # Publish only on the channel the frontend announced, once it is in the room
+        client = getattr(agent_instance, '_client', None)
+        if client is not None and not await client.wait_ready(ROOM_READY_TIMEOUT):
+            logger.warning(f"⚠️ Frontend not in the room after {ROOM_READY_TIMEOUT:g}s, publishing anyway")
+        channel = client.navigation_channel if client is not None else "data"
+        topic_name = client.navigation_topic if client is not None else NAVIGATION_TOPIC
 
+        start = time.perf_counter()
         try:
-            topic_name = "agent-navigation"
-            await room.local_participant.publish_data(
-                message_bytes,
-                reliable=True,
-                topic=topic_name
-            )
-            logger.info(f"✅ Sent navigation via data channel: {pathname}")
-
-            # Also send via metadata as fallback
-            try:
-                metadata_dict = {
+            if channel == "metadata":
+                metadata_json = json.dumps({
                     "navigate": pathname,
                     "url": url,
                     "type": "navigation",
                     "pathname": pathname
-                }
-                metadata_json = json.dumps(metadata_dict)
-                await room.local_participant.set_metadata(metadata_json)
-                logger.info(f"✅ Set metadata with navigation: {pathname}")
-            except Exception as e:
-                logger.warning(f"Could not set metadata: {e}")
-
-            return True
-
+                })
+                size = len(metadata_json.encode('utf-8'))
+                with traced_publish("metadata", size):
+                    await room.local_participant.set_metadata(metadata_json)
+            else:
+                size = len(message_bytes)
+                # Only the latest navigation of a frame goes out; an older one still queued is merged into it
+                outcome = await outbound_for(room).send(message_bytes, topic_name, key="navigation")
+                if outcome == DROPPED:
+                    logger.error(f"❌ Navigation to {pathname} dropped: outbound queue full")
+                    return False
         except Exception as e:
             logger.error(f"❌ Failed to send navigation: {e}")
+            if client is not None:
+                client.publish_stats.record(time.perf_counter() - start, 0, ok=False)
             return False
 
+        elapsed = time.perf_counter() - start
+        if client is not None:
+            client.publish_stats.record(elapsed, size)
+        logger.info(f"✅ Sent navigation via {channel}: {pathname} ({size} bytes, {elapsed * 1000:.1f}ms)")
+        return True
+
     except Exception as e:
-        logger.error(f"❌ Navigation error: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"❌ Navigation error: {e}")
         return False
 
 
-async def send_dom_action(agent_instance, context: RunContext, action_type: str, target: dict, value: str = None):
+async def send_dom_action(agent_instance, context: RunContext, action_type: str, target: dict, value: str = None,
+                          timeout: float = DOM_ACTION_TIMEOUT):
     """
     Helper function to send DOM action to frontend via LiveKit data channel.
 
+    Waits for the frontend's `dom-action-result` acknowledgement (matched by
+    actionId) so the caller learns whether the action actually happened.
+
     Args:
         agent_instance: The agent instance (needed to access room)
         context: RunContext from the function tool
         action_type: Type of action (click, fill, read, focus, scroll)
         target: Target selector (dict with selector, index, id, text, role, date)
         value: Value for fill actions
+        timeout: Seconds to wait for the frontend's result
 
     Returns:
-        bool: True if action was sent successfully
+        DOMActionResult: Outcome reported by the frontend (falsy on failure or timeout)
     """
     try:
-        import uuid
         action_id = str(uuid.uuid4())
 
         message = {
@@ -161,270 +202,155 @@ async def send_dom_action(agent_instance, context: RunContext, action_type: str,
         # Validate message
         if len(message_bytes) == 0 or len(message_bytes) > 64 * 1024:
             logger.error(f"❌ Invalid message size: {len(message_bytes)} bytes")
-            return False
+            return DOMActionResult(False, "Invalid action message size")
 
-        logger.info(f"📤 Sending DOM action: {action_type} on {target}")
+        logger.debug(f"📤 Sending DOM action: {action_type} on {target}")
 
         # Get room
         room = getattr(agent_instance, '_room', None)
         if not room:
             logger.error("❌ No room reference")
-            return False
+            return DOMActionResult(False, "No room connection")
+
+        # Register before publishing so a fast result can't be missed
+        pending = getattr(agent_instance, '_pending_actions', None)
+        if pending is not None:
+            pending.register(action_id)
 
         # Send action
         topic_name = "dom-action"
-        await room.local_participant.publish_data(
-            message_bytes,
-            reliable=True,
-            topic=topic_name
-        )
-        logger.info(f"✅ Sent DOM action: {action_type}")
-        return True
+        try:
+            outcome = await outbound_for(room).send(message_bytes, topic_name)
+        except asyncio.CancelledError:
+            # It may have gone out: make sure the frontend drops it
+            if pending is not None:
+                pending.revoke(action_id)
+            raise
+        except Exception:
+            if pending is not None:
+                pending.discard(action_id)
+            raise
+        if outcome == DROPPED:
+            if pending is not None:
+                pending.discard(action_id)
+            return DOMActionResult(False, "Too many messages queued for the page, action not sent")
+        logger.debug(f"✅ Sent DOM action: {action_type} ({action_id})")
+
+        if pending is None:
+            return DOMActionResult(True, "Sent without acknowledgement")
+
+        result = await pending.wait(action_id, timeout)
+        logger.info(f"{'✅' if result else '❌'} DOM action {action_id} result: {result.message}")
+        return result
 
     except Exception as e:
         logger.error(f"❌ DOM action error: {e}")
-        return False
+        return DOMActionResult(False, str(e))
 
 
-# ==================== NAVIGATION TOOLS ====================
-
-@function_tool
-async def open_dashboard(context: RunContext):
-    """Navigate to the main dashboard page.
-    Use when user asks to:
-    - Go to dashboard
-    - Navigate to dashboard
-    - Show dashboard
-    - Open dashboard
-    - Open main page
-    - See overview/main page
-    - Arabic: "عايز اروح على الداشبورد", "افتح الداشبورد", "وريني الداشبورد", "روح على الداشبورد", "عايز صفحة الداشبورد"
-    """
-    logger.info("🎯 open_dashboard called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/dashboard"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/dashboard جاري فتح الداشبورد... Opening the dashboard..."
-
-
-@function_tool
-async def show_whatsapp_reports(context: RunContext):
-    """Navigate to WhatsApp reports page.
-    Use when user asks to:
-    - Go to WhatsApp reports
-    - Navigate to WhatsApp page
-    - Show WhatsApp reports
-    - Open WhatsApp reports
-    - Show WhatsApp data/analytics
-    - Arabic: "عايز اروح على تقارير الواتساب", "افتح تقارير الواتساب", "وريني تقارير الواتساب"
+async def send_dom_plan(agent_instance, steps: list[dict], timeout: float = DOM_ACTION_TIMEOUT):
     """
-    logger.info("🎯 show_whatsapp_reports called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/whatsapp-reports"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/whatsapp-reports جاري فتح تقارير الواتساب... Opening WhatsApp reports..."
-
-
-@function_tool
-async def show_productivity_reports(context: RunContext):
-    """Navigate to productivity reports page.
-
-    Use when user asks to:
-    - Go to productivity reports
-    - Navigate to productivity page
-    - Show productivity reports
-    - Redirect to productivity reports
-    - Arabic: "عايز اروح على صفحة الإنتاجية", "افتح تقارير الإنتاجية", "وريني صفحة الإنتاجية", "روح على تقارير الإنتاجية"
-
-    **CRITICAL**: If user mentions a SPECIFIC DATE (e.g., "productivity report of 2 nov 2025", "عايز تقرير الإنتاجية بتاع 2 نوفمبر"),
-    you MUST use view_report_by_date() function instead! DO NOT use this function when a date is mentioned.
-    """
-    logger.info("🎯 show_productivity_reports called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/productivity-reports"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/productivity-reports جاري فتح تقارير الإنتاجية... Opening productivity reports..."
+    Send a validated multi-step plan (dom_plan.build_plan) as one `dom-plan`
+    message and wait for the frontend to finish it.
 
+    Args:
+        agent_instance: The agent instance (needed to access room)
+        steps: Wire steps from build_plan()
+        timeout: Longest wait for the next step ack before giving up
 
-@function_tool
-async def show_ads_reports(context: RunContext):
-    """Navigate to advertising reports page.
-    Use when user asks to:
-    - Go to ads/advertising reports
-    - Navigate to ads page
-    - Show ads reports
-    - Open advertising reports
-    - Arabic: "عايز اروح على تقارير الإعلانات", "افتح تقارير الإعلانات"
+    Returns:
+        DOMActionResult: Outcome of the plan, with its per-step acks in `steps`
     """
-    logger.info("🎯 show_ads_reports called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/ads-reports"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/ads-reports جاري فتح تقارير الإعلانات... Opening ads reports..."
+    plan_id = str(uuid.uuid4())
+    try:
+        message_bytes = encode_plan(plan_id, steps)
+    except PlanError as e:
+        return DOMActionResult(False, str(e))
 
+    room = getattr(agent_instance, '_room', None)
+    if not room:
+        logger.error("❌ No room reference")
+        return DOMActionResult(False, "No room connection")
 
-@function_tool
-async def show_mail_reports(context: RunContext):
-    """Navigate to email reports page.
-    Use when user asks to:
-    - Go to email/mail reports page
-    - Navigate to email reports
-    - Show mail reports
-    - Open email reports
-    - Arabic: "عايز اروح على تقارير الإيميلات", "افتح تقارير البريد"
-    """
-    logger.info("🎯 show_mail_reports called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/mail-reports"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/mail-reports جاري فتح تقارير الإيميلات... Opening mail reports..."
+    pending = getattr(agent_instance, '_pending_actions', None)
+    if pending is not None:
+        pending.register(plan_id, plan=True)
 
+    topic_name = "dom-action"
+    try:
+        outcome = await outbound_for(room).send(message_bytes, topic_name, label="dom-plan")
+    except asyncio.CancelledError:
+        if pending is not None:
+            pending.revoke(plan_id)
+        raise
+    except Exception as e:
+        if pending is not None:
+            pending.discard(plan_id)
+        logger.error(f"❌ DOM plan error: {e}")
+        return DOMActionResult(False, str(e))
+    if outcome == DROPPED:
+        if pending is not None:
+            pending.discard(plan_id)
+        return DOMActionResult(False, "Too many messages queued for the page, plan not sent")
+    logger.debug(f"✅ Sent DOM plan: {len(steps)} steps, {len(message_bytes)} bytes ({plan_id})")
 
-@function_tool
-async def open_bots(context: RunContext):
-    """Navigate to bot controls page.
-    Use when user asks to:
-    - Go to bots/bot controls
-    - Navigate to bots page
-    - Show bots
-    - Open bot controls
-    - Arabic: "عايز اروح على البوتات", "افتح صفحة البوتات"
-    """
-    logger.info("🎯 open_bots called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/bots"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/bots جاري فتح صفحة البوتات... Opening bots page..."
+    if pending is None:
+        return DOMActionResult(True, "Sent without acknowledgement")
 
+    result = await pending.wait(plan_id, timeout)
+    logger.info(f"{'✅' if result else '❌'} DOM plan {plan_id}: {describe_steps(list(result.steps), len(steps))}")
+    return result
 
-@function_tool
-async def show_social_posts(context: RunContext):
-    """Navigate to social media posts page.
-    Use when user asks to:
-    - Go to social posts/social media
-    - Navigate to social posts page
-    - Show social posts
-    - Open social media posts
-    - Arabic: "عايز اروح على البوستات", "افتح صفحة السوشيال ميديا"
-    """
-    logger.info("🎯 show_social_posts called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/social-posts"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/social-posts جاري فتح صفحة البوستات... Opening social posts..."
 
+def terminal_reply(agent_instance, context: RunContext, text: str) -> None:
+    """Have `text` spoken as this call's answer, without a second LLM pass (terminal_replies.py)."""
+    terminal = getattr(agent_instance, '_terminal', None)
+    if terminal is not None:
+        terminal.reply(context, text)
 
-@function_tool
-async def show_content_ideas(context: RunContext):
-    """Navigate to content ideas page.
-    Use when user asks to:
-    - Go to content ideas
-    - Navigate to content ideas page
-    - Show content ideas
-    - Open content ideas
-    - Arabic: "عايز اروح على الأفكار", "افتح أفكار المحتوى"
-    """
-    logger.info("🎯 show_content_ideas called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/content-ideas"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/content-ideas جاري فتح صفحة الأفكار... Opening content ideas..."
 
+# ==================== NAVIGATION TOOLS ====================
 
 @function_tool
-async def show_meeting_summary(context: RunContext):
-    """Navigate to meeting summary page.
-    Use when user asks to:
-    - Go to meeting summary
-    - Navigate to meetings page
-    - Show meetings
-    - Open meeting notes
-    - Arabic: "عايز اروح على الاجتماعات", "افتح ملخص الاجتماعات"
-    """
-    logger.info("🎯 show_meeting_summary called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/meeting-summary"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/meeting-summary جاري فتح صفحة الاجتماعات... Opening meeting summary..."
-
+@interruptible
+@traced_tool
+async def navigate(context: RunContext, route: RouteName):
+    """Open a dashboard page. Do not use when the user mentions a date; use view_report_by_date instead.
 
-@function_tool
-async def show_courses_prices(context: RunContext):
-    """Navigate to courses and pricing page.
-    Use when user asks to:
-    - Go to courses/courses prices
-    - Navigate to courses page
-    - Show courses
-    - Open course pricing
-    - Arabic: "عايز اروح على الكورسات", "افتح صفحة أسعار الكورسات"
-    """
-    logger.info("🎯 show_courses_prices called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/courses-prices"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/courses-prices جاري فتح صفحة الكورسات... Opening courses and prices..."
-
-
-@function_tool
-async def go_home(context: RunContext):
-    """Navigate to home page.
-    Use when user asks to:
-    - Go home
-    - Navigate to home
-    - Show home page
-    - Go to homepage
-    - Arabic: "عايز اروح على الصفحة الرئيسية", "افتح الهوم"
+    Args:
+        route: The page to open
     """
-    logger.info("🎯 go_home called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/ جاري فتح الصفحة الرئيسية... Opening home page..."
+    logger.debug(f"navigate: route={route!r}")
+    target = ROUTES_BY_NAME.get(route)
+    if target is None:
+        return f"Unknown page '{route}'. Available pages: {', '.join(ROUTES_BY_NAME)}."
+    agent = context.session.current_agent
+    if await send_navigation_url(agent, context, f"{FRONTEND_BASE_URL}{target.pathname}"):
+        terminal_reply(agent, context, target.confirmation)
+    return f"NAVIGATE:{target.pathname} {target.confirmation}"
 
 
 @function_tool
+@traced_tool
 async def where_am_i(context: RunContext):
-    """Ask the frontend to tell user their current page location. This does NOT navigate - it just shows current location."""
-    return "I can see you're currently on the page. To help you navigate, just tell me where you'd like to go - like 'show me the dashboard' or 'open WhatsApp reports'."
-
-
-@function_tool
-async def open_admin_settings(context: RunContext):
-    """Navigate to admin settings page.
-    Use when user asks to:
-    - Go to admin settings/settings
-    - Navigate to settings
-    - Show settings
-    - Open admin panel
-    - Arabic: "عايز اروح على الإعدادات", "افتح صفحة الأدمن"
-    """
-    logger.info("🎯 open_admin_settings called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/admin/settings"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/admin/settings جاري فتح صفحة الإعدادات... Opening admin settings..."
-
+    """Tell the user which page they are on and what it shows. This does NOT navigate."""
+    page = getattr(context.session.current_agent, '_page_model', None)
+    if page is None or page.content is None:
+        return "I can see you're currently on the page. To help you navigate, just tell me where you'd like to go - like 'show me the dashboard' or 'open WhatsApp reports'."
 
-@function_tool
-async def show_awaiting_approval(context: RunContext):
-    """Navigate to awaiting approval page.
-    Use when user asks to:
-    - Go to awaiting approval
-    - Navigate to approval page
-    - Show pending approvals
-    - Open awaiting approval
-    - Arabic: "عايز اروح على الموافقات", "افتح الموافقات المعلقة"
-    """
-    logger.info("🎯 show_awaiting_approval called")
-    agent = context.agent
-    url = f"{FRONTEND_BASE_URL}/awaiting-approval"
-    await send_navigation_url(agent, context, url)
-    return "NAVIGATE:/awaiting-approval جاري فتح الموافقات... Opening awaiting approval page..."
+    route = ROUTES_BY_PATH.get(page.pathname)
+    counts = ", ".join(f"{len(page.elements(kind))} {kind}" for kind in ("buttons", "links", "inputs", "cards"))
+    if route is not None:
+        terminal_reply(context.session.current_agent, context,
+                       f"إنت دلوقتي في {route.label_ar}... You're on {route.label_en}.")
+    return f"The user is on {route.label_en if route else page.content.get('title') or 'a page'} ({page.pathname}). It shows {counts}."
 
 
 # ==================== DOM INTERACTION TOOLS ====================
 
 @function_tool
+@interruptible
+@traced_tool
 async def click_element(context: RunContext, element_text: str = None, element_id: str = None, element_index: int = None):
     """Click a button or interactive element on the current page.
 
@@ -439,13 +365,24 @@ async def click_element(context: RunContext, element_text: str = None, element_i
         element_id: ID of the element to click
         element_index: Index of the element if multiple matches (0-based)
     """
-    logger.info(f"🔧 click_element called")
-    logger.info(f"   element_text: {element_text}")
-    logger.info(f"   element_id: {element_id}")
-    logger.info(f"   element_index: {element_index}")
+    logger.debug(f"click_element: text={element_text!r} id={element_id!r} index={element_index!r}")
+
+    agent = context.session.current_agent
+
+    # Resolve against the page model first: a target that isn't on the page is
+    # answered without a round trip, and a found one is clicked by its key
+    page = getattr(agent, '_page_model', None)
+    element = None
+    if page is not None and page.content is not None and (element_text or element_id):
+        element = page.resolve(element_text, element_id, element_index)
+        if element is None:
+            buttons = ", ".join(filter(None, (element_label(el)[:40] for el in page.elements("buttons")[:10])))
+            return (f"There is no '{element_text or element_id}' on this page ({page.pathname})."
+                    + (f" Buttons on the page: {buttons}." if buttons else ""))
 
-    agent = context.agent
     target = {}
+    if element is not None and element.get("key"):
+        target["key"] = element["key"]
     if element_id:
         target["id"] = element_id
     if element_text:
@@ -453,15 +390,17 @@ async def click_element(context: RunContext, element_text: str = None, element_i
     if element_index is not None:
         target["index"] = element_index
 
-    success = await send_dom_action(agent, context, "click", target)
+    result = await send_dom_action(agent, context, "click", target)
 
-    if success:
-        return f"Clicked element: {element_text or element_id or 'element'}"
+    if result:
+        return f"Clicked element: {element_label(element)[:80] if element else element_text or element_id or 'element'}"
     else:
-        return f"Failed to click element: {element_text or element_id or 'element'}"
+        return f"Failed to click element: {element_text or element_id or 'element'}. {result.message}"
 
 
 @function_tool
+@interruptible
+@traced_tool
 async def view_report_by_date(context: RunContext, report_type: str = None, date: str = None):
     """View a specific report by date on the report card page.
 
@@ -474,91 +413,255 @@ async def view_report_by_date(context: RunContext, report_type: str = None, date
     - "Show me report for January 15, 2025" → use this function
     - "I need specific report" + mentions date → use this function
 
-    **DO NOT use show_*_reports() functions when a date is mentioned - ALWAYS use this function instead.**
+    **DO NOT use navigate() when a date is mentioned - ALWAYS use this function instead.**
 
     This function will:
-    1. Navigate to the appropriate report page
-    2. Wait for page to load
-    3. Find the report card with the matching date
-    4. Click the "View Report" button
+    1. Look up the report for that date (and say so right away if there is none)
+    2. Navigate to the appropriate report page
+    3. Wait for the page to report that its report cards are rendered
+    4. Click the "View Report" button of the matching report
 
     Args:
         report_type: Type of report - "whatsapp", "productivity", "ads", "mail" (optional, will detect from context)
-        date: Date in various formats (e.g., "2 nov 2025", "2 november 2025", "November 2, 2025", "2025-11-02", "2/11/2025")
+        date: Date as the user said it (e.g., "2 nov 2025", "November 2, 2025", "2025-11-02", "2/11/2025", "2 نوفمبر", "yesterday", "امبارح", "last Sunday")
     """
-    logger.info(f"🔧 view_report_by_date called")
-    logger.info(f"   report_type: {report_type}")
-    logger.info(f"   date: {date}")
+    logger.debug(f"view_report_by_date: report_type={report_type!r} date={date!r}")
 
-    agent = context.agent
+    agent = context.session.current_agent
 
     # Determine report type
     if not report_type:
         report_type = "whatsapp"  # Default
-        logger.info(f"   Using default report_type: {report_type}")
+        logger.debug(f"   Using default report_type: {report_type}")
+
+    section = REPORT_TYPE_SECTIONS.get(report_type.lower(), "whatsapp_reports")
+    report_url = SECTION_PATHS[section]
+
+    # Resolve the exact report from the worker's index when the date parses,
+    # so a missing report is answered without touching the page
+    report = None
+    report_day = parse_date(date) if date else None
+    index = await get_report_index() if report_day else None
+    if index is not None:
+        report = index.lookup(section, report_day)
+        if report is None:
+            nearby = ", ".join(d.strftime("%d %B %Y") for d in index.closest_dates(section, report_day))
+            logger.info(f"   No {section} report on {report_day}, nearest: {nearby or 'none'}")
+            return (f"There is no {report_type} report for {report_day.strftime('%d %B %Y')}."
+                    + (f" The closest reports are from {nearby}." if nearby else ""))
+        logger.info(f"   Resolved report {report.id} for {report_day}")
+
+    # Step 1: Navigate to the report page, watching for its page-content first
+    # so a fast render can't be missed
+    page = getattr(agent, '_page_model', None)
+    ready = page.expect(report_url, require_cards=True) if page is not None else None
+    logger.debug(f"   Step 1: Navigating to: {report_url}")
+    await send_navigation_url(agent, context, f"{FRONTEND_BASE_URL}{report_url}")
+
+    # Step 2: Wait until the frontend reports the page with its report cards
+    if ready is not None:
+        content = await page.wait(ready, PAGE_READY_TIMEOUT)
+        if content is None:
+            logger.warning(f"   Step 2: {report_url} not ready after {PAGE_READY_TIMEOUT:g}s, trying anyway")
+        else:
+            logger.debug(f"   Step 2: {report_url} ready")
+    else:
+        logger.info(f"   Step 2: No page model, waiting {LEGACY_PAGE_LOAD_DELAY:g} seconds for page to load...")
+        await asyncio.sleep(LEGACY_PAGE_LOAD_DELAY)
+
+    # Step 3: Click the report's View Report button, by id when the index
+    # resolved it, otherwise by searching the cards for the date
+    if report is not None:
+        target = {"reportId": report.id, "text": "View Report"}
+        logger.debug(f"   Step 3: Opening report {report.id}")
+    else:
+        target = {
+            "text": "View Report",
+            "date": date or ""
+        }
+        logger.debug(f"   Step 3: Searching for report with date: {date}")
+    result = await send_dom_action(agent, context, "click", target)
 
-    # Map report types to URLs
-    report_urls = {
-        "whatsapp": "/whatsapp-reports",
-        "productivity": "/productivity-reports",
-        "ads": "/ads-reports",
-        "mail": "/mail-reports",
-        "email": "/mail-reports"
-    }
+    if result:
+        logger.info(f"✅ Opened report for date: {date}")
+        return f"Opening report for {date} on {report_type} reports page..."
+    else:
+        logger.error(f"❌ Failed to open report: {result.message}")
+        return f"Failed to open report for {date} ({result.message}). Please try navigating to {report_type} reports page manually."
 
-    report_url = report_urls.get(report_type.lower(), "/whatsapp-reports")
 
-    # Step 1: Navigate to the report page
-    logger.info(f"   Step 1: Navigating to: {report_url}")
-    await send_navigation_url(agent, context, f"{FRONTEND_BASE_URL}{report_url}")
+@function_tool
+@interruptible
+@traced_tool
+async def run_dom_plan(context: RunContext, steps: list[PlanStep]):
+    """Do several page actions in one go, e.g. "open productivity reports, search November, open the second report".
+
+    Use instead of separate navigate/click_element calls when the user asks for
+    two or more steps. Each step waits for its element (or page) to appear.
+
+    Args:
+        steps: The actions, in order (at most 10)
+    """
+    agent = context.session.current_agent
+    try:
+        wire_steps = build_plan(steps, getattr(agent, '_page_model', None))
+    except PlanError as e:
+        return f"Plan not sent: {e}"
 
-    # Step 2: Wait for page to load
-    import asyncio
-    logger.info(f"   Step 2: Waiting 3 seconds for page to load...")
-    await asyncio.sleep(3)
+    result = await send_dom_plan(agent, wire_steps)
+    progress = describe_steps(list(result.steps), len(wire_steps))
+    if result:
+        return f"Done ({progress})."
+    return f"The plan stopped: {result.message} ({progress})."
 
-    # Step 3: Send DOM action to find card by date and click View Report button
-    target = {
-        "text": "View Report",
-        "date": date or ""
-    }
 
-    logger.info(f"   Step 3: Searching for report with date: {date}")
-    success = await send_dom_action(agent, context, "click", target)
+# ==================== REPORT SEARCH TOOLS ====================
 
-    if success:
-        logger.info(f"✅ Successfully sent command to view report for date: {date}")
-        return f"Opening report for {date} on {report_type} reports page..."
+@function_tool
+@traced_tool
+async def search_reports(context: RunContext, question: str, report_type: str = None, date: str = None):
+    """Search the content of the reports, meeting summaries and weekly analyses to answer a question about them.
+
+    Use this when the user asks what a report SAYS, not to open it:
+    - "What did the productivity report say about delays last week?"
+    - "ايه اللي اتقال في الاجتماع عن الميزانية؟"
+    - "How many ads campaigns were mentioned on 2 nov 2025?"
+
+    Answer only from the returned snippets, in the user's language, and say
+    which report (and date) the answer comes from. If nothing relevant is
+    returned, say you couldn't find it in the reports.
+
+    Args:
+        question: The user's question, in their words
+        report_type: Optional - "whatsapp", "productivity", "ads", "mail", "meeting" or "weekly"
+        date: Optional date as the user said it (e.g., "2 nov 2025", "امبارح", "last Sunday")
+    """
+    logger.debug(f"search_reports: question={question!r} report_type={report_type!r} date={date!r}")
+
+    from report_search import get_report_search  # numpy index and HTML parser: loaded with the first search
+
+    index = await get_report_search()
+    if index is None:
+        return "Report search is not available right now."
+
+    day = parse_date(date) if date else None
+    start = time.perf_counter()
+    hits = index.search(question, report_type=report_type, day=day)
+    logger.info(f"   Report search: {len(hits)} hits in {(time.perf_counter() - start) * 1000:.1f}ms")
+    if not hits:
+        scope = f" for {day.strftime('%d %B %Y')}" if day else ""
+        return f"No report content matches that question{scope}."
+    return "\n".join(f"[{n}] {hit.cite()}: {hit.snippet}" for n, hit in enumerate(hits, 1))
+
+
+# ==================== KPI TOOLS ====================
+
+def _span(start: date, end: date) -> str:
+    if start == end:
+        return f"on {start.strftime('%d %B %Y')}"
+    return f"from {start.strftime('%d %B %Y')} to {end.strftime('%d %B %Y')}"
+
+
+@function_tool
+@traced_tool
+async def get_kpi(context: RunContext, metric: KPIMetric, period: str = None, group: str = None):
+    """Count reports, posts, content ideas or active bots over a period, to answer "how many" questions.
+
+    Use this for numbers and trends, not to open a page:
+    - "How many WhatsApp reports this month?" → metric="reports", group="whatsapp", period="this month"
+    - "أداء الإعلانات الأسبوع ده" → metric="reports", group="ads", period="الأسبوع ده"
+    - "How many posts failed last week?" → metric="posts_failed", period="last week"
+    - "Which bots are running?" → metric="bots_active"
+
+    Answer briefly in the user's language, from the numbers returned.
+
+    Args:
+        metric: What to count
+        period: The period as the user said it (e.g., "this month", "الشهر اللي فات", "last 30 days", "November 2025", "امبارح"); empty for all time
+        group: Optional - report type ("whatsapp", "productivity", "ads", "mail") for reports, or platform (e.g., "facebook") for posts
+    """
+    logger.debug(f"get_kpi: metric={metric!r} period={period!r} group={group!r}")
+
+    aggregates = await get_kpi_aggregates()
+    if aggregates is None:
+        return "The dashboard numbers are not available right now."
+
+    if metric == BOTS_METRIC:
+        active = sorted(name for name, is_active in aggregates.bots.items() if is_active)
+        return (f"{len(active)} of {len(aggregates.bots)} bots are active"
+                + (f": {', '.join(active)}." if active else "."))
+    if metric not in METRICS:
+        return f"Unknown metric '{metric}'. Available: {', '.join(METRICS)}, {BOTS_METRIC}."
+
+    today = date.today()
+    if period:
+        span = parse_period(period)
+        if span is None:
+            return f"Could not tell which days '{period}' means. Ask the user for a day, week, month or year."
+        if span[0] > today:
+            return f"The period {_span(span[0], span[1])} has not started yet."
+        start, end = span[0], min(span[1], today)
     else:
-        logger.error(f"❌ Failed to send command to view report")
-        return f"Failed to open report for {date}. Please try navigating to {report_type} reports page manually."
+        days = aggregates.days
+        if days is None or days[0] > today:  # only future-dated rows (e.g. scheduled posts)
+            return f"There are no {METRICS[metric]} yet."
+        start, end = days[0], today
+
+    key = None
+    if group and metric == "reports":
+        key = REPORT_TYPE_SECTIONS.get(group.lower())
+        if key is None:
+            return f"Unknown report type '{group}'. Available: {', '.join(REPORT_TYPE_SECTIONS)}."
+    elif group:
+        key = group.lower()
+    label = METRICS[metric] if key is None else (
+        group_label(metric, key) if metric == "reports" else f"{METRICS[metric]} on {group_label(metric, key)}")
+
+    start_time = time.perf_counter()
+    total = aggregates.total(metric, start, end, key)
+    length = (end - start).days + 1
+    parts = [f"{total} {label} {_span(start, end)}."]
+    if length > 1 and total:
+        daily = aggregates.daily(metric, start, end, key)
+        busiest = start + timedelta(days=int(daily.argmax()))
+        parts.append(f"They fall on {int((daily > 0).sum())} of those {length} days; "
+                     f"the busiest was {busiest.strftime('%d %B')} with {int(daily.max())}.")
+    if period:
+        previous = aggregates.total(metric, start - timedelta(days=length), start - timedelta(days=1), key)
+        parts.append(f"The {'day' if length == 1 else f'{length} days'} before had {previous}.")
+    if key is None:
+        groups = [f"{group_label(metric, g)}: {n}" for g, n in aggregates.by_group(metric, start, end).items() if n]
+        if len(groups) > 1:
+            parts.append(f"By {'section' if metric == 'reports' else 'platform'}: {', '.join(groups)}.")
+    logger.info(f"   KPI {metric} answered in {(time.perf_counter() - start_time) * 1000:.2f}ms")
+    return " ".join(parts)
 
 
 # ==================== TOOL EXPORTS ====================
 
-# List of all navigation tools to be registered with the agent
+# List of all navigation tools to be registered with the agent. Their results
+# are terminal: spoken as-is, without a second LLM pass (terminal_reply)
 NAVIGATION_TOOLS = [
-    open_dashboard,
-    show_whatsapp_reports,
-    show_productivity_reports,
-    show_ads_reports,
-    show_mail_reports,
-    open_bots,
-    show_social_posts,
-    show_content_ideas,
-    show_meeting_summary,
-    show_courses_prices,
-    go_home,
+    navigate,
     where_am_i,
-    open_admin_settings,
-    show_awaiting_approval,
 ]
 
 # List of DOM interaction tools
 DOM_TOOLS = [
     click_element,
     view_report_by_date,
+    run_dom_plan,
+]
+
+# Tools that read report content
+SEARCH_TOOLS = [
+    search_reports,
+]
+
+# Tools that answer numbers from the worker's KPI aggregates
+KPI_TOOLS = [
+    get_kpi,
 ]
 
 # All tools combined
-ALL_TOOLS = NAVIGATION_TOOLS + DOM_TOOLS
+ALL_TOOLS = NAVIGATION_TOOLS + DOM_TOOLS + SEARCH_TOOLS + KPI_TOOLS
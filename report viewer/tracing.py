@@ -0,0 +1,184 @@
+"""
+Hot-path tracing and latency histograms for the voice pipeline and tools.
+
+Spans go through the OpenTelemetry API and are no-ops until setup_tracing()
+installs a provider: OTLP when OTEL_EXPORTER_OTLP_ENDPOINT is set, JSON lines
+when AGENT_TRACE_FILE is set. The same provider is handed to livekit-agents,
+so its own llm_request/tts_request/function_tool spans nest with ours.
+
+Histograms use prometheus_client and are served by the AgentServer's
+/metrics endpoint (AGENT_PROMETHEUS_PORT; set AGENT_PROMETHEUS_MULTIPROC_DIR
+so job processes' samples are collected too).
+
+Per turn, TurnTracer turns the session's metrics into stages:
+  end_of_utterance  end of speech -> turn committed
+  stt_final         end of speech -> final transcript
+  llm_ttft          LLM request -> first token
+  tts_ttfb          TTS request -> first audio frame
+  turn_total        end of speech -> first audio (sum of the above)
+Tool calls (traced_tool) and data-channel publishes (traced_publish) are
+timed where they happen.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from livekit.agents import metrics as lk_metrics
+from opentelemetry import trace
+from prometheus_client import Histogram
+
+logger = logging.getLogger("voice-agent")
+
+AGENT_TRACE_FILE = os.getenv("AGENT_TRACE_FILE", "")
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+
+tracer = trace.get_tracer("report-viewer-agent")
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0)
+
+TURN_STAGE_SECONDS = Histogram(
+    "agent_turn_stage_seconds", "Voice turn latency by pipeline stage", ["stage"], buckets=_LATENCY_BUCKETS,
+)
+TOOL_SECONDS = Histogram(
+    "agent_tool_seconds", "Function tool duration", ["tool", "outcome"], buckets=_LATENCY_BUCKETS,
+)
+PUBLISH_SECONDS = Histogram(
+    "agent_publish_seconds", "Data channel publish latency", ["topic"], buckets=_LATENCY_BUCKETS,
+)
+PUBLISH_BYTES = Histogram(
+    "agent_publish_bytes", "Data channel payload size", ["topic"],
+    buckets=(64, 128, 256, 512, 1024, 4096, 16384, 65536),
+)
+
+_provider = None
+
+
+def setup_tracing():
+    """Install a tracer provider for this process, if an exporter is configured."""
+    global _provider
+    if _provider is not None or not (OTEL_EXPORTER_OTLP_ENDPOINT or AGENT_TRACE_FILE):
+        return _provider
+
+    from livekit.agents import telemetry
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "report-viewer-agent"}))
+    if OTEL_EXPORTER_OTLP_ENDPOINT:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    if AGENT_TRACE_FILE:
+        out = open(AGENT_TRACE_FILE, "a", buffering=1)
+        exporter = ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+
+    trace.set_tracer_provider(provider)
+    telemetry.set_tracer_provider(provider)
+    _provider = provider
+    logger.info(f"Tracing enabled ({OTEL_EXPORTER_OTLP_ENDPOINT or AGENT_TRACE_FILE})")
+    return provider
+
+
+def traced_tool(func):
+    """Time a function tool: one span and one agent_tool_seconds sample per call.
+
+    Goes under @function_tool, which still sees the wrapped signature.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "error"
+        with tracer.start_as_current_span(f"tool.{name}") as span:
+            span.set_attributes({f"tool.arg.{k}": str(v) for k, v in kwargs.items() if v is not None})
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                TOOL_SECONDS.labels(name, outcome).observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+@contextmanager
+def traced_publish(topic: str, size: int):
+    """Span and histograms around one data-channel publish."""
+    start = time.perf_counter()
+    with tracer.start_as_current_span("publish_data", attributes={"topic": topic, "bytes": size}):
+        yield
+    PUBLISH_SECONDS.labels(topic).observe(time.perf_counter() - start)
+    PUBLISH_BYTES.labels(topic).observe(size)
+
+
+def _ns(timestamp: float) -> int:
+    return int(timestamp * 1e9)
+
+
+class TurnTracer:
+    """Per-session turn spans and stage histograms, fed by `metrics_collected` events."""
+
+    def __init__(self):
+        self._turns: dict[str, dict] = {}  # speech_id -> span and stage durations
+
+    def attach(self, session) -> None:
+        session.on("metrics_collected", lambda event: self.on_metrics(event.metrics))
+
+    def on_metrics(self, m) -> None:
+        # Metrics are emitted when a step completes: `timestamp` is its end
+        if isinstance(m, lk_metrics.EOUMetrics):
+            self.close()  # a new user turn: earlier ones won't produce more audio
+            end_of_speech = m.timestamp - m.end_of_utterance_delay
+            self._stage(m.speech_id, "end_of_utterance", end_of_speech, m.end_of_utterance_delay)
+            self._stage(m.speech_id, "stt_final", end_of_speech, m.transcription_delay)
+        elif isinstance(m, lk_metrics.LLMMetrics) and not m.cancelled:
+            self._stage(m.speech_id, "llm_ttft", m.timestamp - m.duration, m.ttft)
+        elif isinstance(m, lk_metrics.TTSMetrics) and not m.cancelled:
+            start = m.timestamp - m.duration
+            self._stage(m.speech_id, "tts_ttfb", start, m.ttfb)
+            self._finish(m.speech_id, start + m.ttfb)
+
+    def _turn(self, speech_id: str, start: float) -> dict:
+        turn = self._turns.get(speech_id)
+        if turn is None:
+            span = tracer.start_span("turn", start_time=_ns(start), attributes={"speech_id": speech_id})
+            turn = self._turns[speech_id] = {"span": span, "stages": {}, "end": start}
+        return turn
+
+    def _stage(self, speech_id: str | None, stage: str, start: float, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        TURN_STAGE_SECONDS.labels(stage).observe(seconds)
+        if speech_id is None:
+            return
+        turn = self._turn(speech_id, start)
+        turn["stages"].setdefault(stage, seconds)
+        turn["end"] = max(turn["end"], start + seconds)
+        context = trace.set_span_in_context(turn["span"])
+        tracer.start_span(stage, context=context, start_time=_ns(start)).end(end_time=_ns(start + seconds))
+
+    def _finish(self, speech_id: str | None, end: float) -> None:
+        turn = self._turns.pop(speech_id, None) if speech_id else None
+        if turn is None:
+            return
+        stages = turn["stages"]
+        total = sum(stages.get(s, 0.0) for s in ("end_of_utterance", "llm_ttft", "tts_ttfb"))
+        if total > 0:
+            TURN_STAGE_SECONDS.labels("turn_total").observe(total)
+            turn["span"].set_attribute("turn_total_ms", round(total * 1000, 1))
+        turn["span"].end(end_time=_ns(end))
+
+    def close(self) -> None:
+        """End turns that never produced TTS audio (interrupted, fast path, cached audio)."""
+        for turn in self._turns.values():
+            turn["span"].end(end_time=_ns(turn["end"]))
+        self._turns.clear()
@@ -0,0 +1,244 @@
+"""
+Persistent cache of synthesized audio for the agent's fixed phrases.
+
+The navigation confirmations and the opening greeting are the same few
+sentences in every session, so their audio is rendered once by the TTS
+provider and then served from PCM files on local disk (memory-mapped on
+read), shared by all worker processes on the host. Entries are keyed by
+(text, voice, language) and evicted least-recently-used once the directory
+grows past TTS_CACHE_MAX_MB.
+
+Only registered phrases are cached. VoiceAssistant.tts_node buffers the
+text stream while it is still a prefix of a registered phrase and falls
+through to the live TTS as soon as it diverges, so ordinary LLM replies
+are not delayed.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+from collections import OrderedDict
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable
+
+from livekit import rtc
+
+logger = logging.getLogger("voice-agent")
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tts_cache"))
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "64"))
+
+# Served frames are 20ms, like the TTS plugins' output
+FRAME_MS = 20
+
+_MAGIC = b"TTS1"
+_HEADER = struct.Struct("<4sIH")  # magic, sample_rate, num_channels
+_ARABIC = re.compile(r'[؀-ۿ]')
+_LATIN = re.compile(r'[A-Za-z]')
+
+
+def normalize_phrase(text: str) -> str:
+    return " ".join(text.split())
+
+
+def phrase_language(text: str) -> str:
+    """"ar", "en" or "mixed" (the bilingual confirmations), from the script used."""
+    arabic, latin = bool(_ARABIC.search(text)), bool(_LATIN.search(text))
+    if arabic and latin:
+        return "mixed"
+    return "ar" if arabic else "en"
+
+
+class TTSCache:
+    """Size-bounded, LRU, on-disk PCM cache with hit/miss counters."""
+
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = int(TTS_CACHE_MAX_MB * 1024 * 1024)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._phrases: set[str] = set()
+        self._prefixes: set[str] = set()
+        self._files: OrderedDict[str, int] = OrderedDict()  # key -> size, least recently used first
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pcm"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(self._files.values())
+
+    # ==================== PHRASES ====================
+
+    def register(self, phrases: Iterable[str]) -> None:
+        """Mark phrases as cacheable."""
+        for phrase in phrases:
+            phrase = normalize_phrase(phrase)
+            self._phrases.add(phrase)
+            self._prefixes.update(phrase[:i] for i in range(len(phrase) + 1))
+
+    def is_phrase(self, text: str) -> bool:
+        return normalize_phrase(text) in self._phrases
+
+    def could_be_phrase(self, text: str) -> bool:
+        """True while streamed text may still turn out to be a registered phrase."""
+        return normalize_phrase(text) in self._prefixes
+
+    # ==================== STORAGE ====================
+
+    @staticmethod
+    def key(text: str, voice: str, language: str | None = None) -> str:
+        text = normalize_phrase(text)
+        language = language or phrase_language(text)
+        return hashlib.sha256(f"{voice}\n{language}\n{text}".encode()).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pcm")
+
+    def get(self, text: str, voice: str, language: str | None = None) -> list[rtc.AudioFrame] | None:
+        """Cached frames for this phrase, or None (counted as a miss)."""
+        key = self.key(text, voice, language)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                frames = self._frames(mm)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Missing, evicted by another process, empty or corrupt
+            self._files.pop(key, None)
+            self.misses += 1
+            return None
+        if key not in self._files:
+            self._files[key] = os.path.getsize(path)  # written by another worker process
+        self._files.move_to_end(key)
+        self.hits += 1
+        return frames
+
+    @staticmethod
+    def _frames(mm: mmap.mmap) -> list[rtc.AudioFrame]:
+        magic, sample_rate, num_channels = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC:
+            raise ValueError("not a TTS cache file")
+        step = sample_rate * FRAME_MS // 1000 * num_channels * 2  # int16 samples
+        frames = []
+        for start in range(_HEADER.size, len(mm), step):
+            chunk = mm[start:start + step]
+            frames.append(rtc.AudioFrame(chunk, sample_rate, num_channels, len(chunk) // (2 * num_channels)))
+        return frames
+
+    def put(self, text: str, voice: str, frames: list[rtc.AudioFrame], language: str | None = None) -> None:
+        """Store a phrase's audio (atomically, so other processes never read a partial file)."""
+        if not frames:
+            return
+        key = self.key(text, voice, language)
+        sample_rate, num_channels = frames[0].sample_rate, frames[0].num_channels
+        pcm = b"".join(bytes(frame.data) for frame in frames)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, sample_rate, num_channels))
+                f.write(pcm)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            logger.warning(f"⚠️ TTS cache write failed: {e}")
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+        self._files[key] = _HEADER.size + len(pcm)
+        self._files.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        total = self.size_bytes
+        while total > self.max_bytes and len(self._files) > 1:
+            key, size = self._files.popitem(last=False)
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._files),
+            "bytes": self.size_bytes,
+        }
+
+    # ==================== SYNTHESIS ====================
+
+    async def synthesize(
+        self,
+        text: AsyncIterable[str],
+        voice: str,
+        tts: Callable[[AsyncIterable[str]], AsyncIterable[rtc.AudioFrame]],
+    ) -> AsyncIterator[rtc.AudioFrame]:
+        """Speak `text`, from the cache when it is a registered phrase.
+
+        `tts` is the live synthesis path (Agent.default.tts_node). A registered
+        phrase that misses is synthesized live once and written through.
+        """
+        stream = aiter(text)
+        buffered = ""
+        async for chunk in stream:
+            buffered += chunk
+            if not self.could_be_phrase(buffered):
+                async for frame in tts(_chain(buffered, stream)):
+                    yield frame
+                return
+
+        if not self.is_phrase(buffered):
+            async for frame in tts(_chain(buffered)):
+                yield frame
+            return
+
+        cached = self.get(buffered, voice)
+        if cached is not None:
+            for frame in cached:
+                yield frame
+            return
+
+        frames = []
+        async for frame in tts(_chain(buffered)):
+            frames.append(frame)
+            yield frame
+        self.put(buffered, voice, frames)
+
+
+async def _chain(first: str, rest: AsyncIterator[str] | None = None) -> AsyncIterator[str]:
+    yield first
+    if rest is not None:
+        async for chunk in rest:
+            yield chunk
+
+
+_cache: TTSCache | None = None
+
+
+def get_tts_cache() -> TTSCache | None:
+    """This process's cache, or None when disabled (TTS_CACHE_MAX_MB=0) or the directory is unusable."""
+    global _cache
+    if _cache is None and TTS_CACHE_MAX_MB > 0:
+        try:
+            _cache = TTSCache()
+        except OSError as e:
+            logger.warning(f"⚠️ TTS cache disabled: {e}")
+            return None
+    return _cache
@@ -1,6 +1,6 @@
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts"
 import { createClient } from 'https://esm.sh/@supabase/supabase-js@2'
-import { AccessToken } from "npm:livekit-server-sdk@2.7.0"
+import { AccessToken, ParticipantInfo_Kind, RoomServiceClient } from "npm:livekit-server-sdk@2.7.0"
 
 const corsHeaders = {
   'Access-Control-Allow-Origin': '*',
@@ -44,14 +44,9 @@ serve(async (req) => {
     // Parse request body
     const { participantName } = await req.json()
 
-
-    // Generate UNIQUE room name every time
-    const timestamp = Date.now()
-    const random = Math.random().toString(36).substring(2, 8)
-    const uniqueRoomName = `voice-${timestamp}-${random}`
-
-
-    console.log(`🎯 Creating token for UNIQUE room: ${uniqueRoomName}`)
+    // One stable room per user: a reload or network blip rejoins the room,
+    // where the agent keeps the session alive for a grace period
+    const roomName = `voice-${user.id}`
 
     // Get LiveKit credentials from environment
     const livekitUrl = Deno.env.get('LIVEKIT_URL')
@@ -71,7 +66,7 @@ serve(async (req) => {
     // Grant permissions to join the room
     at.addGrant({
       roomJoin: true,
-      room: uniqueRoomName,
+      room: roomName,
       canPublish: true,
       canSubscribe: true,
       canPublishData: true,
@@ -80,15 +75,26 @@ serve(async (req) => {
     // Generate JWT token
     const token = await at.toJwt()
 
-    // Notify Railway agent to join the room
+    // Is the agent still in the room from the user's last connection?
+    let resumed = false
+    try {
+      const roomService = new RoomServiceClient(livekitUrl, apiKey, apiSecret)
+      const participants = await roomService.listParticipants(roomName)
+      resumed = participants.some((p) => p.kind === ParticipantInfo_Kind.AGENT)
+    } catch {
+      // The room doesn't exist yet
+    }
+    console.log(`🎯 Token for room ${roomName} (${resumed ? 'resuming the live agent' : 'new session'})`)
+
+    // Notify Railway agent to join the room, unless it is still there
     const railwayUrl = Deno.env.get('RAILWAY_AGENT_URL')
-    if (railwayUrl) {
+    if (railwayUrl && !resumed) {
       try {
         const agentResponse = await fetch(`${railwayUrl}/start`, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({
-            room_name: uniqueRoomName,
+            room_name: roomName,
             participant_identity: participantName || user.id,
           }),
         })
@@ -108,7 +114,8 @@ serve(async (req) => {
       JSON.stringify({
         token,
         url: livekitUrl,
-        roomName: uniqueRoomName,
+        roomName,
+        resumed,
       }),
       {
         headers: { ...corsHeaders, 'Content-Type': 'application/json' },